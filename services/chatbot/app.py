@@ -8,12 +8,12 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.responses import StreamingResponse, Response
 import json
+import httpx
 import requests
 from contextlib import asynccontextmanager
 from asyncio import BoundedSemaphore
 from functools import wraps
 import uvicorn
-from starlette.concurrency import iterate_in_threadpool
 from lingua import Language
 
 from common.misc_utils import set_log_level, get_logger
@@ -28,8 +28,8 @@ logger = get_logger("chatbot")
 
 from common.diagnostic_logger import setup_comprehensive_crash_handler
 import common.db_utils as db
-from common.misc_utils import get_embedding_endpoint, get_llm_endpoint, get_reranker_endpoint, set_request_id, create_llm_session, configure_uvicorn_logging
-from common.llm_utils import query_vllm_stream, query_vllm_non_stream, query_vllm_models, tokenize_with_llm
+from common.misc_utils import get_embedding_endpoint, get_llm_endpoint, get_reranker_endpoint, set_request_id, create_llm_session, create_async_llm_client, close_async_llm_client, configure_uvicorn_logging
+from common.llm_utils import query_vllm_stream_async, query_vllm_non_stream_async, query_vllm_models, tokenize_many, tokenize_with_llm
 from common.perf_utils import perf_registry
 from common.error_utils import APIError, ErrorCode, http_error_responses, http_exception_handler
 from chatbot.backend_utils import search_only, validate_query_length
@@ -107,14 +107,17 @@ diagnostic_logger, stderr_monitor, signal_handler = setup_comprehensive_crash_ha
 async def lifespan(app):
     """Manage application lifespan events (startup and shutdown).
 
-    Sets up uvicorn logging configuration, creates a global connection pool
-    for the LLM session, and pre-initializes model configurations.
+    Sets up uvicorn logging configuration, creates global connection pools
+    for the sync LLM session and the async LLM client, and pre-initializes
+    model configurations.
     """
     filtered_paths = ['/health']
     configure_uvicorn_logging(settings.common.app.log_level, filtered_paths)
     create_llm_session(pool_maxsize=settings.common.llm.max_batch_size)
+    create_async_llm_client(max_connections=settings.common.llm.max_batch_size)
     initialize_models()
     yield
+    await close_async_llm_client()
     stderr_monitor.stop()
 
 # OpenAPI tags metadata for endpoint organization
@@ -325,7 +328,7 @@ async def locked_stream(stream_g, perf_stat_dict):
     error chunk response if a failure occurs mid-stream.
     """
     try:
-        async for chunk in iterate_in_threadpool(stream_g):
+        async for chunk in stream_g:
             yield chunk
     except Exception as e:
         logger.error(f"Error in streaming response: {str(e)}", exc_info=True)
@@ -559,7 +562,8 @@ async def chat_completion(req: ChatCompletionRequest, credentials: Optional[HTTP
                 truncate_history_by_tokens,
                 previous_messages,
                 get_history_token_budget(query_lang, settings.query_rephrasing.history_token_budget),
-                lambda text: tokenize_with_llm(text, llm_endpoint)
+                lambda text: tokenize_with_llm(text, llm_endpoint),
+                count_many_fn=lambda texts: tokenize_many(texts, llm_endpoint),
             )
 
             if truncated_history_for_rephrasing:
@@ -597,8 +601,8 @@ async def chat_completion(req: ChatCompletionRequest, credentials: Optional[HTTP
             stop_words = get_stop_words_with_special_tokens(req.stop)
 
             if req.stream:
-                vllm_stream = await asyncio.to_thread(
-                    query_vllm_stream,
+                # Async generator: the vLLM call starts when the response body is streamed
+                vllm_stream = query_vllm_stream_async(
                     current_query,
                     docs,
                     llm_endpoint,
@@ -619,8 +623,7 @@ async def chat_completion(req: ChatCompletionRequest, credentials: Optional[HTTP
                     response.headers["X-Rephrased-Query"] = rephrased_query
                 return response
 
-            vllm_non_stream = await asyncio.to_thread(
-                query_vllm_non_stream,
+            vllm_non_stream = await query_vllm_non_stream_async(
                 current_query,
                 docs,
                 llm_endpoint,
@@ -664,7 +667,7 @@ async def chat_completion(req: ChatCompletionRequest, credentials: Optional[HTTP
                 return response_data
 
             APIError.raise_error(ErrorCode.LLM_ERROR, "Unexpected response format from LLM")
-        except requests.exceptions.HTTPError as e:
+        except (requests.exceptions.HTTPError, httpx.HTTPStatusError) as e:
             status_code = e.response.status_code if e.response is not None else 502
             logger.error(f"Error in non-streaming response: {e}", exc_info=True)
             raise HTTPException(
@@ -68,6 +68,22 @@ def search_only(question, top_k, top_r):
             perf_stat_dict["retrieve_time"] = float(response.headers["X-Retrieve-Time"])
         if "X-Rerank-Time" in response.headers:
             perf_stat_dict["rerank_time"] = float(response.headers["X-Rerank-Time"])
+        if "X-Retrieval-Cache" in response.headers:
+            perf_stat_dict["retrieval_cache_hit"] = response.headers["X-Retrieval-Cache"] == "hit"
+        if "X-Retrieval-Cache-Hit-Rate" in response.headers:
+            perf_stat_dict["retrieval_cache_hit_rate"] = float(response.headers["X-Retrieval-Cache-Hit-Rate"])
+        if "X-Retrieval-Cache-Bytes" in response.headers:
+            perf_stat_dict["retrieval_cache_bytes"] = int(response.headers["X-Retrieval-Cache-Bytes"])
+        if "X-Semantic-Cache" in response.headers:
+            perf_stat_dict["semantic_cache_hit"] = response.headers["X-Semantic-Cache"] == "hit"
+        if "X-Semantic-Cache-Hit-Rate" in response.headers:
+            perf_stat_dict["semantic_cache_hit_rate"] = float(response.headers["X-Semantic-Cache-Hit-Rate"])
+        if "X-Rerank-Cache-Hits" in response.headers:
+            perf_stat_dict["rerank_cache_hits"] = int(response.headers["X-Rerank-Cache-Hits"])
+        if "X-Rerank-Cache-Misses" in response.headers:
+            perf_stat_dict["rerank_cache_misses"] = int(response.headers["X-Rerank-Cache-Misses"])
+        if "X-Rerank-Cache-Hit-Rate" in response.headers:
+            perf_stat_dict["rerank_cache_hit_rate"] = float(response.headers["X-Rerank-Cache-Hit-Rate"])
 
         logger.info(
             f"Similarity service timing - "
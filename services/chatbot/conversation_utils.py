@@ -38,7 +38,8 @@ def get_conversation_context(messages: Sequence[Any]) -> tuple[str, list[dict[st
 def truncate_history_by_tokens(
     messages: Sequence[dict[str, str]],
     token_budget: int,
-    tokenize_fn: Callable[[str], list]
+    tokenize_fn: Callable[[str], list],
+    count_many_fn: Callable[[list[str]], list[int]] | None = None,
 ) -> list[dict[str, str]]:
     """
     Truncate history using a token-based sliding window.
@@ -50,6 +51,9 @@ def truncate_history_by_tokens(
         messages: List of message dicts with 'content' and 'role' keys
         token_budget: Maximum number of tokens allowed
         tokenize_fn: Function that takes a string and returns a list of tokens
+        count_many_fn: Optional function that takes a list of strings and returns their
+            token counts in order. When given, all messages are counted in one batch
+            instead of calling tokenize_fn once per message.
     
     Returns:
         list: truncated_messages
@@ -61,9 +65,17 @@ def truncate_history_by_tokens(
         truncated: list[dict[str, str]] = []
         current_tokens = 0
 
-        for message in reversed(messages):
-            content = message.get("content", "")
-            message_tokens = len(tokenize_fn(content))
+        if count_many_fn is not None:
+            token_counts = count_many_fn([message.get("content", "") for message in messages])
+        else:
+            token_counts = None
+
+        for idx in range(len(messages) - 1, -1, -1):
+            message = messages[idx]
+            if token_counts is not None:
+                message_tokens = token_counts[idx]
+            else:
+                message_tokens = len(tokenize_fn(message.get("content", "")))
 
             if not truncated and message_tokens > token_budget:
                 logger.info(
@@ -158,6 +158,14 @@ class PerfMetric(BaseModel):
     completion_tokens: Optional[int] = Field(default=None, description="Number of tokens generated by LLM")
     prompt_tokens: Optional[int] = Field(default=None, description="Number of tokens in the prompt")
     token_latencies: Optional[list[float]] = Field(default=None, description="Per-token latencies for streaming responses")
+    retrieval_cache_hit: Optional[bool] = Field(default=None, description="Whether retrieval was served from the similarity service's result cache")
+    retrieval_cache_hit_rate: Optional[float] = Field(default=None, description="Hit rate of the similarity service's retrieval cache")
+    retrieval_cache_bytes: Optional[int] = Field(default=None, description="Approximate memory used by the similarity service's retrieval cache")
+    semantic_cache_hit: Optional[bool] = Field(default=None, description="Whether results were reused from a near-duplicate query in the similarity service's semantic cache")
+    semantic_cache_hit_rate: Optional[float] = Field(default=None, description="Hit rate of the similarity service's semantic query cache")
+    rerank_cache_hits: Optional[int] = Field(default=None, description="Reranker scores served from the similarity service's score cache")
+    rerank_cache_misses: Optional[int] = Field(default=None, description="Reranker scores computed by the reranker endpoint")
+    rerank_cache_hit_rate: Optional[float] = Field(default=None, description="Hit rate of the similarity service's rerank score cache")
 
 
 class PerfMetricsResponse(BaseModel):
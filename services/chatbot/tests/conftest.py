@@ -184,7 +184,7 @@ def mock_vllm_response():
 @pytest.fixture
 def mock_vllm_stream():
     """Mock vLLM streaming response generator."""
-    def stream_generator():
+    async def stream_generator():
         chunks = [
             'data: {"choices":[{"delta":{"content":"Based on"}}]}\n\n',
             'data: {"choices":[{"delta":{"content":" the retrieved"}}]}\n\n',
@@ -310,17 +310,17 @@ def mock_detect_language(monkeypatch):
 
 @pytest.fixture
 def mock_query_vllm_non_stream(monkeypatch, mock_vllm_response):
-    """Mock query_vllm_non_stream function."""
-    mock = Mock(return_value=mock_vllm_response)
-    monkeypatch.setattr("chatbot.app.query_vllm_non_stream", mock)
+    """Mock query_vllm_non_stream_async function."""
+    mock = AsyncMock(return_value=mock_vllm_response)
+    monkeypatch.setattr("chatbot.app.query_vllm_non_stream_async", mock)
     return mock
 
 
 @pytest.fixture
 def mock_query_vllm_stream(monkeypatch, mock_vllm_stream):
-    """Mock query_vllm_stream function."""
+    """Mock query_vllm_stream_async function."""
     mock = Mock(return_value=mock_vllm_stream)
-    monkeypatch.setattr("chatbot.app.query_vllm_stream", mock)
+    monkeypatch.setattr("chatbot.app.query_vllm_stream_async", mock)
     return mock
 
 
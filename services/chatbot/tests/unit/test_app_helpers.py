@@ -109,8 +109,8 @@ class TestQueryRephrasingIntegration:
         mock_search = Mock(return_value=([{"page_content": "test"}], {}))
         monkeypatch.setattr("chatbot.app.search_only", mock_search)
         
-        mock_vllm = Mock(return_value={"choices": [{"message": {"content": "Response"}}]})
-        monkeypatch.setattr("chatbot.app.query_vllm_non_stream", mock_vllm)
+        mock_vllm = AsyncMock(return_value={"choices": [{"message": {"content": "Response"}}]})
+        monkeypatch.setattr("chatbot.app.query_vllm_non_stream_async", mock_vllm)
         
         # Mock is_auth_required to return False
         mock_is_auth = AsyncMock(return_value=False)
@@ -182,8 +182,8 @@ class TestQueryRephrasingIntegration:
         mock_search = Mock(return_value=([{"page_content": "test"}], {}))
         monkeypatch.setattr("chatbot.app.search_only", mock_search)
         
-        mock_vllm = Mock(return_value={"choices": [{"message": {"content": "Antwort"}}]})
-        monkeypatch.setattr("chatbot.app.query_vllm_non_stream", mock_vllm)
+        mock_vllm = AsyncMock(return_value={"choices": [{"message": {"content": "Antwort"}}]})
+        monkeypatch.setattr("chatbot.app.query_vllm_non_stream_async", mock_vllm)
         
         # Mock is_auth_required to return False
         mock_is_auth = AsyncMock(return_value=False)
@@ -252,8 +252,8 @@ class TestQueryRephrasingIntegration:
         mock_search = Mock(return_value=([{"page_content": "test"}], {}))
         monkeypatch.setattr("chatbot.app.search_only", mock_search)
         
-        mock_vllm = Mock(return_value={"choices": [{"message": {"content": "Response"}}]})
-        monkeypatch.setattr("chatbot.app.query_vllm_non_stream", mock_vllm)
+        mock_vllm = AsyncMock(return_value={"choices": [{"message": {"content": "Response"}}]})
+        monkeypatch.setattr("chatbot.app.query_vllm_non_stream_async", mock_vllm)
         
         # Mock is_auth_required to return False
         mock_is_auth = AsyncMock(return_value=False)
@@ -311,8 +311,8 @@ class TestQueryRephrasingIntegration:
         mock_search = Mock(return_value=([{"page_content": "test"}], {}))
         monkeypatch.setattr("chatbot.app.search_only", mock_search)
         
-        mock_vllm = Mock(return_value={"choices": [{"message": {"content": "Response"}}]})
-        monkeypatch.setattr("chatbot.app.query_vllm_non_stream", mock_vllm)
+        mock_vllm = AsyncMock(return_value={"choices": [{"message": {"content": "Response"}}]})
+        monkeypatch.setattr("chatbot.app.query_vllm_non_stream_async", mock_vllm)
         
         # Mock is_auth_required to return False
         mock_is_auth = AsyncMock(return_value=False)
@@ -85,6 +85,74 @@ class TestSearchOnly:
         assert "rerank_time" in perf_stat_dict
         assert perf_stat_dict["rerank_time"] == 0.045
 
+    def test_returns_retrieval_cache_stats_from_headers(self, monkeypatch):
+        """search_only must copy retrieval cache stats from similarity service headers."""
+        from chatbot import backend_utils
+
+        self._patch_settings(monkeypatch, threshold=0.0)
+
+        mock_response = Mock()
+        mock_response.json.return_value = {"score_type": "cosine", "results": []}
+        mock_response.raise_for_status = Mock()
+        mock_response.headers = {
+            "X-Retrieve-Time": "0.001",
+            "X-Retrieval-Cache": "hit",
+            "X-Retrieval-Cache-Hit-Rate": "0.7500",
+            "X-Retrieval-Cache-Bytes": "2048",
+        }
+        self._mock_session(monkeypatch, mock_response)
+
+        _, perf_stat_dict = backend_utils.search_only(question="q", top_k=10, top_r=5)
+
+        assert perf_stat_dict["retrieval_cache_hit"] is True
+        assert perf_stat_dict["retrieval_cache_hit_rate"] == 0.75
+        assert perf_stat_dict["retrieval_cache_bytes"] == 2048
+
+    def test_returns_semantic_cache_stats_from_headers(self, monkeypatch):
+        """search_only must copy semantic query cache stats from similarity service headers."""
+        from chatbot import backend_utils
+
+        self._patch_settings(monkeypatch, threshold=0.0)
+
+        mock_response = Mock()
+        mock_response.json.return_value = {"score_type": "relevance", "results": []}
+        mock_response.raise_for_status = Mock()
+        mock_response.headers = {
+            "X-Retrieve-Time": "0.001",
+            "X-Semantic-Cache": "hit",
+            "X-Semantic-Cache-Hit-Rate": "0.2500",
+        }
+        self._mock_session(monkeypatch, mock_response)
+
+        _, perf_stat_dict = backend_utils.search_only(question="q", top_k=10, top_r=5)
+
+        assert perf_stat_dict["semantic_cache_hit"] is True
+        assert perf_stat_dict["semantic_cache_hit_rate"] == 0.25
+
+    def test_returns_rerank_cache_stats_from_headers(self, monkeypatch):
+        """search_only must copy rerank score cache stats from similarity service headers."""
+        from chatbot import backend_utils
+
+        self._patch_settings(monkeypatch, threshold=0.0)
+
+        mock_response = Mock()
+        mock_response.json.return_value = {"score_type": "relevance", "results": []}
+        mock_response.raise_for_status = Mock()
+        mock_response.headers = {
+            "X-Retrieve-Time": "0.001",
+            "X-Rerank-Time": "0.002",
+            "X-Rerank-Cache-Hits": "15",
+            "X-Rerank-Cache-Misses": "5",
+            "X-Rerank-Cache-Hit-Rate": "0.6000",
+        }
+        self._mock_session(monkeypatch, mock_response)
+
+        _, perf_stat_dict = backend_utils.search_only(question="q", top_k=20, top_r=5)
+
+        assert perf_stat_dict["rerank_cache_hits"] == 15
+        assert perf_stat_dict["rerank_cache_misses"] == 5
+        assert perf_stat_dict["rerank_cache_hit_rate"] == 0.6
+
     def test_applies_top_r_cutoff(self, monkeypatch):
         """search_only must truncate to top_r documents after retrieval."""
         from chatbot import backend_utils
@@ -186,6 +186,29 @@ class TestTruncateHistoryByTokens:
         assert len(result) == 3
         assert result == messages
     
+    def test_count_many_fn_counts_all_messages_in_one_call(self):
+        """Test batched counting replaces per-message tokenize calls"""
+        from chatbot.conversation_utils import truncate_history_by_tokens
+        
+        tokenize_fn = Mock(side_effect=AssertionError("tokenize_fn should not be called"))
+        count_many_fn = Mock(return_value=[40, 30, 50])
+        
+        messages = [
+            {"role": "user", "content": "Message 1"},
+            {"role": "assistant", "content": "Response 1"},
+            {"role": "user", "content": "Message 2"}
+        ]
+        
+        result = truncate_history_by_tokens(
+            messages=messages,
+            token_budget=80,
+            tokenize_fn=tokenize_fn,
+            count_many_fn=count_many_fn
+        )
+        
+        count_many_fn.assert_called_once_with(["Message 1", "Response 1", "Message 2"])
+        assert result == messages[1:]
+    
     def test_truncates_oldest_messages_first(self):
         """Test truncates oldest messages when over budget"""
         from chatbot.conversation_utils import truncate_history_by_tokens
@@ -307,8 +307,8 @@ class TestChatCompletionNonStreaming:
         mock_detect_language, monkeypatch
     ):
         """Test error response from vLLM"""
-        mock_vllm = Mock(return_value={"error": "Model error"})
-        monkeypatch.setattr("chatbot.app.query_vllm_non_stream", mock_vllm)
+        mock_vllm = AsyncMock(return_value={"error": "Model error"})
+        monkeypatch.setattr("chatbot.app.query_vllm_non_stream_async", mock_vllm)
         
         # Mock concurrency limiter
         mock_limiter = Mock()
@@ -0,0 +1,177 @@
+"""
+Benchmark cascade reranking: rerank latency against recall@k on the golden question sets.
+
+Every golden answer is split into chunks of a few sentences, and together they form
+the corpus; a question's relevant chunks are those of its own answer. For each
+question, BM25 retrieves the first-stage candidates, cascade_prune keeps the most
+promising of them, and rerank_documents scores the rest against a local mock
+reranker. The mock is a noisy relevance oracle (a stand-in for a cross-encoder that
+is better than the cheap stage) whose latency grows with the number of documents
+per request, like a model forward pass:
+
+    latency = base_ms + per_doc_ms * documents
+
+The first row reranks every candidate (no cascade). The other rows keep fewer
+candidates, optionally with a relative score floor; recall@k shows what the
+pruning costs in quality.
+
+Usage (from the services directory):
+    python -m common.benchmarks.cascade_rerank [--candidates 50] [--k 5] [--base-ms 3] [--per-doc-ms 0.4]
+"""
+
+import argparse
+import csv
+import math
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from common import reranker_utils
+from common.reranker_utils import cascade_prune, rerank_documents
+from common.settings import settings
+
+GOLDEN_DIR = Path(__file__).resolve().parents[3] / "test" / "golden"
+MOCK_ENDPOINT = "mock://reranker"
+SENTENCES_PER_CHUNK = 2
+QUESTION_COLUMNS = ("Question", "golden_question")
+ANSWER_COLUMNS = ("GoldenAnswer", "Golden Answer", "golden_answer")
+# (rerank candidates, min relative score); None reranks every retrieved candidate
+CASCADES = [(None, 0.0), (30, 0.0), (20, 0.0), (10, 0.0), (20, 0.5)]
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def load_golden(golden_dir):
+    """Return (questions, chunks, relevant chunk ids per question) from every golden CSV."""
+    questions, chunks, relevant = [], [], []
+    for path in sorted(Path(golden_dir).glob("*.csv")):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for row in csv.DictReader(f):
+                question = next((row[c] for c in QUESTION_COLUMNS if row.get(c)), "")
+                answer = next((row[c] for c in ANSWER_COLUMNS if row.get(c)), "")
+                if not question.strip() or not answer.strip():
+                    continue
+                sentences = [s for s in _SENTENCE_RE.split(answer.strip()) if s]
+                ids = set()
+                for start in range(0, len(sentences), SENTENCES_PER_CHUNK):
+                    ids.add(len(chunks))
+                    chunks.append({
+                        "page_content": " ".join(sentences[start:start + SENTENCES_PER_CHUNK]),
+                        "chunk_id": len(chunks),
+                        "filename": path.name,
+                    })
+                questions.append(question.strip())
+                relevant.append(ids)
+    return questions, chunks, relevant
+
+
+class Bm25:
+    """Okapi BM25 over the chunk texts, the first retrieval stage."""
+
+    def __init__(self, chunks, k1=1.2, b=0.75):
+        """Index the chunks."""
+        self.k1, self.b = k1, b
+        self.docs = [Counter(t.lower() for t in _TOKEN_RE.findall(c["page_content"])) for c in chunks]
+        self.lengths = np.array([sum(d.values()) for d in self.docs], dtype=np.float64)
+        self.avg_length = self.lengths.mean()
+        df = Counter(term for d in self.docs for term in d)
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+    def search(self, query, top_k):
+        """Return (ids, scores) of the top_k chunks."""
+        scores = np.zeros(len(self.docs))
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / self.avg_length)
+        for term in set(t.lower() for t in _TOKEN_RE.findall(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            tf = np.array([d.get(term, 0) for d in self.docs], dtype=np.float64)
+            scores += idf * tf * (self.k1 + 1) / (tf + norm)
+        top = np.argsort(-scores, kind="stable")[:top_k]
+        return top.tolist(), scores[top].tolist()
+
+
+class MockRerankClient:
+    """Local stand-in for the Cohere client: a noisy relevance oracle with per-document latency."""
+
+    def __init__(self, base_ms, per_doc_ms, noise, seed):
+        """Configure latency and score noise."""
+        self.base_ms, self.per_doc_ms, self.noise = base_ms, per_doc_ms, noise
+        self.rng = np.random.default_rng(seed)
+        self.relevant_texts = set()
+
+    def rerank(self, model, query, documents, top_n=None, max_tokens_per_doc=None):
+        """Score the documents, taking as long as one forward pass over them."""
+        time.sleep((self.base_ms + self.per_doc_ms * len(documents)) / 1000)
+        results = [
+            SimpleNamespace(index=i, relevance_score=float((text in self.relevant_texts) + self.rng.normal(0, self.noise)))
+            for i, text in enumerate(documents)
+        ]
+        return SimpleNamespace(results=results)
+
+
+def run(cascade, questions, chunks, relevant, bm25, client, args):
+    """Run every question through one cascade; return (p50 ms, p95 ms, mean cascade ms, recall@k)."""
+    keep, min_relative = cascade
+    latencies, cascade_ms, recalls = [], [], []
+    for question, expected in zip(questions, relevant):
+        ids, scores = bm25.search(question, args.candidates)
+        docs = [chunks[i] for i in ids]
+        client.relevant_texts = {chunks[i]["page_content"] for i in expected}
+
+        start = time.perf_counter()
+        if keep is not None:
+            docs, scores = cascade_prune(question, docs, scores, keep=keep, min_keep=args.k,
+                                         min_relative_score=min_relative)
+        pruned = time.perf_counter()
+        reranked = rerank_documents(question, docs, "mock", MOCK_ENDPOINT)[:args.k]
+        done = time.perf_counter()
+
+        cascade_ms.append((pruned - start) * 1000)
+        latencies.append((done - start) * 1000)
+        found = {doc["chunk_id"] for doc, _ in reranked}
+        recalls.append(len(found & expected) / min(args.k, len(expected)))
+    return (float(np.percentile(latencies, 50)), float(np.percentile(latencies, 95)),
+            float(np.mean(cascade_ms)), float(np.mean(recalls)))
+
+
+def main():
+    """Run the benchmark and print latency and recall for every cascade configuration."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--golden-dir", default=str(GOLDEN_DIR), help="Directory of golden question CSVs")
+    parser.add_argument("--candidates", type=int, default=50, help="First-stage candidates retrieved per question")
+    parser.add_argument("--k", type=int, default=5, help="Results returned per question (recall@k)")
+    parser.add_argument("--base-ms", type=float, default=3.0, help="Mock reranker latency per request")
+    parser.add_argument("--per-doc-ms", type=float, default=0.4, help="Mock reranker latency per document")
+    parser.add_argument("--noise", type=float, default=0.35, help="Standard deviation of mock reranker score noise")
+    parser.add_argument("--seed", type=int, default=0, help="Mock reranker random seed")
+    args = parser.parse_args()
+
+    questions, chunks, relevant = load_golden(args.golden_dir)
+    if not questions:
+        parser.error(f"no golden questions found in {args.golden_dir}")
+    bm25 = Bm25(chunks)
+
+    # Measure every configuration against the reranker, not the score cache
+    settings.reranker.cache_enabled = False
+    client = MockRerankClient(args.base_ms, args.per_doc_ms, args.noise, args.seed)
+    reranker_utils._clients[MOCK_ENDPOINT] = client
+
+    print(f"corpus: {len(chunks)} chunks, {len(questions)} questions, {args.candidates} candidates, k={args.k}")
+    print(f"{'cascade':<22} {'p50 ms':>8} {'p95 ms':>8} {'prune ms':>9} {f'recall@{args.k}':>9}")
+    for cascade in CASCADES:
+        keep, min_relative = cascade
+        label = "rerank all" if keep is None else f"keep {keep}" + (f", floor {min_relative}" if min_relative else "")
+        client.rng = np.random.default_rng(args.seed)
+        p50, p95, prune_ms, recall = run(cascade, questions, chunks, relevant, bm25, client, args)
+        print(f"{label:<22} {p50:>8.2f} {p95:>8.2f} {prune_ms:>9.3f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
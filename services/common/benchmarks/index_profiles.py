@@ -0,0 +1,153 @@
+"""
+Benchmark the k-NN index profiles of OpensearchVectorStore against the float32 baseline.
+
+OpenSearch is replaced by a NumPy stand-in that stores vectors the way each profile
+does and searches them exhaustively, so the benchmark runs without a cluster and
+isolates the effect of vector compression (the HNSW approximation is the same
+for every profile):
+
+- lucene_fp32: float32 vectors
+- lucene_byte: 7-bit scalar quantization with a global confidence interval
+- faiss_fp16: float16 vectors
+- on_disk: 1-bit binary quantization searched with 3x oversampling, then rescored
+  with the full-precision vectors kept on disk
+
+Memory per million chunks uses the k-NN plugin's sizing formula for the native
+HNSW memory: 1.1 * (bytes per vector + 8 * m) bytes per vector. Quantized vectors
+are scored after decoding, so latency reflects the stand-in's exhaustive scan
+(and the extra candidate pass of on_disk), not HNSW traversal on a cluster.
+
+Usage (from the services directory):
+    python -m common.benchmarks.index_profiles [--chunks 20000] [--dim 768] [--k 10] [--seed 0]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+HNSW_M = 24
+ON_DISK_OVERSAMPLE = 3
+QUERIES = 200
+
+
+def make_corpus(n_chunks, dim, seed):
+    """Clustered unit vectors, resembling embeddings of related chunks."""
+    rng = np.random.default_rng(seed)
+    centroids = rng.standard_normal((max(n_chunks // 200, 1), dim)).astype(np.float32)
+    vectors = centroids[rng.integers(0, len(centroids), n_chunks)]
+    vectors = vectors + 0.8 * rng.standard_normal((n_chunks, dim)).astype(np.float32)
+    queries = vectors[rng.integers(0, n_chunks, QUERIES)] + 0.3 * rng.standard_normal((QUERIES, dim)).astype(np.float32)
+    normalize = lambda x: x / np.linalg.norm(x, axis=1, keepdims=True)  # noqa: E731
+    return normalize(vectors), normalize(queries).astype(np.float32)
+
+
+class Fp32Index:
+    """Full-precision vectors."""
+
+    bytes_per_dim = 4.0
+
+    def __init__(self, vectors):
+        """Store the vectors."""
+        self.vectors = vectors
+
+    def search(self, query, k):
+        """Return the ids of the k highest cosine scores."""
+        scores = self.vectors @ query
+        top = np.argpartition(-scores, k)[:k]
+        return top[np.argsort(-scores[top])]
+
+
+class Fp16Index(Fp32Index):
+    """Vectors stored as float16 (faiss sq fp16)."""
+
+    bytes_per_dim = 2.0
+
+    def __init__(self, vectors):
+        """Round the vectors to half precision; scored as float32, which holds them exactly."""
+        super().__init__(vectors.astype(np.float16).astype(np.float32))
+
+
+class ByteIndex(Fp32Index):
+    """Vectors quantized to 7-bit integers over a global confidence interval (Lucene sq)."""
+
+    bytes_per_dim = 1.0
+
+    def __init__(self, vectors):
+        """Quantize vectors to 0..127 over the central 99.8% of component values."""
+        low, high = np.quantile(vectors, [0.001, 0.999])
+        scale = (high - low) / 127
+        codes = np.round((np.clip(vectors, low, high) - low) / scale)
+        # Scored dequantized, so only the quantization error differs from the baseline
+        super().__init__((codes * scale + low).astype(np.float32))
+
+
+class OnDiskIndex:
+    """1-bit binary quantization in memory, full-precision rescoring from disk."""
+
+    bytes_per_dim = 1 / 8
+
+    def __init__(self, vectors):
+        """Keep sign bits in memory and the original vectors for rescoring."""
+        self.mean = vectors.mean(axis=0)
+        self.bits = np.packbits(vectors - self.mean > 0, axis=1)
+        self.full = vectors
+
+    def search(self, query, k):
+        """Rank by Hamming distance, then rescore the oversampled candidates exactly."""
+        query_bits = np.packbits(query - self.mean > 0)
+        distances = np.unpackbits(self.bits ^ query_bits, axis=1).sum(axis=1)
+        candidates = np.argpartition(distances, k * ON_DISK_OVERSAMPLE)[:k * ON_DISK_OVERSAMPLE]
+        scores = self.full[candidates] @ query
+        return candidates[np.argsort(-scores)[:k]]
+
+
+PROFILES = {
+    "lucene_fp32": Fp32Index,
+    "lucene_byte": ByteIndex,
+    "faiss_fp16": Fp16Index,
+    "on_disk": OnDiskIndex,
+}
+
+
+def memory_per_million_gib(bytes_per_dim, dim):
+    """Native HNSW memory for one million vectors, per the k-NN plugin sizing formula."""
+    return 1.1 * (bytes_per_dim * dim + 8 * HNSW_M) * 1_000_000 / 1024 ** 3
+
+
+def run(index, queries, k, truth):
+    """Search every query; return (p95 latency in ms, mean recall@k against truth)."""
+    latencies = []
+    recalls = []
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        found = index.search(query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(set(found.tolist()) & expected) / k)
+    return float(np.percentile(latencies, 95)), float(np.mean(recalls))
+
+
+def main():
+    """Run the benchmark and print memory, latency and recall for every profile."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunks", type=int, default=20000, help="Number of indexed vectors")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--k", type=int, default=10, help="Results per query (recall@k)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    args = parser.parse_args()
+
+    vectors, queries = make_corpus(args.chunks, args.dim, args.seed)
+    baseline = Fp32Index(vectors)
+    truth = [set(baseline.search(query, args.k).tolist()) for query in queries]
+
+    print(f"corpus: {args.chunks} vectors x {args.dim} dims, {len(queries)} queries, k={args.k}")
+    print(f"{'profile':<12} {'GiB / 1M chunks':>16} {'p95 ms':>8} {f'recall@{args.k}':>10}")
+    for name, index_cls in PROFILES.items():
+        index = index_cls(vectors)
+        p95, recall = run(index, queries, args.k, truth)
+        memory = memory_per_million_gib(index_cls.bytes_per_dim, args.dim)
+        print(f"{name:<12} {memory:>16.2f} {p95:>8.2f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark fixed-size vs token/bytes-budgeted insert batches in OpensearchVectorStore.insert_chunks.
+
+The embedding server and OpenSearch are replaced by latency models, so the
+benchmark runs without either service and isolates the effect of batch sizing:
+
+- embedding request: fixed per-request overhead + cost per token
+- bulk request: fixed per-request overhead (including the refresh) + cost per MB
+
+The corpus mixes short table summaries with long text chunks, as produced by
+digitize ingestion.
+
+Usage (from the services directory):
+    python -m common.benchmarks.insert_batching [--chunks 1000] [--seed 0]
+"""
+
+import argparse
+import json
+import random
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from common.opensearch import OpensearchVectorStore
+
+EMBED_REQUEST_OVERHEAD_S = 0.015
+EMBED_PER_TOKEN_S = 0.00002
+BULK_REQUEST_OVERHEAD_S = 0.020
+BULK_PER_MB_S = 0.030
+EMBEDDING_DIM = 768
+
+
+class SimulatedEmbedding:
+    """Embedding stand-in whose latency grows with request count and tokens."""
+
+    def embed_documents(self, texts):
+        tokens = sum(len(t) // 4 + 1 for t in texts)
+        time.sleep(EMBED_REQUEST_OVERHEAD_S + tokens * EMBED_PER_TOKEN_S)
+        return [np.zeros(EMBEDDING_DIM, dtype=np.float32) for _ in texts]
+
+
+def simulated_bulk(client, actions, **kwargs):
+    """Bulk request stand-in whose latency grows with request count and payload size."""
+    actions = list(actions)
+    payload_mb = len(json.dumps([a["_source"] for a in actions], default=int)) / (1024 * 1024)
+    time.sleep(BULK_REQUEST_OVERHEAD_S + payload_mb * BULK_PER_MB_S)
+    for action in actions:
+        yield True, {"index": {"_id": action["_id"], "status": 201}}
+
+
+def make_corpus(n_chunks, seed):
+    """Mixed corpus: ~60% short table summaries, ~40% long text chunks."""
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(n_chunks):
+        if rng.random() < 0.6:
+            length = rng.randint(80, 400)
+        else:
+            length = rng.randint(1200, 2000)
+        chunks.append({"page_content": "x" * length, "filename": "bench.pdf", "doc_id": f"doc-{i // 100}"})
+    return chunks
+
+
+def run(chunks, batch_size):
+    """Index chunks once and return chunks/sec."""
+    store = OpensearchVectorStore.__new__(OpensearchVectorStore)
+    store.index_name = "bench"
+    store.num_shards = 1
+    store.client = MagicMock()
+    store.client.indices.exists.return_value = True
+
+    # One bulk request per batch, so only the batch sizing is measured
+    with patch.object(OpensearchVectorStore, "_stream_bulk", lambda self, actions: simulated_bulk(self.client, actions)):
+        start = time.perf_counter()
+        assert store.insert_chunks(chunks, embedding=SimulatedEmbedding(), batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+    return len(chunks) / elapsed
+
+
+def main():
+    """Run the benchmark and print throughput for both strategies."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunks", type=int, default=1000, help="Number of chunks in the corpus")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    args = parser.parse_args()
+
+    chunks = make_corpus(args.chunks, args.seed)
+    fixed = run(chunks, batch_size=10)
+    dynamic = run(chunks, batch_size=None)
+
+    print(f"corpus: {len(chunks)} chunks")
+    print(f"fixed batch_size=10 : {fixed:8.1f} chunks/sec")
+    print(f"token/bytes budget  : {dynamic:8.1f} chunks/sec ({dynamic / fixed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Load test /v1/similarity-search: the threaded sync pipeline against the async one.
+
+The similarity app is driven in-process over httpx.ASGITransport by a fixed number of
+concurrent clients, each sending reranked searches back to back. The embedding
+server, OpenSearch and the reranker are local stand-ins that answer after a fixed
+latency: the sync pipeline's stand-ins sleep in the calling thread, the async
+pipeline's are httpx.MockTransport handlers that await the same latency, behind the
+real async OpenSearch REST path and the real Cohere AsyncClientV2.
+
+Every configuration runs at --concurrency clients and at ten times as many. The sync
+pipeline holds a worker thread of the default executor for the whole request, so its
+throughput stops growing once the pool is saturated and the extra clients queue,
+which shows in p99. The async pipeline only waits on sockets.
+
+Usage (from the services directory):
+    python -m common.benchmarks.similarity_load [--concurrency 8] [--requests-per-client 20]
+        [--embed-ms 10] [--search-ms 15] [--rerank-ms 25]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+from cohere import AsyncClientV2, ClientV2
+
+import similarity.app as similarity_app
+from common import misc_utils, reranker_utils
+from common.opensearch import OpensearchVectorStore
+from common.settings import settings as common_settings
+from similarity.settings import settings
+
+EMB_ENDPOINT = "http://embedding"
+RERANK_ENDPOINT = "http://reranker"
+DIMENSION = 384
+TOP_K = 5
+
+
+def _hits(count):
+    return {"hits": {"total": {"value": count}, "hits": [
+        {"_score": 1.0 - i / 100, "_source": {"chunk_id": i, "text": f"chunk {i}", "metadata": {"filename": "f.pdf"}}}
+        for i in range(count)
+    ]}}
+
+
+def _rerank_response(documents):
+    return {
+        "id": "bench",
+        "results": [{"index": i, "relevance_score": 1.0 - i / 100} for i in range(len(documents))],
+        "meta": {},
+    }
+
+
+def _embeddings(texts):
+    return {"data": [{"embedding": [0.1] * DIMENSION} for _ in texts]}
+
+
+class SleepingSession:
+    """Stand-in for the requests session: blocks the calling thread for the embedding latency."""
+
+    def __init__(self, latency):
+        """Configure the latency in seconds."""
+        self.latency = latency
+
+    def post(self, url, data=None, headers=None, **kwargs):
+        """Return embeddings for the posted texts after the latency."""
+        time.sleep(self.latency)
+        body = _embeddings(json.loads(data)["input"])
+        return SimpleNamespace(raise_for_status=lambda: None, json=lambda: body)
+
+
+class SleepingOpenSearch:
+    """Stand-in for the sync OpenSearch client: blocks the calling thread for the search latency."""
+
+    def __init__(self, latency, candidates):
+        """Configure the latency in seconds and the hits per search."""
+        self.latency, self.candidates = latency, candidates
+
+    def search(self, index, body, params=None):
+        """Return the configured hits after the latency."""
+        time.sleep(self.latency)
+        return _hits(self.candidates)
+
+
+def _sleeping_transport(latency, respond):
+    """A sync MockTransport answering JSON requests with respond(payload) after the latency."""
+    def handler(request):
+        time.sleep(latency)
+        return httpx.Response(200, json=respond(json.loads(request.content or b"{}")))
+    return httpx.MockTransport(handler)
+
+
+def _async_transport(latency, respond):
+    """An async MockTransport answering requests with respond(request) after the latency."""
+    async def handler(request):
+        await asyncio.sleep(latency)
+        return httpx.Response(200, json=respond(request))
+    return httpx.MockTransport(handler)
+
+
+def install_stand_ins(args):
+    """Point the similarity app at the local stand-ins and disable every cache."""
+    common_settings.vector_store.retrieval_cache_enabled = False
+    common_settings.reranker.cache_enabled = False
+    common_settings.embedding.micro_batch_enabled = False
+    candidates = TOP_K * 3
+
+    store = OpensearchVectorStore.__new__(OpensearchVectorStore)
+    store.index_name = "rag_bench"
+    store.num_shards = 1
+    store.client = SleepingOpenSearch(args.search_ms / 1000, candidates)
+    store._remember_index()
+    store._async_http = httpx.AsyncClient(
+        base_url="https://opensearch:9200",
+        transport=_async_transport(args.search_ms / 1000, lambda request: (
+            _hits(candidates) if request.method == "POST" else {}
+        )),
+    )
+
+    misc_utils.SESSION = SleepingSession(args.embed_ms / 1000)
+    misc_utils.ASYNC_CLIENT = httpx.AsyncClient(transport=_async_transport(
+        args.embed_ms / 1000, lambda request: _embeddings(json.loads(request.content)["input"])
+    ))
+
+    reranker_utils._clients[RERANK_ENDPOINT] = ClientV2(
+        api_key="bench",
+        base_url=RERANK_ENDPOINT,
+        httpx_client=httpx.Client(transport=_sleeping_transport(
+            args.rerank_ms / 1000, lambda payload: _rerank_response(payload["documents"])
+        )),
+    )
+    async_http = httpx.AsyncClient(transport=_async_transport(
+        args.rerank_ms / 1000, lambda request: _rerank_response(json.loads(request.content)["documents"])
+    ))
+    reranker_utils._async_clients[RERANK_ENDPOINT] = (
+        AsyncClientV2(api_key="bench", base_url=RERANK_ENDPOINT, httpx_client=async_http), async_http
+    )
+
+    similarity_app.vectorstore = store
+    similarity_app.emb_model_dict = {"emb_model": "bench", "emb_endpoint": EMB_ENDPOINT, "max_model_len": 512}
+    similarity_app.reranker_model_dict = {"reranker_model": "bench", "reranker_endpoint": RERANK_ENDPOINT}
+    # Query validation calls the tokenizer the same way on both pipelines; keep it out of the comparison
+    similarity_app._validate_query_length = lambda query, endpoint, max_tokens: (True, None)
+
+
+async def run_load(concurrency, requests_per_client):
+    """Send reranked searches from concurrent clients; return (QPS, p50 ms, p99 ms, errors)."""
+    latencies, errors = [], 0
+    transport = httpx.ASGITransport(app=similarity_app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://similarity", timeout=None) as client:
+        async def worker(n):
+            nonlocal errors
+            for i in range(requests_per_client):
+                start = time.perf_counter()
+                response = await client.post("/v1/similarity-search", json={
+                    "query": f"question {n}-{i}", "top_k": TOP_K, "rerank": True,
+                })
+                latencies.append((time.perf_counter() - start) * 1000)
+                errors += response.status_code != 200
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return (len(latencies) / elapsed, float(np.percentile(latencies, 50)),
+            float(np.percentile(latencies, 99)), errors)
+
+
+def main():
+    """Run the load test and print throughput and latency of both pipelines."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients; also run at 10x")
+    parser.add_argument("--requests-per-client", type=int, default=20, help="Searches sent by each client")
+    parser.add_argument("--embed-ms", type=float, default=10.0, help="Embedding stand-in latency")
+    parser.add_argument("--search-ms", type=float, default=15.0, help="OpenSearch stand-in latency")
+    parser.add_argument("--rerank-ms", type=float, default=25.0, help="Reranker stand-in latency")
+    args = parser.parse_args()
+
+    install_stand_ins(args)
+    # Per-request INFO logs would dominate the measured time
+    logging.disable(logging.INFO)
+
+    print(f"stand-in latency: embed {args.embed_ms} ms, search {args.search_ms} ms, rerank {args.rerank_ms} ms")
+    print(f"{'pipeline':<10} {'clients':>8} {'QPS':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for async_pipeline in (False, True):
+        settings.similarity.async_pipeline = async_pipeline
+        label = "async" if async_pipeline else "sync"
+        asyncio.run(run_load(args.concurrency, 2))  # warm up clients and pools
+        for concurrency in (args.concurrency, args.concurrency * 10):
+            qps, p50, p99, errors = asyncio.run(run_load(concurrency, args.requests_per_client))
+            print(f"{label:<10} {concurrency:>8} {qps:>9.1f} {p50:>9.1f} {p99:>9.1f} {errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
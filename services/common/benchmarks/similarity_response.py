@@ -0,0 +1,89 @@
+"""
+Benchmark /v1/similarity-search response building: pydantic models against orjson dicts.
+
+Times only what the endpoint does after retrieval: turning top_k results of
+--chunk-bytes of text each into the response body. Three variants are compared:
+the previous path (SimilaritySearchResult models, encoded with jsonable_encoder and
+rendered by the stdlib JSON encoder, as FastAPI does with a response_model), the
+current one (plain dicts rendered with orjson), and format=compact (chunk ids and
+scores only).
+
+Usage (from the services directory):
+    python -m common.benchmarks.similarity_response [--top-k 20] [--chunk-bytes 5000] [--repeat 2000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from similarity.app import OrjsonResponse, _to_results
+from similarity.similarity_utils import SimilaritySearchResponse, SimilaritySearchResult
+
+
+def _docs(top_k, chunk_bytes):
+    return [
+        {"chunk_id": i, "page_content": "x" * chunk_bytes, "filename": "f.pdf", "type": "text", "source": "f.pdf"}
+        for i in range(top_k)
+    ]
+
+
+def pydantic_body(docs, scores):
+    """The response path before orjson rendering: validate every result into a model, then encode it."""
+    model = SimilaritySearchResponse(score_type="cosine", results=[
+        SimilaritySearchResult(
+            page_content=doc.get("page_content", ""),
+            filename=doc.get("filename", ""),
+            type=doc.get("type", ""),
+            source=doc.get("source", ""),
+            chunk_id=str(doc.get("chunk_id", "")),
+            score=float(score),
+        )
+        for doc, score in zip(docs, scores)
+    ])
+    return JSONResponse(jsonable_encoder(model)).body
+
+
+def orjson_body(docs, scores, result_format="full"):
+    """The current response path: plain result dicts rendered with orjson."""
+    return OrjsonResponse({"score_type": "cosine", "results": _to_results(docs, scores, result_format)}).body
+
+
+def measure(build, repeat):
+    """Call build repeat times; return (mean ms, p99 ms, body bytes)."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = build()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.mean(timings)), float(np.percentile(timings, 99)), len(body)
+
+
+def main():
+    """Run the benchmark and print build time and payload size of each variant."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--top-k", type=int, default=20, help="Results per response")
+    parser.add_argument("--chunk-bytes", type=int, default=5000, help="Text size of each result")
+    parser.add_argument("--repeat", type=int, default=2000, help="Responses built per variant")
+    args = parser.parse_args()
+
+    docs = _docs(args.top_k, args.chunk_bytes)
+    scores = list(np.linspace(0.9, 0.5, args.top_k, dtype=np.float32))
+    variants = [
+        ("pydantic", lambda: pydantic_body(docs, scores)),
+        ("orjson", lambda: orjson_body(docs, scores)),
+        ("orjson compact", lambda: orjson_body(docs, scores, "compact")),
+    ]
+
+    print(f"top_k {args.top_k}, {args.chunk_bytes} bytes per chunk, {args.repeat} responses")
+    print(f"{'variant':<16} {'mean ms':>9} {'p99 ms':>9} {'bytes':>9}")
+    for label, build in variants:
+        measure(build, 50)  # warm up
+        mean, p99, size = measure(build, args.repeat)
+        print(f"{label:<16} {mean:>9.3f} {p99:>9.3f} {size:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,5 +11,8 @@ def get_vector_store() -> VectorStore:
     if v_store_type == "OPENSEARCH":
         from common.opensearch import OpensearchVectorStore
         return OpensearchVectorStore()
+    elif v_store_type == "LOCAL":
+        from common.local_vector_store import LocalVectorStore
+        return LocalVectorStore()
     else:
         raise VectorStoreNotReadyError(f"Unsupported VectorStore type: {v_store_type}")
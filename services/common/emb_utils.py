@@ -1,48 +1,429 @@
+import asyncio
+import hashlib
 import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import numpy as np
 from common.misc_utils import get_logger
 import common.misc_utils as misc_utils
-from common.retry_utils import retry_on_transient_error
+from common.retry_utils import async_retry_on_transient_error, retry_on_transient_error
+from common.settings import settings
 
 logger = get_logger("Embedding")
 
 _embedder_instance = None
+_embedding_cache = None
+_embedding_cache_failed = False
+_embedding_cache_lock = threading.Lock()
+
+_HEADERS = {
+    "accept": "application/json",
+    "Content-type": "application/json"
+}
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent embedding calls into batched /v1/embeddings requests.
+
+    Callers submit their texts and get a Future back. A background thread takes the
+    first pending request, keeps collecting requests until max_wait_ms has elapsed
+    or max_batch_size texts are queued, and hands the batch to a small pool that
+    sends it as one request and resolves every caller's Future with its own slice
+    of the returned vectors. Up to max_in_flight batches are sent concurrently;
+    while all of them are busy, new requests queue up and form the next batch.
+    """
+
+    def __init__(self, post_fn, max_batch_size: int, max_wait_ms: float, max_in_flight: int = 4):
+        """
+        Initialize the batcher.
+
+        Args:
+            post_fn: Function that embeds a list of texts in a single request
+            max_batch_size: Maximum number of texts sent in one request
+            max_wait_ms: Maximum time to wait for more requests after the first one arrives
+            max_in_flight: Maximum number of batch requests sent concurrently
+        """
+        self.post_fn = post_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_in_flight = max_in_flight
+        self.requests = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+
+    def submit(self, texts: list) -> Future:
+        """Queue texts for embedding and return a Future resolving to their vectors."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future
+
+    def stats(self) -> dict:
+        """Return request/batch counters and the resulting average batch size."""
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "avg_requests_per_batch": self.requests / self.batches if self.batches else 0.0,
+        }
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_in_flight, thread_name_prefix="embedding-batch"
+                    )
+                    self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._worker.start()
+
+    def _collect(self) -> list:
+        """Block for the first request, then gather more until the batch is full or the wait expires."""
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            # Start collecting only once a request slot is free, so waiting requests form the next batch
+            self._slots.acquire()
+            pending = self._collect()
+            self.requests += len(pending)
+            self.batches += 1
+            try:
+                self._executor.submit(self._send, pending)
+            except Exception as e:
+                self._slots.release()
+                for _, future in pending:
+                    future.set_exception(e)
+
+    def _send(self, pending):
+        """Embed the texts of a collected batch and resolve each caller's Future with its vectors."""
+        try:
+            texts = [text for item_texts, _ in pending for text in item_texts]
+            vectors = self.post_fn(texts)
+            if len(vectors) != len(texts):
+                raise RuntimeError(f"Embedding endpoint returned {len(vectors)} vectors for {len(texts)} texts")
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        offset = 0
+        for item_texts, future in pending:
+            future.set_result(vectors[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
 
 class Embedding:
-    def __init__(self, emb_model, emb_endpoint, max_model_len):
+    def __init__(self, emb_model, emb_endpoint, max_model_len, batcher_config=None):
         self.emb_model = emb_model
         self.emb_endpoint = emb_endpoint
         self.max_model_len = int(max_model_len)
+        self.batcher = None
+        if batcher_config is not None and batcher_config.micro_batch_enabled:
+            self.batcher = EmbeddingBatcher(
+                self._post_embedding,
+                max_batch_size=batcher_config.micro_batch_max_size,
+                max_wait_ms=batcher_config.micro_batch_max_wait_ms,
+                max_in_flight=batcher_config.micro_batch_max_in_flight,
+            )
+
+    def _use_batcher(self, texts):
+        # Requests that already fill a batch gain nothing from waiting for others
+        return self.batcher is not None and len(texts) < self.batcher.max_batch_size
 
     def embed_documents(self, texts):
+        if self._use_batcher(texts):
+            return self.batcher.submit(texts).result()
         return self._post_embedding(texts)
 
     def embed_query(self, text):
-        return self._post_embedding([text])[0]
+        return self.embed_documents([text])[0]
+
+    async def embed_documents_async(self, texts):
+        if self._use_batcher(texts):
+            return await asyncio.wrap_future(self.batcher.submit(texts))
+        return await self._post_embedding_async(texts)
+
+    async def embed_query_async(self, text):
+        return (await self.embed_documents_async([text]))[0]
+
+    @property
+    def cache_identity(self) -> str:
+        """Identify the vectors this embedder returns: the model and the prompt truncation length."""
+        return f"{self.emb_model}#{self.max_model_len - 1}"
+
+    def _payload(self, texts):
+        return {
+            "input": texts,
+            "model": self.emb_model,
+            "truncate_prompt_tokens": self.max_model_len - 1,
+        }
+
+    @staticmethod
+    def _parse_response(r):
+        embeddings = [data['embedding'] for data in r['data']]
+        return [np.array(embed, dtype=np.float32) for embed in embeddings]
 
     @retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
     def _post_embedding(self, texts):
         if misc_utils.SESSION is None:
             raise RuntimeError("LLM session not initialized. Call create_llm_session() first.")
         
-        payload = {
-            "input": texts,
-            "model": self.emb_model,
-            "truncate_prompt_tokens": self.max_model_len - 1,
-        }
-        headers = {
-            "accept": "application/json",
-            "Content-type": "application/json"
-        }
         response = misc_utils.SESSION.post(
             f"{self.emb_endpoint}/v1/embeddings",
-            data=json.dumps(payload),
-            headers=headers
+            data=json.dumps(self._payload(texts)),
+            headers=_HEADERS
         )
         response.raise_for_status()
-        r = response.json()
-        embeddings = [data['embedding'] for data in r['data']]
-        return [np.array(embed, dtype=np.float32) for embed in embeddings]
+        return self._parse_response(response.json())
+
+    @async_retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+    async def _post_embedding_async(self, texts):
+        if misc_utils.ASYNC_CLIENT is None:
+            raise RuntimeError("Async LLM client not initialized. Call create_async_llm_client() first.")
+
+        response = await misc_utils.ASYNC_CLIENT.post(
+            f"{self.emb_endpoint}/v1/embeddings",
+            content=json.dumps(self._payload(texts)),
+            headers=_HEADERS
+        )
+        response.raise_for_status()
+        return self._parse_response(response.json())
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of embedding vectors.
+
+    Vectors are stored as float32 blobs in a SQLite file keyed by
+    (embedder identity, md5 of the text), so re-ingested documents and boilerplate
+    chunks shared between documents are embedded only once. When the stored
+    vectors exceed max_bytes, the least recently used rows are evicted.
+
+    Lookups do not write: access times older than _TOUCH_AFTER seconds are collected
+    in memory and written with the next put_many, or once _TOUCH_FLUSH_ROWS are pending.
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _LOOKUP_BATCH = 500
+    _TOUCH_AFTER = 60.0
+    _TOUCH_FLUSH_ROWS = 1000
+
+    def __init__(self, path: str, max_bytes: int):
+        """
+        Open (or create) the cache file.
+
+        Args:
+            path: SQLite file holding the cached vectors
+            max_bytes: Size cap for the stored vectors
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> access time not yet written
+        self._touched: dict[str, float] = {}
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embedding_cache_accessed ON embedding_cache (accessed)")
+        self._db.commit()
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM embedding_cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(identity: str, text: str) -> str:
+        """Build the cache key for a text embedded by the embedder with the given identity."""
+        return f"{identity}|{hashlib.md5(text.encode('utf-8', 'surrogatepass')).hexdigest()}"
+
+    def get_many(self, identity: str, texts: list) -> list:
+        """Return the cached vector for each text, or None where it is not cached."""
+        keys = [self.make_key(identity, text) for text in texts]
+        found = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), self._LOOKUP_BATCH):
+                batch = keys[i:i + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT key, vector, accessed FROM embedding_cache WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob, accessed in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                    if now - accessed > self._TOUCH_AFTER:
+                        self._touched[key] = now
+            if len(self._touched) >= self._TOUCH_FLUSH_ROWS:
+                self._flush_touched_locked()
+                self._db.commit()
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for vector in results if vector is not None)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return results
+
+    def put_many(self, identity: str, texts: list, vectors: list):
+        """Store vectors for texts, evicting least recently used rows beyond the size cap."""
+        now = time.time()
+        rows = []
+        for text, vector in zip(texts, vectors):
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((self.make_key(identity, text), blob, len(blob), now))
+        if not rows:
+            return
+        with self._lock:
+            # Pending access times go first so eviction sees them
+            self._flush_touched_locked()
+            # Replaced rows are subtracted before their new size is added
+            keys = [row[0] for row in rows]
+            for i in range(0, len(keys), self._LOOKUP_BATCH):
+                batch = keys[i:i + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                self._bytes -= self._db.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM embedding_cache WHERE key IN ({placeholders})", batch
+                ).fetchone()[0]
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, vector, size, accessed) VALUES (?, ?, ?, ?)", rows
+            )
+            self._bytes += sum(row[2] for row in rows)
+            if self._bytes > self.max_bytes:
+                self._evict_locked()
+            self._db.commit()
+
+    def _flush_touched_locked(self):
+        """Write the access times collected by get_many; the caller commits."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE embedding_cache SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _evict_locked(self):
+        """Delete the least recently used rows until the cache is back under 90% of its cap."""
+        target = int(self.max_bytes * 0.9)
+        while self._bytes > target:
+            rows = self._db.execute(
+                "SELECT key, size FROM embedding_cache ORDER BY accessed LIMIT 1000"
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                break
+            evicted = []
+            for key, size in rows:
+                evicted.append((key,))
+                self._bytes -= size
+                if self._bytes <= target:
+                    break
+            self._db.executemany("DELETE FROM embedding_cache WHERE key = ?", evicted)
+            self.evictions += len(evicted)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the stored size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class CachedEmbedding:
+    """
+    Embedding wrapper that serves embed_documents from an EmbeddingCache.
+
+    Only texts missing from the cache are sent to the wrapped embedder. Hits and
+    misses are also counted per instance, so a wrapper created per document
+    reports that document's cache hit rate.
+    """
+
+    def __init__(self, embedding: Embedding, cache: EmbeddingCache):
+        """Wrap embedding with cache lookups."""
+        self.embedding = embedding
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of texts served from the cache by this instance."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def embed_documents(self, texts):
+        """Embed texts, sending only cache misses to the embedding server."""
+        identity = self.embedding.cache_identity
+        try:
+            vectors = self.cache.get_many(identity, texts)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed, embedding all texts: {e}")
+            vectors = [None] * len(texts)
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            computed = self.embedding.embed_documents(missing_texts)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+            try:
+                self.cache.put_many(identity, missing_texts, computed)
+            except Exception as e:
+                logger.warning(f"Failed to store embeddings in cache: {e}")
+        return vectors
+
+    def embed_query(self, text):
+        """Embed a query without caching it."""
+        return self.embedding.embed_query(text)
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Return the process-wide embedding cache, or None if disabled or unavailable."""
+    global _embedding_cache, _embedding_cache_failed
+    if not settings.embedding.cache_enabled or _embedding_cache_failed:
+        return None
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None and not _embedding_cache_failed:
+                path = os.path.join(settings.vector_store.local_cache_dir, "embedding_cache.sqlite")
+                try:
+                    _embedding_cache = EmbeddingCache(path, settings.embedding.cache_max_bytes)
+                except Exception as e:
+                    logger.warning(f"Embedding cache disabled, failed to open {path}: {e}")
+                    _embedding_cache_failed = True
+    return _embedding_cache
+
 
 def get_embedder(emb_model, emb_endpoint, max_model_len) -> Embedding:
     """
@@ -50,5 +431,5 @@ def get_embedder(emb_model, emb_endpoint, max_model_len) -> Embedding:
     """
     global _embedder_instance
     if _embedder_instance is None:
-        _embedder_instance = Embedding(emb_model, emb_endpoint, max_model_len)
+        _embedder_instance = Embedding(emb_model, emb_endpoint, max_model_len, batcher_config=settings.embedding)
     return _embedder_instance
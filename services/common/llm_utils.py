@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import os
+import httpx
 import requests
 import time
 import json
@@ -8,7 +10,8 @@ from tqdm import tqdm
 
 from common.misc_utils import get_logger, resolve_model_max_len
 from common.settings import settings
-from common.retry_utils import retry_on_transient_error
+from common.retry_utils import async_retry_on_transient_error, retry_on_transient_error
+from common.tokenizer_utils import get_tokenizer
 import common.misc_utils as misc_utils
 
 logger = get_logger("LLM")
@@ -302,7 +305,8 @@ def query_vllm_payload(
         truncated_messages = truncate_history_by_tokens(
             previous_messages,
             history_budget,
-            lambda text: tokenize_with_llm(text, llm_endpoint)
+            lambda text: tokenize_with_llm(text, llm_endpoint),
+            count_many_fn=lambda texts: tokenize_many(texts, llm_endpoint),
         )
 
         if truncated_messages:
@@ -388,6 +392,26 @@ def query_vllm_non_stream(
 
     return response_json
 
+def _record_chat_stream_chunk(data_str: str, perf_stat_dict: dict) -> bool:
+    """
+    Parse one chat-completions SSE payload, recording token usage in perf_stat_dict.
+
+    Returns:
+        True if the chunk carries generated choices and should be forwarded to the client
+    """
+    try:
+        chunk = json.loads(data_str)
+    except json.JSONDecodeError:
+        return False
+
+    # If this is a usage chunk (common in final chunk of OpenAI streams)
+    if 'usage' in chunk and chunk['usage'] is not None:
+        perf_stat_dict["completion_tokens"] = chunk['usage'].get('completion_tokens', 0)
+        perf_stat_dict["prompt_tokens"] = chunk['usage'].get('prompt_tokens', 0)
+
+    # Only record latency for actual token chunks (choices)
+    return 'choices' in chunk and len(chunk['choices']) > 0
+
 def query_vllm_stream(
     question,
     documents,
@@ -439,23 +463,11 @@ def query_vllm_stream(
                 if data_str == "[DONE]":
                     break
 
-                try:
-                    chunk = json.loads(data_str)
-
-                    # If this is a usage chunk (common in final chunk of OpenAI streams)
-                    if 'usage' in chunk and chunk['usage'] is not None:
-                        perf_stat_dict["completion_tokens"] = chunk['usage'].get('completion_tokens', 0)
-                        perf_stat_dict["prompt_tokens"] = chunk['usage'].get('prompt_tokens', 0)
-
-                    # Only record latency for actual token chunks (choices)
-                    if 'choices' in chunk and len(chunk['choices']) > 0:
-                        now = time.time()
-                        token_latencies.append(now - last_token_time)
-                        last_token_time = now
-                        yield f"{raw_line}\n\n"
-
-                except json.JSONDecodeError:
-                    continue
+                if _record_chat_stream_chunk(data_str, perf_stat_dict):
+                    now = time.time()
+                    token_latencies.append(now - last_token_time)
+                    last_token_time = now
+                    yield f"{raw_line}\n\n"
 
         request_time = time.time() - start_time
         perf_stat_dict["token_latencies"] = token_latencies
@@ -473,18 +485,9 @@ def query_vllm_stream(
         yield f"data: {json.dumps({'error': str(e)})}\n\n"
         yield "data: [DONE]\n\n"
 
-@retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
-def query_vllm_summarize(
-    llm_endpoint: str,
-    messages: list,
-    model: str,
-    max_tokens: int,
-    temperature: float,
-):
-    """Send a non-streaming summarization request to vLLM and return the response content and token counts."""
+def _summarize_payload(messages: list, model: str, max_tokens: int, temperature: float, stream: bool = False):
+    """Build headers and the chat-completions payload for a summarization request."""
     from summarize.settings import settings as summarize_settings
-    if misc_utils.SESSION is None:
-        raise RuntimeError("LLM session not initialized. Call create_llm_session() first.")
 
     headers = get_vllm_headers(settings.llm.api_key)
     stop_words = [w for w in summarize_settings.summarize.summarization_stop_words.split(",") if w]
@@ -494,8 +497,36 @@ def query_vllm_summarize(
         "max_tokens": max_tokens,
         "temperature": temperature,
     }
+    if stream:
+        payload["stream"] = True
     if stop_words:
         payload["stop"] = stop_words
+    return headers, payload
+
+def _parse_summarize_result(result: dict):
+    """Extract the summary content and token usage from a chat-completions response."""
+    content = ""
+    input_tokens = 0
+    output_tokens = 0
+    if "choices" in result and len(result["choices"]) > 0:
+        content = result["choices"][0].get("message", {}).get("content", "") or ""
+        input_tokens = result.get("usage", {}).get("prompt_tokens", 0)
+        output_tokens = result.get("usage", {}).get("completion_tokens", 0)
+    return content.strip(), input_tokens, output_tokens
+
+@retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+def query_vllm_summarize(
+    llm_endpoint: str,
+    messages: list,
+    model: str,
+    max_tokens: int,
+    temperature: float,
+):
+    """Send a non-streaming summarization request to vLLM and return the response content and token counts."""
+    if misc_utils.SESSION is None:
+        raise RuntimeError("LLM session not initialized. Call create_llm_session() first.")
+
+    headers, payload = _summarize_payload(messages, model, max_tokens, temperature)
 
     response = misc_utils.SESSION.post(
         f"{llm_endpoint}/v1/chat/completions",
@@ -507,14 +538,7 @@ def query_vllm_summarize(
 
     result = response.json()
     logger.debug(f"vLLM response: {result}")
-    content = ""
-    input_tokens = 0
-    output_tokens = 0
-    if "choices" in result and len(result["choices"]) > 0:
-        content = result["choices"][0].get("message", {}).get("content", "") or ""
-        input_tokens = result.get("usage", {}).get("prompt_tokens", 0)
-        output_tokens = result.get("usage", {}).get("completion_tokens", 0)
-    return content.strip(), input_tokens, output_tokens
+    return _parse_summarize_result(result)
 
 def query_vllm_summarize_stream(
     llm_endpoint: str,
@@ -524,21 +548,10 @@ def query_vllm_summarize_stream(
     temperature: float,
 ):
     """Stream a summarization request to vLLM, yielding raw SSE lines."""
-    from summarize.settings import settings as summarize_settings
     if misc_utils.SESSION is None:
         raise RuntimeError("LLM session not initialized. Call create_llm_session() first.")
 
-    headers = get_vllm_headers(settings.llm.api_key)
-    stop_words = [w for w in summarize_settings.summarize.summarization_stop_words.split(",") if w]
-    payload = {
-        "messages": messages,
-        "model": model,
-        "max_tokens": max_tokens,
-        "temperature": temperature,
-        "stream": True,
-    }
-    if stop_words:
-        payload["stop"] = stop_words
+    headers, payload = _summarize_payload(messages, model, max_tokens, temperature, stream=True)
 
     try:
         logger.debug("STREAMING SUMMARIZE RESPONSE")
@@ -565,10 +578,196 @@ def query_vllm_summarize_stream(
         yield f"data: {json.dumps({'error': str(e)})}\n\n"
         yield "data: [DONE]\n\n"
 
-@retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+def _get_async_client():
+    """Return the shared async client, failing fast if it has not been created."""
+    if misc_utils.ASYNC_CLIENT is None:
+        raise RuntimeError("Async LLM client not initialized. Call create_async_llm_client() first.")
+    return misc_utils.ASYNC_CLIENT
+
+def _http_error_details(e: httpx.HTTPError) -> str:
+    """Describe an httpx error, including the response body when it has been read."""
+    error_details = str(e)
+    if isinstance(e, httpx.HTTPStatusError):
+        try:
+            error_details += f", Response Text: {e.response.text}"
+        except httpx.ResponseNotRead:
+            pass
+    return error_details
+
+@async_retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+async def query_vllm_non_stream_async(
+    question,
+    documents,
+    llm_endpoint,
+    llm_model,
+    stop_words,
+    max_new_tokens,
+    temperature,
+    perf_stat_dict,
+    lang,
+    api_key: str | None = None,
+    previous_messages: list | None = None,
+    rephrased_query: str | None = None,
+):
+    """Async variant of query_vllm_non_stream using the shared httpx.AsyncClient."""
+    client = _get_async_client()
+
+    # Prompt assembly tokenizes documents/history, which may call the tokenizer over HTTP
+    headers, payload = await asyncio.to_thread(
+        query_vllm_payload,
+        question,
+        documents,
+        llm_endpoint,
+        llm_model,
+        stop_words,
+        max_new_tokens,
+        temperature,
+        False,
+        lang,
+        api_key,
+        previous_messages,
+        rephrased_query,
+    )
+
+    start_time = time.time()
+    response = await client.post(f"{llm_endpoint}/v1/chat/completions", json=payload, headers=headers)
+    request_time = time.time() - start_time
+    perf_stat_dict["inference_time"] = request_time
+    response.raise_for_status()
+    response_json = response.json()
+    if 'usage' in response_json:
+        perf_stat_dict["completion_tokens"] = response_json['usage'].get('completion_tokens', 0)
+        perf_stat_dict["prompt_tokens"] = response_json['usage'].get('prompt_tokens', 0)
+
+    return response_json
+
+async def query_vllm_stream_async(
+    question,
+    documents,
+    llm_endpoint,
+    llm_model,
+    stop_words,
+    max_new_tokens,
+    temperature,
+    perf_stat_dict,
+    lang,
+    api_key: str | None = None,
+    previous_messages: list | None = None,
+    rephrased_query: str | None = None,
+):
+    """Async variant of query_vllm_stream, yielding raw SSE lines read on the event loop."""
+    client = _get_async_client()
+
+    headers, payload = await asyncio.to_thread(
+        query_vllm_payload,
+        question,
+        documents,
+        llm_endpoint,
+        llm_model,
+        stop_words,
+        max_new_tokens,
+        temperature,
+        True,
+        lang,
+        api_key,
+        previous_messages,
+        rephrased_query,
+    )
+    try:
+        logger.debug("STREAMING RESPONSE")
+        token_latencies = []
+        start_time = time.time()
+        last_token_time = start_time
+
+        async with client.stream("POST", f"{llm_endpoint}/v1/chat/completions", json=payload, headers=headers) as r:
+            async for raw_line in r.aiter_lines():
+                if not raw_line:
+                    continue
+
+                if not raw_line.startswith("data: "):
+                    continue
+
+                data_str = raw_line[len("data: "):]
+                if data_str == "[DONE]":
+                    break
+
+                if _record_chat_stream_chunk(data_str, perf_stat_dict):
+                    now = time.time()
+                    token_latencies.append(now - last_token_time)
+                    last_token_time = now
+                    yield f"{raw_line}\n\n"
+
+        request_time = time.time() - start_time
+        perf_stat_dict["token_latencies"] = token_latencies
+        perf_stat_dict["inference_time"] = request_time
+
+    except httpx.HTTPError as e:
+        error_details = _http_error_details(e)
+        logger.error(f"Error calling vLLM stream API: {error_details}")
+        yield f"data: {json.dumps({'error': error_details})}\n\n"
+        yield "data: [DONE]\n\n"
+    except Exception as e:
+        logger.error(f"Error calling vLLM stream API: {e}")
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield "data: [DONE]\n\n"
+
+@async_retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+async def query_vllm_summarize_async(
+    llm_endpoint: str,
+    messages: list,
+    model: str,
+    max_tokens: int,
+    temperature: float,
+):
+    """Async variant of query_vllm_summarize using the shared httpx.AsyncClient."""
+    client = _get_async_client()
+    headers, payload = _summarize_payload(messages, model, max_tokens, temperature)
+
+    response = await client.post(f"{llm_endpoint}/v1/chat/completions", json=payload, headers=headers)
+    response.raise_for_status()
+
+    result = response.json()
+    logger.debug(f"vLLM response: {result}")
+    return _parse_summarize_result(result)
+
+async def query_vllm_summarize_stream_async(
+    llm_endpoint: str,
+    messages: list,
+    model: str,
+    max_tokens: int,
+    temperature: float,
+):
+    """Async variant of query_vllm_summarize_stream, yielding raw SSE lines read on the event loop."""
+    client = _get_async_client()
+    headers, payload = _summarize_payload(messages, model, max_tokens, temperature, stream=True)
+
+    try:
+        logger.debug("STREAMING SUMMARIZE RESPONSE")
+        async with client.stream("POST", f"{llm_endpoint}/v1/chat/completions", json=payload, headers=headers) as r:
+            if r.is_error:
+                # Read the body so the error details include vLLM's message
+                await r.aread()
+            r.raise_for_status()
+            async for raw_line in r.aiter_lines():
+                if not raw_line:
+                    continue
+                yield f"{raw_line}\n\n"
+    except httpx.HTTPError as e:
+        error_details = _http_error_details(e)
+        logger.error(f"Error calling vLLM stream API: {error_details}")
+        yield f"data: {json.dumps({'error': error_details})}\n\n"
+        yield "data: [DONE]\n\n"
+    except Exception as e:
+        logger.error(f"Error calling vLLM stream API: {e}")
+        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+        yield "data: [DONE]\n\n"
+
 def tokenize_with_llm(prompt, emb_endpoint, max_retries=3):
     """
-    Tokenize text using the LLM embedding endpoint with retry logic.
+    Tokenize text with the tokenizer backend configured for the endpoint.
+
+    Uses the in-process tokenizer when one is configured for the endpoint
+    (see common.tokenizer_utils), otherwise the endpoint's /tokenize API with retry logic.
 
     Args:
         prompt: Text to tokenize
@@ -579,28 +778,45 @@ def tokenize_with_llm(prompt, emb_endpoint, max_retries=3):
         List of tokens
 
     Raises:
-        RuntimeError: If SESSION is not initialized
+        RuntimeError: If SESSION is not initialized and the HTTP backend is used
         requests.exceptions.RequestException: If all retries fail
     """
-    if misc_utils.SESSION is None:
-        raise RuntimeError("LLM session not initialized. Call create_llm_session() first.")
+    return get_tokenizer(emb_endpoint).encode(prompt)
 
-    payload = {
-        "prompt": prompt
-    }
+def tokenize_many(texts, emb_endpoint, max_concurrency: int | None = None) -> list[int]:
+    """
+    Count tokens for many texts in one batched operation.
 
-    response = misc_utils.SESSION.post(f"{emb_endpoint}/tokenize", json=payload)
-    response.raise_for_status()
-    result = response.json()
-    tokens = result.get("tokens", [])
+    With the HTTP backend the /tokenize requests are pipelined over the shared
+    SESSION pool with bounded concurrency; the local backend encodes the whole
+    batch in-process.
 
-    return tokens
+    Args:
+        texts: Texts to tokenize
+        emb_endpoint: Embedding endpoint URL
+        max_concurrency: Maximum requests in flight (default: settings.tokenizer.max_concurrency)
+
+    Returns:
+        List of token counts, in the same order as texts
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+    if max_concurrency is None:
+        max_concurrency = settings.tokenizer.max_concurrency
+    return get_tokenizer(emb_endpoint).count_many(texts, max_concurrency=max_concurrency)
 
 def truncate_text_to_token_limit(text, token_limit, llm_endpoint, tokens=None):
     """
-    This function uses a character ratio approach to truncate text to fit within
-    the token budget. It estimates the character limit based on the token-to-character
-    ratio and iteratively adjusts if needed.
+    Truncate text to fit within the token budget, cutting exactly at a token boundary.
+
+    The text is tokenized once (or pre-computed tokens are reused) and the tokenizer
+    backend maps the first token_limit tokens back to a character position: the local
+    tokenizer uses per-token character offsets, the HTTP backend detokenizes the first
+    token_limit token ids. With pre-computed tokens this costs at most one tokenizer call.
+    If the backend cannot map tokens to characters, a conservative character-ratio
+    estimate is used instead; the estimate is re-tokenized once and shrunk in proportion
+    if it still exceeds token_limit.
 
     Args:
         text: Text to truncate
@@ -612,11 +828,8 @@ def truncate_text_to_token_limit(text, token_limit, llm_endpoint, tokens=None):
         Truncated text string that fits within token_limit
 
     Raises:
-        RuntimeError: If SESSION is not initialized
+        RuntimeError: If SESSION is not initialized and the HTTP backend is used
     """
-    if misc_utils.SESSION is None:
-        raise RuntimeError("LLM session not initialized. Call create_llm_session() first.")
-
     if not text or token_limit <= 0:
         return ""
     
@@ -628,17 +841,20 @@ def truncate_text_to_token_limit(text, token_limit, llm_endpoint, tokens=None):
     if len(tokens) <= token_limit:
         return text
     
-    # Calculate approximate character position based on token-to-character ratio
-    char_ratio = len(text) / len(tokens)
-    approx_char_limit = int(token_limit * char_ratio)
-    
-    # Truncate at character level
-    truncated_text = text[:approx_char_limit]
-    
-    # Verify and adjust if needed
-    while len(tokenize_with_llm(truncated_text, llm_endpoint)) > token_limit:
-        # Reduce by 10% and retry
-        truncated_text = truncated_text[:int(len(truncated_text) * 0.9)]
+    truncated_text = None
+    try:
+        truncated_text = get_tokenizer(llm_endpoint).token_prefix(text, tokens, token_limit)
+    except Exception as e:
+        logger.warning(f"Failed to map tokens back to text, using character estimate: {e}")
+
+    if truncated_text is None:
+        # Conservative estimate from the token-to-character ratio, with a 10% safety margin
+        char_ratio = len(text) / len(tokens)
+        truncated_text = text[:int(token_limit * char_ratio * 0.9)]
+        # Verify once; shrink in proportion to the overshoot with the same margin
+        estimate_tokens = len(tokenize_with_llm(truncated_text, llm_endpoint))
+        if estimate_tokens > token_limit:
+            truncated_text = truncated_text[:int(len(truncated_text) * token_limit / estimate_tokens * 0.9)]
     
     # Try to truncate at a word boundary for better readability
     # Look back up to 100 characters for a space
@@ -0,0 +1,456 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from common.misc_utils import get_logger
+from common.opensearch import generate_chunk_id
+from common.retrieval_cache import reset_last_lookup
+from common.settings import settings
+from common.vector_db import VectorStore, VectorStoreNotReadyError, chunk_metadata, search_result
+
+logger = get_logger("LocalVectorStore")
+
+_TOKEN_RE = re.compile(r"\w+")
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+# Same as the OpenSearch hybrid_pipeline: min_max normalization, then a weighted
+# arithmetic mean of the (dense, sparse) sub-query scores
+_HYBRID_WEIGHTS = (0.3, 0.7)
+_MIN_NORMALIZED_SCORE = 0.001
+_MIN_CAPACITY_ROWS = 1024
+
+_hnsw_unavailable_logged = False
+
+
+def _tokenize(text):
+    """Split text into lowercase word tokens, like the OpenSearch standard analyzer."""
+    return [token.lower() for token in _TOKEN_RE.findall(text or "")]
+
+
+def _min_max(hits):
+    """Normalize (row, score) hits to [0, 1] the way the OpenSearch normalization-processor does."""
+    if not hits:
+        return []
+    scores = [score for _, score in hits]
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [(row, 1.0) for row, _ in hits]
+    return [(row, (score - low) / (high - low) or _MIN_NORMALIZED_SCORE) for row, score in hits]
+
+
+class LocalVectorStore(VectorStore):
+    """
+    Embedded vector store for single-node and edge deployments.
+
+    Vectors live in a memory-mapped float32 matrix (vectors.f32) and chunk ids, text
+    and metadata in a SQLite sidecar (chunks.sqlite), both under one directory.
+    Dense search is exact, vectorized cosine similarity (or an HNSW index when
+    local_store_hnsw is set and hnswlib is installed), sparse search is BM25 over an
+    in-process inverted index, and hybrid search fuses both like the OpenSearch
+    hybrid pipeline. Scores follow OpenSearch conventions, so results are
+    interchangeable with OpensearchVectorStore.
+
+    Several processes may share the directory (e.g. digitize writing and the
+    similarity service reading): every write bumps a version in the sidecar, and
+    readers reload their in-memory indexes when it changes.
+    """
+
+    def __init__(self, path=None):
+        """Open (or create) the store under path, defaulting to the configured directory."""
+        cfg = settings.vector_store
+        self.path = path or cfg.local_store_dir or os.path.join(cfg.local_cache_dir, "local_vector_store")
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors_path = os.path.join(self.path, "vectors.f32")
+        self._lock = threading.RLock()
+        self._hnsw = None
+        self._hnsw_version = None
+
+        # Autocommit mode; writes use explicit BEGIN IMMEDIATE transactions
+        self._db = sqlite3.connect(
+            os.path.join(self.path, "chunks.sqlite"), check_same_thread=False, timeout=30.0, isolation_level=None
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "row INTEGER PRIMARY KEY, chunk_id INTEGER UNIQUE NOT NULL, doc_id TEXT NOT NULL, "
+            "language TEXT NOT NULL, text TEXT NOT NULL, metadata TEXT NOT NULL, alive INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks (doc_id)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._load()
+        logger.debug(f"Local vector store opened at {self.path} with {int(self._alive.sum())} chunks")
+
+    # ------------------------------------------------------------------ state
+
+    def _info(self):
+        return dict(self._db.execute("SELECT key, value FROM store_info").fetchall())
+
+    def _set_info(self, **values):
+        self._db.executemany(
+            "INSERT OR REPLACE INTO store_info (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in values.items()],
+        )
+
+    def _open_vectors(self, rows_needed):
+        """Memory-map the vector file, growing it to hold at least rows_needed rows."""
+        if self.dim is None:
+            self._vectors = None
+            return
+        row_bytes = self.dim * 4
+        capacity = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        if capacity < rows_needed:
+            capacity = max(_MIN_CAPACITY_ROWS, rows_needed, capacity * 2)
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _load(self):
+        """Rebuild the in-memory indexes from the sidecar and the vector file."""
+        with self._lock:
+            info = self._info()
+            self.dim = int(info["dimension"]) if "dimension" in info else None
+            self._version = info.get("version")
+            self._count = int(info.get("rows", 0))
+            self._open_vectors(self._count)
+
+            self._alive = np.zeros(self._count, dtype=bool)
+            self._languages = np.full(self._count, "", dtype=object)
+            self._doc_len = np.zeros(self._count, dtype=np.float32)
+            self._postings = defaultdict(dict)
+            for row, language, text in self._db.execute("SELECT row, language, text FROM chunks WHERE alive = 1"):
+                self._index_row(row, language, text)
+            self._norms = (
+                np.linalg.norm(self._vectors[:self._count], axis=1) if self._count else np.zeros(0, dtype=np.float32)
+            )
+
+    def _refresh_if_changed(self):
+        """Reload when another process changed the store since it was loaded."""
+        row = self._db.execute("SELECT value FROM store_info WHERE key = 'version'").fetchone()
+        if (row[0] if row else None) != self._version:
+            logger.debug(f"Local vector store at {self.path} changed, reloading")
+            self._load()
+
+    def _grow(self, rows):
+        """Extend the per-row arrays to hold rows rows."""
+        extra = rows - self._count
+        if extra <= 0:
+            return
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        self._languages = np.concatenate([self._languages, np.full(extra, "", dtype=object)])
+        self._doc_len = np.concatenate([self._doc_len, np.zeros(extra, dtype=np.float32)])
+        self._norms = np.concatenate([self._norms, np.zeros(extra, dtype=np.float32)])
+        self._count = rows
+
+    def _index_row(self, row, language, text):
+        tokens = Counter(_tokenize(text))
+        for token, tf in tokens.items():
+            self._postings[token][row] = tf
+        self._doc_len[row] = sum(tokens.values())
+        self._languages[row] = language
+        self._alive[row] = True
+
+    def _unindex_row(self, row, text):
+        for token in set(_tokenize(text)):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(row, None)
+                if not postings:
+                    del self._postings[token]
+        self._alive[row] = False
+
+    def _commit_version(self):
+        """Bump the store version inside the current transaction and commit."""
+        version = uuid.uuid4().hex
+        self._set_info(version=version, rows=self._count)
+        self._db.execute("COMMIT")
+        self._version = version
+
+    # ----------------------------------------------------------------- writes
+
+    def insert_chunks(self, chunks, vectors=None, embedding=None, batch_size=None):
+        """
+        Insert chunks with pre-computed 'vectors' or vectors from an 'embedding' instance.
+
+        Chunks are keyed by the same chunk id as in OpenSearch, so re-inserting a chunk
+        replaces it. Returns True once every chunk is stored.
+        """
+        if not chunks:
+            logger.debug("Nothing to chunk!")
+            return True
+        if vectors is None and embedding is None:
+            raise ValueError("Provide 'vectors' or 'embedding' to insert chunks.")
+
+        batch_size = batch_size or settings.vector_store.insert_batch_max_chunks
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            if vectors is not None:
+                batch_vectors = vectors[start:start + len(batch)]
+            else:
+                batch_vectors = embedding.embed_documents([doc.get("page_content", "") for doc in batch])
+            self._write_batch(batch, np.asarray(batch_vectors, dtype=np.float32))
+
+        logger.info(f"Insert operation completed successfully: {len(chunks)} chunks inserted into {self.path}")
+        return True
+
+    def _write_batch(self, batch, matrix):
+        # Last occurrence wins when a batch repeats a chunk, as with bulk index actions
+        records = {}
+        for doc, vector in zip(batch, matrix):
+            text = doc.get("page_content", "")
+            metadata = chunk_metadata(doc)
+            records[int(generate_chunk_id(metadata["doc_id"], text))] = (metadata, text, vector)
+
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh_if_changed()
+                if self.dim is None:
+                    self.dim = matrix.shape[1]
+                    self._set_info(dimension=self.dim)
+                elif matrix.shape[1] != self.dim:
+                    raise ValueError(f"Store has dimension {self.dim}, embeddings have {matrix.shape[1]}")
+
+                rows = {}
+                replaced = []
+                next_row = self._count
+                for cid in records:
+                    existing = self._db.execute(
+                        "SELECT row, text, alive FROM chunks WHERE chunk_id = ?", (cid,)
+                    ).fetchone()
+                    if existing is not None:
+                        rows[cid] = existing[0]
+                        if existing[2]:
+                            replaced.append((existing[0], existing[1]))
+                    else:
+                        rows[cid] = next_row
+                        next_row += 1
+
+                # Vectors are flushed before the rows that reference them are committed
+                self._open_vectors(next_row)
+                for cid, (_, _, vector) in records.items():
+                    self._vectors[rows[cid]] = vector
+                self._vectors.flush()
+
+                self._db.executemany(
+                    "INSERT INTO chunks (row, chunk_id, doc_id, language, text, metadata, alive) "
+                    "VALUES (?, ?, ?, ?, ?, ?, 1) ON CONFLICT (chunk_id) DO UPDATE SET "
+                    "doc_id = excluded.doc_id, language = excluded.language, text = excluded.text, "
+                    "metadata = excluded.metadata, alive = 1",
+                    [
+                        (rows[cid], cid, metadata["doc_id"], metadata["language"], text, json.dumps(metadata))
+                        for cid, (metadata, text, _) in records.items()
+                    ],
+                )
+                self._grow(next_row)
+                for row, text in replaced:
+                    self._unindex_row(row, text)
+                for cid, (metadata, text, vector) in records.items():
+                    self._index_row(rows[cid], metadata["language"], text)
+                    self._norms[rows[cid]] = np.linalg.norm(vector)
+                self._commit_version()
+            except Exception:
+                self._db.execute("ROLLBACK")
+                self._load()
+                raise
+
+    def _delete_where(self, clause, params):
+        """Mark the chunks matching a SQL condition as deleted; returns the number deleted."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh_if_changed()
+                deleted = self._db.execute(
+                    f"SELECT row, text FROM chunks WHERE alive = 1 AND {clause}", params
+                ).fetchall()
+                if not deleted:
+                    self._db.execute("ROLLBACK")
+                    return 0
+                self._db.executemany("UPDATE chunks SET alive = 0 WHERE row = ?", [(row,) for row, _ in deleted])
+                for row, text in deleted:
+                    self._unindex_row(row, text)
+                self._commit_version()
+            except Exception:
+                self._db.execute("ROLLBACK")
+                self._load()
+                raise
+        return len(deleted)
+
+    def remove_docs_from_index(self, doc_ids: list[str]):
+        """Delete all chunks of the given documents; returns the number of chunks deleted."""
+        if not doc_ids:
+            logger.warning(f"No document ids provided to remove from {self.path}. Skipping.")
+            return 0
+        placeholders = ", ".join("?" for _ in doc_ids)
+        deleted_count = self._delete_where(f"doc_id IN ({placeholders})", list(doc_ids))
+        logger.info(f"Successfully deleted {deleted_count} chunks for {len(doc_ids)} documents from {self.path}")
+        return deleted_count
+
+    def delete_document_by_id(self, doc_id: str):
+        """Delete all chunks of one document; returns the number of chunks deleted."""
+        deleted_count = self._delete_where("doc_id = ?", (str(doc_id).strip(),))
+        logger.info(f"Deleted {deleted_count} chunks for document {doc_id} from {self.path}")
+        return deleted_count
+
+    # ---------------------------------------------------------------- queries
+
+    def check_db_populated(self):
+        """Return True once any chunk has been inserted, like an existing OpenSearch index."""
+        with self._lock:
+            self._refresh_if_changed()
+            return self.dim is not None
+
+    def generation(self):
+        """Return the store version, which every write by any process changes."""
+        with self._lock:
+            self._refresh_if_changed()
+            return self._version
+
+    def search(self, query_text, vector=None, embedding=None, top_k=5, mode=None, doc_id=None, language='en'):
+        """
+        Supported search modes: dense(semantic search), sparse(keyword match) and hybrid(combination of dense and sparse).
+        Accepts either a pre-computed 'vector' OR an 'embedding' instance.
+        """
+        # Local searches are cheap enough to skip the retrieval cache
+        reset_last_lookup()
+        with self._lock:
+            self._refresh_if_changed()
+            if self.dim is None:
+                raise VectorStoreNotReadyError("Index is empty. Ingest documents first.")
+
+        if vector is not None:
+            query_vector = vector
+        elif embedding is not None:
+            query_vector = embedding.embed_query(query_text)
+        else:
+            raise ValueError("Provide 'vector' or 'embedding' to perform search.")
+
+        mode = mode or "hybrid"
+        if mode not in ("dense", "sparse", "hybrid"):
+            raise ValueError(f"Invalid search mode: {mode}. Must be 'dense', 'sparse', or 'hybrid'.")
+
+        limit = top_k * 3
+        with self._lock:
+            mask = self._alive & (self._languages == language) if language else self._alive.copy()
+            if mode == "dense":
+                ranked = self._dense(query_vector, mask, limit)[:top_k]
+            elif mode == "sparse":
+                ranked = self._sparse(query_text, mask, top_k)
+            else:
+                ranked = self._hybrid(query_vector, query_text, mask, limit)[:top_k]
+            results = self._results(ranked)
+
+        logger.debug(f"Search operation completed successfully with {len(results)} results")
+        return results
+
+    def _dense(self, query_vector, mask, k):
+        """Return the k best (row, score) pairs by cosine similarity, scored like OpenSearch."""
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+        query = np.asarray(query_vector, dtype=np.float32)
+        query_norm = float(np.linalg.norm(query)) or 1.0
+
+        hits = self._hnsw_search(query, mask, min(k, len(candidates)))
+        if hits is not None:
+            return hits
+
+        cosine = (self._vectors[:self._count] @ query) / (np.maximum(self._norms, 1e-12) * query_norm)
+        scores = (1.0 + cosine[candidates]) / 2  # OpenSearch cosinesimil score
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def _sparse(self, query_text, mask, k):
+        """Return the k best (row, score) pairs by BM25."""
+        alive = int(self._alive.sum())
+        if not alive:
+            return []
+        avg_len = float(self._doc_len[self._alive].mean()) or 1.0
+        scores = np.zeros(self._count, dtype=np.float64)
+        for token in _tokenize(query_text):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            rows = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            tfs = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            idf = math.log(1 + (alive - len(postings) + 0.5) / (len(postings) + 0.5))
+            norm = _BM25_K1 * (1 - _BM25_B + _BM25_B * self._doc_len[rows] / avg_len)
+            scores[rows] += idf * tfs / (tfs + norm)
+
+        candidates = np.flatnonzero(mask & (scores > 0))
+        if not len(candidates):
+            return []
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores[candidates], k - 1)[:k]
+        top = top[np.argsort(-scores[candidates][top])]
+        return [(int(candidates[i]), float(scores[candidates][i])) for i in top]
+
+    def _hybrid(self, query_vector, query_text, mask, limit):
+        """Fuse dense and sparse hits with min_max normalization and a weighted arithmetic mean."""
+        combined = {}
+        sub_queries = (self._dense(query_vector, mask, limit), self._sparse(query_text, mask, limit))
+        for i, hits in enumerate(sub_queries):
+            for row, score in _min_max(hits):
+                combined.setdefault(row, [0.0, 0.0])[i] = score
+        total_weight = sum(_HYBRID_WEIGHTS)
+        fused = [
+            (row, sum(w * s for w, s in zip(_HYBRID_WEIGHTS, scores)) / total_weight)
+            for row, scores in combined.items()
+        ]
+        return sorted(fused, key=lambda hit: hit[1], reverse=True)
+
+    def _hnsw_search(self, query, mask, k):
+        """Search the HNSW index if enabled; None means use exact search."""
+        global _hnsw_unavailable_logged
+        cfg = settings.vector_store
+        if not cfg.local_store_hnsw:
+            return None
+        try:
+            import hnswlib
+        except ImportError:
+            if not _hnsw_unavailable_logged:
+                logger.warning("local_store_hnsw is set but hnswlib is not installed, using exact search")
+                _hnsw_unavailable_logged = True
+            return None
+
+        if self._hnsw is None or self._hnsw_version != self._version:
+            rows = np.flatnonzero(self._alive)
+            index = hnswlib.Index(space="cosine", dim=self.dim)
+            index.init_index(max_elements=max(len(rows), 1), ef_construction=cfg.index_hnsw_ef_construction, M=cfg.index_hnsw_m)
+            index.add_items(np.asarray(self._vectors[rows]), rows)
+            self._hnsw, self._hnsw_version = index, self._version
+
+        self._hnsw.set_ef(max(cfg.index_ef_search, k))
+        try:
+            labels, distances = self._hnsw.knn_query(query, k=k, filter=lambda label: bool(mask[label]))
+        except RuntimeError as e:
+            # Too few filtered neighbours reachable in the graph
+            logger.debug(f"HNSW search failed, using exact search: {e}")
+            return None
+        return [(int(row), float((2.0 - distance) / 2)) for row, distance in zip(labels[0], distances[0])]
+
+    def _results(self, ranked):
+        """Load text and metadata for ranked (row, score) hits and format them like OpenSearch results."""
+        if not ranked:
+            return []
+        placeholders = ", ".join("?" for _ in ranked)
+        records = {
+            row: (chunk_id, text, json.loads(metadata))
+            for row, chunk_id, text, metadata in self._db.execute(
+                f"SELECT row, chunk_id, text, metadata FROM chunks WHERE row IN ({placeholders})",
+                [row for row, _ in ranked],
+            )
+        }
+        results = []
+        for row, score in ranked:
+            chunk_id, text, metadata = records[row]
+            results.append(search_result(chunk_id, text, score, metadata))
+        return results
@@ -6,6 +6,7 @@ import shutil
 from pathlib import Path
 from typing import Optional
 
+import httpx
 import requests
 from contextvars import ContextVar
 from requests.adapters import HTTPAdapter
@@ -16,6 +17,9 @@ request_id_ctx = ContextVar("request_id", default="-")
 # Global SESSION for all LLM and embedding API calls
 SESSION = None
 
+# Global async client for LLM and embedding API calls made from the event loop
+ASYNC_CLIENT = None
+
 class DoclingConversionError(Exception):
     """Exception raised when Docling document conversion fails.
 
@@ -181,6 +185,35 @@ def create_llm_session(pool_maxsize, pool_connections: int = 3, pool_block: bool
         SESSION = session
 
 
+def create_async_llm_client(max_connections, timeout: float = 3600.0):
+    """Create a shared httpx.AsyncClient with a bounded connection pool for LLM and embedding API calls.
+
+    Requests issued through this client run natively on the event loop, so a worker can
+    hold many concurrent (streaming) vLLM calls without occupying a thread per call.
+    """
+    global ASYNC_CLIENT
+
+    if ASYNC_CLIENT is None:
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        # Only the connect timeout is kept short; generation calls can legitimately run for minutes
+        ASYNC_CLIENT = httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(timeout, connect=10.0),
+        )
+
+
+async def close_async_llm_client():
+    """Close the shared async client, releasing its pooled connections."""
+    global ASYNC_CLIENT
+
+    if ASYNC_CLIENT is not None:
+        await ASYNC_CLIENT.aclose()
+        ASYNC_CLIENT = None
+
+
 def get_txt_tab_filenames(file_paths, out_path):
     """Derive text and table output filenames from a list of input file paths and an output directory."""
     original_filenames = [fp.split('/')[-1] for fp in file_paths]
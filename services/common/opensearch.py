@@ -1,15 +1,95 @@
+import json
+
+import httpx
 import numpy as np
 import hashlib
+import itertools
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, wait
+from contextlib import contextmanager
 from tqdm import tqdm
 from opensearchpy import OpenSearch, helpers
+from opensearchpy.exceptions import NotFoundError
 
 from common.misc_utils import get_logger
-from common.vector_db import VectorStore, VectorStoreNotReadyError
-from common.retry_utils import retry_on_transient_error
+from common.retrieval_cache import get_retrieval_cache, reset_last_lookup
+from common.vector_db import (
+    SEARCH_METADATA_FIELDS,
+    VectorStore,
+    VectorStoreNotReadyError,
+    chunk_metadata,
+    per_query,
+    search_result,
+)
+from common.retry_utils import async_retry_on_transient_error, retry_on_transient_error
 from common.settings import settings
+from common.thread_utils import ContextAwareThreadPoolExecutor
 
 logger = get_logger("OpenSearch")
 
+# Rough size estimates used to size insert batches without tokenizing or serializing
+_BYTES_PER_TOKEN = 4               # average UTF-8 bytes per embedding-model token
+_JSON_BYTES_PER_FLOAT = 20         # a float32 rendered as a JSON number, plus separator
+_BULK_ACTION_OVERHEAD_BYTES = 512  # action line, ids and metadata of one bulk item
+
+# Indices currently in bulk ingestion mode: index name -> {"refs": int, "saved": dict | None}.
+# Module-level so every store instance on the same index (e.g. one re-created after a
+# failure) sees the mode, and concurrent jobs restore the settings only once.
+_bulk_ingestion_state = {}
+_bulk_ingestion_lock = threading.Lock()
+# _meta key recording the settings saved by bulk ingestion mode, so a process killed during
+# a job does not leave the index without refresh: they are restored on the next startup
+_BULK_INGESTION_META_KEY = "bulk_ingestion_saved"
+# Serializes read-modify-write updates of index _meta within this process
+_meta_lock = threading.Lock()
+
+# k-NN index profiles (vector_store.index_profile). "min_version" is the oldest OpenSearch
+# release supporting the profile with cosine similarity; "encoder" / "mode" are added to the
+# knn_vector mapping. Lucene and faiss both accept at most 16,000 dimensions.
+_INDEX_PROFILES = {
+    "lucene_fp32": {"engine": "lucene", "min_version": (2, 0)},
+    # Lucene quantizes each float32 dimension to one byte on its own, so inserts and
+    # queries keep sending float vectors
+    "lucene_byte": {"engine": "lucene", "min_version": (2, 16), "encoder": {"name": "sq"}},
+    "faiss_fp16": {"engine": "faiss", "min_version": (2, 19), "encoder": {"name": "sq", "parameters": {"type": "fp16"}}},
+    # Binary-quantized graph in memory, full-precision vectors on disk for rescoring
+    "on_disk": {"engine": "faiss", "min_version": (2, 19), "mode": "on_disk"},
+}
+_MAX_VECTOR_DIMENSION = 16000
+# Default index.max_terms_count; larger deletes are split into several terms queries
+_MAX_DELETE_TERMS = 65536
+
+# Stored fields fetched by searches: not the embedding, nor metadata that search results leave out
+_SEARCH_SOURCE_FIELDS = ["chunk_id", "text", *(f"metadata.{field}" for field in SEARCH_METADATA_FIELDS)]
+
+# Indices known to exist: index name -> {"dimension": int | None, "mapping_version": int}.
+# Only existence is cached, since another service may create the index at any time; an
+# entry is dropped when OpenSearch reports the index missing. mapping_version changes
+# whenever the index is (re)discovered or created, so derived caches can tell generations apart.
+_index_states = {}
+_index_state_lock = threading.Lock()
+_mapping_versions = itertools.count(1)
+
+# Generation of each index's contents, for the retrieval cache:
+# index name -> {"local": int, "token": str | None, "checked_at": float | None,
+#                "published_at": float | None, "unpublished": bool}.
+# "local" counts changes made by this process. "token" is the value every writer
+# stores in the index _meta, re-read at most every retrieval_cache_generation_poll_seconds
+# so changes made by other services (e.g. digitize ingestion) are noticed too.
+# "unpublished" marks local changes not yet announced through the token, because
+# they were not searchable yet (bulk ingestion mode defers refreshes).
+_index_generations = {}
+
+# Reindexes running in this process: index name (alias) -> {"dirty": {doc_id: "written" | "deleted"}}.
+# Documents written or deleted through the alias while a reindex copies it are recorded
+# here and replayed on the new index before the alias is swapped.
+_reindexes = {}
+_reindex_lock = threading.Lock()
+_write_gates = {}
+
 
 def generate_chunk_id(doc_id: str, page_content: str) -> np.int64:
     """
@@ -23,11 +103,110 @@ def generate_chunk_id(doc_id: str, page_content: str) -> np.int64:
     chunk_id = chunk_int % (2**63)           # Fit into signed 64-bit range
     return np.int64(chunk_id)
 
+def _json_default(value):
+    """Serialize NumPy vectors and scalars in request bodies sent without the opensearch-py serializer."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _strip_index_prefix(flat_settings):
+    """Convert flat 'index.*' setting names to the keys expected under {"index": {...}}."""
+    return {key[len("index."):]: value for key, value in flat_settings.items()}
+
+
+class _WriteGate:
+    """Shared/exclusive lock per index: writes share it, a reindex holds it exclusively while it swaps the alias."""
+
+    def __init__(self):
+        """Initialize an unlocked gate."""
+        self._cond = threading.Condition()
+        self._writers = 0
+        self._exclusive = False
+
+    @contextmanager
+    def shared(self):
+        """Hold the gate with other writers; waits while it is held exclusively."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._exclusive)
+            self._writers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writers -= 1
+                self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the gate alone; new writers wait and running ones are waited for."""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._exclusive)
+            self._exclusive = True
+            self._cond.wait_for(lambda: self._writers == 0)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+
+def _prefetch(iterator, depth):
+    """
+    Run iterator in a background thread, buffering up to depth items in a bounded queue.
+
+    Lets the producer (e.g. embedding requests) run ahead of the consumer (bulk indexing)
+    by at most depth items. Exceptions raised by the producer are re-raised to the consumer.
+    Closing the returned generator early stops the producer.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def offer(item):
+        # Re-check stop periodically so an abandoned consumer never leaves the producer blocked
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not offer((item, None)):
+                    return
+        except Exception as e:
+            offer((done, e))
+            return
+        offer((done, None))
+
+    executor = ContextAwareThreadPoolExecutor(max_workers=1)
+    executor.submit(produce)
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=True)
+
+
 class OpensearchNotReadyError(VectorStoreNotReadyError):
     """Raised when OpenSearch is unreachable or initializing."""
     pass
 
 class OpensearchVectorStore(VectorStore):
+    supports_reindex = True
+
     def __init__(self):
         """Initialize the OpenSearch client and create the hybrid search pipeline."""
         logger.debug("Initializing OpensearchVectorStore")
@@ -63,7 +242,174 @@ class OpensearchVectorStore(VectorStore):
         hash_part = hashlib.md5(name.encode()).hexdigest()
         return f"{self.db_prefix}_{hash_part}"
 
-    @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
+    def _index_state(self):
+        """Return the cached state of this index, or None if it is not known to exist."""
+        with _index_state_lock:
+            return _index_states.get(self.index_name)
+
+    def _remember_index(self, dimension=None):
+        """Record that this index exists, with its embedding dimension if known."""
+        with _index_state_lock:
+            state = _index_states.get(self.index_name)
+            if state is None:
+                state = {"dimension": dimension, "mapping_version": next(_mapping_versions)}
+                _index_states[self.index_name] = state
+            elif dimension is not None:
+                state["dimension"] = dimension
+            return state
+
+    def _forget_index(self):
+        """Drop the cached state after OpenSearch reported the index missing."""
+        with _index_state_lock:
+            _index_states.pop(self.index_name, None)
+
+    def _index_exists(self):
+        """Check whether the index exists, asking OpenSearch only until it is known to."""
+        if self._index_state() is not None:
+            return True
+        if not self.client.indices.exists(index=self.index_name):
+            return False
+        self._remember_index()
+        return True
+
+    def _read_dimension(self):
+        """Read the embedding dimension from the index mapping; None if it cannot be determined."""
+        try:
+            mapping = self.client.indices.get_mapping(index=self.index_name)
+            dimension = next(iter(mapping.values()))["mappings"]["properties"]["embedding"]["dimension"]
+            return dimension if isinstance(dimension, int) else None
+        except Exception as e:
+            logger.debug(f"Could not read embedding dimension of {self.index_name}: {e}")
+            return None
+
+    def _generation_entry_locked(self):
+        return _index_generations.setdefault(
+            self.index_name,
+            {"local": 0, "token": None, "checked_at": None, "published_at": None, "unpublished": False},
+        )
+
+    def _read_meta(self):
+        """Read the index _meta (generation token, bulk ingestion settings)."""
+        mapping = self.client.indices.get_mapping(index=self.index_name)
+        return next(iter(mapping.values()), {}).get("mappings", {}).get("_meta") or {}
+
+    def _put_meta(self, updates):
+        """Merge updates into the index _meta, which put_mapping replaces as a whole; None removes a key."""
+        with _meta_lock:
+            meta = {**self._read_meta(), **updates}
+            meta = {key: value for key, value in meta.items() if value is not None}
+            self.client.indices.put_mapping(index=self.index_name, body={"_meta": meta})
+
+    def _read_generation_token(self):
+        """Read the generation token other writers stored in the index _meta."""
+        try:
+            meta = self._read_meta()
+        except NotFoundError:
+            self._forget_index()
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+        except Exception as e:
+            logger.warning(f"Failed to read generation of {self.index_name}: {e}")
+            return None
+        return meta.get("generation")
+
+    def _generation_poll_due(self, now):
+        """Whether the generation token should be re-read from the index _meta."""
+        with _index_state_lock:
+            checked_at = self._generation_entry_locked()["checked_at"]
+        return checked_at is None or now - checked_at >= settings.vector_store.retrieval_cache_generation_poll_seconds
+
+    def _current_generation(self, token=None, now=None):
+        """Return the generation tuple, after recording a freshly read token if given."""
+        with _index_state_lock:
+            entry = self._generation_entry_locked()
+            if now is not None:
+                entry["token"] = token
+                entry["checked_at"] = now
+            local, token = entry["local"], entry["token"]
+        state = self._index_state()
+        return state["mapping_version"] if state else None, local, token
+
+    def _generation(self):
+        """Return the current generation of the index contents."""
+        now = time.monotonic()
+        if self._generation_poll_due(now):
+            return self._current_generation(self._read_generation_token(), now)
+        return self._current_generation()
+
+    def generation(self):
+        """
+        Return the generation of the index contents, as used by the retrieval cache.
+
+        Changes made by other services are noticed within retrieval_cache_generation_poll_seconds.
+        """
+        return self._generation()
+
+    def _bump_generation(self, publish=True, meta=None):
+        """
+        Record a change to the index contents, for this process and for other services.
+
+        The local counter changes on every call. Publishing a new token in the index
+        _meta updates the cluster state, so callers only publish once the change is
+        searchable; unpublished changes go out with the next publish.
+
+        Args:
+            publish: Whether to publish a new generation token for other services now
+            meta: Other _meta updates to publish along with the new generation token
+        """
+        with _index_state_lock:
+            entry = self._generation_entry_locked()
+            entry["local"] += 1
+            if not publish:
+                entry["unpublished"] = True
+                return
+        self._publish_generation(meta)
+
+    def _publish_generation(self, meta=None):
+        """Store a new generation token in the index _meta, along with other _meta updates."""
+        token = uuid.uuid4().hex
+        try:
+            self._put_meta({**(meta or {}), "generation": token})
+        except Exception as e:
+            logger.warning(f"Failed to publish generation of {self.index_name}: {e}")
+            return
+        with _index_state_lock:
+            entry = self._generation_entry_locked()
+            # Our own change is already counted in "local"
+            entry["token"] = token
+            entry["published_at"] = time.monotonic()
+            entry["unpublished"] = False
+
+    def _publish_insert_due(self):
+        """Whether an insert that just finished is searchable and worth announcing to other services."""
+        if not self._in_bulk_ingestion_mode():
+            # Every batch was refreshed
+            return True
+        if settings.vector_store.bulk_ingestion_refresh != "document":
+            # Nothing is searchable before the refresh when the job ends, which publishes
+            return False
+        # Each document is refreshed, but other services only poll the token every
+        # retrieval_cache_generation_poll_seconds, so publishing more often is wasted
+        with _index_state_lock:
+            published_at = self._generation_entry_locked()["published_at"]
+        poll_seconds = settings.vector_store.retrieval_cache_generation_poll_seconds
+        return published_at is None or time.monotonic() - published_at >= poll_seconds
+
+    def _write_gate(self):
+        with _reindex_lock:
+            return _write_gates.setdefault(self.index_name, _WriteGate())
+
+    @contextmanager
+    def _tracked_write(self, doc_ids, operation):
+        """Run a write through the index, recording its documents for a reindex in progress."""
+        with self._write_gate().shared():
+            try:
+                yield
+            finally:
+                with _reindex_lock:
+                    state = _reindexes.get(self.index_name)
+                    if state is not None:
+                        state["dirty"].update(dict.fromkeys(doc_ids, operation))
+
     def _create_pipeline(self):
         logger.debug("Creating hybrid search pipeline")
 
@@ -90,21 +436,52 @@ class OpensearchVectorStore(VectorStore):
             logger.error(f"Failed to create hybrid search pipeline: {e}")
             raise
 
-    @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
-    def _setup_index(self, dim):
-        logger.debug(f"Setting up index {self.index_name} with dimension {dim}")
-
-        if self.client.indices.exists(index=self.index_name):
-            return
+    def _embedding_mapping(self, dim):
+        """Build the knn_vector mapping of the embedding field for the configured index profile."""
+        cfg = settings.vector_store
+        profile = _INDEX_PROFILES[cfg.index_profile]
+        field = {"type": "knn_vector", "dimension": dim}
+        if "mode" in profile:
+            # The k-NN plugin picks the method and compression for the mode
+            field.update({"space_type": "cosinesimil", "mode": profile["mode"]})
+            return field
+        parameters = {"ef_construction": cfg.index_hnsw_ef_construction, "m": cfg.index_hnsw_m}
+        if "encoder" in profile:
+            parameters["encoder"] = profile["encoder"]
+        field["method"] = {
+            "name": "hnsw",    # HNSW is standard for high performance
+            "space_type": "cosinesimil",
+            "engine": profile["engine"],
+            "parameters": parameters,
+        }
+        return field
 
-        logger.debug(f"Creating new index {self.index_name}")
+    def _validate_index_profile(self, dim):
+        """Check the configured index profile can hold dim-sized vectors on this cluster."""
+        name = settings.vector_store.index_profile
+        profile = _INDEX_PROFILES[name]
+        if not 1 <= dim <= _MAX_VECTOR_DIMENSION:
+            raise ValueError(f"Index profile '{name}' supports 1 to {_MAX_VECTOR_DIMENSION} dimensions, got {dim}")
 
-        # index body: setting and mappings
-        index_body = {
+        try:
+            number = self.client.info()["version"]["number"]
+            version = tuple(int(part) for part in number.split("-")[0].split(".")[:2])
+        except Exception as e:
+            # Let index creation report an unsupported mapping
+            logger.warning(f"Could not read the OpenSearch version to validate index profile '{name}': {e}")
+            return
+        if version < profile["min_version"]:
+            required = ".".join(str(part) for part in profile["min_version"])
+            raise ValueError(f"Index profile '{name}' requires OpenSearch {required} or later, cluster runs {number}")
+        logger.debug(f"Index profile '{name}' validated for {dim} dimensions on OpenSearch {number}")
+
+    def _index_body(self, dim):
+        """Build the settings and mappings of a new index for dim-sized embeddings."""
+        return {
             "settings": {
                 "index": {
                     "knn": True,  # Enable k-NN search functionality
-                    "knn.algo_param.ef_search": 100,  # Number of candidates to consider during search (higher = more accurate but slower)
+                    "knn.algo_param.ef_search": settings.vector_store.index_ef_search,  # Number of candidates to consider during search (higher = more accurate but slower)
                     "number_of_shards": self.num_shards,  # Number of primary shards for data distribution
                     'auto_expand_replicas': '0-all' # dynamically set the replicas based on nodes
                 }
@@ -115,19 +492,7 @@ class OpensearchVectorStore(VectorStore):
                     "chunk_id": {"type": "long"},
                     
                     # Vector embedding field for semantic search
-                    "embedding": {
-                        "type": "knn_vector",
-                        "dimension": dim,
-                        "method": {
-                            "name": "hnsw",    # HNSW is standard for high performance
-                            "space_type": "cosinesimil",
-                            "engine": "lucene",
-                            "parameters": {
-                                "ef_construction": 128,
-                                "m": 24
-                            }
-                        }
-                    },
+                    "embedding": self._embedding_mapping(dim),
                     
                     # The actual text content of the chunk for keyword search and retrieval
                     "text": {
@@ -153,16 +518,270 @@ class OpensearchVectorStore(VectorStore):
                 }
             }
         }
+
+    @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
+    def _setup_index(self, dim):
+        logger.debug(f"Setting up index {self.index_name} with dimension {dim}")
+
+        # Always asks OpenSearch: bulk requests would otherwise auto-create a deleted
+        # index with a dynamic mapping. This runs once per document, not per query.
+        if self.client.indices.exists(index=self.index_name):
+            state = self._remember_index()
+            if state["dimension"] is None:
+                state["dimension"] = self._read_dimension()
+            if not state.get("bulk_ingestion_checked"):
+                # Once per discovered index, in case startup recovery could not reach OpenSearch
+                state["bulk_ingestion_checked"] = True
+                self.recover_bulk_ingestion_mode()
+            if state["dimension"] not in (None, dim):
+                logger.warning(f"Index {self.index_name} has dimension {state['dimension']}, embeddings have {dim}")
+            return
+        self._forget_index()
+
+        logger.debug(f"Creating new index {self.index_name}")
+        self._validate_index_profile(dim)
+
         # Create the Index
         try:
-            self.client.indices.create(index=self.index_name, body=index_body)
+            self.client.indices.create(index=self.index_name, body=self._index_body(dim))
+            self._remember_index(dim)
             logger.debug(f"Index {self.index_name} created successfully with {dim} dimensions")
         except Exception as e:
             logger.error(f"Failed to create index {self.index_name}: {e}")
             raise
 
+        # An index created during a bulk ingestion job starts in ingestion mode too
+        with _bulk_ingestion_lock:
+            state = _bulk_ingestion_state.get(self.index_name)
+            if state is not None and state["saved"] is None:
+                try:
+                    self._apply_bulk_ingestion_settings(state)
+                except Exception as e:
+                    logger.warning(f"Failed to enable bulk ingestion mode on {self.index_name}: {e}")
+
+    def _apply_bulk_ingestion_settings(self, state):
+        """Disable refresh (and optionally replicas), saving the current values in state."""
+        current = self.client.indices.get_settings(index=self.index_name, flat_settings=True)
+        # Keyed by the concrete index, which differs from index_name once it is an alias
+        index_settings = next(iter(current.values()), {}).get("settings", {})
+        ingestion_settings = {"index.refresh_interval": "-1"}
+        if settings.vector_store.bulk_ingestion_disable_replicas:
+            ingestion_settings["index.auto_expand_replicas"] = "false"
+            ingestion_settings["index.number_of_replicas"] = 0
+        # Settings that were not set explicitly are restored to their defaults (None)
+        saved = {key: index_settings.get(key) for key in ingestion_settings}
+        # Recorded in the index before changing anything, so they survive this process
+        self._put_meta({_BULK_INGESTION_META_KEY: saved})
+        state["saved"] = saved
+        self.client.indices.put_settings(index=self.index_name, body={"index": _strip_index_prefix(ingestion_settings)})
+        logger.info(f"Bulk ingestion mode enabled on {self.index_name}: {ingestion_settings}")
+
+    def _in_bulk_ingestion_mode(self):
+        return self.index_name in _bulk_ingestion_state
+
+    @contextmanager
+    def bulk_ingestion_mode(self):
+        """
+        Optimize the index for a large ingestion job for the duration of the block.
+
+        Periodic refresh is disabled (and, with bulk_ingestion_disable_replicas, replicas are
+        dropped to 0) so bulk requests stop forcing a segment refresh per batch. Documents
+        become searchable through one explicit refresh per document or per job, depending
+        on bulk_ingestion_refresh. The original settings are restored and the index is
+        refreshed when the block exits, including when it raises.
+        """
+        with _bulk_ingestion_lock:
+            state = _bulk_ingestion_state.get(self.index_name)
+            if state is not None:
+                state["refs"] += 1
+            else:
+                state = {"refs": 1, "saved": None}
+                _bulk_ingestion_state[self.index_name] = state
+                try:
+                    if self._index_exists():
+                        self._apply_bulk_ingestion_settings(state)
+                except Exception as e:
+                    # Ingestion still works with the regular settings, just slower
+                    logger.warning(f"Failed to enable bulk ingestion mode on {self.index_name}: {e}")
+        try:
+            yield
+        finally:
+            with _bulk_ingestion_lock:
+                state["refs"] -= 1
+                if state["refs"] == 0:
+                    _bulk_ingestion_state.pop(self.index_name, None)
+                    self._restore_bulk_ingestion_settings(state)
+                    with _index_state_lock:
+                        unpublished = self._generation_entry_locked()["unpublished"]
+                    if unpublished:
+                        # The settings were not restored (or never changed), which publishes otherwise
+                        self._publish_generation()
+
+    def _restore_bulk_ingestion_settings(self, state):
+        """Restore settings saved by _apply_bulk_ingestion_settings and refresh once."""
+        if state["saved"] is None:
+            return
+        try:
+            self._restore_saved_settings(state["saved"])
+            logger.info(f"Bulk ingestion mode disabled on {self.index_name}, settings restored")
+        except Exception as e:
+            logger.error(
+                f"Failed to restore index settings {state['saved']} on {self.index_name} after bulk ingestion: {e}"
+            )
+
+    def _restore_saved_settings(self, saved):
+        """Put back settings saved for bulk ingestion, refresh, and clear them from the index _meta."""
+        self.client.indices.put_settings(index=self.index_name, body={"index": _strip_index_prefix(saved)})
+        self.client.indices.refresh(index=self.index_name)
+        # Chunks indexed during the job only became searchable with this refresh
+        self._bump_generation(meta={_BULK_INGESTION_META_KEY: None})
+
+    def recover_bulk_ingestion_mode(self):
+        """
+        Restore settings left behind by a bulk ingestion job whose process was killed.
+
+        Does nothing while this process runs a job on the index. Returns True if
+        settings were restored.
+        """
+        with _bulk_ingestion_lock:
+            if self._in_bulk_ingestion_mode():
+                return False
+            try:
+                saved = self._read_meta().get(_BULK_INGESTION_META_KEY)
+                if not saved:
+                    return False
+                self._restore_saved_settings(saved)
+            except Exception as e:
+                logger.warning(f"Failed to recover bulk ingestion settings of {self.index_name}: {e}")
+                return False
+        logger.warning(f"Restored index settings {saved} on {self.index_name} left by an interrupted ingestion job")
+        return True
+
+    def _next_batch_end(self, chunks, start, vector_bytes, batch_size=None):
+        """
+        Return the end index of the batch starting at chunks[start].
+
+        With a fixed batch_size the batch simply holds batch_size chunks. Otherwise
+        chunks are added until the estimated embedding tokens or bulk payload bytes
+        would exceed their budgets (or the chunk cap is reached), so short chunks such
+        as table summaries travel in large batches and long text chunks in small ones.
+        A batch always holds at least one chunk.
+        """
+        if batch_size:
+            return min(start + batch_size, len(chunks))
+
+        cfg = settings.vector_store
+        tokens = 0
+        payload_bytes = 0
+        end = start
+        while end < len(chunks) and end - start < cfg.insert_batch_max_chunks:
+            text_bytes = len((chunks[end].get("page_content") or "").encode("utf-8"))
+            chunk_tokens = text_bytes // _BYTES_PER_TOKEN + 1
+            chunk_bytes = text_bytes + vector_bytes + _BULK_ACTION_OVERHEAD_BYTES
+            if end > start and (
+                tokens + chunk_tokens > cfg.insert_batch_max_tokens
+                or payload_bytes + chunk_bytes > cfg.insert_batch_max_bytes
+            ):
+                break
+            tokens += chunk_tokens
+            payload_bytes += chunk_bytes
+            end += 1
+        return end
+
+    def _build_actions(self, batch, embeddings):
+        """Transform a batch of chunks and their embeddings into OpenSearch bulk actions."""
+        actions = []
+        for doc, emb in zip(batch, embeddings):
+            pc = doc.get("page_content", "")
+            metadata = chunk_metadata(doc)
+
+            # Generate chunk ID based on content + doc_id (falls back to filename if UUID missing)
+            # This allows updating doc_id when re-ingesting the same file
+            cid = generate_chunk_id(metadata["doc_id"], pc)
+
+            actions.append({
+                "_index": self.index_name,
+                "_id": str(cid),
+                "_source": {
+                    "chunk_id": cid,
+                    "embedding": emb.tolist() if isinstance(emb, np.ndarray) else emb,
+                    "text": pc,
+                    "metadata": metadata
+                }
+            })
+        return actions
+
+    def _stream_bulk(self, actions):
+        """Send actions in byte-bounded bulk requests and yield (ok, item) per action, in order."""
+        cfg = settings.vector_store
+        options = dict(
+            chunk_size=cfg.bulk_chunk_size,
+            max_chunk_bytes=cfg.bulk_max_chunk_bytes,
+            raise_on_error=False,   # Report failed chunks instead of raising on the first one
+            refresh=False,          # Refreshed once per batch (or per document/job in bulk ingestion mode)
+        )
+        if cfg.bulk_thread_count > 1 and len(actions) > cfg.bulk_chunk_size:
+            return helpers.parallel_bulk(self.client, actions, thread_count=cfg.bulk_thread_count, **options)
+        return helpers.streaming_bulk(self.client, actions, **options)
+
+    def _bulk_index_batch(self, actions, batch_num, refresh=True):
+        """Bulk insert one batch of actions; returns False if any chunk failed to index.
+
+        Chunks rejected with 429 (rejected execution) are retried with exponential
+        backoff; any other chunk error, or a 429 that outlives the retries, fails the batch.
+        With refresh=False the caller takes care of refreshing the index.
+        """
+        cfg = settings.vector_store
+        pending = actions
+        success_count = 0
+        try:
+            for attempt in range(cfg.bulk_max_retries + 1):
+                rejected, errors = [], []
+                # Drain the results so parallel_bulk shuts its worker pool down
+                results = list(self._stream_bulk(pending))
+                for action, (ok, item) in zip(pending, results):
+                    if ok:
+                        success_count += 1
+                    elif next(iter(item.values())).get("status") == 429:
+                        rejected.append((action, item))
+                    else:
+                        errors.append(item)
+
+                if not rejected or errors:
+                    break
+                if attempt < cfg.bulk_max_retries:
+                    delay = min(cfg.bulk_initial_backoff * (2 ** attempt), cfg.bulk_max_backoff)
+                    logger.warning(
+                        f"Batch {batch_num}: {len(rejected)} chunks rejected with 429, "
+                        f"retrying in {delay:.1f}s (attempt {attempt + 1}/{cfg.bulk_max_retries})"
+                    )
+                    time.sleep(delay)
+                    pending = [action for action, _ in rejected]
+            errors.extend(item for _, item in rejected)
+
+            # If any errors occurred in this batch, the document failed
+            if errors:
+                logger.debug(f"Batch {batch_num}: {len(errors)} chunks failed to insert")
+                for error_item in errors:
+                    # OpenSearch returns errors in a dict format: {'index': {'_id': '...', 'error': ...}}
+                    action_type = list(error_item.keys())[0]
+                    error_detail = error_item[action_type]
+                    logger.error(f"Chunk insertion error: {error_detail.get('error', 'Unknown error')}")
+                return False
+
+            if refresh and not self._in_bulk_ingestion_mode():
+                # Bulk ingestion mode refreshes per document/job instead
+                self.client.indices.refresh(index=self.index_name)
+
+            logger.debug(f"Batch {batch_num}: {success_count} chunks inserted successfully")
+            return True
+
+        except Exception as e:
+            logger.error(f"Exception during bulk insert for batch {batch_num}: {e}")
+            raise
+
     @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
-    def insert_chunks(self, chunks, vectors=None, embedding=None, batch_size=10):
+    def insert_chunks(self, chunks, vectors=None, embedding=None, batch_size=None):
         """Supports 2 modes of insertion with retry logic for transient failures.
 
         1. Pure embedding: pass 'chunks' and 'vectors'
@@ -172,146 +791,99 @@ class OpensearchVectorStore(VectorStore):
             chunks: List of document chunks to insert (for a single document)
             vectors: Pre-computed embeddings (optional)
             embedding: Embedding instance to generate embeddings (optional)
-            batch_size: Number of chunks to insert per batch
+            batch_size: Fixed number of chunks per batch. If None, batches are sized by the
+                token and bulk-payload budgets in the vector store settings.
 
         Returns:
             bool: True if indexing succeeded, False if it failed
         """
+        with self._tracked_write({chunk_metadata(doc)["doc_id"] for doc in chunks}, "written"):
+            return self._insert_chunks(chunks, vectors, embedding, batch_size)
+
+    def _insert_chunks(self, chunks, vectors, embedding, batch_size):
         logger.debug("Starting insert_chunks operation")
 
         if not chunks:
             logger.debug("Nothing to chunk!")
             return True
 
-        logger.debug(f"Inserting {len(chunks)} chunks into OpenSearch with batch_size={batch_size}")
+        logger.debug(f"Inserting {len(chunks)} chunks into OpenSearch with batch_size={batch_size or 'dynamic'}")
 
         # Handle Pre-computed Vectors if provided
         final_embeddings = vectors
+        first_end = 0
         if vectors is not None and len(vectors) > 0:
             logger.debug(f"Using pre-computed vectors, dimension: {len(vectors[0])}")
             # Initialize index using pre-computed vector dimension (only once)
             self._setup_index(len(vectors[0]))
+            vector_bytes = len(vectors[0]) * _JSON_BYTES_PER_FLOAT
         elif embedding is not None:
             logger.debug("Will generate embeddings using provided embedding instance")
-            # Generate first batch to get dimension and setup index once
-            first_batch = chunks[:min(batch_size, len(chunks))]
-            first_page_contents = [doc.get("page_content") for doc in first_batch]
+            # Generate first batch to get dimension and setup index once. The vector size
+            # is not known yet, so the first batch is sized by its text alone.
+            first_end = self._next_batch_end(chunks, 0, 0, batch_size)
+            first_page_contents = [doc.get("page_content") for doc in chunks[:first_end]]
             first_embeddings = embedding.embed_documents(first_page_contents)
             dim = len(first_embeddings[0])
             self._setup_index(dim)
+            vector_bytes = dim * _JSON_BYTES_PER_FLOAT
             logger.debug(f"Index setup completed with dimension: {dim}")
-
-        # Iterate through chunks in batches and insert in bulk
-        for i in tqdm(range(0, len(chunks), batch_size)):
-            batch = chunks[i:i + batch_size]
-            page_contents = [doc.get("page_content") for doc in batch]
-
-            # Generate embeddings for this batch
-            if vectors is None and embedding is not None:
-                current_batch_embeddings = embedding.embed_documents(page_contents)
-            else:
-                # Use the relevant slice from pre-computed vectors
-                assert final_embeddings is not None, "final_embeddings must be set when vectors is provided"
-                current_batch_embeddings = final_embeddings[i:i + batch_size]
-
-            # 3. Transform batch to OpenSearch document format
-            actions = []
-            for j, (doc, emb) in enumerate(zip(batch, current_batch_embeddings)):
-                fn = doc.get("filename", "")
-                pc = doc.get("page_content", "")
-
-                # Generate chunk ID based on content + filename (not doc_id)
-                # This allows updating doc_id when re-ingesting the same file
-                doc_id = doc.get("doc_id") or fn # Fallback to filename if UUID missing
-                cid = generate_chunk_id(doc_id, pc)
-
-                # Build metadata object with all fields
-                metadata = {
-                    "filename": fn,
-                    "doc_id": doc_id,
-                    "type": doc.get("type", ""),
-                    "source": doc.get("source", ""),
-                    "language": doc.get("language", "")
-                }
-                
-                # Add optional fields if they exist
-                if doc.get("page_number") is not None:
-                    metadata["page_number"] = doc.get("page_number")
-                if doc.get("chunk_index") is not None:
-                    metadata["chunk_index"] = doc.get("chunk_index")
-                if doc.get("total_chunks") is not None:
-                    metadata["total_chunks"] = doc.get("total_chunks")
-                if doc.get("created_at") is not None:
-                    metadata["created_at"] = doc.get("created_at")
-
-                actions.append({
-                    "_index": self.index_name,
-                    "_id": str(cid),
-                    "_source": {
-                        "chunk_id": cid,
-                        "embedding": emb.tolist() if isinstance(emb, np.ndarray) else emb,
-                        "text": pc,
-                        "metadata": metadata
-                    }
-                })
-
-            # Bulk insert the current batch
-            batch_num = i // batch_size + 1
-
-            try:
-                # Use bulk insert with error handling
-                success_count, errors = helpers.bulk(
-                    self.client,
-                    actions,
-                    stats_only=False,               # Get detailed error information for failed chunks
-                    raise_on_error=False,           # Continue indexing other chunks even if some fail
-                    refresh=True
-                )
-
-                # If any errors occurred in this batch, the document failed
-                if errors:
-                    logger.debug(f"Batch {batch_num}: {len(errors)} chunks failed to insert")
-                    for error_item in errors:
-                        # OpenSearch returns errors in a dict format: {'index': {'_id': '...', 'error': ...}}
-                        action_type = list(error_item.keys())[0]
-                        error_detail = error_item[action_type]
-                        logger.error(f"Chunk insertion error: {error_detail.get('error', 'Unknown error')}")
+        else:
+            vector_bytes = 0
+
+        def embedded_batches():
+            """Yield (batch, embeddings) for each insert batch, embedding on demand."""
+            i = 0
+            while i < len(chunks):
+                end = first_end if i == 0 and first_end else self._next_batch_end(chunks, i, vector_bytes, batch_size)
+                batch = chunks[i:end]
+
+                # Generate embeddings for this batch (the first batch was embedded during index setup)
+                if vectors is None and embedding is not None:
+                    if i == 0:
+                        yield batch, first_embeddings
+                    else:
+                        yield batch, embedding.embed_documents([doc.get("page_content") for doc in batch])
+                else:
+                    # Use the relevant slice from pre-computed vectors
+                    assert final_embeddings is not None, "final_embeddings must be set when vectors is provided"
+                    yield batch, final_embeddings[i:end]
+                i = end
+
+        batches = embedded_batches()
+        pipeline_depth = settings.vector_store.insert_pipeline_depth
+        if vectors is None and embedding is not None and pipeline_depth > 0:
+            # Embed batch N+1 while batch N is being bulk-indexed
+            batches = _prefetch(batches, pipeline_depth)
+
+        # Insert batches in bulk as their embeddings become available
+        progress = tqdm(total=len(chunks))
+        sent = False
+        try:
+            for batch_num, (batch, current_batch_embeddings) in enumerate(batches, start=1):
+                actions = self._build_actions(batch, current_batch_embeddings)
+                sent = True
+                if not self._bulk_index_batch(actions, batch_num):
                     return False
-
-                logger.debug(f"Batch {batch_num}: {success_count} chunks inserted successfully")
-
-            except Exception as e:
-                logger.error(f"Exception during bulk insert for batch {batch_num}: {e}")
-                raise
+                progress.update(len(batch))
+
+            if self._in_bulk_ingestion_mode() and settings.vector_store.bulk_ingestion_refresh == "document":
+                # One refresh makes the whole document searchable
+                self.client.indices.refresh(index=self.index_name)
+        finally:
+            # Stops the prefetch thread if indexing ended early
+            batches.close()
+            progress.close()
+            if sent:
+                # Even a failed document may have indexed some chunks
+                self._bump_generation(publish=self._publish_insert_due())
 
         logger.info(f"Insert operation completed successfully: {len(chunks)} chunks inserted into index {self.index_name}")
         return True
 
 
-    @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
-    def search(self, query_text, vector=None, embedding=None, top_k=5, mode=None, doc_id=None, language='en'):
-        """
-        Supported search modes: dense(semantic search), sparse(keyword match) and hybrid(combination of dense and sparse).
-        Accepts either a pre-computed 'vector' OR an 'embedding' instance.
-        Includes retry logic for transient failures.
-        """
-        logger.debug(f"Starting search operation: query='{query_text[:50]}...', top_k={top_k}, mode={mode}, language={language}")
-
-        query = query_text
-        if not self.client.indices.exists(index=self.index_name):
-            logger.error(f"Index {self.index_name} does not exist")
-            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
-
-        if vector is not None:
-            logger.debug("Using pre-computed query vector")
-            query_vector = vector
-        elif embedding is not None:
-            logger.debug("Generating query embedding")
-            query_vector = embedding.embed_query(query)
-        else:
-            logger.error("No vector or embedding provided for search")
-            raise ValueError("Provide 'vector' or 'embedding' to perform search.")
-
+    def _build_search_body(self, query, query_vector, top_k, mode, language):
+        """Build the search request body for one query in the given mode."""
         # Default to hybrid mode if not specified
         if mode is None:
             mode = "hybrid"
@@ -319,13 +891,12 @@ class OpensearchVectorStore(VectorStore):
 
         limit = top_k * 3
         logger.debug(f"Search mode: {mode}, limit: {limit}")
-        params = {}
 
         if mode == "dense":
             # 1. Define the k-NN search body
             search_body = {
                 "size": top_k,
-                "_source": ["chunk_id", "text", "metadata"],
+                "_source": _SEARCH_SOURCE_FIELDS,
                 "query": {
                     "knn": {
                         "embedding": {
@@ -344,7 +915,7 @@ class OpensearchVectorStore(VectorStore):
             # Standard full-text match for sparse/keyword logic
             search_body = {
                 "size": top_k,
-                "_source": ["chunk_id", "text", "metadata"],
+                "_source": _SEARCH_SOURCE_FIELDS,
                 "query": {
                     "bool": {
                         "must": [
@@ -360,7 +931,7 @@ class OpensearchVectorStore(VectorStore):
             # OpenSearch Hybrid Query combines Dense (k-NN) and Sparse (Match)
             search_body = {
                 "size": top_k, # Final number of results after fusion
-                "_source": ["chunk_id", "text", "metadata"],
+                "_source": _SEARCH_SOURCE_FIELDS,
                 "query": {
                     "hybrid": {
                         "queries": [
@@ -389,6 +960,56 @@ class OpensearchVectorStore(VectorStore):
             logger.error(f"Invalid search mode: {mode}")
             raise ValueError(f"Invalid search mode: {mode}. Must be 'dense', 'sparse', or 'hybrid'.")
 
+        return search_body
+
+    def _format_hits(self, hits):
+        """Flatten OpenSearch hits into result dicts."""
+        results = []
+        for idx, hit in enumerate(hits):
+            source = hit["_source"]
+            result = search_result(source.get("chunk_id"), source.get("text"), hit["_score"], source.get("metadata") or {})
+            results.append(result)
+            logger.debug(f"Result {idx+1}: doc_id={result.get('doc_id', 'N/A')}, score={hit['_score']:.4f}")
+
+        return results
+
+    @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
+    def search(self, query_text, vector=None, embedding=None, top_k=5, mode=None, doc_id=None, language='en'):
+        """
+        Supported search modes: dense(semantic search), sparse(keyword match) and hybrid(combination of dense and sparse).
+        Accepts either a pre-computed 'vector' OR an 'embedding' instance.
+        Includes retry logic for transient failures.
+        """
+        logger.debug(f"Starting search operation: query='{query_text[:50]}...', top_k={top_k}, mode={mode}, language={language}")
+
+        query = query_text
+        if not self._index_exists():
+            logger.error(f"Index {self.index_name} does not exist")
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+
+        # Results are cached per query text and embedding model, so only searches given the
+        # embedding are cached; a pre-computed 'vector' is taken to be its embedding of the query
+        reset_last_lookup()
+        cache = get_retrieval_cache() if embedding is not None else None
+        if cache is not None:
+            generation = self._generation()
+            cache_key = cache.make_key(query, mode or "hybrid", top_k, language, doc_id, getattr(embedding, "emb_model", ""))
+            cached = cache.get(self.index_name, generation, cache_key)
+            if cached is not None:
+                logger.debug(f"Search served from retrieval cache with {len(cached)} results")
+                return cached
+
+        if vector is not None:
+            logger.debug("Using pre-computed query vector")
+            query_vector = vector
+        elif embedding is not None:
+            logger.debug("Generating query embedding")
+            query_vector = embedding.embed_query(query)
+        else:
+            logger.error("No vector or embedding provided for search")
+            raise ValueError("Provide 'vector' or 'embedding' to perform search.")
+
+        search_body = self._build_search_body(query, query_vector, top_k, mode, language)
         params = {"search_pipeline": "hybrid_pipeline"}
 
         try:
@@ -397,30 +1018,232 @@ class OpensearchVectorStore(VectorStore):
 
             total_hits = response["hits"]["total"]["value"] if isinstance(response["hits"]["total"], dict) else response["hits"]["total"]
             logger.info(f"Search completed: found {total_hits} total hits, returning top {len(response['hits']['hits'])} results")
+        except NotFoundError:
+            # Deleted since it was cached
+            self._forget_index()
+            logger.error(f"Index {self.index_name} does not exist")
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
         except Exception as e:
             logger.error(f"Search query failed: {e}")
             raise
 
-        # Format results
+        results = self._format_hits(response["hits"]["hits"])
+        if cache is not None:
+            cache.put(self.index_name, generation, cache_key, results)
+        logger.debug(f"Search operation completed successfully with {len(results)} results")
+        return results
+
+    @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
+    def search_many(self, queries, vectors=None, embedding=None, top_k=5, mode=None, language='en'):
+        """
+        Run several searches in one _msearch request and return one result list per query.
+        Query vectors come from a single batched embedding call unless 'vectors' is given.
+        top_k and mode apply to all queries, or give one value per query.
+        """
+        if not queries:
+            return []
+        top_ks = per_query(top_k, len(queries))
+        modes = per_query(mode, len(queries))
+        logger.debug(f"Starting search_many operation: {len(queries)} queries, top_k={top_k}, mode={mode}, language={language}")
+
+        if not self._index_exists():
+            logger.error(f"Index {self.index_name} does not exist")
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+
+        if vectors is not None:
+            logger.debug("Using pre-computed query vectors")
+            query_vectors = vectors
+        elif embedding is not None:
+            logger.debug(f"Generating {len(queries)} query embeddings in one request")
+            query_vectors = embedding.embed_documents(list(queries))
+        else:
+            logger.error("No vectors or embedding provided for search")
+            raise ValueError("Provide 'vectors' or 'embedding' to perform search.")
+
+        # _msearch body: a header line followed by a search body for every query
+        msearch_body = []
+        for query, query_vector, k, m in zip(queries, query_vectors, top_ks, modes):
+            msearch_body.append({"index": self.index_name, "search_pipeline": "hybrid_pipeline"})
+            msearch_body.append(self._build_search_body(query, query_vector, k, m, language))
+
+        try:
+            logger.debug(f"Executing {len(queries)} search queries on index {self.index_name}")
+            response = self.client.msearch(body=msearch_body)
+        except NotFoundError:
+            self._forget_index()
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+        except Exception as e:
+            logger.error(f"Multi-search query failed: {e}")
+            raise
+
         results = []
-        for idx, hit in enumerate(response["hits"]["hits"]):
-            source = hit["_source"]
-            # Flatten the structure for backward compatibility
-            result = {
-                "chunk_id": source.get("chunk_id"),
-                "text": source.get("text"),
-                "page_content": source.get("text"),  # Alias for backward compatibility
-                "score": hit["_score"]
-            }
-            # Add metadata fields
-            if "metadata" in source:
-                result.update(source["metadata"])
-                result["metadata"] = source["metadata"]  # Keep nested structure too
-            
-            results.append(result)
-            logger.debug(f"Result {idx+1}: doc_id={result.get('doc_id', 'N/A')}, score={hit['_score']:.4f}")
+        for idx, item in enumerate(response["responses"]):
+            if item.get("status") == 404:
+                # Deleted since it was cached
+                self._forget_index()
+                raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+            if "error" in item:
+                logger.error(f"Search query {idx + 1} of {len(queries)} failed: {item['error']}")
+                raise RuntimeError(f"Search query {idx + 1} failed: {item['error']}")
+            results.append(self._format_hits(item["hits"]["hits"]))
+
+        logger.info(f"Multi-search completed: {len(results)} queries, {sum(len(r) for r in results)} results")
+        return results
 
-        logger.debug(f"Search operation completed successfully with {len(results)} results")
+    # ------------------------------------------------------------------ async search
+    # The async path talks to the OpenSearch REST API over httpx, which the services
+    # already use for model endpoints, so no aiohttp-based client is needed.
+
+    _async_http = None
+
+    def _async_client(self):
+        """Return this store's async HTTP client for the OpenSearch REST API, created on first use."""
+        if self._async_http is None:
+            max_connections = settings.vector_store.opensearch_async_max_connections
+            self._async_http = httpx.AsyncClient(
+                base_url=f"https://{self.host}:{self.port}",
+                auth=(settings.vector_store.opensearch_username, settings.vector_store.opensearch_password),
+                verify=False,
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+            )
+        return self._async_http
+
+    async def aclose(self):
+        """Close the async HTTP client, releasing its pooled connections."""
+        if self._async_http is not None:
+            await self._async_http.aclose()
+            self._async_http = None
+
+    async def _index_exists_async(self):
+        """Async counterpart of _index_exists."""
+        if self._index_state() is not None:
+            return True
+        response = await self._async_client().head(f"/{self.index_name}")
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        self._remember_index()
+        return True
+
+    async def _generation_async(self):
+        """Async counterpart of _generation."""
+        now = time.monotonic()
+        if not self._generation_poll_due(now):
+            return self._current_generation()
+        try:
+            response = await self._async_client().get(f"/{self.index_name}/_mapping")
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to read generation of {self.index_name}: {e}")
+            return self._current_generation(None, now)
+        if response.status_code == 404:
+            self._forget_index()
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+        if response.is_error:
+            logger.warning(f"Failed to read generation of {self.index_name}: HTTP {response.status_code}")
+            return self._current_generation(None, now)
+        meta = next(iter(response.json().values()), {}).get("mappings", {}).get("_meta") or {}
+        return self._current_generation(meta.get("generation"), now)
+
+    async def generation_async(self):
+        """Async counterpart of generation."""
+        return await self._generation_async()
+
+    async def _post_async(self, path, content, content_type="application/json", params=None):
+        """POST to the REST API; a missing index raises OpensearchNotReadyError."""
+        response = await self._async_client().post(
+            path,
+            params=params,
+            content=content,
+            headers={"Content-Type": content_type},
+        )
+        if response.status_code == 404:
+            # Deleted since it was cached
+            self._forget_index()
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+        response.raise_for_status()
+        return response.json()
+
+    @async_retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
+    async def search_async(self, query_text, vector=None, embedding=None, top_k=5, mode=None, doc_id=None, language='en'):
+        """
+        Async counterpart of search: the query is embedded with the embedding's async client
+        and searched over the OpenSearch REST API without blocking the event loop.
+        Results and retrieval caching match search.
+        """
+        logger.debug(f"Starting async search operation: query='{query_text[:50]}...', top_k={top_k}, mode={mode}, language={language}")
+
+        if not await self._index_exists_async():
+            logger.error(f"Index {self.index_name} does not exist")
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+
+        reset_last_lookup()
+        cache = get_retrieval_cache() if embedding is not None else None
+        if cache is not None:
+            generation = await self._generation_async()
+            cache_key = cache.make_key(query_text, mode or "hybrid", top_k, language, doc_id, getattr(embedding, "emb_model", ""))
+            cached = cache.get(self.index_name, generation, cache_key)
+            if cached is not None:
+                logger.debug(f"Search served from retrieval cache with {len(cached)} results")
+                return cached
+
+        if vector is not None:
+            query_vector = vector
+        elif embedding is not None:
+            query_vector = await embedding.embed_query_async(query_text)
+        else:
+            logger.error("No vector or embedding provided for search")
+            raise ValueError("Provide 'vector' or 'embedding' to perform search.")
+
+        search_body = self._build_search_body(query_text, query_vector, top_k, mode, language)
+        response = await self._post_async(
+            f"/{self.index_name}/_search",
+            json.dumps(search_body, default=_json_default),
+            params={"search_pipeline": "hybrid_pipeline"},
+        )
+
+        results = self._format_hits(response["hits"]["hits"])
+        if cache is not None:
+            cache.put(self.index_name, generation, cache_key, results)
+        logger.debug(f"Async search completed with {len(results)} results")
+        return results
+
+    @async_retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
+    async def search_many_async(self, queries, vectors=None, embedding=None, top_k=5, mode=None, language='en'):
+        """Async counterpart of search_many: one async embedding call and one _msearch request."""
+        if not queries:
+            return []
+        top_ks = per_query(top_k, len(queries))
+        modes = per_query(mode, len(queries))
+
+        if not await self._index_exists_async():
+            logger.error(f"Index {self.index_name} does not exist")
+            raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+
+        if vectors is not None:
+            query_vectors = vectors
+        elif embedding is not None:
+            query_vectors = await embedding.embed_documents_async(list(queries))
+        else:
+            logger.error("No vectors or embedding provided for search")
+            raise ValueError("Provide 'vectors' or 'embedding' to perform search.")
+
+        # _msearch takes newline-delimited JSON: a header line followed by a search body for every query
+        lines = []
+        for query, query_vector, k, m in zip(queries, query_vectors, top_ks, modes):
+            lines.append(json.dumps({"index": self.index_name, "search_pipeline": "hybrid_pipeline"}))
+            lines.append(json.dumps(self._build_search_body(query, query_vector, k, m, language), default=_json_default))
+        response = await self._post_async("/_msearch", "\n".join(lines) + "\n", "application/x-ndjson")
+
+        results = []
+        for idx, item in enumerate(response["responses"]):
+            if item.get("status") == 404:
+                self._forget_index()
+                raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+            if "error" in item:
+                logger.error(f"Search query {idx + 1} of {len(queries)} failed: {item['error']}")
+                raise RuntimeError(f"Search query {idx + 1} failed: {item['error']}")
+            results.append(self._format_hits(item["hits"]["hits"]))
         return results
 
     @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
@@ -431,65 +1254,146 @@ class OpensearchVectorStore(VectorStore):
         """
         logger.debug(f"Checking if database is populated for index {self.index_name}")
 
+        # Readiness checks always ask OpenSearch, and refresh the cached state
         exists = self.client.indices.exists(index=self.index_name)
+        if exists:
+            self._remember_index()
+        else:
+            self._forget_index()
         logger.info(f"Database populated check: {exists}")
         return exists
 
 
     @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
-    def remove_docs_from_index(self, doc_ids: list[str]):
+    def schedule_document_deletion(self, doc_ids: list[str]):
         """
-        Delete all chunks associated with the specified document IDs from the index.
+        Start deleting all chunks of the given documents and return without waiting.
 
-        This performs a targeted deletion of documents rather than wiping the entire index.
-        Uses batch deletion for efficiency. Includes retry logic for transient failures.
+        The documents are coalesced into one terms query run by an asynchronous, sliced
+        delete_by_query (wait_for_completion=false). OpenSearch records the task, so the
+        deletion completes even if this process exits. Includes retry logic for
+        transient failures.
 
         Args:
             doc_ids: List of document IDs whose chunks should be deleted from the index
 
         Returns:
-            Number of chunks deleted
+            Task ids to pass to wait_for_deletion (empty if there is nothing to delete)
         """
+        doc_ids = list(dict.fromkeys(str(doc_id).strip() for doc_id in doc_ids))
         if not doc_ids:
             logger.warning(f"No document ids provided to remove from index {self.index_name}. Skipping.")
-            return 0
+            return []
+
+        if not self._index_exists():
+            logger.info(f"Index {self.index_name} does not exist, nothing to delete")
+            return []
+
+        # Chunks indexed while refreshes are deferred (bulk ingestion mode) are not
+        # visible to delete_by_query yet. Otherwise insert_chunks has already refreshed.
+        if self._in_bulk_ingestion_mode():
+            self.client.indices.refresh(index=self.index_name)
+
+        task_ids = []
+        with self._tracked_write(doc_ids, "deleted"):
+            for start in range(0, len(doc_ids), _MAX_DELETE_TERMS):
+                # 'metadata.doc_id' is the nested keyword field in the mapping
+                delete_query = {"query": {"terms": {"metadata.doc_id": doc_ids[start:start + _MAX_DELETE_TERMS]}}}
+                try:
+                    response = self.client.delete_by_query(
+                        index=self.index_name,
+                        body=delete_query,
+                        params={
+                            "conflicts": "proceed",           # Ignore locks from concurrent indexing
+                            "slices": settings.vector_store.delete_slices,
+                            "refresh": "true",                # One refresh when the task finishes
+                            "wait_for_completion": "false",   # Runs as a task; poll with wait_for_deletion
+                        },
+                    )
+                except NotFoundError:
+                    self._forget_index()
+                    logger.info(f"Index {self.index_name} does not exist, nothing to delete")
+                    return task_ids
+                task_ids.append(response["task"])
+
+        # Cached results may contain the deleted chunks; bumped again once the tasks finish
+        self._bump_generation()
+        logger.info(f"Scheduled deletion of {len(doc_ids)} documents from {self.index_name}: tasks {task_ids}")
+        return task_ids
 
-        logger.debug(f"Starting targeted cleanup of {len(doc_ids)} documents in {self.index_name}")
-
-        if not self.client.indices.exists(index=self.index_name):
-            logger.info(f"Index {self.index_name} does not exist.")
-            return 0
+    @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
+    def deletion_progress(self, task_id: str):
+        """
+        Return the progress of a deletion task started by schedule_document_deletion.
 
-        # Construct terms query for batch deletion
-        # 'metadata.doc_id' is the nested keyword field in the mapping
-        delete_query = {
-            "query": {
-                "terms": {
-                    "metadata.doc_id": doc_ids
-                }
-            }
+        Returns:
+            Dict with 'completed', 'total', 'deleted' and 'failures'
+        """
+        task = self.client.tasks.get(task_id=task_id)
+        status = task.get("task", {}).get("status", {})
+        response = task.get("response") or status
+        failures = list(response.get("failures", []))
+        if task.get("error"):
+            failures.append(task["error"])
+        return {
+            "completed": bool(task.get("completed")),
+            "total": response.get("total", 0),
+            "deleted": response.get("deleted", 0),
+            "failures": failures,
         }
 
-        response = self.client.delete_by_query(
-            index=self.index_name,
-            body=delete_query,
-            params={
-                "refresh": "true",
-                "conflicts": "proceed"
-            }
-        )
+    def wait_for_deletion(self, task_ids: list[str]):
+        """
+        Wait for deletion tasks to finish, logging their progress.
 
-        deleted_count = response.get("deleted", 0)
-        logger.info(f"Successfully deleted {deleted_count} chunks for {len(doc_ids)} documents from {self.index_name}")
+        Returns:
+            Number of chunks deleted
+        """
+        deleted_count = 0
+        for task_id in task_ids:
+            while True:
+                progress = self.deletion_progress(task_id)
+                if progress["completed"]:
+                    break
+                logger.info(
+                    f"Deleting chunks from {self.index_name}: {progress['deleted']}/{progress['total']} (task {task_id})"
+                )
+                time.sleep(settings.vector_store.delete_poll_interval)
+
+            if progress["failures"]:
+                logger.error(f"Deletion task {task_id} on {self.index_name} finished with failures: {progress['failures']}")
+            elif progress["deleted"] < progress["total"]:
+                logger.error(
+                    f"Deletion task {task_id} matched {progress['total']} chunks but deleted {progress['deleted']} "
+                    "(possible version conflicts)"
+                )
+            deleted_count += progress["deleted"]
 
+        if deleted_count:
+            self._bump_generation()
         return deleted_count
 
+    def remove_docs_from_index(self, doc_ids: list[str]):
+        """
+        Delete all chunks associated with the specified document IDs from the index.
+
+        This performs a targeted deletion of documents rather than wiping the entire index.
+        The deletion runs as an asynchronous, sliced task that is polled to completion.
+
+        Args:
+            doc_ids: List of document IDs whose chunks should be deleted from the index
+
+        Returns:
+            Number of chunks deleted
+        """
+        logger.debug(f"Starting targeted cleanup of {len(doc_ids)} documents in {self.index_name}")
+        deleted_count = self.wait_for_deletion(self.schedule_document_deletion(doc_ids))
+        logger.info(f"Successfully deleted {deleted_count} chunks for {len(doc_ids)} documents from {self.index_name}")
+        return deleted_count
 
-    @retry_on_transient_error(max_retries=3, initial_delay=5.0, backoff_multiplier=2.0)
     def delete_document_by_id(self, doc_id: str):
         """
         Delete all chunks associated with a specific document from the index.
-        Includes retry logic for transient failures.
 
         Args:
             doc_id: The unique identifier of the document to delete
@@ -498,49 +1402,206 @@ class OpensearchVectorStore(VectorStore):
             Number of chunks deleted
         """
         logger.debug(f"Starting delete operation for document {doc_id}")
+        deleted_count = self.wait_for_deletion(self.schedule_document_deletion([doc_id]))
+        logger.info(f"Deleted {deleted_count} chunks for document {doc_id} from index {self.index_name}")
+        return deleted_count
 
-        if not self.client.indices.exists(index=self.index_name):
-            logger.error(f"Index {self.index_name} does not exist, nothing to delete")
-            return 0
+    def _resolve_index(self):
+        """Return the concrete index behind index_name and whether index_name is an alias."""
+        if self.client.indices.exists_alias(name=self.index_name):
+            return next(iter(self.client.indices.get_alias(name=self.index_name))), True
+        return self.index_name, False
 
-        # 1. Immediate Refresh (Safety Check)
-        # If a user ingests and then deletes immediately, OpenSearch might not have 'seen' the documents yet
-        self.client.indices.refresh(index=self.index_name)
+    def _copy_chunks(self, source, target, embedding, query=None, on_progress=None):
+        """
+        Re-embed the chunks of source matching query and index them into target.
 
-        # STEP 2: Perform the actual deletion
-        delete_query = {
-            "query": {
-                "term": {
-                    "metadata.doc_id": str(doc_id).strip()
-                }
-            }
-        }
+        Batches of reindex_batch_size chunks are embedded and indexed by up to
+        reindex_parallelism workers; new batches are started no faster than
+        reindex_max_chunks_per_second allows. Returns the number of chunks copied.
+        """
+        cfg = settings.vector_store
+        hits = helpers.scan(
+            self.client,
+            index=source,
+            query={"query": query or {"match_all": {}}, "_source": ["chunk_id", "text", "metadata"]},
+            size=cfg.reindex_batch_size,
+            scroll="10m",
+        )
 
-        response = self.client.delete_by_query(
-            index=self.index_name,
-            body=delete_query,
-            params={
-                        "refresh": "true",             # Update index stats immediately
-                        "conflicts": "proceed",        # Ignore locks from concurrent indexing
-                        "wait_for_completion": "true"  # Synchronous for the API response
+        def copy_batch(batch, batch_num):
+            vectors = embedding.embed_documents([hit["_source"].get("text") or "" for hit in batch])
+            actions = [
+                {
+                    "_index": target,
+                    "_id": hit["_id"],
+                    "_source": {
+                        **hit["_source"],
+                        "embedding": vector.tolist() if isinstance(vector, np.ndarray) else vector,
                     },
-        )
+                }
+                for hit, vector in zip(batch, vectors)
+            ]
+            if not self._bulk_index_batch(actions, batch_num, refresh=False):
+                raise RuntimeError(f"Failed to index reindex batch {batch_num} into {target}")
+            return len(batch)
+
+        def batches():
+            batch = []
+            for hit in hits:
+                batch.append(hit)
+                if len(batch) == cfg.reindex_batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        copied = submitted = 0
+        started = time.monotonic()
+        in_flight = set()
+
+        def collect(return_when):
+            nonlocal copied, in_flight
+            done, in_flight = wait(in_flight, return_when=return_when)
+            for future in done:
+                copied += future.result()
+                if on_progress:
+                    on_progress(copied)
+
+        with ContextAwareThreadPoolExecutor(max_workers=cfg.reindex_parallelism) as executor:
+            for batch_num, batch in enumerate(batches(), start=1):
+                if cfg.reindex_max_chunks_per_second > 0:
+                    # Throttle: start no more chunks than the rate allows since the copy began
+                    delay = started + submitted / cfg.reindex_max_chunks_per_second - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                in_flight.add(executor.submit(copy_batch, batch, batch_num))
+                submitted += len(batch)
+                if len(in_flight) >= cfg.reindex_parallelism:
+                    collect(FIRST_COMPLETED)
+            collect(ALL_COMPLETED)
+        return copied
+
+    def _replay_writes(self, source, target, embedding):
+        """Apply documents written or deleted through the alias since the copy began to target."""
+        with _reindex_lock:
+            state = _reindexes[self.index_name]
+            dirty, state["dirty"] = state["dirty"], {}
+        if not dirty:
+            return 0
+
+        # Chunks indexed in bulk ingestion mode may not be refreshed yet
+        self.client.indices.refresh(index=source)
+        doc_ids = list(dirty)
+        for start in range(0, len(doc_ids), _MAX_DELETE_TERMS):
+            self.client.delete_by_query(
+                index=target,
+                body={"query": {"terms": {"metadata.doc_id": doc_ids[start:start + _MAX_DELETE_TERMS]}}},
+                params={"conflicts": "proceed", "refresh": "true"},
+            )
+        written = [doc_id for doc_id, operation in dirty.items() if operation == "written"]
+        for start in range(0, len(written), _MAX_DELETE_TERMS):
+            self._copy_chunks(source, target, embedding, {"terms": {"metadata.doc_id": written[start:start + _MAX_DELETE_TERMS]}})
+        logger.info(f"Replayed changes to {len(dirty)} documents on {target}")
+        return len(dirty)
+
+    def reindex(self, embedding, progress=None):
+        """
+        Rebuild the index into a new versioned index, then atomically point the index name at it.
 
-        deleted_count = response.get("deleted", 0)
-        total_matched = response.get("total", 0)
-        failures = response.get("failures", [])
+        Searches keep being served by the current index until the swap. Chunk text and
+        metadata are read back from it and re-embedded with 'embedding', which may use
+        another model, into an index created with the current index profile. Documents
+        written or deleted through this store during the copy are replayed on the new
+        index; new writes wait only while the last changes are replayed and the alias is
+        swapped.
 
-        # Log detailed response for debugging
-        logger.debug(f"delete_by_query response: took={response.get('took')}ms, total={total_matched}, deleted={deleted_count}, failures={len(failures)}")
+        The first reindex turns the index name from a concrete index into an alias. An
+        alias cannot share the name of an index, so the concrete index is deleted in the
+        same atomic request that adds the alias and cannot be rolled back to. This is only
+        done with reindex_delete_old_index set; otherwise such a reindex fails before
+        copying anything.
 
-        if failures:
-            logger.error(f"Deletion failures for document {doc_id}: {failures}")
+        Args:
+            embedding: Embedding instance for the new index
+            progress: Optional callable receiving {"phase", "total", "copied"} updates
 
-        if deleted_count > 0:
-            logger.info(f"✓ Deleted {deleted_count} chunks for document {doc_id} from index {self.index_name}")
-        else:
-            if total_matched == 0:
-                logger.info(f"Deleted {deleted_count} chunks for document {doc_id} from index {self.index_name} (no matching documents found)")
-            else:
-                logger.error(f"Matched {total_matched} documents but deleted {deleted_count} for document {doc_id} (possible version conflicts or failures)")
-        return deleted_count
+        Returns:
+            str: Name of the new index
+        """
+        cfg = settings.vector_store
+        report = progress or (lambda update: None)
+        with _reindex_lock:
+            if self.index_name in _reindexes:
+                raise RuntimeError(f"A reindex of {self.index_name} is already running")
+            _reindexes[self.index_name] = {"dirty": {}}
+
+        target = None
+        try:
+            if not self.client.indices.exists(index=self.index_name):
+                raise OpensearchNotReadyError("Index is empty. Ingest documents first.")
+            source, is_alias = self._resolve_index()
+            if not is_alias and not cfg.reindex_delete_old_index:
+                raise RuntimeError(
+                    f"{self.index_name} is a concrete index: replacing it with an alias of the same name "
+                    "deletes it, which reindex_delete_old_index=false does not allow"
+                )
+
+            dim = len(embedding.embed_query("dimension probe"))
+            self._validate_index_profile(dim)
+            target = f"{self.index_name}_{time.strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:6]}"
+            body = self._index_body(dim)
+            # Built without refreshes or replicas; both are restored before the swap
+            body["settings"]["index"].update({"refresh_interval": "-1", "auto_expand_replicas": "false", "number_of_replicas": 0})
+            body["mappings"]["_meta"] = {"generation": uuid.uuid4().hex}
+            self.client.indices.create(index=target, body=body)
+            logger.info(f"Reindexing {source} into {target} with {dim}-dimensional embeddings")
+
+            self.client.indices.refresh(index=source)
+            total = self.client.count(index=source)["count"]
+            report({"phase": "copying", "total": total, "copied": 0})
+            copied = self._copy_chunks(
+                source, target, embedding,
+                on_progress=lambda done: report({"phase": "copying", "total": total, "copied": done}),
+            )
+
+            report({"phase": "catching_up", "total": total, "copied": copied})
+            self._replay_writes(source, target, embedding)
+            self.client.indices.put_settings(
+                index=target, body={"index": {"refresh_interval": None, "auto_expand_replicas": "0-all"}}
+            )
+            self.client.indices.refresh(index=target)
+
+            report({"phase": "swapping", "total": total, "copied": copied})
+            with self._write_gate().exclusive():
+                self._replay_writes(source, target, embedding)
+                self.client.indices.refresh(index=target)
+                # A concrete index with the alias name is removed in the same atomic request;
+                # only reached with reindex_delete_old_index set
+                remove = {"remove": {"index": source, "alias": self.index_name}} if is_alias else {"remove_index": {"index": source}}
+                self.client.indices.update_aliases(
+                    body={"actions": [{"add": {"index": target, "alias": self.index_name}}, remove]}
+                )
+                self._forget_index()
+                self._remember_index(dim)
+            logger.info(f"Alias {self.index_name} now points to {target}")
+        except Exception:
+            if target is not None:
+                try:
+                    self.client.indices.delete(index=target, ignore_unavailable=True)
+                except Exception as e:
+                    logger.warning(f"Failed to delete partial index {target}: {e}")
+            raise
+        finally:
+            with _reindex_lock:
+                _reindexes.pop(self.index_name, None)
+
+        self._bump_generation()
+        if is_alias and cfg.reindex_delete_old_index:
+            try:
+                self.client.indices.delete(index=source)
+                logger.info(f"Deleted previous index {source}")
+            except Exception as e:
+                logger.warning(f"Failed to delete previous index {source}: {e}")
+        report({"phase": "done", "total": total, "copied": copied})
+        return target
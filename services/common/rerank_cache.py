@@ -0,0 +1,132 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from common.misc_utils import get_logger
+from common.settings import settings
+
+logger = get_logger("RerankCache")
+
+_rerank_cache = None
+_rerank_cache_lock = threading.Lock()
+
+# (hits, misses) of the last rerank in this context, or None if the cache was not consulted
+_last_rerank = ContextVar("rerank_cache_last_rerank", default=None)
+
+
+class RerankCache:
+    """
+    Bounded TTL/LRU cache of reranker scores keyed by (query hash, chunk_id, reranker model).
+
+    A chunk_id is derived from the chunk's document and text, so a cached score stays
+    valid for as long as the chunk exists. Documents are deleted by the digitize service,
+    not in this process, so entries are never invalidated: scores of deleted chunks are
+    not looked up again and only expire through the TTL and LRU bound.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached scores
+            ttl_seconds: Time after which a cached score is no longer served
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (score, expires_at)
+        self._entries: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def query_hash(query: str) -> str:
+        """Hash a query; queries differing only in case or spacing share a hash."""
+        normalized = " ".join(query.split()).casefold()
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def chunk_key(document: dict) -> str:
+        """Identify a chunk by its chunk_id, or by its text when it has none."""
+        chunk_id = document.get("chunk_id")
+        if chunk_id not in (None, ""):
+            return str(chunk_id)
+        text = document.get("page_content") or ""
+        return "text:" + hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get_many(self, model: str, query: str, documents: list) -> dict:
+        """Return {position: score} for the documents with a live cached score."""
+        qhash = self.query_hash(query)
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for pos, document in enumerate(documents):
+                key = (qhash, self.chunk_key(document), model)
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] <= now:
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    continue
+                self._entries.move_to_end(key)
+                found[pos] = entry[0]
+            self.hits += len(found)
+            self.misses += len(documents) - len(found)
+        return found
+
+    def put_many(self, model: str, query: str, documents: list, scores: list):
+        """Store the scores of the given documents."""
+        qhash = self.query_hash(query)
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for document, score in zip(documents, scores):
+                key = (qhash, self.chunk_key(document), model)
+                self._entries[key] = (float(score), expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the number of cached scores."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def get_rerank_cache() -> RerankCache | None:
+    """Return the process-wide rerank score cache, or None if disabled."""
+    global _rerank_cache
+    if not settings.reranker.cache_enabled:
+        return None
+    if _rerank_cache is None:
+        with _rerank_cache_lock:
+            if _rerank_cache is None:
+                _rerank_cache = RerankCache(settings.reranker.cache_max_entries, settings.reranker.cache_ttl_seconds)
+    return _rerank_cache
+
+
+def record_last_rerank(hits: int, misses: int):
+    """Remember the cache outcome of a rerank in this context."""
+    _last_rerank.set((hits, misses))
+
+
+def reset_last_rerank():
+    """Forget the cache outcome of the previous rerank in this context."""
+    _last_rerank.set(None)
+
+
+def last_rerank_lookup() -> tuple | None:
+    """Return (hits, misses) of the last rerank in this context, or None if the cache was not consulted."""
+    return _last_rerank.get()
@@ -1,13 +1,69 @@
+import asyncio
+import re
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
-from cohere import ClientV2
+import httpx
+from cohere import AsyncClientV2, ClientV2
 
 from common.misc_utils import get_logger
-from common.retry_utils import retry_on_transient_error
+from common.rerank_cache import get_rerank_cache, record_last_rerank, reset_last_rerank
+from common.retry_utils import async_retry_on_transient_error, retry_on_transient_error
+from common.settings import settings
 
 logger = get_logger("reranker")
 
+# Rough characters-per-token ratio used to size rerank batches without a tokenizer round-trip
+_CHARS_PER_TOKEN = 4
+
+_TERM_RE = re.compile(r"\w{2,}")
+
+_clients: Dict[str, ClientV2] = {}
+_clients_lock = threading.Lock()
+
+# Async clients are only created and used on the event loop thread: endpoint -> (client, httpx client)
+_async_clients: Dict[str, Tuple[AsyncClientV2, httpx.AsyncClient]] = {}
+
+
+def get_rerank_client(endpoint: str) -> ClientV2:
+    """Return the shared reranker client of an endpoint, creating it with a pooled HTTP client on first use."""
+    client = _clients.get(endpoint)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(endpoint)
+            if client is None:
+                max_connections = settings.reranker.max_connections
+                http_client = httpx.Client(
+                    limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                    timeout=httpx.Timeout(300.0, connect=10.0),
+                )
+                client = ClientV2(api_key="sk-fake-key", base_url=endpoint, httpx_client=http_client)
+                _clients[endpoint] = client
+    return client
+
+
+def get_async_rerank_client(endpoint: str) -> AsyncClientV2:
+    """Return the shared async reranker client of an endpoint, creating it on first use."""
+    entry = _async_clients.get(endpoint)
+    if entry is None:
+        max_connections = settings.reranker.max_connections
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(300.0, connect=10.0),
+        )
+        entry = (AsyncClientV2(api_key="sk-fake-key", base_url=endpoint, httpx_client=http_client), http_client)
+        _async_clients[endpoint] = entry
+    return entry[0]
+
+
+async def close_async_rerank_clients():
+    """Close the shared async reranker clients, releasing their pooled connections."""
+    clients = list(_async_clients.values())
+    _async_clients.clear()
+    for _, http_client in clients:
+        await http_client.aclose()
+
 
 @retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
 def rerank_helper(co2_client: ClientV2, query: str, document: dict, model: str) -> Tuple[dict, float]:
@@ -26,34 +82,274 @@ def rerank_helper(co2_client: ClientV2, query: str, document: dict, model: str)
         model=model,
         query=query,
         documents=[page_content],
-        max_tokens_per_doc=512,
+        max_tokens_per_doc=settings.reranker.max_tokens_per_doc,
     )
     score = result.results[0].relevance_score
     return document, score
 
 
+@async_retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+async def rerank_helper_async(co2_client: AsyncClientV2, query: str, document: dict, model: str) -> Tuple[dict, float]:
+    """Async counterpart of rerank_helper."""
+    page_content = document.get("page_content", "")
+    if not page_content:
+        return document, 0.0
+
+    result = await co2_client.rerank(
+        model=model,
+        query=query,
+        documents=[page_content],
+        max_tokens_per_doc=settings.reranker.max_tokens_per_doc,
+    )
+    return document, result.results[0].relevance_score
+
+
+@retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+def rerank_batch(co2_client: ClientV2, query: str, texts: List[str], model: str) -> Dict[int, float]:
+    """
+    Score several documents against the query in a single rerank request.
+
+    Returns:
+        Mapping of position in texts to relevance score; positions the server did
+        not return are missing.
+    """
+    result = co2_client.rerank(
+        model=model,
+        query=query,
+        documents=texts,
+        top_n=len(texts),
+        max_tokens_per_doc=settings.reranker.max_tokens_per_doc,
+    )
+    return {r.index: r.relevance_score for r in result.results if 0 <= r.index < len(texts)}
+
+
+@async_retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+async def rerank_batch_async(co2_client: AsyncClientV2, query: str, texts: List[str], model: str) -> Dict[int, float]:
+    """Async counterpart of rerank_batch."""
+    result = await co2_client.rerank(
+        model=model,
+        query=query,
+        documents=texts,
+        top_n=len(texts),
+        max_tokens_per_doc=settings.reranker.max_tokens_per_doc,
+    )
+    return {r.index: r.relevance_score for r in result.results if 0 <= r.index < len(texts)}
+
+
+def _estimate_tokens(text: str) -> int:
+    return min(len(text) // _CHARS_PER_TOKEN + 1, settings.reranker.max_tokens_per_doc)
+
+
+def _plan_batches(query: str, positions: List[int], texts: List[str]) -> List[List[int]]:
+    """Split document positions into batches bounded by document count and token budget."""
+    max_docs = settings.reranker.batch_max_documents
+    budget = settings.reranker.batch_max_tokens
+    # Every document is scored together with the query, so the query counts once per document
+    query_tokens = len(query) // _CHARS_PER_TOKEN + 1
+
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for pos in positions:
+        cost = query_tokens + _estimate_tokens(texts[pos])
+        if current and (len(current) >= max_docs or used + cost > budget):
+            batches.append(current)
+            current, used = [], 0
+        current.append(pos)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _start_rerank(query: str, documents: List[dict], model: str):
+    """
+    Serve what the score cache holds for a rerank.
+
+    Returns:
+        (texts, scores, positions still to score, cache or None)
+    """
+    reset_last_rerank()
+    texts = [doc.get("page_content", "") for doc in documents]
+    scores: List[float] = [0.0] * len(documents)
+    positions = [i for i, text in enumerate(texts) if text]
+    if len(positions) < len(documents):
+        logger.warning(f"{len(documents) - len(positions)} document(s) have no page_content, assigning score 0.0")
+
+    cache = get_rerank_cache()
+    if cache is not None:
+        cached = cache.get_many(model, query, [documents[pos] for pos in positions])
+        for i, score in cached.items():
+            scores[positions[i]] = score
+        positions = [pos for i, pos in enumerate(positions) if i not in cached]
+        record_last_rerank(len(cached), len(positions))
+    return texts, scores, positions, cache
+
+
+def _finish_rerank(query, documents, model, scores, positions, failed, cache) -> List[Tuple[dict, float]]:
+    """Cache the newly computed scores and rank the documents by descending score."""
+    if cache is not None and positions:
+        # Fallback scores of failed requests are not cached
+        scored = [pos for pos in positions if pos not in failed]
+        cache.put_many(model, query, [documents[pos] for pos in scored], [scores[pos] for pos in scored])
+    reranked = list(zip(documents, scores))
+    return sorted(reranked, key=lambda x: x[1], reverse=True)
+
+
+def _apply_batch_scores(batch: List[int], batch_scores: Dict[int, float], scores: List[float]) -> List[int]:
+    """Record the scores of a batch; return the positions the response did not score."""
+    for i, pos in enumerate(batch):
+        if i in batch_scores:
+            scores[pos] = batch_scores[i]
+    return [pos for i, pos in enumerate(batch) if i not in batch_scores]
+
+
 def rerank_documents(query: str, documents: List[dict], model: str, endpoint: str, max_workers: int = 8) -> List[Tuple[dict, float]]:
     """
     Rerank documents for a given query using vLLM-compatible Cohere API.
 
+    Scores cached for the same query, chunk and model are reused. The remaining
+    documents are scored in as few rerank requests as the batch limits allow, on a
+    client shared per endpoint. Documents of a failed request, or missing from its
+    response, are scored one by one instead.
+
     Returns:
         List of (document, score) sorted by descending score.
     """
-    co2 = ClientV2(api_key="sk-fake-key", base_url=endpoint)
-    reranked: List[Tuple[dict, float]] = []
+    if not documents:
+        reset_last_rerank()
+        return []
 
-    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(documents)))) as executor:
-        futures = {
-            executor.submit(rerank_helper, co2, query, doc, model): doc
-            for doc in documents
-        }
+    texts, scores, positions, cache = _start_rerank(query, documents, model)
+    failed = set()
+    if not positions:
+        return _finish_rerank(query, documents, model, scores, positions, failed, cache)
 
-        for future in as_completed(futures):
-            doc = futures[future]
-            try:
-                reranked.append(future.result())
-            except Exception as e:
-                logger.error(f"Thread error: {e}")
-                reranked.append((doc, 0.0))
+    co2 = get_rerank_client(endpoint)
+    batches = _plan_batches(query, positions, texts)
+    missing: List[int] = []
 
-    return sorted(reranked, key=lambda x: x[1], reverse=True)
+    def score_batch(batch: List[int]) -> List[int]:
+        try:
+            batch_scores = rerank_batch(co2, query, [texts[pos] for pos in batch], model)
+        except Exception as e:
+            logger.error(f"Batched rerank of {len(batch)} documents failed, scoring them individually: {e}")
+            return batch
+        return _apply_batch_scores(batch, batch_scores, scores)
+
+    if len(batches) == 1:
+        missing.extend(score_batch(batches[0]))
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+            for unscored in executor.map(score_batch, batches):
+                missing.extend(unscored)
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as executor:
+            futures = {
+                executor.submit(rerank_helper, co2, query, documents[pos], model): pos
+                for pos in missing
+            }
+
+            for future in as_completed(futures):
+                pos = futures[future]
+                try:
+                    scores[pos] = future.result()[1]
+                except Exception as e:
+                    logger.error(f"Thread error: {e}")
+                    failed.add(pos)
+
+    return _finish_rerank(query, documents, model, scores, positions, failed, cache)
+
+
+async def rerank_documents_async(query: str, documents: List[dict], model: str, endpoint: str) -> List[Tuple[dict, float]]:
+    """
+    Async counterpart of rerank_documents.
+
+    Batches and per-document fallbacks are sent concurrently on the event loop over a
+    shared AsyncClientV2, so waiting for the reranker does not occupy a thread.
+
+    Returns:
+        List of (document, score) sorted by descending score.
+    """
+    if not documents:
+        reset_last_rerank()
+        return []
+
+    texts, scores, positions, cache = _start_rerank(query, documents, model)
+    failed = set()
+    if not positions:
+        return _finish_rerank(query, documents, model, scores, positions, failed, cache)
+
+    co2 = get_async_rerank_client(endpoint)
+
+    async def score_batch(batch: List[int]) -> List[int]:
+        try:
+            batch_scores = await rerank_batch_async(co2, query, [texts[pos] for pos in batch], model)
+        except Exception as e:
+            logger.error(f"Batched rerank of {len(batch)} documents failed, scoring them individually: {e}")
+            return batch
+        return _apply_batch_scores(batch, batch_scores, scores)
+
+    missing = [
+        pos
+        for unscored in await asyncio.gather(*(score_batch(batch) for batch in _plan_batches(query, positions, texts)))
+        for pos in unscored
+    ]
+
+    if missing:
+        outcomes = await asyncio.gather(
+            *(rerank_helper_async(co2, query, documents[pos], model) for pos in missing),
+            return_exceptions=True,
+        )
+        for pos, outcome in zip(missing, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Rerank error: {outcome}")
+                failed.add(pos)
+            else:
+                scores[pos] = outcome[1]
+
+    return _finish_rerank(query, documents, model, scores, positions, failed, cache)
+
+
+def _terms(text: str) -> set:
+    return {term.casefold() for term in _TERM_RE.findall(text or "")}
+
+
+def cascade_prune(
+    query: str,
+    documents: List[dict],
+    scores: List[float],
+    keep: int,
+    min_keep: int = 1,
+    min_relative_score: float = 0.0,
+    lexical_weight: float = 0.5,
+) -> Tuple[List[dict], List[float]]:
+    """
+    Prune retrieval candidates with a cheap local score before cross-encoder reranking.
+
+    The cheap score blends the min-max normalized retrieval score with the fraction
+    of query terms found in the chunk. The best 'keep' candidates are returned, minus
+    those scoring below min_relative_score times the best cheap score, but never
+    fewer than min_keep.
+
+    Returns:
+        (documents, retrieval scores) of the kept candidates, best cheap score first.
+    """
+    if not documents:
+        return documents, scores
+
+    low, high = min(scores), max(scores)
+    spread = high - low
+    query_terms = _terms(query)
+
+    cheap = []
+    for doc, score in zip(documents, scores):
+        retrieval = (score - low) / spread if spread > 0 else 1.0
+        overlap = len(query_terms & _terms(doc.get("page_content", ""))) / len(query_terms) if query_terms else 0.0
+        cheap.append((1 - lexical_weight) * retrieval + lexical_weight * overlap)
+
+    order = sorted(range(len(documents)), key=lambda i: cheap[i], reverse=True)
+    floor = min_relative_score * cheap[order[0]]
+    kept = [i for n, i in enumerate(order[:max(keep, min_keep)]) if n < min_keep or cheap[i] >= floor]
+    return [documents[i] for i in kept], [scores[i] for i in kept]
@@ -0,0 +1,141 @@
+import copy
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+
+from common.misc_utils import get_logger
+from common.settings import settings
+
+logger = get_logger("RetrievalCache")
+
+_retrieval_cache = None
+_retrieval_cache_lock = threading.Lock()
+
+# Outcome of the last cache lookup in this context: True (hit), False (miss) or None (not cached)
+_last_lookup = ContextVar("retrieval_cache_last_lookup", default=None)
+
+
+class RetrievalCache:
+    """
+    Bounded LRU cache of search results keyed by query parameters and index generation.
+
+    Keys are (normalized query, mode, top_k, language, doc filter, embedding model)
+    within an index. Every lookup carries the index's current generation; when it
+    differs from the generation the cached entries were stored under, all entries
+    of that index are dropped, so results are never served across corpus changes.
+    """
+
+    # Approximate per-entry overhead (key tuple, result dicts, OrderedDict node)
+    _ENTRY_OVERHEAD_BYTES = 300
+    _RESULT_OVERHEAD_BYTES = 400
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory cap for cached results
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[tuple, tuple[list, int]] = OrderedDict()
+        self._generations: dict[str, tuple] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: str, mode: str, top_k: int, language: str, doc_id: str | None, model: str = "") -> tuple:
+        """Build the cache key for a search; queries differing only in case or spacing share a key."""
+        normalized = " ".join(query.split()).casefold()
+        return normalized, mode, top_k, language or "", doc_id or "", model
+
+    def _entry_size(self, results: list) -> int:
+        size = self._ENTRY_OVERHEAD_BYTES
+        for result in results:
+            size += self._RESULT_OVERHEAD_BYTES + len(result.get("page_content") or "") * 2
+        return size
+
+    def _check_generation_locked(self, index_name: str, generation: tuple):
+        """Drop the entries of index_name if its generation changed since they were stored."""
+        if self._generations.get(index_name) == generation:
+            return
+        if index_name in self._generations:
+            stale = [key for key in self._entries if key[0] == index_name]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+            self.invalidations += 1
+            logger.debug(f"Index {index_name} changed, dropped {len(stale)} cached results")
+        self._generations[index_name] = generation
+
+    def get(self, index_name: str, generation: tuple, key: tuple) -> list | None:
+        """Return a copy of the cached results for key, or None on a miss."""
+        with self._lock:
+            self._check_generation_locked(index_name, generation)
+            entry = self._entries.get((index_name, *key))
+            if entry is None:
+                self.misses += 1
+                _last_lookup.set(False)
+                return None
+            self._entries.move_to_end((index_name, *key))
+            self.hits += 1
+            _last_lookup.set(True)
+            # Callers may modify the result dicts
+            return copy.deepcopy(entry[0])
+
+    def put(self, index_name: str, generation: tuple, key: tuple, results: list):
+        """Store results for key if the index is still at generation."""
+        size = self._entry_size(results)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._check_generation_locked(index_name, generation)
+            full_key = (index_name, *key)
+            previous = self._entries.pop(full_key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[full_key] = (copy.deepcopy(results), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the approximate memory footprint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def get_retrieval_cache() -> RetrievalCache | None:
+    """Return the process-wide retrieval cache, or None if disabled."""
+    global _retrieval_cache
+    if not settings.vector_store.retrieval_cache_enabled:
+        return None
+    if _retrieval_cache is None:
+        with _retrieval_cache_lock:
+            if _retrieval_cache is None:
+                _retrieval_cache = RetrievalCache(settings.vector_store.retrieval_cache_max_bytes)
+    return _retrieval_cache
+
+
+def last_lookup_hit() -> bool | None:
+    """Return whether the last search in this context was served from the cache (None if not cached)."""
+    return _last_lookup.get()
+
+
+def reset_last_lookup():
+    """Forget the outcome of the previous lookup in this context."""
+    _last_lookup.set(None)
@@ -1,11 +1,8 @@
 from common.emb_utils import get_embedder
 
 
-def retrieve_documents(query, emb_model, emb_endpoint, max_tokens, vectorstore, top_k, mode="hybrid", language='en'):
-    """Retrieve documents from the vector store using embedding-based search."""
-    embedding = get_embedder(emb_model, emb_endpoint, max_tokens)
-    results = vectorstore.search(query, embedding=embedding, top_k=top_k, mode=mode, language=language)
-
+def _to_documents(results):
+    """Convert vector store hits into retrieved documents and their scores."""
     retrieved_documents = []
     scores = []
 
@@ -23,3 +20,31 @@ def retrieve_documents(query, emb_model, emb_endpoint, max_tokens, vectorstore,
         scores.append(score)
 
     return retrieved_documents, scores
+
+
+def retrieve_documents(query, emb_model, emb_endpoint, max_tokens, vectorstore, top_k, mode="hybrid", language='en', vector=None):
+    """Retrieve documents from the vector store using embedding-based search, or a pre-computed query vector."""
+    embedding = get_embedder(emb_model, emb_endpoint, max_tokens)
+    results = vectorstore.search(query, vector=vector, embedding=embedding, top_k=top_k, mode=mode, language=language)
+    return _to_documents(results)
+
+
+def retrieve_documents_many(queries, emb_model, emb_endpoint, max_tokens, vectorstore, top_k, mode="hybrid", language='en'):
+    """Retrieve documents for several queries with one embedding request and one search request."""
+    embedding = get_embedder(emb_model, emb_endpoint, max_tokens)
+    results = vectorstore.search_many(queries, embedding=embedding, top_k=top_k, mode=mode, language=language)
+    return [_to_documents(hits) for hits in results]
+
+
+async def retrieve_documents_async(query, emb_model, emb_endpoint, max_tokens, vectorstore, top_k, mode="hybrid", language='en', vector=None):
+    """Async counterpart of retrieve_documents, embedding and searching without blocking the event loop."""
+    embedding = get_embedder(emb_model, emb_endpoint, max_tokens)
+    results = await vectorstore.search_async(query, vector=vector, embedding=embedding, top_k=top_k, mode=mode, language=language)
+    return _to_documents(results)
+
+
+async def retrieve_documents_many_async(queries, emb_model, emb_endpoint, max_tokens, vectorstore, top_k, mode="hybrid", language='en'):
+    """Async counterpart of retrieve_documents_many."""
+    embedding = get_embedder(emb_model, emb_endpoint, max_tokens)
+    results = await vectorstore.search_many_async(queries, embedding=embedding, top_k=top_k, mode=mode, language=language)
+    return [_to_documents(hits) for hits in results]
@@ -13,8 +13,10 @@ due to temporary issues like:
 The retry logic uses exponential backoff to avoid overwhelming the server.
 """
 
+import asyncio
 import time
 import functools
+import httpx
 import requests
 from typing import Callable, TypeVar, Any, Optional, Tuple, Type
 from opensearchpy import OpenSearchException, ConnectionError as OSConnectionError, TransportError
@@ -65,6 +67,13 @@ def is_retryable_error(exception: Exception, allow_local_retries: bool = False)
         ]):
             return True
     
+    # Async HTTP client (httpx) errors
+    if isinstance(exception, httpx.HTTPStatusError):
+        return 500 <= exception.response.status_code < 600
+    if isinstance(exception, httpx.TransportError):
+        # Timeouts, connection failures, pool exhaustion and dropped connections
+        return True
+
     # OpenSearch-related errors
     if isinstance(exception, (OpenSearchException, OSConnectionError, TransportError)):
         # Connection and transport errors are always retryable
@@ -164,6 +173,7 @@ def retry_on_transient_error(
     if retryable_exceptions is None:
         retryable_exceptions = (
             requests.exceptions.RequestException,
+            httpx.HTTPError,
             OpenSearchException,
             OSConnectionError,
             TransportError
@@ -239,3 +249,80 @@ def retry_on_transient_error(
     return decorator
 
 
+def async_retry_on_transient_error(
+    max_retries: int = 3,
+    initial_delay: float = 1.0,
+    backoff_multiplier: float = 2.0,
+    max_delay: float = 10.0,
+    retryable_exceptions: Optional[Tuple[Type[Exception], ...]] = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorator to retry a coroutine function on transient errors with exponential backoff.
+
+    Same retry policy as retry_on_transient_error, but the backoff is awaited with
+    asyncio.sleep so the event loop keeps serving other requests while waiting.
+
+    Args:
+        max_retries: Maximum number of retry attempts (default: 3)
+        initial_delay: Initial delay between retries in seconds (default: 1.0)
+        backoff_multiplier: Multiplier for delay after each retry (default: 2.0)
+        max_delay: Maximum delay between retries in seconds (default: 10.0)
+        retryable_exceptions: Tuple of exception types to retry on. If None, uses
+                            httpx.HTTPError and requests.exceptions.RequestException
+
+    Returns:
+        Decorated coroutine function with retry logic
+    """
+    if retryable_exceptions is None:
+        retryable_exceptions = (
+            httpx.HTTPError,
+            requests.exceptions.RequestException,
+        )
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            for attempt in range(max_retries):
+                try:
+                    result = await func(*args, **kwargs)
+
+                    if attempt > 0:
+                        logger.debug(
+                            f"{func.__name__} succeeded on attempt {attempt + 1}/{max_retries}"
+                        )
+
+                    return result
+
+                except retryable_exceptions as e:
+                    if not is_retryable_error(e):
+                        logger.debug(
+                            f"{func.__name__} failed with non-retryable error: {e}"
+                        )
+                        raise
+
+                    if attempt == max_retries - 1:
+                        logger.debug(
+                            f"{func.__name__} failed after {max_retries} attempts: {e}"
+                        )
+                        raise
+
+                    backoff_time = min(
+                        initial_delay * (backoff_multiplier ** attempt),
+                        max_delay
+                    )
+
+                    error_details = str(e)
+                    if isinstance(e, httpx.HTTPStatusError):
+                        error_details = f"HTTP {e.response.status_code}: {e.response.text[:100]}"
+
+                    logger.debug(
+                        f"{func.__name__} failed (attempt {attempt + 1}/{max_retries}). "
+                        f"Retrying in {backoff_time:.2f}s... Error: {error_details}"
+                    )
+
+                    await asyncio.sleep(backoff_time)
+
+            raise RuntimeError(f"{func.__name__} failed after all retries")
+
+        return wrapper
+    return decorator
@@ -84,6 +84,43 @@ class EmbeddingConfig(BaseSettings):
         description="Fallback maximum context length for the configured embedding model",
     )
 
+    micro_batch_enabled: bool = Field(
+        default=False,
+        description="Coalesce concurrent embed_query/embed_documents calls into batched /v1/embeddings requests",
+    )
+
+    micro_batch_max_wait_ms: float = Field(
+        default=5.0,
+        ge=0.0,
+        description="Maximum time in milliseconds a micro-batch waits for more requests before it is sent",
+    )
+
+    micro_batch_max_size: int = Field(
+        default=32,
+        ge=1,
+        description="Maximum number of texts sent in one micro-batched embedding request",
+    )
+
+    micro_batch_max_in_flight: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of micro-batched embedding requests in flight at once",
+    )
+
+    cache_enabled: bool = Field(
+        default=False,
+        description=(
+            "Cache document embeddings by content hash in embedding_cache.sqlite under the local cache "
+            "directory during ingestion and reindexing; the file grows up to cache_max_bytes"
+        ),
+    )
+
+    cache_max_bytes: int = Field(
+        default=256 * 1024 * 1024,
+        ge=0,
+        description="Size cap in bytes for the vectors in the persistent embedding cache (disk usage)",
+    )
+
 
 class RerankerConfig(BaseSettings):
     """Reranker model configuration."""
@@ -100,6 +137,118 @@ class RerankerConfig(BaseSettings):
         description="Reranker model name",
     )
 
+    batch_max_documents: int = Field(
+        default=64,
+        ge=1,
+        description="Maximum number of documents sent in one rerank request",
+    )
+
+    batch_max_tokens: int = Field(
+        default=16384,
+        ge=1,
+        description="Approximate token budget (query plus documents) of one rerank request",
+    )
+
+    max_tokens_per_doc: int = Field(
+        default=512,
+        ge=1,
+        description="Tokens of each document the reranker scores; longer documents are truncated by the server",
+    )
+
+    max_connections: int = Field(
+        default=16,
+        ge=1,
+        description="Connection pool size of the shared reranker client per endpoint",
+    )
+
+    cache_enabled: bool = Field(
+        default=True,
+        description="Cache reranker scores by (query, chunk, model) so only misses are sent to the reranker",
+    )
+
+    cache_max_entries: int = Field(
+        default=100_000,
+        ge=1,
+        description="Maximum number of cached reranker scores",
+    )
+
+    cache_ttl_seconds: float = Field(
+        default=3600.0,
+        gt=0,
+        description="Seconds a cached reranker score is served",
+    )
+
+
+class TokenizerConfig(BaseSettings):
+    """Tokenizer backend configuration."""
+
+    model_config = SettingsConfigDict(env_prefix='TOKENIZER_')
+
+    backend: str = Field(
+        default="auto",
+        description=(
+            "Tokenizer backend: 'http' (model server /tokenize endpoint), "
+            "'local' (in-process tokenizer files, fail if unavailable) or "
+            "'auto' (local when tokenizer files are configured, http otherwise)"
+        ),
+    )
+
+    llm_path: str = Field(
+        default="",
+        description="Path to the LLM model's tokenizer.json or the directory containing it",
+    )
+
+    emb_path: str = Field(
+        default="",
+        description="Path to the embedding model's tokenizer.json or the directory containing it",
+    )
+
+    parity_check: bool = Field(
+        default=True,
+        description="Compare local token counts with the /tokenize endpoint before using the local tokenizer",
+    )
+
+    parity_retry_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description=(
+            "Delay before re-running a parity check that could not reach the endpoint; "
+            "the HTTP tokenizer is used meanwhile"
+        ),
+    )
+
+    max_concurrency: int = Field(
+        default=8,
+        ge=1,
+        description="Maximum concurrent /tokenize requests issued by batched tokenization (tokenize_many)",
+    )
+
+    cache_enabled: bool = Field(
+        default=True,
+        description="Cache token ids per (tokenizer, text hash) in front of the tokenizer backend",
+    )
+
+    cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Memory cap in bytes for the token cache",
+    )
+
+    cache_persist: bool = Field(
+        default=False,
+        description="Persist the token cache to a SQLite file under the local cache directory",
+    )
+
+    @field_validator('backend')
+    @classmethod
+    def validate_backend(cls, v):
+        """Validate and normalize the tokenizer backend name."""
+        v = str(v).lower()
+        if v not in ("auto", "http", "local"):
+            logger.warning(f"Unknown tokenizer backend '{v}', falling back to 'auto'")
+            return "auto"
+        return v
+
 
 class LanguageConfig(BaseSettings):
     """Language detection settings."""
@@ -150,7 +299,7 @@ class VectorStoreConfig(BaseSettings):
 
     vector_store_type: str = Field(
         default="OPENSEARCH",
-        description="Type of vector store (OPENSEARCH, etc.)",
+        description="Type of vector store: OPENSEARCH, or LOCAL for the embedded single-node store",
     )
 
     # OpenSearch specific
@@ -189,11 +338,216 @@ class VectorStoreConfig(BaseSettings):
         description="OpenSearch number of shards",
     )
 
+    opensearch_async_max_connections: int = Field(
+        default=64,
+        ge=1,
+        description="Connection pool size of the async OpenSearch REST client used by async searches",
+    )
+
     local_cache_dir: str = Field(
         default="/var/cache",
         description="Local cache directory for vector store operations",
     )
 
+    # Local (embedded) store specific
+    local_store_dir: str = Field(
+        default="",
+        description="Directory of the LOCAL vector store (defaults to <local_cache_dir>/local_vector_store)",
+    )
+
+    local_store_hnsw: bool = Field(
+        default=False,
+        description="Serve LOCAL dense search from an in-memory HNSW index (needs hnswlib) instead of exact search",
+    )
+
+    insert_batch_max_tokens: int = Field(
+        default=8192,
+        ge=1,
+        description="Estimated embedding tokens per insert batch (one embedding request and one bulk request)",
+    )
+
+    insert_batch_max_bytes: int = Field(
+        default=5 * 1024 * 1024,
+        ge=1,
+        description="Estimated bulk request payload bytes per insert batch",
+    )
+
+    insert_batch_max_chunks: int = Field(
+        default=128,
+        ge=1,
+        description="Maximum number of chunks per insert batch",
+    )
+
+    insert_pipeline_depth: int = Field(
+        default=2,
+        ge=0,
+        description="Embedded batches buffered ahead of bulk indexing in insert_chunks (0 embeds and indexes in sequence)",
+    )
+
+    bulk_thread_count: int = Field(
+        default=4,
+        ge=1,
+        description="Concurrent bulk requests per insert batch (1 sends them one after another with streaming_bulk)",
+    )
+
+    bulk_chunk_size: int = Field(
+        default=32,
+        ge=1,
+        description="Maximum number of chunks per bulk request",
+    )
+
+    bulk_max_chunk_bytes: int = Field(
+        default=10 * 1024 * 1024,
+        ge=1,
+        description="Maximum payload bytes per bulk request",
+    )
+
+    bulk_max_retries: int = Field(
+        default=3,
+        ge=0,
+        description="Retries for chunks rejected with 429 (rejected execution) by OpenSearch",
+    )
+
+    bulk_initial_backoff: float = Field(
+        default=2.0,
+        ge=0,
+        description="Seconds to wait before the first 429 retry; doubled on every retry",
+    )
+
+    bulk_max_backoff: float = Field(
+        default=60.0,
+        ge=0,
+        description="Maximum seconds to wait between 429 retries",
+    )
+
+    delete_slices: str = Field(
+        default="auto",
+        description="Slices of asynchronous delete_by_query tasks: 'auto' (one per shard) or a number",
+    )
+
+    delete_poll_interval: float = Field(
+        default=2.0,
+        gt=0,
+        description="Seconds between progress checks while waiting for a delete task",
+    )
+
+    reindex_batch_size: int = Field(
+        default=128,
+        ge=1,
+        description="Chunks read, re-embedded and indexed per batch during a reindex",
+    )
+
+    reindex_parallelism: int = Field(
+        default=4,
+        ge=1,
+        description="Reindex batches embedded and indexed concurrently",
+    )
+
+    reindex_max_chunks_per_second: float = Field(
+        default=200.0,
+        ge=0,
+        description="Upper bound on reindex throughput, to spare the embedding server and cluster (0 = unthrottled)",
+    )
+
+    reindex_delete_old_index: bool = Field(
+        default=True,
+        description=(
+            "Delete the previous index once a reindex has swapped the alias to the new one. The first "
+            "reindex replaces a concrete index with an alias of the same name, which always deletes it, "
+            "so it is refused when this is false"
+        ),
+    )
+
+    bulk_ingestion_refresh: str = Field(
+        default="document",
+        description=(
+            "When documents become searchable during a bulk ingestion job: "
+            "'document' (one refresh after each document) or 'job' (one refresh when the job ends)"
+        ),
+    )
+
+    bulk_ingestion_disable_replicas: bool = Field(
+        default=False,
+        description="Drop replicas to 0 during bulk ingestion jobs and restore them afterwards",
+    )
+
+    index_profile: str = Field(
+        default="lucene_fp32",
+        description=(
+            "k-NN index profile used when creating the index: 'lucene_fp32' (float32 Lucene HNSW), "
+            "'lucene_byte' (Lucene HNSW with byte scalar quantization), 'faiss_fp16' (faiss HNSW with "
+            "fp16 scalar quantization) or 'on_disk' (faiss on-disk mode, 32x compressed with rescoring)"
+        ),
+    )
+
+    index_hnsw_m: int = Field(
+        default=24,
+        ge=2,
+        description="HNSW graph degree (m) of the k-NN index",
+    )
+
+    index_hnsw_ef_construction: int = Field(
+        default=128,
+        ge=2,
+        description="HNSW candidate list size while building the k-NN index",
+    )
+
+    index_ef_search: int = Field(
+        default=100,
+        ge=1,
+        description="HNSW candidates considered at search time (higher = more accurate but slower)",
+    )
+
+    retrieval_cache_enabled: bool = Field(
+        default=True,
+        description="Cache search results until the index changes",
+    )
+
+    retrieval_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        ge=0,
+        description="Approximate memory cap for cached search results",
+    )
+
+    retrieval_cache_generation_poll_seconds: float = Field(
+        default=5.0,
+        ge=0,
+        description=(
+            "How often a search re-reads the index generation written by other services; "
+            "bounds how long results can be served after another service changes the index"
+        ),
+    )
+
+    @field_validator('delete_slices')
+    @classmethod
+    def validate_delete_slices(cls, v):
+        """Validate delete_by_query slices: 'auto' or a positive number."""
+        v = str(v).lower()
+        if v != "auto" and not (v.isdigit() and int(v) > 0):
+            logger.warning(f"Invalid delete slices '{v}', falling back to 'auto'")
+            return "auto"
+        return v
+
+    @field_validator('bulk_ingestion_refresh')
+    @classmethod
+    def validate_bulk_ingestion_refresh(cls, v):
+        """Validate and normalize the bulk ingestion refresh policy."""
+        v = str(v).lower()
+        if v not in ("document", "job"):
+            logger.warning(f"Unknown bulk ingestion refresh policy '{v}', falling back to 'document'")
+            return "document"
+        return v
+
+    @field_validator('index_profile')
+    @classmethod
+    def validate_index_profile(cls, v):
+        """Validate and normalize the k-NN index profile."""
+        v = str(v).lower()
+        if v not in ("lucene_fp32", "lucene_byte", "faiss_fp16", "on_disk"):
+            logger.warning(f"Unknown index profile '{v}', falling back to 'lucene_fp32'")
+            return "lucene_fp32"
+        return v
+
 
 class Settings(BaseSettings):
     """Main settings class combining all common configuration sections."""
@@ -202,6 +556,7 @@ class Settings(BaseSettings):
     llm: LLMConfig = Field(default_factory=LLMConfig)
     embedding: EmbeddingConfig = Field(default_factory=EmbeddingConfig)
     reranker: RerankerConfig = Field(default_factory=RerankerConfig)
+    tokenizer: TokenizerConfig = Field(default_factory=TokenizerConfig)
     language: LanguageConfig = Field(default_factory=LanguageConfig)
     vector_store: VectorStoreConfig = Field(default_factory=VectorStoreConfig)
 
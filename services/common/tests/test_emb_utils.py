@@ -0,0 +1,213 @@
+"""
+Unit tests for common/emb_utils.py module.
+
+Tests cover the micro-batcher that coalesces concurrent embedding calls and
+the persistent content-hash embedding cache.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+from common.emb_utils import CachedEmbedding, Embedding, EmbeddingCache
+
+
+def _batcher_config(max_size=32, max_wait_ms=200.0, max_in_flight=4):
+    cfg = Mock()
+    cfg.micro_batch_enabled = True
+    cfg.micro_batch_max_size = max_size
+    cfg.micro_batch_max_wait_ms = max_wait_ms
+    cfg.micro_batch_max_in_flight = max_in_flight
+    return cfg
+
+
+def _fake_post(calls):
+    """Return a _post_embedding replacement that encodes each text's length."""
+    def post(self, texts):
+        calls.append(list(texts))
+        return [np.array([len(t)], dtype=np.float32) for t in texts]
+    return post
+
+
+@pytest.mark.unit
+class TestEmbeddingBatcher:
+    """Tests for micro-batched embedding requests."""
+
+    def test_concurrent_queries_share_one_request(self):
+        """Test concurrent embed_query calls are sent as one batch and routed back."""
+        calls = []
+        texts = ["a", "bb", "ccc", "dddd"]
+        results = {}
+        barrier = threading.Barrier(len(texts))
+
+        def query(text):
+            barrier.wait()
+            results[text] = embedder.embed_query(text)
+
+        with patch.object(Embedding, "_post_embedding", _fake_post(calls)):
+            embedder = Embedding("emb", "http://emb:8000", 512, batcher_config=_batcher_config())
+            threads = [threading.Thread(target=query, args=(t,)) for t in texts]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert len(calls) == 1
+        assert sorted(calls[0]) == sorted(texts)
+        assert {t: v.tolist() for t, v in results.items()} == {t: [len(t)] for t in texts}
+        assert embedder.batcher.stats()["avg_requests_per_batch"] == len(texts)
+
+    def test_batch_sent_when_full(self):
+        """Test a full batch is flushed without waiting for the timeout."""
+        calls = []
+        with patch.object(Embedding, "_post_embedding", _fake_post(calls)):
+            embedder = Embedding("emb", "http://emb:8000", 512, batcher_config=_batcher_config(max_size=2, max_wait_ms=60_000))
+            futures = [embedder.batcher.submit(["x"]), embedder.batcher.submit(["y"])]
+            assert [f.result(timeout=5)[0].tolist() for f in futures] == [[1.0], [1.0]]
+
+        assert calls == [["x", "y"]]
+
+    def test_errors_reach_every_caller(self):
+        """Test a failed batch request raises in each waiting caller."""
+        with patch.object(Embedding, "_post_embedding", side_effect=RuntimeError("down")):
+            embedder = Embedding("emb", "http://emb:8000", 512, batcher_config=_batcher_config(max_wait_ms=1))
+            with pytest.raises(RuntimeError, match="down"):
+                embedder.embed_query("text")
+
+    def test_batches_sent_concurrently(self):
+        """Test a slow request does not hold back the next batch, up to max_in_flight."""
+        both_in_flight = threading.Barrier(2, timeout=5)
+
+        def post(self, texts):
+            both_in_flight.wait()
+            return [np.array([len(t)], dtype=np.float32) for t in texts]
+
+        with patch.object(Embedding, "_post_embedding", post):
+            embedder = Embedding("emb", "http://emb:8000", 512,
+                                 batcher_config=_batcher_config(max_size=1, max_in_flight=2))
+            futures = [embedder.batcher.submit(["x"]), embedder.batcher.submit(["yy"])]
+            assert [f.result(timeout=5)[0].tolist() for f in futures] == [[1.0], [2.0]]
+
+        assert embedder.batcher.stats()["batches"] == 2
+
+    def test_short_response_fails_every_caller(self):
+        """Test a response with fewer vectors than texts raises instead of handing out truncated slices."""
+        with patch.object(Embedding, "_post_embedding", return_value=[np.zeros(1, dtype=np.float32)]):
+            embedder = Embedding("emb", "http://emb:8000", 512, batcher_config=_batcher_config(max_size=2))
+            futures = [embedder.batcher.submit(["x"]), embedder.batcher.submit(["y"])]
+            for future in futures:
+                with pytest.raises(RuntimeError, match="1 vectors for 2 texts"):
+                    future.result(timeout=5)
+
+    def test_large_batches_bypass_batcher(self):
+        """Test a request that already fills a batch is sent directly."""
+        calls = []
+        with patch.object(Embedding, "_post_embedding", _fake_post(calls)):
+            embedder = Embedding("emb", "http://emb:8000", 512, batcher_config=_batcher_config(max_size=2))
+            embedder.embed_documents(["a", "b", "c"])
+
+        assert calls == [["a", "b", "c"]]
+        assert embedder.batcher.stats()["batches"] == 0
+
+    def test_disabled_by_default(self):
+        """Test no batcher is created without configuration."""
+        assert Embedding("emb", "http://emb:8000", 512).batcher is None
+
+    @pytest.mark.asyncio
+    async def test_async_query_uses_batcher(self):
+        """Test async callers are coalesced through the same batcher."""
+        import asyncio
+
+        calls = []
+        with patch.object(Embedding, "_post_embedding", _fake_post(calls)):
+            embedder = Embedding("emb", "http://emb:8000", 512, batcher_config=_batcher_config())
+            vectors = await asyncio.gather(embedder.embed_query_async("a"), embedder.embed_query_async("bb"))
+
+        assert [v.tolist() for v in vectors] == [[1.0], [2.0]]
+        assert len(calls) == 1
+
+
+@pytest.mark.unit
+class TestEmbeddingCache:
+    """Tests for the persistent embedding cache."""
+
+    def test_only_misses_are_embedded(self, tmp_path):
+        """Test cached texts are not sent to the embedding server again."""
+        calls = []
+        cache = EmbeddingCache(str(tmp_path / "emb.sqlite"), max_bytes=1024 * 1024)
+        with patch.object(Embedding, "_post_embedding", _fake_post(calls)):
+            embedder = CachedEmbedding(Embedding("emb", "http://emb:8000", 512), cache)
+            embedder.embed_documents(["a", "bb"])
+            vectors = embedder.embed_documents(["bb", "ccc", "a"])
+
+        assert calls == [["a", "bb"], ["ccc"]]
+        assert [v.tolist() for v in vectors] == [[2.0], [3.0], [1.0]]
+        assert embedder.hit_rate == pytest.approx(2 / 5)
+
+    def test_entries_survive_reopen(self, tmp_path):
+        """Test vectors written by one instance are read by a new one."""
+        path = str(tmp_path / "emb.sqlite")
+        EmbeddingCache(path, max_bytes=1024).put_many("emb", ["text"], [np.array([0.5, 1.5], dtype=np.float32)])
+
+        vector = EmbeddingCache(path, max_bytes=1024).get_many("emb", ["text"])[0]
+
+        assert vector.dtype == np.float32
+        assert vector.tolist() == [0.5, 1.5]
+
+    def test_keys_include_model(self, tmp_path):
+        """Test vectors from another embedding model are not reused."""
+        cache = EmbeddingCache(str(tmp_path / "emb.sqlite"), max_bytes=1024)
+        cache.put_many("model-a", ["text"], [np.zeros(4, dtype=np.float32)])
+
+        assert cache.get_many("model-b", ["text"]) == [None]
+
+    def test_keys_include_truncation_length(self, tmp_path):
+        """Test vectors embedded with another max_model_len are not reused."""
+        calls = []
+        cache = EmbeddingCache(str(tmp_path / "emb.sqlite"), max_bytes=1024 * 1024)
+        with patch.object(Embedding, "_post_embedding", _fake_post(calls)):
+            CachedEmbedding(Embedding("emb", "http://emb:8000", 512), cache).embed_documents(["a"])
+            CachedEmbedding(Embedding("emb", "http://emb:8000", 8192), cache).embed_documents(["a"])
+
+        assert calls == [["a"], ["a"]]
+
+    def test_lookups_do_not_write(self, tmp_path):
+        """Test access times of hits are deferred to the next put_many."""
+        vector = np.zeros(4, dtype=np.float32)
+        cache = EmbeddingCache(str(tmp_path / "emb.sqlite"), max_bytes=1024)
+        with patch("common.emb_utils.time.time", return_value=100.0):
+            cache.put_many("emb", ["a"], [vector])
+        cache._db = Mock(wraps=cache._db)
+
+        with patch("common.emb_utils.time.time", side_effect=[130.0, 200.0]):
+            cache.get_many("emb", ["a"])  # accessed 30s ago: not recorded
+            cache.get_many("emb", ["a"])
+
+        cache._db.commit.assert_not_called()
+        assert cache._touched == {EmbeddingCache.make_key("emb", "a"): 200.0}
+
+        with patch("common.emb_utils.time.time", return_value=300.0):
+            cache.put_many("emb", ["b"], [vector])
+
+        assert cache._touched == {}
+        accessed = cache._db.execute(
+            "SELECT accessed FROM embedding_cache WHERE key = ?", (EmbeddingCache.make_key("emb", "a"),)
+        ).fetchone()[0]
+        assert accessed == 200.0
+
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        """Test the least recently used vectors are evicted beyond the size cap."""
+        vector = np.zeros(16, dtype=np.float32)  # 64 bytes
+        cache = EmbeddingCache(str(tmp_path / "emb.sqlite"), max_bytes=3 * vector.nbytes)
+        with patch("common.emb_utils.time.time", side_effect=[100.0, 200.0, 300.0, 400.0, 500.0]):
+            cache.put_many("emb", ["a"], [vector])
+            cache.put_many("emb", ["b"], [vector])
+            cache.put_many("emb", ["c"], [vector])
+            cache.get_many("emb", ["a"])
+            cache.put_many("emb", ["d"], [vector])
+
+        assert cache.get_many("emb", ["a", "b", "c", "d"])[1] is None
+        assert cache.stats()["bytes"] <= cache.max_bytes
+        assert cache.stats()["evictions"] >= 1
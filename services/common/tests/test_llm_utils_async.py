@@ -0,0 +1,189 @@
+"""
+Unit tests for the async vLLM and embedding clients in common/llm_utils.py and common/emb_utils.py.
+
+Requests go through a real httpx.AsyncClient backed by an httpx.MockTransport,
+so connection handling, streaming and retries are exercised without a server.
+"""
+
+import json
+
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+
+import common.misc_utils as misc_utils
+
+LLM_ENDPOINT = "http://llm:8000"
+
+
+@pytest.fixture
+def async_client():
+    """Install a shared async client whose transport is controlled by the test."""
+    handlers = []
+
+    def dispatch(request):
+        return handlers.pop(0)(request) if len(handlers) > 1 else handlers[0](request)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(dispatch))
+    with patch.object(misc_utils, "ASYNC_CLIENT", client):
+        yield handlers
+
+
+@pytest.fixture
+def summarize_settings():
+    """Patch summarize settings read while building summarization payloads."""
+    mock_settings = Mock()
+    mock_settings.summarize.summarization_stop_words = ""
+    with patch("summarize.settings.settings", mock_settings):
+        yield mock_settings
+
+
+def _sse(*events):
+    return "".join(f"data: {event}\n\n" for event in events).encode()
+
+
+@pytest.mark.unit
+class TestQueryVLLMSummarizeAsync:
+    """Tests for the async summarization calls."""
+
+    @pytest.mark.asyncio
+    async def test_returns_content_and_usage(self, async_client, summarize_settings):
+        """Test the response is parsed like the sync variant."""
+        from common.llm_utils import query_vllm_summarize_async
+
+        async_client.append(lambda request: httpx.Response(200, json={
+            "choices": [{"message": {"content": " Summary. "}}],
+            "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+        }))
+
+        result = await query_vllm_summarize_async(LLM_ENDPOINT, [{"role": "user", "content": "x"}], "m", 10, 0.0)
+
+        assert result == ("Summary.", 12, 3)
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_server_errors(self, async_client, summarize_settings):
+        """Test a 503 is retried with backoff and the next response is used."""
+        from common.llm_utils import query_vllm_summarize_async
+
+        async_client.append(lambda request: httpx.Response(503, text="busy"))
+        async_client.append(lambda request: httpx.Response(200, json={
+            "choices": [{"message": {"content": "ok"}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1},
+        }))
+
+        with patch("common.retry_utils.asyncio.sleep") as mock_sleep:
+            result = await query_vllm_summarize_async(LLM_ENDPOINT, [], "m", 10, 0.0)
+
+        assert result == ("ok", 1, 1)
+        mock_sleep.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_client_errors_not_retried(self, async_client, summarize_settings):
+        """Test a 4xx is raised immediately."""
+        from common.llm_utils import query_vllm_summarize_async
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400, text="bad request")
+
+        async_client.append(handler)
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await query_vllm_summarize_async(LLM_ENDPOINT, [], "m", 10, 0.0)
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_sse_lines(self, async_client, summarize_settings):
+        """Test streamed lines are forwarded as SSE events."""
+        from common.llm_utils import query_vllm_summarize_stream_async
+
+        async_client.append(lambda request: httpx.Response(200, content=_sse('{"choices": []}', "[DONE]")))
+
+        lines = [line async for line in query_vllm_summarize_stream_async(LLM_ENDPOINT, [], "m", 10, 0.0)]
+
+        assert lines == ['data: {"choices": []}\n\n', "data: [DONE]\n\n"]
+
+    @pytest.mark.asyncio
+    async def test_stream_error_includes_response_body(self, async_client, summarize_settings):
+        """Test an upstream error is reported as an SSE error event."""
+        from common.llm_utils import query_vllm_summarize_stream_async
+
+        async_client.append(lambda request: httpx.Response(400, text="context too long"))
+
+        lines = [line async for line in query_vllm_summarize_stream_async(LLM_ENDPOINT, [], "m", 10, 0.0)]
+
+        assert "context too long" in json.loads(lines[0][len("data: "):])["error"]
+        assert lines[-1] == "data: [DONE]\n\n"
+
+    @pytest.mark.asyncio
+    async def test_requires_client(self, summarize_settings):
+        """Test a clear error is raised before the client is created."""
+        from common.llm_utils import query_vllm_summarize_async
+
+        with patch.object(misc_utils, "ASYNC_CLIENT", None):
+            with pytest.raises(RuntimeError, match="create_async_llm_client"):
+                await query_vllm_summarize_async(LLM_ENDPOINT, [], "m", 10, 0.0)
+
+
+@pytest.mark.unit
+class TestQueryVLLMChatAsync:
+    """Tests for the async chat-completion calls."""
+
+    @pytest.mark.asyncio
+    async def test_stream_records_usage_and_latencies(self, async_client):
+        """Test token chunks are forwarded and usage is recorded in perf stats."""
+        from common.llm_utils import query_vllm_stream_async
+
+        async_client.append(lambda request: httpx.Response(200, content=_sse(
+            '{"choices": [{"delta": {"content": "Hi"}}]}',
+            '{"choices": [], "usage": {"prompt_tokens": 7, "completion_tokens": 1}}',
+            "[DONE]",
+        )))
+        perf_stat_dict = {}
+
+        with patch("common.llm_utils.query_vllm_payload", return_value=({}, {"stream": True})):
+            lines = [line async for line in query_vllm_stream_async(
+                "q", [], LLM_ENDPOINT, "m", [], 10, 0.0, perf_stat_dict, "EN"
+            )]
+
+        assert lines == ['data: {"choices": [{"delta": {"content": "Hi"}}]}\n\n']
+        assert perf_stat_dict["prompt_tokens"] == 7
+        assert len(perf_stat_dict["token_latencies"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_non_stream_returns_json(self, async_client):
+        """Test the non-streaming call returns the response JSON."""
+        from common.llm_utils import query_vllm_non_stream_async
+
+        body = {"choices": [{"message": {"content": "Hi"}}], "usage": {"prompt_tokens": 5, "completion_tokens": 1}}
+        async_client.append(lambda request: httpx.Response(200, json=body))
+        perf_stat_dict = {}
+
+        with patch("common.llm_utils.query_vllm_payload", return_value=({}, {"stream": False})):
+            result = await query_vllm_non_stream_async(
+                "q", [], LLM_ENDPOINT, "m", [], 10, 0.0, perf_stat_dict, "EN"
+            )
+
+        assert result == body
+        assert perf_stat_dict["completion_tokens"] == 1
+
+
+@pytest.mark.unit
+class TestEmbeddingAsync:
+    """Tests for the async embedding client."""
+
+    @pytest.mark.asyncio
+    async def test_embed_documents_async(self, async_client):
+        """Test embeddings are returned as float32 arrays in input order."""
+        from common.emb_utils import Embedding
+
+        async_client.append(lambda request: httpx.Response(200, json={
+            "data": [{"embedding": [1.0, 2.0]}, {"embedding": [3.0, 4.0]}],
+        }))
+
+        vectors = await Embedding("emb", "http://emb:8000", 512).embed_documents_async(["a", "b"])
+
+        assert [v.tolist() for v in vectors] == [[1.0, 2.0], [3.0, 4.0]]
+        assert vectors[0].dtype.name == "float32"
@@ -0,0 +1,979 @@
+"""
+Unit tests for common/opensearch.py module.
+
+Tests cover insert batching, streaming/parallel bulk indexing with 429 retries,
+bulk ingestion mode, multi-query search (sync and async), the index-state cache, the retrieval
+result cache and k-NN index profiles with a mocked OpenSearch client.
+"""
+
+import json
+import threading
+
+import httpx
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+from opensearchpy.exceptions import NotFoundError
+
+import common.opensearch as opensearch
+import common.retrieval_cache as retrieval_cache
+from common.opensearch import OpensearchNotReadyError, OpensearchVectorStore
+
+
+@pytest.fixture(autouse=True)
+def clear_index_states():
+    """Start every test without cached index state or search results."""
+    opensearch._index_states.clear()
+    opensearch._index_generations.clear()
+    retrieval_cache._retrieval_cache = None
+    yield
+    opensearch._index_states.clear()
+    opensearch._index_generations.clear()
+    retrieval_cache._retrieval_cache = None
+
+
+@pytest.fixture
+def store():
+    """OpensearchVectorStore with a mocked client and no network setup."""
+    s = OpensearchVectorStore.__new__(OpensearchVectorStore)
+    s.index_name = "rag_test"
+    s.num_shards = 1
+    s.client = MagicMock()
+    s.client.indices.exists.return_value = True
+    s.client.info.return_value = {"version": {"number": "2.19.1"}}
+    return s
+
+
+@pytest.fixture
+def batch_settings():
+    """Patch insert batch budgets to small, predictable values."""
+    with patch("common.opensearch.settings") as mock_settings:
+        mock_settings.vector_store.insert_batch_max_tokens = 100
+        mock_settings.vector_store.insert_batch_max_bytes = 10_000_000
+        mock_settings.vector_store.insert_batch_max_chunks = 50
+        mock_settings.vector_store.insert_pipeline_depth = 2
+        mock_settings.vector_store.bulk_thread_count = 1
+        mock_settings.vector_store.bulk_chunk_size = 500
+        mock_settings.vector_store.bulk_max_chunk_bytes = 10_000_000
+        mock_settings.vector_store.bulk_max_retries = 3
+        mock_settings.vector_store.bulk_initial_backoff = 2.0
+        mock_settings.vector_store.bulk_max_backoff = 60.0
+        yield mock_settings.vector_store
+
+
+def _fake_streaming_bulk(batches, status=lambda action: 201):
+    """Return a streaming_bulk replacement that records batches and yields per-action results."""
+    def streaming_bulk(client, actions, **kwargs):
+        actions = list(actions)
+        batches.append(actions)
+        for action in actions:
+            code = status(action)
+            item = {"index": {"_id": action["_id"], "status": code}}
+            if code >= 300:
+                item["index"]["error"] = "boom"
+            yield code < 300, item
+    return streaming_bulk
+
+
+@pytest.fixture
+def mock_bulk():
+    """Patch helpers.streaming_bulk to succeed and record each batch of actions."""
+    batches = []
+    with patch("common.opensearch.helpers.streaming_bulk", side_effect=_fake_streaming_bulk(batches)):
+        yield batches
+
+
+def _embedder():
+    embedding = Mock()
+    embedding.embed_documents.side_effect = lambda texts: [np.ones(4, dtype=np.float32) for _ in texts]
+    return embedding
+
+
+def _chunks(*lengths):
+    return [{"page_content": "x" * n, "filename": "f.pdf", "doc_id": "d"} for n in lengths]
+
+
+@pytest.mark.unit
+class TestInsertBatching:
+    """Tests for token/bytes budgeted insert batches."""
+
+    def test_short_chunks_share_a_batch(self, store, batch_settings):
+        """Test short chunks are grouped until the token budget is reached."""
+        chunks = _chunks(*[40] * 30)  # 11 estimated tokens each
+        assert store._next_batch_end(chunks, 0, vector_bytes=0) == 9
+
+    def test_long_chunk_gets_its_own_batch(self, store, batch_settings):
+        """Test a chunk over the budget is still sent, alone."""
+        chunks = _chunks(1000, 40)
+        assert store._next_batch_end(chunks, 0, vector_bytes=0) == 1
+
+    def test_bytes_budget_limits_batch(self, store, batch_settings):
+        """Test the bulk payload budget accounts for vector size."""
+        batch_settings.insert_batch_max_bytes = 3100
+        chunks = _chunks(*[4] * 10)
+        assert store._next_batch_end(chunks, 0, vector_bytes=1000) == 2
+
+    def test_fixed_batch_size(self, store, batch_settings):
+        """Test an explicit batch_size keeps fixed-size batches."""
+        chunks = _chunks(*[4] * 25)
+        assert store._next_batch_end(chunks, 20, vector_bytes=0, batch_size=10) == 25
+
+    def test_insert_covers_every_chunk_once(self, store, batch_settings, mock_bulk):
+        """Test mixed-length chunks are embedded and indexed exactly once."""
+        chunks = _chunks(*([40] * 12 + [380] + [40] * 5))
+        embedding = _embedder()
+
+        assert store.insert_chunks(chunks, embedding=embedding) is True
+
+        embedded = [text for call in embedding.embed_documents.call_args_list for text in call[0][0]]
+        indexed = [action["_source"]["text"] for batch in mock_bulk for action in batch]
+        assert embedded == [c["page_content"] for c in chunks]
+        assert indexed == embedded
+        assert [len(batch) for batch in mock_bulk] == [9, 3, 1, 5]
+
+    def test_failed_batch_fails_document(self, store, batch_settings):
+        """Test any chunk error marks the document as failed."""
+        failing = _fake_streaming_bulk([], status=lambda action: 400 if action["_source"]["text"] == "y" else 201)
+        chunks = _chunks(10, 10) + [{"page_content": "y", "filename": "f.pdf", "doc_id": "d"}]
+        with patch("common.opensearch.helpers.streaming_bulk", side_effect=failing):
+            assert store.insert_chunks(chunks, embedding=_embedder()) is False
+
+
+@pytest.mark.unit
+class TestInsertPipeline:
+    """Tests for overlapping embedding with bulk indexing."""
+
+    def test_next_batch_embedded_during_bulk(self, store, batch_settings):
+        """Test batch N+1 is embedded while batch N is being indexed."""
+        batch_settings.insert_batch_max_chunks = 1
+        second_embedded = threading.Event()
+        overlapped = []
+        embedding = Mock()
+
+        def embed(texts):
+            if texts == ["x" * 2]:
+                second_embedded.set()
+            return [np.ones(4, dtype=np.float32) for _ in texts]
+
+        def bulk(client, actions, **kwargs):
+            if actions[0]["_source"]["text"] == "x":
+                overlapped.append(second_embedded.wait(timeout=5))
+            yield from _fake_streaming_bulk([])(client, actions)
+
+        embedding.embed_documents.side_effect = embed
+        with patch("common.opensearch.helpers.streaming_bulk", side_effect=bulk):
+            assert store.insert_chunks(_chunks(1, 2, 3), embedding=embedding) is True
+
+        assert overlapped == [True]
+
+    def test_bulk_failure_stops_pipeline(self, store, batch_settings):
+        """Test a failed batch returns False without indexing later batches."""
+        batch_settings.insert_batch_max_chunks = 1
+        batches = []
+        failing = _fake_streaming_bulk(batches, status=lambda action: 400)
+        with patch("common.opensearch.helpers.streaming_bulk", side_effect=failing):
+            assert store.insert_chunks(_chunks(1, 2, 3, 4, 5), embedding=_embedder()) is False
+
+        assert len(batches) == 1
+
+    def test_embedding_error_propagates(self, store, batch_settings, mock_bulk):
+        """Test an embedding failure in the producer is raised to the caller."""
+        batch_settings.insert_batch_max_chunks = 1
+        embedding = Mock()
+        embedding.embed_documents.side_effect = [[np.ones(4, dtype=np.float32)], ValueError("emb down")]
+
+        with patch("common.retry_utils.time.sleep"), pytest.raises(ValueError, match="emb down"):
+            store.insert_chunks(_chunks(1, 2), embedding=embedding)
+
+    def test_sequential_when_disabled(self, store, batch_settings, mock_bulk):
+        """Test depth 0 embeds and indexes in sequence."""
+        batch_settings.insert_pipeline_depth = 0
+        batch_settings.insert_batch_max_chunks = 1
+        assert store.insert_chunks(_chunks(1, 2, 3), embedding=_embedder()) is True
+        assert len(mock_bulk) == 3
+
+
+@pytest.mark.unit
+class TestBulkIngestionMode:
+    """Tests for deferring refreshes during ingestion jobs."""
+
+    @pytest.fixture(autouse=True)
+    def index_settings(self, store, batch_settings):
+        """Existing index with an explicit refresh interval."""
+        batch_settings.bulk_ingestion_refresh = "document"
+        batch_settings.bulk_ingestion_disable_replicas = False
+        store.client.indices.get_settings.return_value = {
+            "rag_test": {"settings": {"index.refresh_interval": "1s"}}
+        }
+
+    def test_refresh_disabled_and_restored(self, store):
+        """Test refresh is turned off for the job and the old value restored after."""
+        with store.bulk_ingestion_mode():
+            store.client.indices.put_settings.assert_called_once_with(
+                index="rag_test", body={"index": {"refresh_interval": "-1"}}
+            )
+        store.client.indices.put_settings.assert_called_with(
+            index="rag_test", body={"index": {"refresh_interval": "1s"}}
+        )
+        store.client.indices.refresh.assert_called_once_with(index="rag_test")
+
+    def test_settings_restored_when_job_fails(self, store):
+        """Test the original settings are restored if the job raises."""
+        with pytest.raises(RuntimeError):
+            with store.bulk_ingestion_mode():
+                raise RuntimeError("job failed")
+        assert store.client.indices.put_settings.call_args[1]["body"] == {"index": {"refresh_interval": "1s"}}
+
+    def test_replicas_dropped_when_configured(self, store, batch_settings):
+        """Test replicas are set to 0 and restored to their defaults."""
+        batch_settings.bulk_ingestion_disable_replicas = True
+        with store.bulk_ingestion_mode():
+            body = store.client.indices.put_settings.call_args[1]["body"]["index"]
+            assert body["number_of_replicas"] == 0
+            assert body["auto_expand_replicas"] == "false"
+        restored = store.client.indices.put_settings.call_args[1]["body"]["index"]
+        assert restored == {"refresh_interval": "1s", "auto_expand_replicas": None, "number_of_replicas": None}
+
+    def test_bulk_skips_refresh_and_document_refreshed_once(self, store, batch_settings, mock_bulk):
+        """Test batches skip refresh and each document is refreshed once."""
+        batch_settings.insert_batch_max_chunks = 1
+        with store.bulk_ingestion_mode():
+            store.insert_chunks(_chunks(1, 2), embedding=_embedder())
+            assert len(mock_bulk) == 2
+            store.client.indices.refresh.assert_called_once_with(index="rag_test")
+
+    def test_job_refresh_policy(self, store, batch_settings, mock_bulk):
+        """Test the 'job' policy refreshes only when the job ends."""
+        batch_settings.bulk_ingestion_refresh = "job"
+        with store.bulk_ingestion_mode():
+            store.insert_chunks(_chunks(1, 2), embedding=_embedder())
+            store.client.indices.refresh.assert_not_called()
+        store.client.indices.refresh.assert_called_once()
+
+    def test_nested_jobs_restore_once(self, store):
+        """Test overlapping jobs on one index restore the settings only when the last ends."""
+        with store.bulk_ingestion_mode():
+            with store.bulk_ingestion_mode():
+                pass
+            assert store.client.indices.put_settings.call_count == 1
+        assert store.client.indices.put_settings.call_count == 2
+
+    def test_saved_settings_recorded_in_index(self, store):
+        """Test the saved settings are kept in the index _meta for the job and removed after."""
+        store.client.indices.get_mapping.return_value = {"rag_test": {"mappings": {"_meta": {"generation": "g1"}}}}
+        with store.bulk_ingestion_mode():
+            meta = store.client.indices.put_mapping.call_args[1]["body"]["_meta"]
+            assert meta == {"generation": "g1", "bulk_ingestion_saved": {"index.refresh_interval": "1s"}}
+        meta = store.client.indices.put_mapping.call_args[1]["body"]["_meta"]
+        assert "bulk_ingestion_saved" not in meta
+        assert meta["generation"] != "g1"
+
+    def test_interrupted_job_settings_recovered(self, store):
+        """Test settings recorded by a killed process are restored when no job is running."""
+        store.client.indices.get_mapping.return_value = {"rag_test": {"mappings": {"_meta": {
+            "generation": "g1", "bulk_ingestion_saved": {"index.refresh_interval": None},
+        }}}}
+
+        with store.bulk_ingestion_mode():
+            assert store.recover_bulk_ingestion_mode() is False
+        store.client.indices.put_settings.reset_mock()
+
+        assert store.recover_bulk_ingestion_mode() is True
+        store.client.indices.put_settings.assert_called_once_with(
+            index="rag_test", body={"index": {"refresh_interval": None}}
+        )
+        assert "bulk_ingestion_saved" not in store.client.indices.put_mapping.call_args[1]["body"]["_meta"]
+
+    def test_recovery_checked_when_index_discovered(self, store):
+        """Test the first index setup of a process restores settings left by a killed job."""
+        store.client.indices.get_mapping.return_value = {"rag_test": {"mappings": {"_meta": {
+            "bulk_ingestion_saved": {"index.refresh_interval": "1s"},
+        }}}}
+        store._setup_index(4)
+        store._setup_index(4)
+
+        store.client.indices.put_settings.assert_called_once_with(
+            index="rag_test", body={"index": {"refresh_interval": "1s"}}
+        )
+
+    def test_generation_published_when_job_ends(self, store, batch_settings, mock_bulk):
+        """Test inserts under the 'job' policy publish the generation once, when the job ends."""
+        batch_settings.bulk_ingestion_refresh = "job"
+        with store.bulk_ingestion_mode():
+            writes = store.client.indices.put_mapping.call_count
+            store.insert_chunks(_chunks(1), embedding=_embedder())
+            store.insert_chunks(_chunks(2), embedding=_embedder())
+            assert store.client.indices.put_mapping.call_count == writes
+            assert opensearch._index_generations["rag_test"]["local"] == 2
+        assert store.client.indices.put_mapping.call_count == writes + 1
+
+    def test_document_refresh_publishes_once_per_poll_interval(self, store, batch_settings, mock_bulk):
+        """Test per-document refreshes publish at most once per poll interval, and the job end publishes."""
+        batch_settings.retrieval_cache_generation_poll_seconds = 60
+        with store.bulk_ingestion_mode():
+            writes = store.client.indices.put_mapping.call_count
+            store.insert_chunks(_chunks(1), embedding=_embedder())
+            store.insert_chunks(_chunks(2), embedding=_embedder())
+            assert store.client.indices.put_mapping.call_count == writes + 1
+        assert store.client.indices.put_mapping.call_count == writes + 2
+
+    def test_unpublished_changes_published_without_saved_settings(self, store, batch_settings, mock_bulk):
+        """Test the job end publishes deferred changes even if the settings could not be changed."""
+        batch_settings.bulk_ingestion_refresh = "job"
+        store.client.indices.get_settings.side_effect = RuntimeError("no permission")
+        with store.bulk_ingestion_mode():
+            store.insert_chunks(_chunks(1), embedding=_embedder())
+            store.client.indices.put_mapping.assert_not_called()
+        store.client.indices.put_mapping.assert_called_once()
+
+    def test_regular_inserts_refresh_per_batch(self, store, batch_settings, mock_bulk):
+        """Test inserts outside an ingestion job refresh after every batch."""
+        batch_settings.insert_batch_max_chunks = 1
+        store.insert_chunks(_chunks(1, 2), embedding=_embedder())
+        assert store.client.indices.refresh.call_count == 2
+
+
+@pytest.mark.unit
+class TestStreamingBulk:
+    """Tests for byte-bounded, parallel bulk requests and 429 retries."""
+
+    def test_request_limits_passed_through(self, store, batch_settings, mock_bulk):
+        """Test chunk count and byte limits bound each bulk request."""
+        batch_settings.bulk_chunk_size = 7
+        batch_settings.bulk_max_chunk_bytes = 4096
+        with patch("common.opensearch.helpers.streaming_bulk", wraps=_fake_streaming_bulk([])) as bulk:
+            store.insert_chunks(_chunks(1, 2), embedding=_embedder())
+
+        kwargs = bulk.call_args[1]
+        assert (kwargs["chunk_size"], kwargs["max_chunk_bytes"], kwargs["refresh"]) == (7, 4096, False)
+
+    def test_parallel_bulk_for_large_batches(self, store, batch_settings):
+        """Test batches spanning several requests are sent by parallel workers."""
+        batch_settings.bulk_thread_count = 3
+        batch_settings.bulk_chunk_size = 2
+        with patch("common.opensearch.helpers.parallel_bulk", side_effect=_fake_streaming_bulk([])) as bulk:
+            assert store.insert_chunks(_chunks(1, 2, 3, 4, 5), embedding=_embedder()) is True
+
+        assert bulk.call_args[1]["thread_count"] == 3
+
+    def test_rejected_chunks_retried(self, store, batch_settings):
+        """Test only chunks rejected with 429 are resent, after a backoff."""
+        batches = []
+        attempts = {}
+
+        def status(action):
+            attempts[action["_id"]] = attempts.get(action["_id"], 0) + 1
+            rejected = action["_source"]["text"] == "xx" and attempts[action["_id"]] < 3
+            return 429 if rejected else 201
+
+        with patch("common.opensearch.helpers.streaming_bulk", side_effect=_fake_streaming_bulk(batches, status)), \
+             patch("common.opensearch.time.sleep") as sleep:
+            assert store.insert_chunks(_chunks(1, 2, 3), embedding=_embedder()) is True
+
+        assert [len(batch) for batch in batches] == [3, 1, 1]
+        assert [c[0][0] for c in sleep.call_args_list] == [2.0, 4.0]
+
+    def test_rejections_exhaust_retries(self, store, batch_settings):
+        """Test chunks still rejected after the last retry fail the document."""
+        batch_settings.bulk_max_retries = 2
+        batches = []
+        with patch("common.opensearch.helpers.streaming_bulk", side_effect=_fake_streaming_bulk(batches, lambda a: 429)), \
+             patch("common.opensearch.time.sleep"):
+            assert store.insert_chunks(_chunks(1, 2), embedding=_embedder()) is False
+
+        assert len(batches) == 3
+
+    def test_other_errors_not_retried(self, store, batch_settings):
+        """Test a mapping error fails the batch without retrying rejected chunks."""
+        batches = []
+        status = lambda action: 400 if action["_source"]["text"] == "x" else 429  # noqa: E731
+        with patch("common.opensearch.helpers.streaming_bulk", side_effect=_fake_streaming_bulk(batches, status)), \
+             patch("common.opensearch.time.sleep") as sleep:
+            assert store.insert_chunks(_chunks(1, 2), embedding=_embedder()) is False
+
+        assert len(batches) == 1
+        sleep.assert_not_called()
+
+
+def _hits(*texts):
+    return {"hits": {"total": {"value": len(texts)}, "hits": [
+        {"_score": 1.0, "_source": {"chunk_id": i, "text": t, "metadata": {"filename": "f.pdf"}}}
+        for i, t in enumerate(texts)
+    ]}}
+
+
+@pytest.mark.unit
+class TestSearchMany:
+    """Tests for multi-query search over _msearch."""
+
+    def test_one_embedding_and_one_msearch_request(self, store):
+        """Test N queries cost one embedding call and one _msearch call."""
+        embedding = _embedder()
+        store.client.msearch.return_value = {"responses": [_hits("a1", "a2"), _hits("b1")]}
+
+        results = store.search_many(["a", "b"], embedding=embedding, top_k=2, mode="dense")
+
+        embedding.embed_documents.assert_called_once_with(["a", "b"])
+        embedding.embed_query.assert_not_called()
+        store.client.search.assert_not_called()
+        body = store.client.msearch.call_args[1]["body"]
+        assert len(body) == 4
+        assert body[0]["index"] == "rag_test"
+        assert body[1]["query"]["knn"]["embedding"]["k"] == 6
+        assert [[r["page_content"] for r in hits] for hits in results] == [["a1", "a2"], ["b1"]]
+        assert results[0][0]["filename"] == "f.pdf"
+
+    def test_bodies_match_single_search(self, store):
+        """Test each _msearch body is the body search() sends for that query."""
+        vector = [0.1, 0.2]
+        store.client.search.return_value = _hits()
+        store.client.msearch.return_value = {"responses": [_hits()]}
+
+        store.search("q", vector=vector, top_k=3, mode="hybrid")
+        store.search_many(["q"], vectors=[vector], top_k=3, mode="hybrid")
+
+        assert store.client.msearch.call_args[1]["body"][1] == store.client.search.call_args[1]["body"]
+
+    def test_per_query_top_k_and_mode(self, store):
+        """Test top_k and mode given per query shape each _msearch body."""
+        store.client.msearch.return_value = {"responses": [_hits(), _hits()]}
+
+        store.search_many(["a", "b"], vectors=[[0.1], [0.2]], top_k=[2, 5], mode=["dense", "sparse"])
+
+        body = store.client.msearch.call_args[1]["body"]
+        assert body[1]["query"]["knn"]["embedding"]["k"] == 6
+        assert "knn" not in str(body[3]["query"])
+        with pytest.raises(ValueError):
+            store.search_many(["a", "b"], vectors=[[0.1], [0.2]], top_k=[2])
+
+    def test_failed_query_raises(self, store):
+        """Test an error for any query fails the whole call."""
+        store.client.msearch.return_value = {"responses": [_hits("a"), {"error": {"type": "boom"}, "status": 400}]}
+
+        with patch("common.retry_utils.time.sleep"), pytest.raises(RuntimeError, match="query 2"):
+            store.search_many(["a", "b"], vectors=[[0.1], [0.2]])
+
+    def test_source_excludes_embedding(self, store):
+        """Test every search mode fetches only the returned fields, never the embedding."""
+        store.client.search.return_value = _hits("a")
+
+        for mode in ("dense", "sparse", "hybrid"):
+            results = store.search("q", vector=[0.1, 0.2], top_k=1, mode=mode)
+            source = store.client.search.call_args[1]["body"]["_source"]
+            assert "chunk_id" in source and "text" in source and "metadata.filename" in source
+            assert not any(field.startswith("embedding") for field in source)
+            assert set(results[0]) == {"chunk_id", "page_content", "score", "filename"}
+
+    def test_empty_queries(self, store):
+        """Test no request is made without queries."""
+        assert store.search_many([], embedding=_embedder()) == []
+        store.client.msearch.assert_not_called()
+
+
+def _async_transport(store, responses, requests):
+    """Serve the store's async REST calls with (status, json) from responses, recording each request."""
+    def handler(request):
+        requests.append(request)
+        status, body = responses(request)
+        return httpx.Response(status, json=body)
+    store._async_http = httpx.AsyncClient(base_url="https://opensearch:9200", transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.unit
+class TestAsyncSearch:
+    """Tests for the async search path over the OpenSearch REST API."""
+
+    @pytest.mark.asyncio
+    async def test_search_async_posts_search_body(self, store):
+        """Test search_async sends the body search() sends, through the hybrid pipeline."""
+        requests = []
+        _async_transport(store, lambda r: (200, _hits("a1", "a2")), requests)
+        store.client.search.return_value = _hits()
+        vector = [0.1, 0.2]
+
+        results = await store.search_async("q", vector=vector, top_k=3, mode="hybrid")
+        store.search("q", vector=vector, top_k=3, mode="hybrid")
+
+        assert [r["page_content"] for r in results] == ["a1", "a2"]
+        request = requests[-1]
+        assert request.url.path == "/rag_test/_search"
+        assert request.url.params["search_pipeline"] == "hybrid_pipeline"
+        assert json.loads(request.content) == store.client.search.call_args[1]["body"]
+
+    @pytest.mark.asyncio
+    async def test_search_many_async_one_embedding_and_one_msearch(self, store):
+        """Test N queries cost one async embedding call and one ndjson _msearch request."""
+        requests = []
+        _async_transport(store, lambda r: (200, {"responses": [_hits("a1"), _hits("b1", "b2")]}), requests)
+        embedding = Mock()
+        embedding.embed_documents_async = AsyncMock(return_value=[np.ones(4, dtype=np.float32)] * 2)
+
+        results = await store.search_many_async(["a", "b"], embedding=embedding, top_k=[1, 2], mode="dense")
+
+        embedding.embed_documents_async.assert_awaited_once_with(["a", "b"])
+        assert [(r.method, r.url.path) for r in requests] == [("HEAD", "/rag_test"), ("POST", "/_msearch")]
+        lines = [json.loads(line) for line in requests[1].content.decode().splitlines()]
+        assert lines[0] == {"index": "rag_test", "search_pipeline": "hybrid_pipeline"}
+        assert lines[1]["query"]["knn"]["embedding"]["k"] == 3
+        assert [[r["page_content"] for r in hits] for hits in results] == [["a1"], ["b1", "b2"]]
+
+    @pytest.mark.asyncio
+    async def test_missing_index_raises_not_ready(self, store):
+        """Test a 404 from a deleted index forgets it and raises OpensearchNotReadyError."""
+        _async_transport(store, lambda r: (404, {"error": "index_not_found_exception"}), [])
+        store._remember_index()
+
+        with pytest.raises(OpensearchNotReadyError):
+            await store.search_async("q", vector=[0.1], top_k=1)
+
+        assert store._index_state() is None
+
+    @pytest.mark.asyncio
+    async def test_aclose_releases_client(self, store):
+        """Test aclose closes the async client so the next call creates a new one."""
+        _async_transport(store, lambda r: (200, {}), [])
+        client = store._async_http
+
+        await store.aclose()
+
+        assert client.is_closed
+        assert store._async_http is None
+
+
+@pytest.mark.unit
+class TestIndexStateCache:
+    """Tests for caching index existence across requests."""
+
+    def test_search_makes_one_call_once_index_known(self, store):
+        """Test the hot search path sends only the search request."""
+        store.client.search.return_value = _hits("a")
+        store.search("q", vector=[0.1], mode="dense")
+        store.client.reset_mock()
+
+        store.search("q", vector=[0.1], mode="dense")
+
+        assert [c[0] for c in store.client.mock_calls] == ["search"]
+
+    def test_missing_index_not_cached(self, store):
+        """Test a missing index is checked again, since another service may create it."""
+        store.client.indices.exists.return_value = False
+        for _ in range(2):
+            with pytest.raises(OpensearchNotReadyError):
+                store.search("q", vector=[0.1])
+        assert store.client.indices.exists.call_count == 2
+
+    def test_not_found_invalidates_state(self, store):
+        """Test an index deleted behind the cache is reported and re-checked next time."""
+        store.client.search.return_value = _hits()
+        store.search("q", vector=[0.1])
+        store.client.search.side_effect = NotFoundError(404, "index_not_found_exception", {})
+
+        with pytest.raises(OpensearchNotReadyError):
+            store.search("q", vector=[0.1])
+
+        assert store._index_state() is None
+
+    def test_created_index_recorded(self, store):
+        """Test creating the index records its dimension and a new mapping version."""
+        store.client.indices.exists.return_value = False
+        store._setup_index(768)
+        first = store._index_state()
+        store._forget_index()
+        store._setup_index(768)
+
+        assert first["dimension"] == 768
+        assert store._index_state()["mapping_version"] > first["mapping_version"]
+
+    def test_existing_index_dimension_read_once(self, store):
+        """Test the mapping of an existing index is read on discovery only (dimension and _meta)."""
+        store.client.indices.get_mapping.return_value = {
+            "rag_test": {"mappings": {"properties": {"embedding": {"dimension": 384}}}}
+        }
+        store._setup_index(384)
+        reads = store.client.indices.get_mapping.call_count
+        store._setup_index(384)
+
+        assert store._index_state()["dimension"] == 384
+        assert store.client.indices.get_mapping.call_count == reads == 2
+
+    def test_delete_skips_refresh_outside_ingestion(self, store):
+        """Test deleting a document does not force a refresh when inserts already refreshed."""
+        store.client.delete_by_query.return_value = {"task": "node:1"}
+        store.client.tasks.get.return_value = {"completed": True, "response": {"deleted": 2, "total": 2}}
+
+        assert store.delete_document_by_id("doc") == 2
+
+        store.client.indices.refresh.assert_not_called()
+
+
+@pytest.mark.unit
+class TestAsyncDelete:
+    """Tests for asynchronous, sliced delete_by_query tasks."""
+
+    @pytest.fixture(autouse=True)
+    def no_sleep(self):
+        """Skip the waits between task progress checks."""
+        with patch("common.opensearch.time.sleep") as sleep:
+            yield sleep
+
+    def test_schedule_coalesces_documents(self, store):
+        """Test documents are deleted with one terms query run as an async sliced task."""
+        store.client.delete_by_query.return_value = {"task": "node:7"}
+
+        assert store.schedule_document_deletion(["a", " b ", "a"]) == ["node:7"]
+
+        kwargs = store.client.delete_by_query.call_args.kwargs
+        assert kwargs["body"] == {"query": {"terms": {"metadata.doc_id": ["a", "b"]}}}
+        assert kwargs["params"]["wait_for_completion"] == "false"
+        assert kwargs["params"]["slices"] == "auto"
+        store.client.tasks.get.assert_not_called()
+
+    def test_schedule_splits_large_deletes(self, store):
+        """Test more documents than the terms limit are deleted with several tasks."""
+        store.client.delete_by_query.side_effect = [{"task": "node:1"}, {"task": "node:2"}]
+
+        with patch("common.opensearch._MAX_DELETE_TERMS", 2):
+            assert store.schedule_document_deletion(["a", "b", "c"]) == ["node:1", "node:2"]
+
+    def test_schedule_without_index(self, store):
+        """Test nothing is scheduled when the index does not exist."""
+        store.client.indices.exists.return_value = False
+
+        assert store.schedule_document_deletion(["a"]) == []
+        store.client.delete_by_query.assert_not_called()
+
+    def test_wait_polls_until_completed(self, store, no_sleep):
+        """Test waiting polls the task until it completes and returns the deleted count."""
+        store.client.tasks.get.side_effect = [
+            {"completed": False, "task": {"status": {"total": 10, "deleted": 4}}},
+            {"completed": True, "response": {"total": 10, "deleted": 10, "failures": []}},
+        ]
+
+        assert store.wait_for_deletion(["node:1"]) == 10
+        assert store.client.tasks.get.call_count == 2
+        no_sleep.assert_called_once()
+
+    def test_remove_docs_waits_for_all_tasks(self, store):
+        """Test remove_docs_from_index returns the chunks deleted by every task."""
+        store.client.delete_by_query.side_effect = [{"task": "node:1"}, {"task": "node:2"}]
+        store.client.tasks.get.return_value = {"completed": True, "response": {"total": 3, "deleted": 3}}
+
+        with patch("common.opensearch._MAX_DELETE_TERMS", 1):
+            assert store.remove_docs_from_index(["a", "b"]) == 6
+
+
+@pytest.mark.unit
+class TestReindex:
+    """Tests for alias-based reindexing into a new versioned index."""
+
+    @pytest.fixture
+    def reindex_settings(self, batch_settings):
+        """Small unthrottled reindex batches."""
+        batch_settings.reindex_batch_size = 2
+        batch_settings.reindex_parallelism = 2
+        batch_settings.reindex_max_chunks_per_second = 0
+        batch_settings.reindex_delete_old_index = True
+        batch_settings.index_profile = "lucene_fp32"
+        batch_settings.index_hnsw_m = 24
+        batch_settings.index_hnsw_ef_construction = 128
+        batch_settings.index_ef_search = 100
+        return batch_settings
+
+    @staticmethod
+    def _source_hits(*doc_ids):
+        return [
+            {"_id": str(i), "_source": {"chunk_id": i, "text": f"text {i}", "metadata": {"doc_id": doc_id}}}
+            for i, doc_id in enumerate(doc_ids)
+        ]
+
+    @pytest.fixture
+    def source(self, store):
+        """A concrete (not yet aliased) index with three chunks."""
+        store.client.indices.exists_alias.return_value = False
+        store.client.count.return_value = {"count": 3}
+        hits = self._source_hits("a", "a", "b")
+        with patch("common.opensearch.helpers.scan", return_value=hits) as scan:
+            yield scan
+
+    def test_reindex_copies_and_swaps_alias(self, store, reindex_settings, source, mock_bulk):
+        """Test every chunk is re-embedded into the new index before the alias is swapped atomically."""
+        embedding = _embedder()
+        embedding.embed_query.return_value = np.ones(4)
+        updates = []
+
+        target = store.reindex(embedding, progress=updates.append)
+
+        assert target.startswith("rag_test_")
+        create = store.client.indices.create.call_args.kwargs
+        assert create["index"] == target
+        assert create["body"]["mappings"]["properties"]["embedding"]["dimension"] == 4
+        indexed = [action for batch in mock_bulk for action in batch]
+        assert sorted(action["_id"] for action in indexed) == ["0", "1", "2"]
+        assert all(action["_index"] == target and action["_source"]["embedding"] == [1.0] * 4 for action in indexed)
+        store.client.indices.update_aliases.assert_called_once_with(body={"actions": [
+            {"add": {"index": target, "alias": "rag_test"}},
+            {"remove_index": {"index": "rag_test"}},
+        ]})
+        assert updates[-1] == {"phase": "done", "total": 3, "copied": 3}
+        assert store._index_state()["dimension"] == 4
+
+    def test_concrete_index_kept_without_delete_old_index(self, store, reindex_settings, source):
+        """Test the first reindex is refused before copying when the concrete index must not be deleted."""
+        reindex_settings.reindex_delete_old_index = False
+        embedding = _embedder()
+
+        with pytest.raises(RuntimeError, match="reindex_delete_old_index=false"):
+            store.reindex(embedding)
+
+        store.client.indices.create.assert_not_called()
+        store.client.indices.update_aliases.assert_not_called()
+        store.client.indices.delete.assert_not_called()
+        embedding.embed_query.assert_not_called()
+        assert opensearch._reindexes == {}
+
+    def test_reindex_of_alias_keeps_previous_index_without_delete_old_index(
+        self, store, reindex_settings, source, mock_bulk
+    ):
+        """Test an aliased index is moved without deleting the previous index when configured so."""
+        reindex_settings.reindex_delete_old_index = False
+        store.client.indices.exists_alias.return_value = True
+        store.client.indices.get_alias.return_value = {"rag_test_old": {"aliases": {"rag_test": {}}}}
+        embedding = _embedder()
+        embedding.embed_query.return_value = np.ones(4)
+
+        store.reindex(embedding)
+
+        actions = store.client.indices.update_aliases.call_args.kwargs["body"]["actions"]
+        assert actions[1] == {"remove": {"index": "rag_test_old", "alias": "rag_test"}}
+        store.client.indices.delete.assert_not_called()
+
+    def test_reindex_of_alias_deletes_previous_index(self, store, reindex_settings, source, mock_bulk):
+        """Test an aliased index is moved to the new index and the previous one deleted."""
+        store.client.indices.exists_alias.return_value = True
+        store.client.indices.get_alias.return_value = {"rag_test_old": {"aliases": {"rag_test": {}}}}
+        embedding = _embedder()
+        embedding.embed_query.return_value = np.ones(4)
+
+        target = store.reindex(embedding)
+
+        actions = store.client.indices.update_aliases.call_args.kwargs["body"]["actions"]
+        assert actions[1] == {"remove": {"index": "rag_test_old", "alias": "rag_test"}}
+        store.client.indices.delete.assert_called_once_with(index="rag_test_old")
+        assert target != "rag_test_old"
+
+    def test_writes_during_copy_are_replayed(self, store, reindex_settings, source, mock_bulk):
+        """Test documents written or deleted through the alias during the copy are replayed on the new index."""
+        embedding = _embedder()
+        embedding.embed_query.return_value = np.ones(4)
+        copy_chunks = store._copy_chunks
+        replayed = []
+
+        def copy_then_write(source_index, target, emb, query=None, on_progress=None):
+            if query is None:
+                with store._tracked_write(["new-doc"], "written"), store._tracked_write(["b"], "deleted"):
+                    pass
+            else:
+                replayed.append(query)
+            return copy_chunks(source_index, target, emb, query, on_progress)
+
+        with patch.object(store, "_copy_chunks", side_effect=copy_then_write):
+            target = store.reindex(embedding)
+
+        deletes = [c.kwargs for c in store.client.delete_by_query.call_args_list]
+        assert deletes[0]["index"] == target
+        assert sorted(deletes[0]["body"]["query"]["terms"]["metadata.doc_id"]) == ["b", "new-doc"]
+        assert replayed == [{"terms": {"metadata.doc_id": ["new-doc"]}}]
+
+    def test_failed_reindex_keeps_current_index(self, store, reindex_settings, source):
+        """Test a failed copy deletes the partial index and leaves the alias untouched."""
+        embedding = _embedder()
+        embedding.embed_query.return_value = np.ones(4)
+        embedding.embed_documents.side_effect = RuntimeError("embedding server down")
+
+        with pytest.raises(RuntimeError, match="embedding server down"):
+            store.reindex(embedding)
+
+        target = store.client.indices.create.call_args.kwargs["index"]
+        store.client.indices.delete.assert_called_once_with(index=target, ignore_unavailable=True)
+        store.client.indices.update_aliases.assert_not_called()
+        assert opensearch._reindexes == {}
+
+    def test_concurrent_reindex_rejected(self, store):
+        """Test a second reindex of the same index is rejected while one runs."""
+        opensearch._reindexes["rag_test"] = {"dirty": {}}
+        try:
+            with pytest.raises(RuntimeError, match="already running"):
+                store.reindex(_embedder())
+        finally:
+            opensearch._reindexes.clear()
+
+
+@pytest.mark.unit
+class TestRetrievalCacheIntegration:
+    """Tests for serving repeated searches from the retrieval cache."""
+
+    @pytest.fixture(autouse=True)
+    def cache_settings(self, batch_settings):
+        """Enable the retrieval cache and poll the shared generation on every search."""
+        batch_settings.retrieval_cache_generation_poll_seconds = 0
+        with patch("common.retrieval_cache.settings") as mock_settings:
+            mock_settings.vector_store.retrieval_cache_enabled = True
+            mock_settings.vector_store.retrieval_cache_max_bytes = 1024 * 1024
+            yield
+
+    @pytest.fixture
+    def searchable(self, store):
+        """Index with one hit for every search and no generation written by other services."""
+        store.client.search.return_value = _hits("a")
+        store.client.indices.get_mapping.return_value = {"rag_test": {"mappings": {}}}
+        return store
+
+    def test_repeated_query_skips_embedding_and_search(self, searchable):
+        """Test a repeated question is answered without embedding or k-NN search."""
+        embedding = _embedder()
+        first = searchable.search("How do I reset?", embedding=embedding, mode="dense")
+        second = searchable.search("how do i  reset?", embedding=embedding, mode="dense")
+
+        assert second == first
+        embedding.embed_query.assert_called_once()
+        searchable.client.search.assert_called_once()
+
+    def test_insert_invalidates_cached_results(self, searchable, mock_bulk):
+        """Test results are searched again once documents were inserted."""
+        embedding = _embedder()
+        searchable.search("q", embedding=embedding)
+        searchable.insert_chunks(_chunks(1), embedding=_embedder())
+        searchable.search("q", embedding=embedding)
+
+        assert searchable.client.search.call_count == 2
+
+    def test_delete_invalidates_cached_results(self, searchable):
+        """Test deleting a document invalidates cached results."""
+        searchable.client.delete_by_query.return_value = {"task": "node:1"}
+        searchable.client.tasks.get.return_value = {"completed": True, "response": {"deleted": 1, "total": 1}}
+        searchable.search("q", embedding=_embedder())
+        searchable.delete_document_by_id("doc")
+        searchable.search("q", embedding=_embedder())
+
+        assert searchable.client.search.call_count == 2
+
+    def test_changes_by_other_services_invalidate(self, searchable):
+        """Test a generation written to the index _meta by another service invalidates results."""
+        searchable.search("q", embedding=_embedder())
+        searchable.client.indices.get_mapping.return_value = {
+            "rag_test": {"mappings": {"_meta": {"generation": "from-digitize"}}}
+        }
+        searchable.search("q", embedding=_embedder())
+
+        assert searchable.client.search.call_count == 2
+
+    def test_own_changes_published(self, searchable, mock_bulk):
+        """Test inserts publish a new generation for other services."""
+        searchable.insert_chunks(_chunks(1), embedding=_embedder())
+
+        body = searchable.client.indices.put_mapping.call_args[1]["body"]
+        assert body["_meta"]["generation"]
+
+    def test_precomputed_vectors_not_cached(self, searchable):
+        """Test searches with only a caller-supplied vector always reach OpenSearch."""
+        searchable.search("q", vector=[0.1])
+        searchable.search("q", vector=[0.1])
+
+        assert searchable.client.search.call_count == 2
+
+    def test_query_vector_with_embedding_cached(self, searchable):
+        """Test a vector supplied along with the embedding that produced it is served from the cache."""
+        embedding = _embedder()
+        first = searchable.search("q", vector=[0.1], embedding=embedding, mode="dense")
+        second = searchable.search("q", embedding=embedding, mode="dense")
+
+        assert second == first
+        searchable.client.search.assert_called_once()
+        embedding.embed_query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_async_query_vector_with_embedding_cached(self, searchable):
+        """Test the async search also caches searches given the query vector and its embedding."""
+        embedding = _embedder()
+        requests = []
+        _async_transport(searchable, lambda r: (200, {"rag_test": {"mappings": {}}}), requests)
+        first = searchable.search("q", embedding=embedding, mode="dense")
+
+        second = await searchable.search_async("q", vector=[0.1], embedding=embedding, mode="dense")
+
+        assert second == first
+        assert [(r.method, r.url.path) for r in requests] == [("GET", "/rag_test/_mapping")]
+
+
+@pytest.mark.unit
+class TestIndexProfiles:
+    """Tests for selectable k-NN index profiles."""
+
+    def _created_field(self, store):
+        store.client.indices.exists.return_value = False
+        store._setup_index(768)
+        return store.client.indices.create.call_args[1]["body"]["mappings"]["properties"]["embedding"]
+
+    def _profile(self, batch_settings, name):
+        batch_settings.index_profile = name
+        batch_settings.index_hnsw_m = 24
+        batch_settings.index_hnsw_ef_construction = 128
+        batch_settings.index_ef_search = 100
+
+    def test_default_profile_keeps_lucene_fp32_mapping(self, store, batch_settings):
+        """Test the default profile creates the float32 Lucene HNSW mapping."""
+        self._profile(batch_settings, "lucene_fp32")
+        field = self._created_field(store)
+
+        assert field == {
+            "type": "knn_vector",
+            "dimension": 768,
+            "method": {
+                "name": "hnsw",
+                "space_type": "cosinesimil",
+                "engine": "lucene",
+                "parameters": {"ef_construction": 128, "m": 24},
+            },
+        }
+
+    def test_faiss_fp16_profile(self, store, batch_settings):
+        """Test the fp16 profile uses faiss with a scalar-quantization encoder."""
+        self._profile(batch_settings, "faiss_fp16")
+        method = self._created_field(store)["method"]
+
+        assert method["engine"] == "faiss"
+        assert method["parameters"]["encoder"] == {"name": "sq", "parameters": {"type": "fp16"}}
+
+    def test_byte_profile_quantizes_in_lucene(self, store, batch_settings):
+        """Test the byte profile keeps float vectors and lets Lucene quantize them."""
+        self._profile(batch_settings, "lucene_byte")
+        field = self._created_field(store)
+
+        assert "data_type" not in field
+        assert field["method"]["parameters"]["encoder"] == {"name": "sq"}
+
+    def test_on_disk_profile(self, store, batch_settings):
+        """Test the on-disk profile sets the k-NN mode instead of a method."""
+        self._profile(batch_settings, "on_disk")
+        field = self._created_field(store)
+
+        assert field["mode"] == "on_disk"
+        assert "method" not in field
+
+    def test_profile_rejected_on_old_cluster(self, store, batch_settings):
+        """Test index creation fails clearly when the cluster is too old for the profile."""
+        self._profile(batch_settings, "on_disk")
+        store.client.info.return_value = {"version": {"number": "2.11.0"}}
+
+        with pytest.raises(ValueError, match="requires OpenSearch 2.19"):
+            self._created_field(store)
+        store.client.indices.create.assert_not_called()
+
+    def test_dimension_limit_validated(self, store, batch_settings):
+        """Test vectors beyond the engine dimension limit are rejected before creation."""
+        self._profile(batch_settings, "lucene_fp32")
+        store.client.indices.exists.return_value = False
+
+        with pytest.raises(ValueError, match="16000 dimensions"):
+            store._setup_index(20000)
@@ -0,0 +1,279 @@
+"""
+Unit tests for common/reranker_utils.py module.
+
+Tests cover batched reranking on the shared sync and async clients, token-bounded batch
+planning, the per-document fallback on partial failure and the rerank score
+cache.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import common.rerank_cache as rerank_cache
+import common.reranker_utils as reranker_utils
+from common.rerank_cache import RerankCache, last_rerank_lookup
+from common.reranker_utils import cascade_prune, get_rerank_client, rerank_documents, rerank_documents_async
+
+
+def _response(scores):
+    """Build a rerank response from (index, score) pairs."""
+    return SimpleNamespace(results=[SimpleNamespace(index=i, relevance_score=s) for i, s in scores])
+
+
+def _docs(*texts):
+    return [{"page_content": t, "id": n} for n, t in enumerate(texts)]
+
+
+@pytest.fixture(autouse=True)
+def fresh_rerank_cache():
+    """Start every test with an empty process-wide score cache."""
+    with patch.object(rerank_cache, "_rerank_cache", None):
+        yield
+
+
+@pytest.fixture
+def client():
+    """A fake reranker client returned for every endpoint."""
+    client = Mock()
+    with patch.object(reranker_utils, "get_rerank_client", return_value=client):
+        yield client
+
+
+@pytest.mark.unit
+class TestRerankDocuments:
+    """Tests for batched reranking."""
+
+    def test_single_request_maps_scores_back(self, client):
+        """Test all documents are scored in one request and sorted by the returned scores."""
+        client.rerank.return_value = _response([(2, 0.9), (0, 0.5), (1, 0.1)])
+
+        result = rerank_documents("q", _docs("a", "b", "c"), "model", "http://rerank")
+
+        assert client.rerank.call_count == 1
+        assert client.rerank.call_args.kwargs["documents"] == ["a", "b", "c"]
+        assert [(d["id"], s) for d, s in result] == [(2, 0.9), (0, 0.5), (1, 0.1)]
+
+    def test_empty_documents_skip_request(self, client):
+        """Test documents without page_content score 0.0 and are not sent."""
+        client.rerank.return_value = _response([(0, 0.7)])
+
+        result = rerank_documents("q", _docs("", "b"), "model", "http://rerank")
+
+        assert client.rerank.call_args.kwargs["documents"] == ["b"]
+        assert [(d["id"], s) for d, s in result] == [(1, 0.7), (0, 0.0)]
+        assert rerank_documents("q", [], "model", "http://rerank") == []
+
+    def test_batches_bounded_by_document_count(self, client):
+        """Test documents are split into requests of at most batch_max_documents."""
+        client.rerank.side_effect = lambda **kw: _response([(i, 0.5) for i in range(len(kw["documents"]))])
+
+        with patch.object(reranker_utils.settings.reranker, "batch_max_documents", 2):
+            result = rerank_documents("q", _docs("a", "b", "c", "d", "e"), "model", "http://rerank")
+
+        sizes = sorted(len(c.kwargs["documents"]) for c in client.rerank.call_args_list)
+        assert sizes == [1, 2, 2]
+        assert len(result) == 5
+
+    def test_batches_bounded_by_token_budget(self):
+        """Test long documents start a new batch once the token budget is used up."""
+        texts = ["x" * 400, "y" * 400, "z" * 400]
+
+        with patch.object(reranker_utils.settings.reranker, "batch_max_tokens", 250):
+            batches = reranker_utils._plan_batches("query", [0, 1, 2], texts)
+
+        assert batches == [[0, 1], [2]]
+
+    def test_missing_results_scored_individually(self, client):
+        """Test documents absent from a batched response fall back to single-document requests."""
+        def rerank(**kwargs):
+            if len(kwargs["documents"]) > 1:
+                return _response([(0, 0.4)])
+            return _response([(0, 0.8)])
+        client.rerank.side_effect = rerank
+
+        result = rerank_documents("q", _docs("a", "b"), "model", "http://rerank")
+
+        assert client.rerank.call_count == 2
+        assert client.rerank.call_args.kwargs["documents"] == ["b"]
+        assert [(d["id"], s) for d, s in result] == [(1, 0.8), (0, 0.4)]
+
+    def test_failed_batch_scored_individually(self, client):
+        """Test a failed batched request falls back to one request per document."""
+        def rerank(**kwargs):
+            if len(kwargs["documents"]) > 1:
+                raise ValueError("batch rejected")
+            if kwargs["documents"] == ["b"]:
+                raise ValueError("document rejected")
+            return _response([(0, 0.6)])
+        client.rerank.side_effect = rerank
+
+        result = rerank_documents("q", _docs("a", "b"), "model", "http://rerank")
+
+        assert client.rerank.call_count == 3
+        assert [(d["id"], s) for d, s in result] == [(0, 0.6), (1, 0.0)]
+
+
+@pytest.mark.unit
+class TestRerankDocumentsAsync:
+    """Tests for batched reranking on the async client."""
+
+    @pytest.fixture
+    def async_client(self):
+        """A fake async reranker client returned for every endpoint."""
+        client = Mock()
+        client.rerank = AsyncMock()
+        with patch.object(reranker_utils, "get_async_rerank_client", return_value=client):
+            yield client
+
+    @pytest.mark.asyncio
+    async def test_batches_sent_concurrently(self, async_client):
+        """Test every batch is awaited and the scores match the sync path's ordering."""
+        async_client.rerank.side_effect = lambda **kw: _response(
+            [(i, 0.1 * len(t)) for i, t in enumerate(kw["documents"])]
+        )
+
+        with patch.object(reranker_utils.settings.reranker, "batch_max_documents", 2):
+            result = await rerank_documents_async("q", _docs("a", "bbb", "cc"), "model", "http://rerank")
+
+        assert async_client.rerank.await_count == 2
+        assert [d["id"] for d, _ in result] == [1, 2, 0]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_scored_individually(self, async_client):
+        """Test a failed batch falls back to single-document requests, scoring failures 0.0."""
+        def rerank(**kwargs):
+            if len(kwargs["documents"]) > 1 or kwargs["documents"] == ["b"]:
+                raise ValueError("rejected")
+            return _response([(0, 0.6)])
+        async_client.rerank.side_effect = rerank
+
+        result = await rerank_documents_async("q", _docs("a", "b"), "model", "http://rerank")
+
+        assert [(d["id"], s) for d, s in result] == [(0, 0.6), (1, 0.0)]
+        assert rerank_cache.get_rerank_cache().stats()["entries"] == 1
+
+
+@pytest.mark.unit
+class TestCascadePrune:
+    """Tests for cheap candidate pruning."""
+
+    def test_keeps_best_cheap_scores(self):
+        """Test lexical overlap lifts a candidate over a better retrieval score."""
+        docs = _docs("bread recipes", "solar panel output", "wind farms")
+
+        kept, scores = cascade_prune("solar panel", docs, [0.9, 0.7, 0.5], keep=2)
+
+        assert [d["id"] for d in kept] == [1, 0]
+        assert scores == [0.7, 0.9]
+
+    def test_min_relative_score_drops_weak_candidates(self):
+        """Test candidates far below the best cheap score are dropped, down to min_keep."""
+        docs = _docs("solar panel output", "bread", "flour", "yeast")
+        retrieval = [0.9, 0.1, 0.1, 0.1]
+
+        kept, _ = cascade_prune("solar panel", docs, retrieval, keep=4, min_relative_score=0.5)
+        assert [d["id"] for d in kept] == [0]
+
+        kept, _ = cascade_prune("solar panel", docs, retrieval, keep=4, min_keep=2, min_relative_score=0.5)
+        assert len(kept) == 2
+
+    def test_no_candidates(self):
+        """Test an empty candidate list is returned unchanged."""
+        assert cascade_prune("q", [], [], keep=3) == ([], [])
+
+
+@pytest.mark.unit
+class TestRerankClient:
+    """Tests for the shared reranker client."""
+
+    def test_client_reused_per_endpoint(self):
+        """Test the same endpoint reuses one client and another endpoint gets its own."""
+        with patch.dict(reranker_utils._clients, clear=True):
+            first = get_rerank_client("http://rerank-a")
+
+            assert get_rerank_client("http://rerank-a") is first
+            assert get_rerank_client("http://rerank-b") is not first
+
+
+@pytest.mark.unit
+class TestRerankCache:
+    """Tests for the rerank score cache."""
+
+    def test_repeated_rerank_served_from_cache(self, client):
+        """Test a repeated query only sends chunks without a cached score to the reranker."""
+        client.rerank.side_effect = lambda **kw: _response([(i, 0.5 + i / 10) for i in range(len(kw["documents"]))])
+        docs = [{"page_content": t, "chunk_id": n} for n, t in enumerate(["a", "b", "c"])]
+
+        first = rerank_documents("what is a", docs[:2], "model", "http://rerank")
+        assert last_rerank_lookup() == (0, 2)
+
+        second = rerank_documents("What  is A", docs, "model", "http://rerank")
+
+        assert last_rerank_lookup() == (2, 1)
+        assert client.rerank.call_count == 2
+        assert client.rerank.call_args.kwargs["documents"] == ["c"]
+        assert [(d["chunk_id"], s) for d, s in first] == [(1, 0.6), (0, 0.5)]
+        assert dict((d["chunk_id"], s) for d, s in second) == {0: 0.5, 1: 0.6, 2: 0.5}
+
+    def test_all_cached_skips_reranker(self, client):
+        """Test a fully cached rerank makes no request."""
+        client.rerank.return_value = _response([(0, 0.9)])
+        docs = [{"page_content": "a", "chunk_id": 1}]
+
+        rerank_documents("q", docs, "model", "http://rerank")
+        result = rerank_documents("q", docs, "model", "http://rerank")
+
+        assert client.rerank.call_count == 1
+        assert result[0][1] == 0.9
+
+    def test_failed_scores_not_cached(self, client):
+        """Test fallback scores of failed requests are retried on the next rerank."""
+        client.rerank.side_effect = ValueError("down")
+        docs = [{"page_content": "a", "chunk_id": 1}]
+
+        rerank_documents("q", docs, "model", "http://rerank")
+
+        assert rerank_cache.get_rerank_cache().stats()["entries"] == 0
+
+    def test_model_is_part_of_key(self):
+        """Test scores of one reranker model are not served for another."""
+        cache = RerankCache(max_entries=10, ttl_seconds=60)
+        docs = [{"page_content": "a", "chunk_id": 1}]
+        cache.put_many("model-a", "q", docs, [0.3])
+
+        assert cache.get_many("model-a", "q", docs) == {0: 0.3}
+        assert cache.get_many("model-b", "q", docs) == {}
+
+    def test_ttl_expiry(self):
+        """Test scores are not served after the TTL."""
+        cache = RerankCache(max_entries=10, ttl_seconds=60)
+        docs = [{"page_content": "a", "chunk_id": 1}]
+
+        with patch("common.rerank_cache.time.monotonic", return_value=100.0):
+            cache.put_many("m", "q", docs, [0.3])
+        with patch("common.rerank_cache.time.monotonic", return_value=200.0):
+            assert cache.get_many("m", "q", docs) == {}
+
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction(self):
+        """Test the least recently used score is evicted at the entry bound."""
+        cache = RerankCache(max_entries=2, ttl_seconds=60)
+        docs = [{"page_content": t, "chunk_id": n} for n, t in enumerate("abc")]
+        cache.put_many("m", "q", docs[:2], [0.1, 0.2])
+        cache.get_many("m", "q", docs[:1])
+
+        cache.put_many("m", "q", docs[2:], [0.3])
+
+        assert cache.get_many("m", "q", docs) == {0: 0.1, 2: 0.3}
+        assert cache.stats()["evictions"] == 1
+
+    def test_scores_keyed_by_chunk_id(self):
+        """Test scores are keyed by chunk_id, and by text only for chunks without one."""
+        cache = RerankCache(max_entries=10, ttl_seconds=60)
+        cache.put_many("m", "q", [{"page_content": "a", "chunk_id": 1}, {"page_content": "b"}], [0.1, 0.2])
+
+        # A changed chunk is indexed under a new chunk_id and gets no stale score
+        assert cache.get_many("m", "q", [{"page_content": "a", "chunk_id": 2}]) == {}
+        assert cache.get_many("m", "q", [{"page_content": "b"}, {"page_content": "x", "chunk_id": 1}]) == {0: 0.2, 1: 0.1}
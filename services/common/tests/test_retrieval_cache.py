@@ -0,0 +1,85 @@
+"""
+Unit tests for common/retrieval_cache.py module.
+
+Tests cover key normalization, generation-based invalidation, the memory cap
+and reporting of the last lookup outcome.
+"""
+
+import pytest
+
+from common.retrieval_cache import RetrievalCache, last_lookup_hit, reset_last_lookup
+
+
+def _results(*texts):
+    return [{"chunk_id": i, "page_content": t, "filename": "f.pdf"} for i, t in enumerate(texts)]
+
+
+@pytest.mark.unit
+class TestRetrievalCache:
+    """Tests for the search result cache."""
+
+    def test_normalized_queries_share_a_key(self):
+        """Test queries differing only in case and whitespace hit the same entry."""
+        assert RetrievalCache.make_key("  How do I  reset? ", "dense", 5, "en", None) == \
+            RetrievalCache.make_key("how do i reset?", "dense", 5, "en", "")
+
+    def test_key_includes_search_parameters(self):
+        """Test mode, top_k, language and doc filter are part of the key."""
+        base = RetrievalCache.make_key("q", "dense", 5, "en", None)
+        assert base != RetrievalCache.make_key("q", "hybrid", 5, "en", None)
+        assert base != RetrievalCache.make_key("q", "dense", 10, "en", None)
+        assert base != RetrievalCache.make_key("q", "dense", 5, "de", None)
+        assert base != RetrievalCache.make_key("q", "dense", 5, "en", "doc-1")
+
+    def test_hit_returns_copy(self):
+        """Test cached results cannot be modified through a returned copy."""
+        cache = RetrievalCache(max_bytes=1024 * 1024)
+        key = cache.make_key("q", "dense", 5, "en", None)
+        cache.put("idx", (1, 0, None), key, _results("a"))
+
+        first = cache.get("idx", (1, 0, None), key)
+        first[0]["filename"] = "changed"
+
+        assert cache.get("idx", (1, 0, None), key)[0]["filename"] == "f.pdf"
+        assert cache.stats()["hits"] == 2
+
+    def test_new_generation_drops_index_entries(self):
+        """Test a generation change invalidates only that index's entries."""
+        cache = RetrievalCache(max_bytes=1024 * 1024)
+        key = cache.make_key("q", "dense", 5, "en", None)
+        cache.put("idx", (1, 0, None), key, _results("a"))
+        cache.put("other", (1, 0, None), key, _results("b"))
+
+        assert cache.get("idx", (1, 1, None), key) is None
+        assert cache.get("other", (1, 0, None), key) is not None
+        assert cache.stats()["entries"] == 1
+        assert cache.stats()["invalidations"] == 1
+
+    def test_memory_cap_evicts_least_recently_used(self):
+        """Test entries are evicted once the memory cap is exceeded."""
+        cache = RetrievalCache(max_bytes=0)
+        entry_bytes = cache._entry_size(_results("x" * 100))
+        cache.max_bytes = 2 * entry_bytes
+        keys = [cache.make_key(str(i), "dense", 5, "en", None) for i in range(3)]
+        for key in keys[:2]:
+            cache.put("idx", (1, 0, None), key, _results("x" * 100))
+        cache.get("idx", (1, 0, None), keys[0])
+        cache.put("idx", (1, 0, None), keys[2], _results("x" * 100))
+
+        assert cache.get("idx", (1, 0, None), keys[1]) is None
+        assert cache.get("idx", (1, 0, None), keys[0]) is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    def test_last_lookup_reported(self):
+        """Test the outcome of the last lookup is available to the caller."""
+        cache = RetrievalCache(max_bytes=1024 * 1024)
+        key = cache.make_key("q", "dense", 5, "en", None)
+        reset_last_lookup()
+        assert last_lookup_hit() is None
+
+        cache.get("idx", (1, 0, None), key)
+        assert last_lookup_hit() is False
+        cache.put("idx", (1, 0, None), key, _results("a"))
+        cache.get("idx", (1, 0, None), key)
+        assert last_lookup_hit() is True
@@ -0,0 +1,347 @@
+"""
+Unit tests for common/tokenizer_utils.py module.
+
+Tests cover backend resolution (http/local/auto), the parity check fallback and
+tokenize_with_llm dispatching to the resolved backend.
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+import common.tokenizer_utils as tokenizer_utils
+from common.tokenizer_utils import (
+    CachedTokenizer,
+    HTTPTokenizer,
+    LocalTokenizer,
+    TokenCache,
+    check_tokenizer_parity,
+    get_tokenizer,
+    reset_tokenizers,
+)
+
+LLM_ENDPOINT = "http://llm:8000"
+
+
+@pytest.fixture(autouse=True)
+def clear_tokenizer_cache():
+    """Ensure every test resolves backends from scratch."""
+    reset_tokenizers()
+    yield
+    reset_tokenizers()
+
+
+@pytest.fixture
+def tokenizer_file(tmp_path):
+    """Write a whitespace word-level tokenizer.json and return its directory."""
+    tokenizer = Tokenizer(WordLevel({"[UNK]": 0}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.save(str(tmp_path / "tokenizer.json"))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def tokenizer_settings(tokenizer_file):
+    """Patch tokenizer settings so the LLM endpoint maps to the test tokenizer."""
+    with patch.object(tokenizer_utils, "settings") as mock_settings:
+        mock_settings.llm.endpoint = LLM_ENDPOINT
+        mock_settings.embedding.endpoint = "http://emb:8000"
+        mock_settings.tokenizer.backend = "auto"
+        mock_settings.tokenizer.llm_path = tokenizer_file
+        mock_settings.tokenizer.emb_path = ""
+        mock_settings.tokenizer.parity_check = True
+        mock_settings.tokenizer.parity_retry_seconds = 60.0
+        mock_settings.tokenizer.cache_enabled = False
+        yield mock_settings
+
+
+@pytest.fixture
+def matching_http(tokenizer_file):
+    """Patch the HTTP backend to return the same tokens as the local tokenizer."""
+    reference = LocalTokenizer(tokenizer_file)
+    with patch.object(HTTPTokenizer, "encode", lambda self, text: reference.encode(text)):
+        yield
+
+
+@pytest.mark.unit
+class TestLocalTokenizer:
+    """Tests for the in-process tokenizer backend."""
+
+    def test_loads_from_directory(self, tokenizer_file):
+        """Test tokenizer.json is found inside a directory."""
+        tok = LocalTokenizer(tokenizer_file)
+        assert tok.count("hello world again") == 3
+
+    def test_missing_file_raises(self, tmp_path):
+        """Test FileNotFoundError when no tokenizer.json exists."""
+        with pytest.raises(FileNotFoundError):
+            LocalTokenizer(str(tmp_path))
+
+
+@pytest.mark.unit
+class TestGetTokenizer:
+    """Tests for backend resolution."""
+
+    def test_http_backend_when_no_path(self, tokenizer_settings):
+        """Test endpoints without tokenizer files use the HTTP backend."""
+        assert isinstance(get_tokenizer("http://other:8000"), HTTPTokenizer)
+
+    def test_local_backend_when_parity_matches(self, tokenizer_settings, matching_http):
+        """Test local tokenizer is used once its counts match the endpoint."""
+        backend = get_tokenizer(LLM_ENDPOINT)
+        assert isinstance(backend, LocalTokenizer)
+
+    def test_falls_back_to_http_on_parity_mismatch(self, tokenizer_settings):
+        """Test HTTP backend is kept when counts differ."""
+        with patch.object(HTTPTokenizer, "encode", return_value=[1]):
+            backend = get_tokenizer(LLM_ENDPOINT)
+        assert isinstance(backend, HTTPTokenizer)
+
+    def test_strict_local_raises_on_parity_mismatch(self, tokenizer_settings):
+        """Test 'local' backend refuses a mismatching tokenizer."""
+        tokenizer_settings.tokenizer.backend = "local"
+        with patch.object(HTTPTokenizer, "encode", return_value=[1]):
+            with pytest.raises(RuntimeError):
+                get_tokenizer(LLM_ENDPOINT)
+
+    def test_unreachable_endpoint_not_verified(self, tokenizer_settings, tokenizer_file):
+        """Test a parity check that cannot run uses HTTP until a later check passes."""
+        reference = LocalTokenizer(tokenizer_file)
+        with patch.object(HTTPTokenizer, "encode", side_effect=ConnectionError("down")):
+            assert isinstance(get_tokenizer(LLM_ENDPOINT), HTTPTokenizer)
+
+        with patch.object(HTTPTokenizer, "encode", lambda self, text: reference.encode(text)):
+            # Not re-checked before the retry delay
+            assert isinstance(get_tokenizer(LLM_ENDPOINT), HTTPTokenizer)
+            with patch("common.tokenizer_utils.time.monotonic", return_value=tokenizer_utils.time.monotonic() + 61):
+                assert isinstance(get_tokenizer(LLM_ENDPOINT), LocalTokenizer)
+
+    def test_strict_local_raises_when_check_cannot_run(self, tokenizer_settings):
+        """Test 'local' backend refuses a tokenizer it could not verify."""
+        tokenizer_settings.tokenizer.backend = "local"
+        with patch.object(HTTPTokenizer, "encode", side_effect=ConnectionError("down")):
+            with pytest.raises(RuntimeError, match="could not run"):
+                get_tokenizer(LLM_ENDPOINT)
+
+    def test_http_backend_forced(self, tokenizer_settings):
+        """Test 'http' backend ignores configured tokenizer files."""
+        tokenizer_settings.tokenizer.backend = "http"
+        assert isinstance(get_tokenizer(LLM_ENDPOINT), HTTPTokenizer)
+
+    def test_backend_resolved_once(self, tokenizer_settings, matching_http):
+        """Test backends are cached per endpoint."""
+        first = get_tokenizer(LLM_ENDPOINT)
+        assert get_tokenizer(LLM_ENDPOINT) is first
+
+
+@pytest.mark.unit
+class TestParityAndDispatch:
+    """Tests for check_tokenizer_parity and tokenize_with_llm."""
+
+    def test_parity_check(self):
+        """Test parity check compares counts sample by sample."""
+        a, b = Mock(name="a"), Mock(name="b")
+        a.count.side_effect = [3, 4]
+        b.count.side_effect = [3, 5]
+        assert check_tokenizer_parity(a, b, samples=("x", "y")) is False
+
+    def test_tokenize_with_llm_uses_resolved_backend(self, tokenizer_settings, tokenizer_file):
+        """Test tokenize_with_llm keeps its signature and dispatches locally."""
+        from common.llm_utils import tokenize_with_llm
+
+        reference = LocalTokenizer(tokenizer_file)
+        with patch.object(HTTPTokenizer, "encode", lambda self, text: reference.encode(text)):
+            get_tokenizer(LLM_ENDPOINT)
+        with patch.object(HTTPTokenizer, "encode", side_effect=AssertionError("HTTP called")):
+            assert len(tokenize_with_llm("one two three", LLM_ENDPOINT)) == 3
+
+
+@pytest.mark.unit
+class TestTokenizeMany:
+    """Tests for batched tokenization."""
+
+    def test_http_counts_returned_in_input_order(self):
+        """Test pipelined /tokenize requests keep input order."""
+        import time
+        from common.llm_utils import tokenize_many
+
+        def slow_encode(self, text):
+            # Longer texts finish first to shuffle completion order
+            time.sleep(0.01 * (5 - len(text.split())))
+            return list(range(len(text.split())))
+
+        texts = ["a", "a b", "a b c", "a b c d"]
+        with patch.object(HTTPTokenizer, "encode", slow_encode):
+            assert tokenize_many(texts, "http://other:8000", max_concurrency=4) == [1, 2, 3, 4]
+
+    def test_empty_input(self):
+        """Test no tokenizer call is made for an empty batch."""
+        from common.llm_utils import tokenize_many
+
+        with patch.object(HTTPTokenizer, "encode", side_effect=AssertionError("HTTP called")):
+            assert tokenize_many([], "http://other:8000") == []
+
+    def test_local_batch(self, tokenizer_file):
+        """Test the local backend counts a batch with encode_batch."""
+        tok = LocalTokenizer(tokenizer_file)
+        assert tok.count_many(["one", "one two", ""]) == [1, 2, 0]
+
+
+@pytest.mark.unit
+class TestTokenCache:
+    """Tests for the content-addressed token cache."""
+
+    def test_hits_and_misses_counted(self):
+        """Test repeated texts are served from the cache."""
+        backend = Mock()
+        backend.name = "http"
+        backend.encode.return_value = [1, 2, 3]
+        cache = TokenCache(max_bytes=1024 * 1024)
+        tok = CachedTokenizer(backend, cache, "http://llm:8000")
+
+        assert tok.encode("system prompt") == [1, 2, 3]
+        assert tok.encode("system prompt") == [1, 2, 3]
+
+        backend.encode.assert_called_once_with("system prompt")
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_keys_include_endpoint(self):
+        """Test the same text for different models is cached separately."""
+        cache = TokenCache(max_bytes=1024 * 1024)
+        cache.put(cache.make_key("http://llm:8000", "text"), [1, 2])
+        assert cache.get(cache.make_key("http://emb:8000", "text")) is None
+
+    def test_memory_cap_evicts_least_recently_used(self):
+        """Test entries are evicted once the memory cap is exceeded."""
+        entry_bytes = 10 * 4 + TokenCache._ENTRY_OVERHEAD_BYTES
+        cache = TokenCache(max_bytes=2 * entry_bytes)
+        keys = [cache.make_key("e", str(i)) for i in range(3)]
+        cache.put(keys[0], list(range(10)))
+        cache.put(keys[1], list(range(10)))
+        cache.get(keys[0])
+        cache.put(keys[2], list(range(10)))
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    def test_entries_persist_to_disk(self, tmp_path):
+        """Test a new cache instance reads entries written by another one."""
+        path = str(tmp_path / "token_cache.sqlite")
+        key = TokenCache.make_key("http://llm:8000", "boilerplate")
+        writer = TokenCache(max_bytes=1024, path=path)
+        writer.put(key, [7, 8, 9])
+        writer.flush()
+
+        assert TokenCache(max_bytes=1024, path=path).get(key) == [7, 8, 9]
+
+    def test_disk_writes_are_batched(self, tmp_path):
+        """Test puts are committed in batches rather than one transaction each."""
+        path = str(tmp_path / "token_cache.sqlite")
+        cache = TokenCache(max_bytes=1024 * 1024, path=path)
+        reader = TokenCache(max_bytes=1024 * 1024, path=path)
+        keys = [cache.make_key("e", str(i)) for i in range(TokenCache._FLUSH_ROWS)]
+        for key in keys[:-1]:
+            cache.put(key, [1])
+
+        assert cache.get(keys[0]) == [1]
+        assert reader.get(keys[0]) is None
+
+        cache.put(keys[-1], [1])
+        assert reader.get_many(keys) == [[1]] * len(keys)
+
+    def test_keys_include_model(self, tokenizer_settings, tokenizer_file):
+        """Test persisted entries are not shared after the model behind an endpoint changes."""
+        tokenizer_settings.tokenizer.backend = "http"
+        tokenizer_settings.tokenizer.cache_enabled = True
+        tokenizer_settings.tokenizer.cache_max_bytes = 1024 * 1024
+        tokenizer_settings.tokenizer.cache_persist = False
+        tokenizer_settings.llm.model = "model-a"
+        with patch.object(HTTPTokenizer, "encode", return_value=[1, 2]):
+            get_tokenizer(LLM_ENDPOINT).encode("text")
+
+        tokenizer_settings.llm.model = "model-b"
+        tokenizer_utils._tokenizer_backends.clear()
+        with patch.object(HTTPTokenizer, "encode", return_value=[3]) as encode:
+            assert get_tokenizer(LLM_ENDPOINT).encode("text") == [3]
+        encode.assert_called_once()
+
+    def test_encode_many_only_tokenizes_misses(self):
+        """Test batched calls send only uncached texts to the backend."""
+        backend = Mock()
+        backend.name = "http"
+        backend.encode_many.side_effect = lambda texts, max_concurrency=1: [[0] * len(t) for t in texts]
+        tok = CachedTokenizer(backend, TokenCache(max_bytes=1024 * 1024), "http://llm:8000")
+        tok.encode_many(["aa", "bbb"])
+
+        assert tok.count_many(["aa", "c", "bbb"]) == [2, 1, 3]
+        backend.encode_many.assert_called_with(["c"], max_concurrency=1)
+
+
+@pytest.mark.unit
+class TestTruncateTextToTokenLimit:
+    """Tests for single-pass truncation at token boundaries."""
+
+    def test_local_cut_at_token_offset(self, tokenizer_file):
+        """Test the local backend cuts exactly after the n-th token."""
+        tok = LocalTokenizer(tokenizer_file)
+        text = "alpha beta gamma delta"
+        assert tok.token_prefix(text, tok.encode(text), 2) == "alpha beta"
+
+    def test_http_uses_single_detokenize_call(self):
+        """Test pre-computed tokens cost exactly one /detokenize request."""
+        from common.llm_utils import truncate_text_to_token_limit
+
+        text = "word " * 200
+        response = Mock()
+        response.json.return_value = {"prompt": "word " * 50}
+        session = Mock()
+        session.post.return_value = response
+
+        with patch("common.misc_utils.SESSION", session), \
+             patch.object(tokenizer_utils, "get_token_cache", return_value=None):
+            result = truncate_text_to_token_limit(text, 50, "http://other:8000", tokens=list(range(200)))
+
+        session.post.assert_called_once()
+        assert session.post.call_args[0][0] == "http://other:8000/detokenize"
+        assert session.post.call_args[1]["json"] == {"tokens": list(range(50))}
+        assert text.startswith(result)
+        assert result.split() == ["word"] * 50
+
+    def test_http_strips_rendered_special_tokens(self):
+        """Test a BOS token rendered by /detokenize is aligned away."""
+        backend = HTTPTokenizer("http://other:8000")
+        with patch.object(HTTPTokenizer, "decode", return_value="<s> Hello there"):
+            assert backend.token_prefix("Hello there friend", [1, 2, 3], 3) == "Hello there"
+
+    def test_falls_back_to_estimate_when_unmappable(self):
+        """Test the character estimate is used when tokens cannot be mapped back."""
+        from common.llm_utils import truncate_text_to_token_limit
+
+        with patch.object(HTTPTokenizer, "decode", return_value="something else"), \
+             patch("common.llm_utils.tokenize_with_llm", return_value=list(range(9))) as tokenize, \
+             patch.object(tokenizer_utils, "get_token_cache", return_value=None):
+            result = truncate_text_to_token_limit("abcdefghij" * 10, 10, "http://other:8000", tokens=list(range(100)))
+
+        assert result == ("abcdefghij" * 10)[:9]
+        tokenize.assert_called_once_with(result, "http://other:8000")
+
+    def test_estimate_shrunk_when_over_limit(self):
+        """Test a character estimate that still exceeds the limit is shrunk once."""
+        from common.llm_utils import truncate_text_to_token_limit
+
+        text = "abcdefghij" * 100
+        with patch.object(HTTPTokenizer, "decode", return_value="something else"), \
+             patch("common.llm_utils.tokenize_with_llm", return_value=list(range(90))) as tokenize, \
+             patch.object(tokenizer_utils, "get_token_cache", return_value=None):
+            result = truncate_text_to_token_limit(text, 50, "http://other:8000", tokens=list(range(100)))
+
+        # 10 characters per token: the 450-character estimate holds 90 tokens, keep 450 * 50 / 90 * 0.9
+        assert result == text[:225]
+        tokenize.assert_called_once()
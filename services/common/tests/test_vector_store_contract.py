@@ -0,0 +1,298 @@
+"""
+Contract tests shared by the VectorStore backends.
+
+Every backend must behave the same for insert, upsert, search in each mode,
+language filtering, deletes and search_many. The local store runs against a
+temporary directory; the OpenSearch store runs only when
+VECTOR_STORE_CONTRACT_OPENSEARCH is set and a cluster is reachable with the
+regular OpenSearch settings.
+"""
+
+import os
+import uuid
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+import common.opensearch as opensearch
+import common.retrieval_cache as retrieval_cache
+from common.local_vector_store import LocalVectorStore
+from common.vector_db import VectorStoreNotReadyError
+
+DIM = 8
+
+
+def _vector(i):
+    """Unit basis-like vector for chunk i, so dense search is unambiguous."""
+    v = np.full(DIM, 0.01, dtype=np.float32)
+    v[i % DIM] = 1.0
+    return v / np.linalg.norm(v)
+
+
+class FakeEmbedding:
+    """Embedding stand-in mapping texts to fixed vectors."""
+
+    emb_model = "fake"
+
+    def __init__(self, vectors):
+        """Store the text-to-vector map."""
+        self.vectors = vectors
+        self.calls = []
+
+    def embed_documents(self, texts):
+        """Return one vector per text."""
+        self.calls.append(list(texts))
+        return [self.vectors[t] for t in texts]
+
+    def embed_query(self, text):
+        """Return the vector of one text."""
+        return self.vectors[text]
+
+
+def _chunks():
+    return [
+        {"page_content": "solar panels convert sunlight", "filename": "energy.pdf", "doc_id": "doc-1",
+         "type": "text", "source": "energy.pdf", "language": "en", "page_number": 1},
+        {"page_content": "wind turbines spin generators", "filename": "energy.pdf", "doc_id": "doc-1",
+         "type": "text", "source": "energy.pdf", "language": "en", "page_number": 2},
+        {"page_content": "bread needs flour and yeast", "filename": "food.pdf", "doc_id": "doc-2",
+         "type": "text", "source": "food.pdf", "language": "en"},
+        {"page_content": "solarzellen wandeln sonnenlicht um", "filename": "energie.pdf", "doc_id": "doc-3",
+         "type": "text", "source": "energie.pdf", "language": "de"},
+    ]
+
+
+def _vectors():
+    return [_vector(i) for i in range(len(_chunks()))]
+
+
+@pytest.fixture(params=[
+    "local",
+    pytest.param("opensearch", marks=[
+        pytest.mark.integration,
+        pytest.mark.skipif(not os.getenv("VECTOR_STORE_CONTRACT_OPENSEARCH"), reason="needs an OpenSearch cluster"),
+    ]),
+])
+def store(request, tmp_path):
+    """An empty store of each backend."""
+    if request.param == "local":
+        yield LocalVectorStore(str(tmp_path / "store"))
+        return
+
+    opensearch._index_states.clear()
+    opensearch._index_generations.clear()
+    retrieval_cache._retrieval_cache = None
+    with patch.object(opensearch.settings.vector_store, "opensearch_index_name", f"contract_{uuid.uuid4().hex}"):
+        s = opensearch.OpensearchVectorStore()
+    try:
+        yield s
+    finally:
+        s.client.indices.delete(index=s.index_name, ignore_unavailable=True)
+
+
+@pytest.mark.unit
+class TestVectorStoreContract:
+    """Test behavior every VectorStore backend must share."""
+
+    def test_empty_store(self, store):
+        """Test that an empty store is unpopulated and refuses searches."""
+        assert store.check_db_populated() is False
+        with pytest.raises(VectorStoreNotReadyError):
+            store.search("solar", vector=_vector(0))
+        assert store.delete_document_by_id("doc-1") == 0
+
+    def test_insert_and_dense_search(self, store):
+        """Test that dense search ranks the nearest chunk first with flattened search metadata only."""
+        assert store.insert_chunks(_chunks(), vectors=_vectors()) is True
+        assert store.check_db_populated() is True
+
+        results = store.search("anything", vector=_vector(1), top_k=2, mode="dense")
+
+        assert len(results) == 2
+        top = results[0]
+        assert top["page_content"] == "wind turbines spin generators"
+        assert top["doc_id"] == "doc-1"
+        assert top["page_number"] == 2
+        assert top["filename"] == "energy.pdf"
+        assert "text" not in top and "metadata" not in top
+        assert top["chunk_id"] == int(opensearch.generate_chunk_id("doc-1", top["page_content"]))
+        assert results[0]["score"] >= results[1]["score"]
+
+    def test_sparse_search_matches_keywords(self, store):
+        """Test that sparse search returns only chunks sharing query terms."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        results = store.search("Yeast FLOUR", vector=_vector(0), top_k=5, mode="sparse")
+
+        assert [r["doc_id"] for r in results] == ["doc-2"]
+
+    def test_hybrid_search_combines_modes(self, store):
+        """Test that hybrid search ranks a chunk matching both sub-queries first."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        results = store.search("solar panels", vector=_vector(0), top_k=3)
+
+        assert results[0]["page_content"] == "solar panels convert sunlight"
+        assert results[0]["score"] == pytest.approx(1.0)
+
+    def test_language_filter(self, store):
+        """Test that searches only return chunks in the requested language."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        german = store.search("solarzellen", vector=_vector(3), top_k=5, mode="dense", language="de")
+        english = store.search("solarzellen", vector=_vector(3), top_k=5, mode="dense", language="en")
+
+        assert [r["doc_id"] for r in german] == ["doc-3"]
+        assert all(r["language"] == "en" for r in english)
+
+    def test_reinsert_replaces_chunks(self, store):
+        """Test that inserting the same chunks again does not duplicate them."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        results = store.search("anything", vector=_vector(0), top_k=10, mode="dense")
+
+        assert len(results) == 3
+        assert len({r["chunk_id"] for r in results}) == 3
+
+    def test_delete_document_by_id(self, store):
+        """Test that deleting a document removes all of its chunks."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        assert store.delete_document_by_id("doc-1") == 2
+
+        results = store.search("solar panels", vector=_vector(0), top_k=10, mode="hybrid")
+        assert "doc-1" not in {r["doc_id"] for r in results}
+        assert store.delete_document_by_id("doc-1") == 0
+
+    def test_generation_changes_with_contents(self, store):
+        """Test that the generation is stable between writes and changes on insert and delete."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+        inserted = store.generation()
+
+        assert inserted is not None
+        assert store.generation() == inserted
+
+        store.delete_document_by_id("doc-1")
+        assert store.generation() != inserted
+
+    def test_remove_docs_from_index(self, store):
+        """Test that removing several documents returns the number of chunks deleted."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        assert store.remove_docs_from_index(["doc-1", "doc-3", "missing"]) == 3
+        assert store.remove_docs_from_index([]) == 0
+
+        results = store.search("anything", vector=_vector(2), top_k=10, mode="dense", language="")
+        assert [r["doc_id"] for r in results] == ["doc-2"]
+
+    def test_insert_and_search_with_embedding(self, store):
+        """Test that the embedding instance is used for both inserts and queries."""
+        vectors = {c["page_content"]: v for c, v in zip(_chunks(), _vectors())}
+        vectors["how is bread made"] = _vector(2)
+        embedding = FakeEmbedding(vectors)
+
+        store.insert_chunks(_chunks(), embedding=embedding, batch_size=3)
+        results = store.search("how is bread made", embedding=embedding, top_k=1, mode="dense")
+
+        assert [len(call) for call in embedding.calls] == [3, 1]
+        assert results[0]["doc_id"] == "doc-2"
+
+    def test_search_many(self, store):
+        """Test that search_many returns one result list per query in order."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        results = store.search_many(["wind", "bread"], vectors=[_vector(1), _vector(2)], top_k=1, mode="dense")
+
+        assert [r[0]["doc_id"] for r in results] == ["doc-1", "doc-2"]
+        assert results[0][0]["page_content"] == "wind turbines spin generators"
+
+    def test_invalid_mode(self, store):
+        """Test that an unknown search mode is rejected."""
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        with pytest.raises(ValueError):
+            store.search("solar", vector=_vector(0), mode="fuzzy")
+
+
+@pytest.mark.unit
+class TestLocalVectorStore:
+    """Test persistence and backend-specific behavior of LocalVectorStore."""
+
+    def test_reopen_restores_store(self, tmp_path):
+        """Test that a new instance over the same directory sees all live chunks."""
+        path = str(tmp_path / "store")
+        first = LocalVectorStore(path)
+        first.insert_chunks(_chunks(), vectors=_vectors())
+        first.delete_document_by_id("doc-2")
+
+        reopened = LocalVectorStore(path)
+
+        assert reopened.check_db_populated() is True
+        results = reopened.search("bread flour", vector=_vector(2), top_k=10, mode="hybrid", language="")
+        assert "doc-2" not in {r["doc_id"] for r in results}
+        assert len(results) == 3
+
+    def test_reader_sees_writes_of_other_instance(self, tmp_path):
+        """Test that an open instance reloads after another instance writes."""
+        path = str(tmp_path / "store")
+        reader = LocalVectorStore(path)
+        writer = LocalVectorStore(path)
+        assert reader.check_db_populated() is False
+
+        writer.insert_chunks(_chunks()[:2], vectors=_vectors()[:2])
+        assert [r["doc_id"] for r in reader.search("wind", vector=_vector(1), top_k=1, mode="sparse")] == ["doc-1"]
+
+        writer.delete_document_by_id("doc-1")
+        assert reader.search("wind", vector=_vector(1), top_k=1, mode="sparse") == []
+
+    def test_vector_file_grows(self, tmp_path):
+        """Test that inserting past the initial capacity keeps earlier vectors."""
+        store = LocalVectorStore(str(tmp_path / "store"))
+        chunks = [
+            {"page_content": f"chunk {i}", "filename": "big.pdf", "doc_id": "big", "language": "en"}
+            for i in range(1500)
+        ]
+        vectors = [_vector(i) for i in range(1500)]
+
+        store.insert_chunks(chunks[:10], vectors=vectors[:10])
+        store.insert_chunks(chunks[10:], vectors=vectors[10:])
+
+        results = store.search("chunk", vector=_vector(3), top_k=1, mode="dense")
+        assert results[0]["score"] == pytest.approx(1.0)
+
+    def test_dimension_mismatch(self, tmp_path):
+        """Test that vectors of another dimension are rejected without changing the store."""
+        store = LocalVectorStore(str(tmp_path / "store"))
+        store.insert_chunks(_chunks()[:1], vectors=_vectors()[:1])
+
+        with pytest.raises(ValueError):
+            store.insert_chunks(_chunks()[1:2], vectors=[np.ones(DIM + 1)])
+
+        assert len(store.search("x", vector=_vector(0), top_k=10, mode="dense")) == 1
+
+    def test_hnsw_search(self, tmp_path):
+        """Test that the HNSW index returns the same nearest chunk as exact search."""
+        pytest.importorskip("hnswlib")
+        store = LocalVectorStore(str(tmp_path / "store"))
+        store.insert_chunks(_chunks(), vectors=_vectors())
+
+        with patch.object(store, "_hnsw_search", wraps=store._hnsw_search) as hnsw_search, \
+                patch("common.local_vector_store.settings.vector_store.local_store_hnsw", True):
+            results = store.search("x", vector=_vector(1), top_k=1, mode="dense")
+
+        assert hnsw_search.called
+        assert results[0]["page_content"] == "wind turbines spin generators"
+
+    def test_selected_by_vector_store_type(self, tmp_path):
+        """Test that vector_store_type=LOCAL selects LocalVectorStore."""
+        from common.db_utils import get_vector_store
+
+        with patch("common.db_utils.settings") as mock_settings, \
+                patch("common.local_vector_store.settings.vector_store.local_store_dir", str(tmp_path / "store")):
+            mock_settings.vector_store.vector_store_type = "LOCAL"
+            store = get_vector_store()
+
+        assert isinstance(store, LocalVectorStore)
+        assert store.path == str(tmp_path / "store")
@@ -0,0 +1,657 @@
+"""
+Pluggable tokenizer backends used for token counting and encoding.
+
+Two backends are available:
+- HTTPTokenizer: POSTs to the model server's ``/tokenize`` endpoint (one round-trip per call).
+- LocalTokenizer: loads the model's ``tokenizer.json`` once per process and encodes in-process.
+
+``get_tokenizer(endpoint)`` resolves the backend for an endpoint according to
+``settings.tokenizer`` and caches it for the lifetime of the process. The HTTP
+backend is always the fallback when local tokenizer files are not configured,
+cannot be loaded, or do not produce the same counts as the endpoint.
+"""
+import atexit
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+
+from common.misc_utils import get_logger
+from common.retry_utils import retry_on_transient_error
+from common.settings import settings
+from common.thread_utils import ContextAwareThreadPoolExecutor
+import common.misc_utils as misc_utils
+
+logger = get_logger("tokenizer")
+
+# Sample texts used to confirm the local tokenizer matches the endpoint's tokenizer
+_PARITY_SAMPLES = (
+    "The quick brown fox jumps over the lazy dog.",
+    "Retrieval-Augmented Generation (RAG) combines search with LLMs: 42 results, 3.14% error.",
+    "Die Größe des Dokuments überschreitet das zulässige Limit.",
+    "Où est la bibliothèque? Dov'è la stazione?\n\n| col1 | col2 |\n|------|------|",
+)
+
+# Resolved tokenizer backend per endpoint
+_tokenizer_backends: dict[str, "TokenizerBackend"] = {}
+# Endpoints whose parity check could not run: (HTTP backend used meanwhile, monotonic time of the next check)
+_unverified_backends: dict[str, tuple["TokenizerBackend", float]] = {}
+_tokenizer_lock = threading.RLock()
+
+# Process-wide token cache shared by all endpoints (created on first use)
+_token_cache: "TokenCache | None" = None
+
+
+class TokenizerBackend(ABC):
+    """Common interface for tokenizer backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def encode(self, text: str) -> list:
+        """
+        Encode text into a list of token ids.
+
+        Args:
+            text: Text to tokenize
+
+        Returns:
+            List of token ids
+        """
+        pass
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in the given text."""
+        return len(self.encode(text))
+
+    def encode_many(self, texts: list[str], max_concurrency: int = 1) -> list[list]:
+        """
+        Encode each text into token ids, in input order.
+
+        Args:
+            texts: Texts to tokenize
+            max_concurrency: Upper bound on concurrent tokenizer calls (ignored by in-process backends)
+
+        Returns:
+            List of token id lists aligned with texts
+        """
+        return [self.encode(text) for text in texts]
+
+    def count_many(self, texts: list[str], max_concurrency: int = 1) -> list[int]:
+        """Return the number of tokens for each text, in input order."""
+        return [len(tokens) for tokens in self.encode_many(texts, max_concurrency=max_concurrency)]
+
+    def token_prefix(self, text: str, token_ids: list, n: int) -> str | None:
+        """
+        Return the prefix of text covered by its first n tokens.
+
+        Args:
+            text: Original text
+            token_ids: Token ids of text as returned by encode()
+            n: Number of leading tokens to keep
+
+        Returns:
+            The prefix of text ending exactly at the n-th token boundary, or None
+            if this backend cannot map tokens back to character positions
+        """
+        return None
+
+
+class HTTPTokenizer(TokenizerBackend):
+    """Tokenizer backed by the model server's /tokenize endpoint."""
+
+    name = "http"
+
+    # Upper bound on the rendered length of special tokens preceding the content
+    _MAX_SPECIAL_PREFIX_CHARS = 64
+
+    def __init__(self, endpoint: str):
+        """Initialize the backend for the given model server endpoint."""
+        self.endpoint = endpoint
+
+    @retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+    def encode(self, text: str) -> list:
+        """Tokenize text with a POST to {endpoint}/tokenize."""
+        if misc_utils.SESSION is None:
+            raise RuntimeError("LLM session not initialized. Call create_llm_session() first.")
+
+        payload = {
+            "prompt": text
+        }
+
+        response = misc_utils.SESSION.post(f"{self.endpoint}/tokenize", json=payload)
+        response.raise_for_status()
+        result = response.json()
+        return result.get("tokens", [])
+
+    def encode_many(self, texts: list[str], max_concurrency: int = 1) -> list[list]:
+        """Tokenize texts with up to max_concurrency requests in flight on the shared SESSION pool."""
+        workers = max(1, min(max_concurrency, len(texts)))
+        if workers == 1:
+            return super().encode_many(texts)
+
+        with ContextAwareThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.encode, text) for text in texts]
+            return [future.result() for future in futures]
+
+    @retry_on_transient_error(max_retries=3, initial_delay=1.0, backoff_multiplier=2.0)
+    def decode(self, token_ids: list) -> str:
+        """Detokenize token ids with a POST to {endpoint}/detokenize."""
+        if misc_utils.SESSION is None:
+            raise RuntimeError("LLM session not initialized. Call create_llm_session() first.")
+
+        payload = {
+            "tokens": list(token_ids)
+        }
+
+        response = misc_utils.SESSION.post(f"{self.endpoint}/detokenize", json=payload)
+        response.raise_for_status()
+        return response.json().get("prompt", "")
+
+    def token_prefix(self, text: str, token_ids: list, n: int) -> str | None:
+        """Detokenize the first n token ids and align the result with the original text."""
+        decoded = self.decode(token_ids[:n])
+        if text.startswith(decoded):
+            return decoded
+
+        # Special tokens (e.g. BOS) may be rendered as text ahead of the content;
+        # skip them by finding the longest tail of the decoded prefix that the
+        # original text starts with.
+        stripped = text.lstrip()
+        leading = len(text) - len(stripped)
+        for start in range(1, min(len(decoded), self._MAX_SPECIAL_PREFIX_CHARS)):
+            content = decoded[start:]
+            if stripped.startswith(content):
+                return text[:leading + len(content)]
+        return None
+
+
+class LocalTokenizer(TokenizerBackend):
+    """In-process tokenizer loaded from a Hugging Face ``tokenizer.json`` file."""
+
+    name = "local"
+
+    def __init__(self, path: str, add_special_tokens: bool = True):
+        """
+        Load the tokenizer files from disk.
+
+        Args:
+            path: Path to a ``tokenizer.json`` file or a directory containing one
+            add_special_tokens: Whether to add BOS/EOS tokens like vLLM's /tokenize does by default
+
+        Raises:
+            FileNotFoundError: If no tokenizer.json can be found at path
+        """
+        from tokenizers import Tokenizer
+
+        tokenizer_file = os.path.join(path, "tokenizer.json") if os.path.isdir(path) else path
+        if not os.path.isfile(tokenizer_file):
+            raise FileNotFoundError(f"Tokenizer file not found: {tokenizer_file}")
+
+        self.path = tokenizer_file
+        self.add_special_tokens = add_special_tokens
+        with open(tokenizer_file, "rb") as f:
+            # Identifies the vocabulary in token cache keys
+            self.digest = hashlib.md5(f.read()).hexdigest()
+        self._tokenizer = Tokenizer.from_file(tokenizer_file)
+        logger.debug(f"Loaded local tokenizer from {tokenizer_file}")
+
+    def encode(self, text: str) -> list:
+        """Tokenize text in-process."""
+        return self._tokenizer.encode(text, add_special_tokens=self.add_special_tokens).ids
+
+    def encode_many(self, texts: list[str], max_concurrency: int = 1) -> list[list]:
+        """Tokenize texts in one encode_batch call (parallelized natively by the tokenizers library)."""
+        encodings = self._tokenizer.encode_batch(texts, add_special_tokens=self.add_special_tokens)
+        return [encoding.ids for encoding in encodings]
+
+    def token_prefix(self, text: str, token_ids: list, n: int) -> str | None:
+        """Cut text at the end character offset of its n-th token."""
+        offsets = self._tokenizer.encode(text, add_special_tokens=self.add_special_tokens).offsets[:n]
+        # Special tokens carry (0, 0) offsets, so the max end is the last content character
+        end = max((offset_end for _, offset_end in offsets), default=0)
+        return text[:end]
+
+
+class TokenCache:
+    """
+    Bounded, content-addressed LRU cache of token ids keyed by (tokenizer identity, hash of text).
+
+    Token ids are stored as compact uint32 arrays and the cache is capped by
+    their approximate memory footprint. When a path is given, entries are also
+    persisted to a SQLite file so they survive restarts and can be shared by
+    services mounting the same cache directory.
+
+    Disk writes are buffered and committed in batches (every _FLUSH_ROWS new
+    entries or _FLUSH_INTERVAL seconds, and by flush()), and disk lookups run
+    outside the memory lock, so tokenizer threads only contend on SQLite when
+    they actually miss in memory.
+    """
+
+    # Approximate per-entry overhead (key tuple, digest, array header, OrderedDict node)
+    _ENTRY_OVERHEAD_BYTES = 200
+    # Buffered entries that trigger a disk commit, and the longest time an entry stays buffered
+    _FLUSH_ROWS = 256
+    _FLUSH_INTERVAL = 2.0
+    # Disk writes between trims of the oldest rows
+    _TRIM_EVERY = 1000
+    # SQLite limits the number of bound parameters per statement
+    _LOOKUP_BATCH = 500
+
+    def __init__(self, max_bytes: int, path: str = "", max_disk_entries: int = 1_000_000):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory cap for cached token ids
+            path: Optional SQLite file used to persist entries ("" for memory only)
+            max_disk_entries: Maximum number of rows kept in the SQLite file
+        """
+        self.max_bytes = max_bytes
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, bytes], array] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        # Serializes use of the SQLite connection; never held together with _lock while waiting on disk
+        self._db_lock = threading.Lock()
+        self._pending: dict[str, bytes] = {}
+        self._last_flush = time.monotonic()
+        self._disk_writes = 0
+        self._last_trim = 0
+        if path:
+            self._open_db(path)
+
+    def _open_db(self, path: str):
+        """Open (or create) the SQLite persistence file; disables persistence on failure."""
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS token_cache (key TEXT PRIMARY KEY, tokens BLOB NOT NULL)"
+            )
+            self._db.commit()
+            logger.debug(f"Token cache persisted to {path}")
+        except Exception as e:
+            logger.warning(f"Token cache persistence disabled, failed to open {path}: {e}")
+            self._db = None
+
+    @staticmethod
+    def make_key(identity: str, text: str) -> tuple[str, bytes]:
+        """Build the cache key for a text tokenized by the tokenizer identified by identity."""
+        return identity, hashlib.md5(text.encode("utf-8", "surrogatepass")).digest()
+
+    @staticmethod
+    def _disk_key(key: tuple[str, bytes]) -> str:
+        return f"{key[0]}|{key[1].hex()}"
+
+    def _entry_size(self, tokens: array) -> int:
+        return len(tokens) * tokens.itemsize + self._ENTRY_OVERHEAD_BYTES
+
+    def _store_locked(self, key: tuple[str, bytes], tokens: array):
+        size = self._entry_size(tokens)
+        if size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= self._entry_size(previous)
+        self._entries[key] = tokens
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._entry_size(evicted)
+            self.evictions += 1
+
+    def _lookup_memory_locked(self, key: tuple[str, bytes]) -> array | None:
+        """Return the in-memory (or buffered, not yet written) token ids for key."""
+        tokens = self._entries.get(key)
+        if tokens is not None:
+            self._entries.move_to_end(key)
+            return tokens
+        if self._pending:
+            blob = self._pending.get(self._disk_key(key))
+            if blob is not None:
+                tokens = array("I")
+                tokens.frombytes(blob)
+                self._store_locked(key, tokens)
+                return tokens
+        return None
+
+    def _lookup_disk(self, keys: list) -> dict:
+        """Read the persisted token ids of keys; called without _lock held."""
+        disk_keys = {self._disk_key(key): key for key in keys}
+        found = {}
+        names = list(disk_keys)
+        try:
+            with self._db_lock:
+                for i in range(0, len(names), self._LOOKUP_BATCH):
+                    batch = names[i:i + self._LOOKUP_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._db.execute(
+                        f"SELECT key, tokens FROM token_cache WHERE key IN ({placeholders})", batch
+                    ).fetchall()
+                    for name, blob in rows:
+                        tokens = array("I")
+                        tokens.frombytes(blob)
+                        found[disk_keys[name]] = tokens
+        except Exception as e:
+            logger.debug(f"Failed to read token cache entries: {e}")
+        return found
+
+    def get(self, key: tuple[str, bytes]) -> list | None:
+        """Return cached token ids for key, or None on a miss."""
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: list) -> list:
+        """Return cached token ids for each key, or None where it is not cached."""
+        results = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                tokens = self._lookup_memory_locked(key)
+                if tokens is not None:
+                    results[i] = tokens.tolist()
+                else:
+                    missing.append(i)
+            if not missing or self._db is None:
+                self.hits += len(keys) - len(missing)
+                self.misses += len(missing)
+                return results
+
+        found = self._lookup_disk([keys[i] for i in missing])
+        with self._lock:
+            for i in missing:
+                tokens = found.get(keys[i])
+                if tokens is not None:
+                    self._store_locked(keys[i], tokens)
+                    results[i] = tokens.tolist()
+            misses = sum(1 for i in missing if results[i] is None)
+            self.hits += len(keys) - misses
+            self.misses += misses
+        return results
+
+    def put(self, key: tuple[str, bytes], token_ids: list):
+        """Store token ids for key in memory and, if enabled, queue them for the disk."""
+        self.put_many([key], [token_ids])
+
+    def put_many(self, keys: list, token_ids: list):
+        """Store token ids for keys in memory and, if enabled, queue them for the disk."""
+        flush = False
+        with self._lock:
+            for key, ids in zip(keys, token_ids):
+                tokens = array("I", ids)
+                self._store_locked(key, tokens)
+                if self._db is not None:
+                    self._pending[self._disk_key(key)] = tokens.tobytes()
+            if self._pending:
+                flush = (len(self._pending) >= self._FLUSH_ROWS
+                         or time.monotonic() - self._last_flush >= self._FLUSH_INTERVAL)
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Write buffered entries to the SQLite file in one transaction."""
+        if self._db is None:
+            return
+        with self._db_lock:
+            with self._lock:
+                rows = list(self._pending.items())
+                self._pending = {}
+                self._last_flush = time.monotonic()
+            if not rows:
+                return
+            try:
+                self._db.executemany("INSERT OR REPLACE INTO token_cache (key, tokens) VALUES (?, ?)", rows)
+                self._disk_writes += len(rows)
+                # Trim the oldest rows periodically rather than on every flush
+                if self._disk_writes - self._last_trim >= self._TRIM_EVERY:
+                    self._last_trim = self._disk_writes
+                    self._db.execute(
+                        "DELETE FROM token_cache WHERE rowid <= "
+                        "(SELECT MAX(rowid) FROM token_cache) - ?",
+                        (self.max_disk_entries,),
+                    )
+                self._db.commit()
+            except Exception as e:
+                logger.debug(f"Failed to persist {len(rows)} token cache entries: {e}")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current memory footprint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "persistent": self._db is not None,
+            }
+
+    def clear(self):
+        """Drop all in-memory entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+
+class CachedTokenizer(TokenizerBackend):
+    """Tokenizer backend that consults a TokenCache before delegating to another backend."""
+
+    def __init__(self, backend: TokenizerBackend, cache: TokenCache, identity: str):
+        """Wrap backend so lookups go through cache first, keyed by the tokenizer identity."""
+        self.backend = backend
+        self.cache = cache
+        self.identity = identity
+        self.name = f"cached-{backend.name}"
+
+    def encode(self, text: str) -> list:
+        """Return cached token ids, tokenizing with the wrapped backend on a miss."""
+        key = self.cache.make_key(self.identity, text)
+        tokens = self.cache.get(key)
+        if tokens is None:
+            tokens = self.backend.encode(text)
+            self.cache.put(key, tokens)
+        return tokens
+
+    def encode_many(self, texts: list[str], max_concurrency: int = 1) -> list[list]:
+        """Serve cached texts from the cache and tokenize only the misses as one batch."""
+        keys = [self.cache.make_key(self.identity, text) for text in texts]
+        results = self.cache.get_many(keys)
+        missing = [i for i, tokens in enumerate(results) if tokens is None]
+        if missing:
+            encoded = self.backend.encode_many([texts[i] for i in missing], max_concurrency=max_concurrency)
+            self.cache.put_many([keys[i] for i in missing], encoded)
+            for i, tokens in zip(missing, encoded):
+                results[i] = tokens
+        return results
+
+    def token_prefix(self, text: str, token_ids: list, n: int) -> str | None:
+        """Delegate to the wrapped backend."""
+        return self.backend.token_prefix(text, token_ids, n)
+
+
+def check_tokenizer_parity(local: TokenizerBackend, remote: TokenizerBackend, samples=_PARITY_SAMPLES) -> bool:
+    """
+    Check that two tokenizer backends produce the same token counts.
+
+    Args:
+        local: Backend under test (usually a LocalTokenizer)
+        remote: Reference backend (usually an HTTPTokenizer)
+        samples: Texts to compare
+
+    Returns:
+        True if every sample yields the same token count on both backends
+    """
+    for sample in samples:
+        local_count = local.count(sample)
+        remote_count = remote.count(sample)
+        if local_count != remote_count:
+            logger.warning(
+                f"Tokenizer parity mismatch: {local.name}={local_count}, {remote.name}={remote_count} "
+                f"for sample '{sample[:40]}...'"
+            )
+            return False
+    return True
+
+
+def _local_tokenizer_path(endpoint: str) -> str:
+    """Return the configured local tokenizer path for an endpoint, or "" if none."""
+    if endpoint and endpoint == settings.llm.endpoint:
+        return settings.tokenizer.llm_path
+    if endpoint and endpoint == settings.embedding.endpoint:
+        return settings.tokenizer.emb_path
+    return ""
+
+
+def _tokenizer_identity(endpoint: str, backend: TokenizerBackend) -> str:
+    """
+    Identify the tokenizer used for an endpoint in token cache keys.
+
+    Combines the endpoint with the model configured for it, and with the digest of
+    the tokenizer file when tokenizing locally, so persisted token ids are not
+    served after a different model is deployed behind the same endpoint.
+    """
+    model = ""
+    if endpoint and endpoint == settings.llm.endpoint:
+        model = settings.llm.model
+    elif endpoint and endpoint == settings.embedding.endpoint:
+        model = settings.embedding.model
+    identity = f"{endpoint}#{model}"
+    if isinstance(backend, LocalTokenizer):
+        identity += f"#{backend.digest}"
+    return identity
+
+
+def _resolve_tokenizer(endpoint: str) -> tuple[TokenizerBackend, bool]:
+    """
+    Build the tokenizer backend for an endpoint according to settings.tokenizer.
+
+    Returns:
+        Tuple of (backend, final). final is False when the parity check could not
+        reach the endpoint: the HTTP backend is returned and resolution must be retried.
+    """
+    http_backend = HTTPTokenizer(endpoint)
+    backend = settings.tokenizer.backend
+    if backend == "http":
+        return http_backend, True
+
+    path = _local_tokenizer_path(endpoint)
+    strict = backend == "local"
+    if not path:
+        if strict:
+            raise RuntimeError(f"No local tokenizer path configured for endpoint {endpoint}")
+        return http_backend, True
+
+    try:
+        local_backend = LocalTokenizer(path)
+    except Exception as e:
+        if strict:
+            raise
+        logger.warning(f"Failed to load local tokenizer from {path}: {e}. Falling back to {endpoint}/tokenize")
+        return http_backend, True
+
+    if settings.tokenizer.parity_check:
+        try:
+            matches = check_tokenizer_parity(local_backend, http_backend)
+        except Exception as e:
+            if strict:
+                raise RuntimeError(f"Tokenizer parity check against {endpoint} could not run: {e}") from e
+            logger.warning(
+                f"Tokenizer parity check against {endpoint} could not run: {e}. Using {endpoint}/tokenize "
+                f"and retrying the check in {settings.tokenizer.parity_retry_seconds}s"
+            )
+            return http_backend, False
+        if not matches:
+            if strict:
+                raise RuntimeError(f"Local tokenizer {path} does not match the tokenizer at {endpoint}")
+            logger.warning(f"Local tokenizer {path} does not match {endpoint}/tokenize. Falling back to HTTP tokenizer")
+            return http_backend, True
+
+    logger.info(f"Using local tokenizer {local_backend.path} for endpoint {endpoint}")
+    return local_backend, True
+
+
+def get_token_cache() -> TokenCache | None:
+    """Return the process-wide token cache, or None if caching is disabled."""
+    global _token_cache
+    if not settings.tokenizer.cache_enabled:
+        return None
+    if _token_cache is None:
+        with _tokenizer_lock:
+            if _token_cache is None:
+                cache_path = ""
+                if settings.tokenizer.cache_persist:
+                    cache_path = os.path.join(settings.vector_store.local_cache_dir, "token_cache.sqlite")
+                _token_cache = TokenCache(settings.tokenizer.cache_max_bytes, cache_path)
+                if cache_path:
+                    atexit.register(_token_cache.flush)
+    return _token_cache
+
+
+def get_token_cache_stats() -> dict:
+    """Return token cache statistics (empty dict when caching is disabled)."""
+    cache = get_token_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def get_tokenizer(endpoint: str) -> TokenizerBackend:
+    """
+    Return the tokenizer backend for an endpoint, resolving it once per process.
+
+    When the token cache is enabled the backend is wrapped in a CachedTokenizer.
+    If the parity check could not reach the endpoint, the HTTP backend is returned
+    and resolution is retried after settings.tokenizer.parity_retry_seconds.
+
+    Args:
+        endpoint: Model server endpoint URL the text is meant for
+
+    Returns:
+        TokenizerBackend instance
+    """
+    backend = _tokenizer_backends.get(endpoint)
+    if backend is not None:
+        return backend
+
+    with _tokenizer_lock:
+        # Double-check after acquiring lock
+        backend = _tokenizer_backends.get(endpoint)
+        if backend is not None:
+            return backend
+        unverified = _unverified_backends.get(endpoint)
+        if unverified is not None and time.monotonic() < unverified[1]:
+            return unverified[0]
+
+        backend, final = _resolve_tokenizer(endpoint)
+        cache = get_token_cache()
+        if cache is not None:
+            backend = CachedTokenizer(backend, cache, _tokenizer_identity(endpoint, backend))
+        if final:
+            _tokenizer_backends[endpoint] = backend
+            _unverified_backends.pop(endpoint, None)
+        else:
+            _unverified_backends[endpoint] = (backend, time.monotonic() + settings.tokenizer.parity_retry_seconds)
+    return backend
+
+
+def reset_tokenizers():
+    """Drop all resolved tokenizer backends and the token cache so they are rebuilt on next use."""
+    global _token_cache
+    with _tokenizer_lock:
+        if _token_cache is not None:
+            _token_cache.flush()
+        _tokenizer_backends.clear()
+        _unverified_backends.clear()
+        _token_cache = None
@@ -1,14 +1,20 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from contextlib import nullcontext
+from typing import List, Dict, Any, Optional, Union
 
 class VectorStore(ABC):
+    # Whether the store implements reindex(embedding, progress=None), rebuilding the
+    # index with a new embedding model or mapping without interrupting searches
+    supports_reindex = False
+
     @abstractmethod
     def insert_chunks(
         self,
         chunks: List[Dict],
         vectors: Optional[List[List[float]]] = None,
         embedding: Optional[Any] = None,
-        batch_size: int = 10
+        batch_size: Optional[int] = None
     ) -> bool:
         """
         Inserts document chunks and their corresponding embeddings into the vector database.
@@ -22,7 +28,8 @@ class VectorStore(ABC):
             chunks: A list of dictionaries containing text content and metadata for a single document.
             vectors: A list of pre-computed vector arrays.
             embedding: An instance of the Embedding class to generate vectors.
-            batch_size: Number of chunks to process in a single bulk operation.
+            batch_size: Number of chunks to process in a single bulk operation. If None,
+                the implementation sizes batches itself.
 
         Returns:
             bool: True if indexing succeeded, False if it failed
@@ -58,6 +65,71 @@ class VectorStore(ABC):
         """
         pass
 
+    def search_many(
+        self,
+        queries: List[str],
+        vectors: Optional[List[List[float]]] = None,
+        embedding: Optional[Any] = None,
+        top_k: Union[int, List[int]] = 5,
+        mode: Union[Optional[str], List[Optional[str]]] = "",
+        language: Optional[str] = "en"
+    ) -> List[List[Dict]]:
+        """
+        Retrieves the top-k most relevant documents for each of several queries.
+
+        Query vectors come from one batched embedding call when 'vectors' is None.
+        This default runs one search per query; stores that can execute several
+        searches in a single request should override it.
+
+        Args:
+            queries: The natural language query strings.
+            vectors: Pre-computed query vectors, one per query.
+            embedding: An instance of the Embedding class to vectorize the queries.
+            top_k: The number of similar documents to return, for all queries or one per query.
+            mode: The search mode, for all queries or one per query.
+
+        Returns:
+            List[List[Dict]]: One result list per query, in query order.
+        """
+        if not queries:
+            return []
+        if vectors is None and embedding is not None:
+            vectors = embedding.embed_documents(list(queries))
+        if vectors is None:
+            raise ValueError("Provide 'vectors' or 'embedding' to perform search.")
+        top_ks = per_query(top_k, len(queries))
+        modes = per_query(mode, len(queries))
+        return [
+            self.search(query, vector=vector, top_k=k, mode=m, language=language)
+            for query, vector, k, m in zip(queries, vectors, top_ks, modes)
+        ]
+
+    async def search_async(self, query_text: str, **kwargs) -> List[Dict]:
+        """
+        Async counterpart of search, taking the same keyword arguments.
+
+        This default runs search in a worker thread; stores with an async client
+        should override it so searches do not occupy a thread while waiting.
+        """
+        return await asyncio.to_thread(self.search, query_text, **kwargs)
+
+    async def search_many_async(self, queries: List[str], **kwargs) -> List[List[Dict]]:
+        """Async counterpart of search_many; this default runs search_many in a worker thread."""
+        return await asyncio.to_thread(self.search_many, queries, **kwargs)
+
+    def generation(self) -> Optional[Any]:
+        """
+        Return a value that changes whenever the indexed contents change.
+
+        Caches of search results compare it to tell whether they are still valid.
+        Stores that cannot detect changes return None, and their results must not be cached.
+        """
+        return None
+
+    async def generation_async(self) -> Optional[Any]:
+        """Async counterpart of generation; this default runs generation in a worker thread."""
+        return await asyncio.to_thread(self.generation)
+
     @abstractmethod
     def remove_docs_from_index(self, doc_ids: list[str]) -> int:
         """
@@ -97,6 +169,88 @@ class VectorStore(ABC):
         """
         pass
 
+    def schedule_document_deletion(self, doc_ids: list[str]) -> list:
+        """
+        Start deleting all chunks of the specified documents without waiting for completion.
+
+        Stores without asynchronous deletion delete synchronously here and return no
+        handles. Either way, the deletion is guaranteed to complete once this returns.
+
+        Args:
+            doc_ids: List of document IDs whose chunks should be deleted from the index
+
+        Returns:
+            Handles to pass to wait_for_deletion
+        """
+        self.remove_docs_from_index(doc_ids)
+        return []
+
+    def wait_for_deletion(self, handles: list) -> int:
+        """
+        Wait for deletions started by schedule_document_deletion.
+
+        Returns:
+            Number of chunks deleted by the awaited deletions
+        """
+        return 0
+
+    def bulk_ingestion_mode(self):
+        """
+        Return a context manager that optimizes the store for a large ingestion job.
+
+        Stores that have nothing to tune return a no-op context manager. Implementations
+        must restore their regular settings when the context exits, even on failure.
+        """
+        return nullcontext()
+
+    def recover_bulk_ingestion_mode(self) -> bool:
+        """
+        Restore regular settings left behind by a bulk ingestion job that never exited.
+
+        Called on startup, when no ingestion job runs in this process. Stores without
+        bulk ingestion settings have nothing to recover.
+
+        Returns:
+            bool: True if settings were restored
+        """
+        return False
+
+def per_query(value: Any, count: int) -> List[Any]:
+    """Expand a search_many argument given once for all queries into one value per query."""
+    if isinstance(value, (list, tuple)):
+        if len(value) != count:
+            raise ValueError(f"Expected {count} per-query values, got {len(value)}")
+        return list(value)
+    return [value] * count
+
+# Metadata fields returned with search results; the other stored fields are bookkeeping no search caller reads
+SEARCH_METADATA_FIELDS = ("filename", "doc_id", "type", "source", "language", "page_number")
+
+
+def search_result(chunk_id: Any, text: str, score: float, metadata: Dict) -> Dict:
+    """Build a search result: the chunk text as page_content, its score and the search metadata fields, flattened."""
+    result = {"chunk_id": chunk_id, "page_content": text, "score": score}
+    for field in SEARCH_METADATA_FIELDS:
+        if field in metadata:
+            result[field] = metadata[field]
+    return result
+
+
+def chunk_metadata(doc: Dict) -> Dict:
+    """Build the metadata stored with a chunk, with optional fields only when present."""
+    filename = doc.get("filename", "")
+    metadata = {
+        "filename": filename,
+        "doc_id": doc.get("doc_id") or filename,  # Fallback to filename if UUID missing
+        "type": doc.get("type", ""),
+        "source": doc.get("source", ""),
+        "language": doc.get("language", "")
+    }
+    for field in ("page_number", "chunk_index", "total_chunks", "created_at"):
+        if doc.get(field) is not None:
+            metadata[field] = doc.get(field)
+    return metadata
+
 class VectorStoreNotReadyError(Exception):
     """Raised when the database is unreachable or initializing."""
     pass
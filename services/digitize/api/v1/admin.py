@@ -1,21 +1,22 @@
 """
 Admin-level API endpoints.
 
-Handles metadata import and export operations.
+Handles metadata import and export operations, and vector index rebuilds.
 These endpoints are mounted at ``/v1`` (not under ``/v1/jobs``)
 because their paths are top-level by convention.
 
 Exposes one router:
-- ``router`` → mounted at ``/v1`` (for /import and /export)
+- ``router`` → mounted at ``/v1`` (for /import, /export and /reindex)
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, status
 
 from common.error_utils import APIError, ErrorCode, http_error_responses
 from common.misc_utils import get_logger
 import digitize.models as models
 import digitize.utils.db as db_ops
 import digitize.utils.jobs as dg_util
+from digitize.pipeline.reindex import get_reindex_status, start_reindex
 
 router = APIRouter()
 logger = get_logger("admin_router")
@@ -150,3 +151,56 @@ async def export_metadata(
             ErrorCode.INTERNAL_SERVER_ERROR,
             "Database query failed during export",
         )
+
+
+@router.post(
+    "/reindex",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=models.ReindexStatusResponse,
+    responses={
+        400: http_error_responses[400],
+        409: http_error_responses[409],
+        500: http_error_responses[500],
+    },
+    summary="Rebuild the vector index",
+    description=(
+        "Re-embed all indexed chunks from their stored text into a new versioned index in the background, "
+        "then atomically switch searches to it. Searches are served from the current index throughout. "
+        "Chunks are embedded with the configured embedding model, which ingestion and search also use; "
+        "a different emb_model is rejected. After changing the model on every service, searches run against "
+        "the previous vectors until the reindex completes. Also use it after changing the index profile. "
+        "The first reindex replaces the original index with an alias and deletes it, "
+        "so it is refused when reindex_delete_old_index is false."
+    ),
+    response_description="Initial reindex status; poll GET /v1/reindex for progress",
+)
+async def reindex(payload: models.ReindexRequest | None = None):
+    """Start a zero-downtime reindex of the vector database."""
+    payload = payload or models.ReindexRequest()
+    try:
+        return start_reindex(emb_model=payload.emb_model, emb_endpoint=payload.emb_endpoint)
+    except (NotImplementedError, ValueError) as exc:
+        APIError.raise_error(ErrorCode.INVALID_REQUEST, str(exc))
+    except RuntimeError as exc:
+        APIError.raise_error(ErrorCode.RESOURCE_LOCKED, str(exc))
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.error(f"Failed to start reindex: {exc}", exc_info=True)
+        APIError.raise_error(ErrorCode.INTERNAL_SERVER_ERROR, str(exc))
+
+
+@router.get(
+    "/reindex",
+    response_model=models.ReindexStatusResponse,
+    responses={404: http_error_responses[404]},
+    summary="Get reindex progress",
+    description="Progress, throughput (chunks/sec) and ETA of the running reindex, or the outcome of the last one.",
+    response_description="Reindex status",
+)
+async def get_reindex():
+    """Return the status of the running or last reindex."""
+    reindex_status = get_reindex_status()
+    if reindex_status is None:
+        APIError.raise_error(ErrorCode.RESOURCE_NOT_FOUND, "No reindex has been started")
+    return reindex_status
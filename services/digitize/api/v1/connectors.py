@@ -311,13 +311,14 @@ async def _run_teardown(connector_id: str) -> None:
             )
 
         # Steps 2+3: remove checksum ownership; delete orphaned documents
+        # The orphaned documents are deleted together, with one VDB deletion request.
         owned_checksums = db_ops.list_connector_checksums(connector_id)
+        orphaned_doc_ids = []
         for checksum in owned_checksums:
             try:
                 remaining, doc_id = db_ops.remove_connector_checksum_entry(connector_id, checksum)
                 if remaining == 0 and doc_id:
-                    if not _best_effort_delete_document(doc_id):
-                        deletion_failed = True
+                    orphaned_doc_ids.append(doc_id)
             except Exception as exc:
                 deletion_failed = True
                 logger.error(
@@ -325,6 +326,8 @@ async def _run_teardown(connector_id: str) -> None:
                     f"{connector_id!r}: {exc}",
                     exc_info=True,
                 )
+        if orphaned_doc_ids and not _best_effort_delete_documents(orphaned_doc_ids):
+            deletion_failed = True
 
         # Step 4: sweep any residual batch staging directories
         if not _sweep_staging_dir(connector_id, settings.digitize.staging_dir / "connectors"):
@@ -352,24 +355,25 @@ async def _run_teardown(connector_id: str) -> None:
         db_ops.set_connector_error(connector_id, "Documents deletion failed")
 
 
-def _best_effort_delete_document(doc_id: str) -> bool:
+def _best_effort_delete_documents(doc_ids: list[str]) -> bool:
     """
-    Delete a document via the full teardown path (VDB → files → DB record).
+    Delete documents via the full teardown path (VDB → files → DB record).
 
-    Calls delete_document_data() so that indexed chunks and output files are
-    cleaned up — not just the DB row.
+    Calls delete_documents_data() so that indexed chunks and output files are
+    cleaned up — not just the DB rows. The chunks of all documents are deleted
+    with a single VDB deletion request.
     All failures are logged and swallowed (best-effort semantics).
 
     Returns True on success, False if an error occurred.
     """
     try:
-        from digitize.api.v1.documents import delete_document_data
-        delete_document_data(doc_id)
-        logger.debug(f"Deleted document {doc_id!r} (connector cleanup)")
+        from digitize.api.v1.documents import delete_documents_data
+        delete_documents_data(doc_ids)
+        logger.debug(f"Deleted documents {doc_ids!r} (connector cleanup)")
         return True
     except Exception as exc:
         logger.error(
-            f"Best-effort document deletion failed for {doc_id!r}: {exc}",
+            f"Best-effort document deletion failed for {doc_ids!r}: {exc}",
             exc_info=True,
         )
         return False
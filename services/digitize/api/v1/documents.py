@@ -19,7 +19,7 @@ from common.misc_utils import get_logger
 from common.error_utils import APIError, ErrorCode, http_error_responses
 import digitize.utils.jobs as dg_util
 import digitize.models as models
-from digitize.pipeline.cleanup import reset_db
+from digitize.pipeline.cleanup import reset_db, schedule_vdb_deletion
 from digitize.utils.storage import storage_manager
 
 router = APIRouter()
@@ -32,13 +32,41 @@ def delete_document_data(doc_id: str) -> None:
     Extracted so connector cleanup can call the same teardown path.
     Raises on failure; callers decide how to handle errors.
     """
+    delete_documents_data([doc_id])
+
+
+def delete_documents_data(doc_ids: list[str]) -> None:
+    """
+    Run the delete_document teardown for several documents.
+
+    The VDB deletion of all documents is scheduled as one request and returns once
+    it is durably scheduled; chunks disappear from search as the vector store works
+    through it. A failed file or record cleanup is logged and the remaining documents
+    are still processed; one error naming every failed document is raised at the end.
+    Callers decide how to handle errors.
+    """
     # 4. VDB cleanup.
-    import common.db_utils as db
+    schedule_vdb_deletion(doc_ids)
+    logger.info(f"VDB cleanup scheduled for {len(doc_ids)} document(s).")
+
+    failed = []
+    first_error = None
+    for doc_id in doc_ids:
+        try:
+            _delete_document_files_and_record(doc_id)
+        except Exception as exc:
+            logger.error(f"File or record cleanup failed for {doc_id}: {exc}", exc_info=True)
+            failed.append(doc_id)
+            first_error = first_error or exc
+
+    if failed:
+        raise RuntimeError(
+            f"Failed to delete files or records of {len(failed)} of {len(doc_ids)} "
+            f"document(s): {', '.join(failed)} ({first_error})"
+        ) from first_error
 
-    vector_store = db.get_vector_store()
-    deleted_chunks = vector_store.delete_document_by_id(doc_id)
-    logger.info(f"VDB cleanup for {doc_id}: {deleted_chunks} chunks removed.")
 
+def _delete_document_files_and_record(doc_id: str) -> None:
     # 5. File cleanup.
     doc_metadata = None
     try:
@@ -36,7 +36,11 @@ set_log_level(settings.common.app.log_level)
 
 from digitize.db.connection import check_db_connection, close_db_connections
 import digitize.utils.jobs as dg_util
-from digitize.utils.recovery import recover_zombie_jobs, recover_connector_sync_state
+from digitize.utils.recovery import (
+    recover_connector_sync_state,
+    recover_vector_store_settings,
+    recover_zombie_jobs,
+)
 
 logger = get_logger("digitize_server")
 diagnostic_logger, stderr_monitor, signal_handler = setup_comprehensive_crash_handler(logger)
@@ -111,6 +115,16 @@ def _recover_zombie_jobs():
         logger.error(f"Error during zombie job recovery: {exc}", exc_info=True)
 
 
+def _recover_vector_store_settings():
+    """Restore index settings left by a bulk ingestion job of a previous app server run."""
+    try:
+        if recover_vector_store_settings():
+            logger.info("Restored vector store settings left by an interrupted ingestion job")
+    except Exception as exc:
+        # Retried when the index is next set up for an insert
+        logger.warning(f"Could not check vector store settings on startup: {exc}")
+
+
 def _shutdown():
     """Release resources on application shutdown."""
     logger.info("Application shutting down...")
@@ -209,6 +223,7 @@ async def lifespan(app: FastAPI):
 
     # Orphan / zombie job recovery on startup.
     _recover_zombie_jobs()
+    _recover_vector_store_settings()
 
     # Connector scheduler.
     async with _connector_scheduler_lifespan():
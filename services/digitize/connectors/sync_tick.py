@@ -358,21 +358,32 @@ async def _process_new_files(
 # ---------------------------------------------------------------------------
 
 async def _delete_orphans(connector_id: str, orphan_checksums: set[str]) -> None:
-    """Remove orphaned checksum rows and delete documents that lose their last owner."""
-    from digitize.api.v1.connectors import _best_effort_delete_document
+    """
+    Remove orphaned checksum rows and delete documents that lose their last owner.
 
-    for checksum in orphan_checksums:
-        try:
-            remaining, doc_id = remove_connector_checksum_entry(connector_id, checksum)
-            if remaining == 0 and doc_id:
-                await asyncio.to_thread(_best_effort_delete_document, doc_id)
-        except Exception as exc:
-            logger.error(
-                f"Error removing orphan checksum {checksum!r} "
-                f"for connector {connector_id!r}: {exc}",
-                exc_info=True,
-            )
-            raise
+    The documents are deleted together once all rows are removed, so their chunks
+    go in one VDB deletion request; if removing a row fails, the documents that
+    were already orphaned are still deleted before the error propagates.
+    """
+    from digitize.api.v1.connectors import _best_effort_delete_documents
+
+    orphaned_doc_ids = []
+    try:
+        for checksum in orphan_checksums:
+            try:
+                remaining, doc_id = remove_connector_checksum_entry(connector_id, checksum)
+                if remaining == 0 and doc_id:
+                    orphaned_doc_ids.append(doc_id)
+            except Exception as exc:
+                logger.error(
+                    f"Error removing orphan checksum {checksum!r} "
+                    f"for connector {connector_id!r}: {exc}",
+                    exc_info=True,
+                )
+                raise
+    finally:
+        if orphaned_doc_ids:
+            await asyncio.to_thread(_best_effort_delete_documents, orphaned_doc_ids)
 
 
 # ---------------------------------------------------------------------------
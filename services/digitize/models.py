@@ -288,4 +288,29 @@ class ExportResponse(BaseModel):
     pagination: ExportPagination
 
 
+class ReindexRequest(BaseModel):
+    """Request model for starting a reindex."""
+    emb_model: Optional[str] = Field(
+        default=None, description="Embedding model for the new index; must be the configured model"
+    )
+    emb_endpoint: Optional[str] = Field(
+        default=None, description="Endpoint serving the configured model (defaults to the configured endpoint)"
+    )
+
+
+class ReindexStatusResponse(BaseModel):
+    """Progress of the running or last reindex."""
+    status: str
+    phase: str
+    emb_model: str
+    total_chunks: int
+    copied_chunks: int
+    chunks_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    new_index: Optional[str] = None
+    started_at: str
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+
 # Made with Bob
@@ -3,6 +3,8 @@ System reset / cleanup pipeline.
 
 Full digitize service reset: VDB reset → PostgreSQL wipe → filesystem cleanup.
 """
+import threading
+
 import common.db_utils as db
 from common.misc_utils import get_logger
 from digitize.utils.storage import storage_manager
@@ -11,13 +13,42 @@ from digitize.db.manager import db_manager
 
 logger = get_logger("cleanup")
 
+
+def _finish_vdb_deletion(vector_store, handles, doc_count):
+    try:
+        deleted_chunks = vector_store.wait_for_deletion(handles)
+        logger.info(f"✓ VDB deletion finished: {deleted_chunks} chunks removed for {doc_count} documents")
+    except Exception as e:
+        # The deletion task keeps running in the vector store; only progress tracking failed
+        logger.error(f"Failed to track VDB deletion of {doc_count} documents: {e}")
+
+
+def schedule_vdb_deletion(doc_ids):
+    """
+    Schedule deletion of all chunks of doc_ids from the vector database in one request.
+
+    Returns as soon as the vector store has durably accepted the deletion; its
+    progress is tracked in a background thread. Raises if scheduling fails.
+    """
+    vector_store = db.get_vector_store()
+    handles = vector_store.schedule_document_deletion(list(doc_ids))
+    if handles:
+        threading.Thread(
+            target=_finish_vdb_deletion,
+            args=(vector_store, handles, len(doc_ids)),
+            name="vdb-deletion",
+            daemon=True,
+        ).start()
+    return handles
+
+
 def reset_db():
     """
     Reset the vector database, PostgreSQL database, and clean up all document files.
 
     This function performs a complete cleanup:
     1. Reads all document IDs from metadata files in DOCS_DIR
-    2. Deletes chunks for those documents from the vector database index
+    2. Schedules deletion of the chunks of those documents from the vector database index
     3. Deletes all jobs and documents from PostgreSQL database
     4. Deletes all digitized content files from /var/cache/digitized
     5. Deletes all document metadata files from /var/cache/docs
@@ -31,10 +62,9 @@ def reset_db():
     # Step 2: Delete chunks from vector database FIRST
     # This ensures documents are removed from search even if file deletion fails
     try:
-        vector_store = db.get_vector_store()
         if doc_ids:
-            deleted_chunks = vector_store.remove_docs_from_index(doc_ids)
-            logger.info(f"✓ Vector database index reset successfully: {deleted_chunks} chunks deleted")
+            schedule_vdb_deletion(doc_ids)
+            logger.info(f"✓ Vector database deletion scheduled for {len(doc_ids)} documents")
         else:
             logger.info(msg="✓ No documents to delete from vector database")
     except Exception as e:
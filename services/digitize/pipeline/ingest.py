@@ -9,7 +9,8 @@ import time
 from typing import Optional
 
 import common.db_utils as db
-from common.emb_utils import get_embedder
+from common.vector_db import VectorStore
+from common.emb_utils import CachedEmbedding, get_embedder, get_embedding_cache
 from common.misc_utils import *
 from digitize.processing.orchestrator import process_documents
 from digitize.utils.jobs import get_job_document_stats
@@ -25,6 +26,7 @@ def create_indexing_handler(
     status_mgr: Optional[DatabaseStatusManager],
     doc_id_dict: Optional[dict],
     file_checksum_dict: Optional[dict] = None,  # filename -> md5 hex
+    vector_store: Optional[VectorStore] = None,
 ):
     """
     Create an indexing handler that can be called immediately after chunking of a document.
@@ -34,12 +36,14 @@ def create_indexing_handler(
         status_mgr: Status manager for updating document status
         doc_id_dict: Mapping of document names to IDs
         file_checksum_dict: Optional mapping of filename -> md5 hex digest
+        vector_store: Vector store to index into (default: a new configured store)
 
     Returns:
         Callable that handles indexing of a single document's chunks
     """
     # Initialize resources once
-    vector_store = db.get_vector_store()
+    if vector_store is None:
+        vector_store = db.get_vector_store()
     embedder = get_embedder(
         emb_model_dict['emb_model'],
         emb_model_dict['emb_endpoint'],
@@ -66,9 +70,18 @@ def create_indexing_handler(
             # Capture indexing timing
             indexing_start_time = time.time()
 
+            # Serve re-ingested and shared chunks from the embedding cache; a wrapper
+            # per document tracks this document's hit rate
+            embedding_cache = get_embedding_cache()
+            doc_embedder = CachedEmbedding(embedder, embedding_cache) if embedding_cache else embedder
+
             # Index the chunks
-            success = vector_store.insert_chunks(chunks, embedding=embedder)
+            success = vector_store.insert_chunks(chunks, embedding=doc_embedder)
             indexing_time = time.time() - indexing_start_time
+            timings = {"indexing": round(indexing_time, 2)}
+            if embedding_cache:
+                timings["embedding_cache_hit_rate"] = round(doc_embedder.hit_rate, 2)
+                logger.debug(f"Embedding cache hit rate for document {doc_id}: {doc_embedder.hit_rate:.2%}")
 
             if not success:
                 logger.error(f"Failed to index document {doc_id}")
@@ -77,7 +90,7 @@ def create_indexing_handler(
                         doc_id,
                         {
                             "status": DocStatus.FAILED,
-                            "timing_in_secs": {"indexing": round(indexing_time, 2)}
+                            "timing_in_secs": timings
                         },
                         error="Failed to index document chunks into vector database"
                     )
@@ -94,7 +107,7 @@ def create_indexing_handler(
                 metadata_update = {
                     "status": DocStatus.COMPLETED,
                     "completed_at": get_utc_timestamp(),
-                    "timing_in_secs": {"indexing": round(indexing_time, 2)},
+                    "timing_in_secs": timings,
                 }
                 if file_hash:
                     metadata_update["file_hash"] = file_hash
@@ -179,18 +192,24 @@ def ingest(
 
         out_path = setup_digitized_doc_dir()
 
+        # One store instance serves indexing and bulk ingestion mode; opening another
+        # LOCAL store would reload every chunk
+        vector_store = db.get_vector_store()
+
         # Create indexing handler for immediate indexing after chunking
         indexing_handler = create_indexing_handler(
-            emb_model_dict, status_mgr, doc_id_dict, file_checksum_dict
+            emb_model_dict, status_mgr, doc_id_dict, file_checksum_dict, vector_store=vector_store
         )
 
         start_time = time.time()
-        # Reserve 100 tokens from embedding model's max_model_len to account for metadata
-        # that will be prepended to content during final merge, ensuring total tokens stay within embedding model limits
-        _, converted_pdf_stats = process_documents(
-            input_file_paths, out_path, llm_model_dict['llm_model'], llm_model_dict['llm_endpoint'],  emb_model_dict["emb_endpoint"],
-            max_tokens=emb_model_dict['max_model_len'] - 100, job_id=job_id, doc_id_dict=doc_id_dict,
-            indexing_callback=indexing_handler)
+        # Defer index refreshes for the whole job; settings are restored even if processing fails
+        with vector_store.bulk_ingestion_mode():
+            # Reserve 100 tokens from embedding model's max_model_len to account for metadata
+            # that will be prepended to content during final merge, ensuring total tokens stay within embedding model limits
+            _, converted_pdf_stats = process_documents(
+                input_file_paths, out_path, llm_model_dict['llm_model'], llm_model_dict['llm_endpoint'],  emb_model_dict["emb_endpoint"],
+                max_tokens=emb_model_dict['max_model_len'] - 100, job_id=job_id, doc_id_dict=doc_id_dict,
+                indexing_callback=indexing_handler)
         # converted_pdf_stats holds { file_name: {page_count: int, table_count: int, timings: {conversion: time_in_secs, process_text: time_in_secs, process_tables: time_in_secs, chunking: time_in_secs}} }
         if converted_pdf_stats is None:
             ingestion_failed()
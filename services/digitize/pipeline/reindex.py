@@ -0,0 +1,139 @@
+"""
+Zero-downtime reindex / re-embed pipeline.
+
+Runs the vector store's reindex in a background thread: a new versioned index is
+built from the stored chunk text while searches keep using the current one, then
+the index alias is swapped atomically. Progress, throughput and ETA of the running
+(or last) reindex are kept here for the admin API.
+
+The new index is embedded with the configured embedding model, which ingestion and
+the query side of every service also use; a reindex cannot move the index to another
+model ahead of them.
+"""
+import threading
+import time
+from typing import Optional
+
+import common.db_utils as db
+from common.emb_utils import CachedEmbedding, Embedding, get_embedding_cache
+from common.misc_utils import get_logger, get_utc_timestamp, resolve_model_max_len
+from common.settings import settings
+
+logger = get_logger("reindex")
+
+_status: Optional[dict] = None
+_status_lock = threading.Lock()
+
+
+def get_reindex_status() -> Optional[dict]:
+    """Return the status of the running or last reindex, or None if none has run."""
+    with _status_lock:
+        if _status is None:
+            return None
+        status = dict(_status)
+
+    copy_started = status.pop("_copy_started", None)
+    if status["status"] == "running" and copy_started is not None and status["copied_chunks"]:
+        elapsed = time.monotonic() - copy_started
+        rate = status["copied_chunks"] / elapsed if elapsed > 0 else 0.0
+        status["chunks_per_second"] = round(rate, 2)
+        remaining = max(status["total_chunks"] - status["copied_chunks"], 0)
+        status["eta_seconds"] = round(remaining / rate, 1) if rate > 0 else None
+    return status
+
+
+def _update(**fields):
+    with _status_lock:
+        _status.update(fields)
+
+
+def _on_progress(update: dict):
+    fields = {"phase": update["phase"], "total_chunks": update["total"], "copied_chunks": update["copied"]}
+    with _status_lock:
+        if _status["_copy_started"] is None and update["phase"] == "copying":
+            _status["_copy_started"] = time.monotonic()
+        _status.update(fields)
+
+
+def _run(vector_store, embedding):
+    started = time.monotonic()
+    try:
+        new_index = vector_store.reindex(embedding, progress=_on_progress)
+        elapsed = time.monotonic() - started
+        with _status_lock:
+            copied = _status["copied_chunks"]
+        _update(
+            status="completed",
+            phase="done",
+            new_index=new_index,
+            chunks_per_second=round(copied / elapsed, 2) if elapsed > 0 else None,
+            eta_seconds=0,
+            finished_at=get_utc_timestamp(),
+        )
+        logger.info(f"✅ Reindex completed: {copied} chunks re-embedded into {new_index} in {elapsed:.1f}s")
+    except Exception as e:
+        logger.error(f"Reindex failed: {e}", exc_info=True)
+        _update(status="failed", error=str(e), eta_seconds=None, finished_at=get_utc_timestamp())
+
+
+def start_reindex(emb_model: Optional[str] = None, emb_endpoint: Optional[str] = None) -> dict:
+    """
+    Start re-embedding every chunk into a new index in the background.
+
+    Args:
+        emb_model: Embedding model for the new index; must be the configured model
+        emb_endpoint: Endpoint serving the model (defaults to the configured endpoint)
+
+    Returns:
+        Initial status of the reindex
+
+    Raises:
+        ValueError: If emb_model is not the configured embedding model
+        RuntimeError: If a reindex is already running
+        NotImplementedError: If the configured vector store cannot reindex
+    """
+    global _status
+    if emb_model and emb_model != settings.embedding.model:
+        # Ingestion and query embedding would keep using the configured model on the new index
+        raise ValueError(
+            f"Embedding model {emb_model} is not the configured model {settings.embedding.model}; "
+            "configure the new model on every service, then reindex"
+        )
+    emb_model = settings.embedding.model
+    emb_endpoint = emb_endpoint or settings.embedding.endpoint
+
+    with _status_lock:
+        if _status is not None and _status["status"] == "running":
+            raise RuntimeError("A reindex is already running")
+        _status = {
+            "status": "running",
+            "phase": "starting",
+            "emb_model": emb_model,
+            "total_chunks": 0,
+            "copied_chunks": 0,
+            "chunks_per_second": None,
+            "eta_seconds": None,
+            "new_index": None,
+            "started_at": get_utc_timestamp(),
+            "finished_at": None,
+            "error": None,
+            "_copy_started": None,
+        }
+
+    try:
+        vector_store = db.get_vector_store()
+        if not vector_store.supports_reindex:
+            raise NotImplementedError(f"{type(vector_store).__name__} does not support reindexing")
+        max_model_len = resolve_model_max_len(emb_endpoint, emb_model, settings.embedding.max_model_len)
+        embedding = Embedding(emb_model, emb_endpoint, max_model_len, batcher_config=settings.embedding)
+        # Chunks embedded before are served from the embedding cache
+        embedding_cache = get_embedding_cache()
+        if embedding_cache:
+            embedding = CachedEmbedding(embedding, embedding_cache)
+    except Exception as e:
+        _update(status="failed", error=str(e), finished_at=get_utc_timestamp())
+        raise
+
+    threading.Thread(target=_run, args=(vector_store, embedding), name="reindex", daemon=True).start()
+    logger.info(f"Reindex started with embedding model {emb_model}")
+    return get_reindex_status()
@@ -12,7 +12,7 @@ import random
 from collections import Counter
 
 from common.lang_utils import LanguageCodes, detect_language
-from common.llm_utils import tokenize_with_llm
+from common.llm_utils import tokenize_many, tokenize_with_llm
 from common.misc_utils import get_logger
 
 logger = get_logger("processing.language")
@@ -32,6 +32,19 @@ def count_tokens(text, emb_endpoint):
     return token_len
 
 
+def count_tokens_many(texts, emb_endpoint):
+    """Count the number of tokens in each of the given texts with one batched tokenizer call.
+
+    Args:
+        texts (list[str]): Input texts to tokenize and count.
+        emb_endpoint (str): The URL of the embedding/tokenizer API endpoint.
+
+    Returns:
+        list[int]: Token count of each text, in input order.
+    """
+    return tokenize_many(texts, emb_endpoint)
+
+
 def detect_document_language(data) -> str:
     """
     Detect the language of a document by sampling random blocks.
@@ -37,6 +37,7 @@ from digitize.parsing.pdf import get_document_page_count
 from digitize.processing.language import (
     collect_header_font_sizes,
     count_tokens,
+    count_tokens_many,
     detect_document_language,
     get_header_level,
 )
@@ -72,27 +73,30 @@ def split_text_into_token_chunks(text, emb_endpoint, max_tokens=512, overlap=50,
     logger.debug(f"Using language for chunking: {language}")
 
     sentences = SentenceSplitter(language=language).split(text)
+    # Count every sentence in one batched call instead of one round-trip per sentence
+    sentence_token_counts = count_tokens_many(sentences, emb_endpoint)
     chunks = []
     current_chunk = []
+    current_token_counts = []
     current_token_count = 0
 
-    for sentence in sentences:
-        token_len = count_tokens(sentence, emb_endpoint)
-
+    for sentence, token_len in zip(sentences, sentence_token_counts):
         if current_token_count + token_len > max_tokens:
             # save current chunk
             chunk_text = " ".join(current_chunk)
             chunks.append(chunk_text)
             # overlap logic (optional)
             if overlap > 0 and len(current_chunk) > 0:
-                overlap_text = current_chunk[-1]
-                current_chunk = [overlap_text]
-                current_token_count = count_tokens(overlap_text, emb_endpoint)
+                current_chunk = [current_chunk[-1]]
+                current_token_counts = [current_token_counts[-1]]
+                current_token_count = current_token_counts[0]
             else:
                 current_chunk = []
+                current_token_counts = []
                 current_token_count = 0
 
         current_chunk.append(sentence)
+        current_token_counts.append(token_len)
         current_token_count += token_len
 
     # flush last
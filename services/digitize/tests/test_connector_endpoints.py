@@ -393,11 +393,11 @@ class TestRunTeardown:
             "digitize.api.v1.connectors.db_ops.delete_active_connector",
             Mock(return_value=True),
         )
-        with patch("digitize.api.v1.connectors._best_effort_delete_document", doc_delete_mock):
+        with patch("digitize.api.v1.connectors._best_effort_delete_documents", doc_delete_mock):
             with patch("digitize.api.v1.connectors._sweep_staging_dir"):
                 from digitize.api.v1.connectors import _run_teardown
                 await _run_teardown(CONNECTOR_ID)
-        doc_delete_mock.assert_called_once_with("doc-0001")
+        doc_delete_mock.assert_called_once_with(["doc-0001"])
 
     async def test_does_not_delete_doc_when_other_owners_remain(self, monkeypatch):
         """remaining_owner_count > 0 → doc must NOT be deleted."""
@@ -418,7 +418,7 @@ class TestRunTeardown:
             "digitize.api.v1.connectors.db_ops.delete_active_connector",
             Mock(return_value=True),
         )
-        with patch("digitize.api.v1.connectors._best_effort_delete_document", doc_delete_mock):
+        with patch("digitize.api.v1.connectors._best_effort_delete_documents", doc_delete_mock):
             with patch("digitize.api.v1.connectors._sweep_staging_dir"):
                 from digitize.api.v1.connectors import _run_teardown
                 await _run_teardown(CONNECTOR_ID)
@@ -1,3 +1,5 @@
+import threading
+import time
 from types import SimpleNamespace
 from typing import cast
 from unittest.mock import AsyncMock, Mock, patch
@@ -456,15 +458,28 @@ class TestDocumentEndpoints:
         monkeypatch.setattr(storage_manager, "delete_document_content", delete_content_mock)
 
         fake_vector_store = Mock()
-        fake_vector_store.delete_document_by_id.return_value = 5
+        fake_vector_store.schedule_document_deletion.return_value = []
 
         with patch("common.db_utils.get_vector_store", return_value=fake_vector_store):
             response = digitize_test_client.delete("/v1/documents/doc-1")
 
         assert response.status_code == 204
-        fake_vector_store.delete_document_by_id.assert_called_once_with("doc-1")
+        fake_vector_store.schedule_document_deletion.assert_called_once_with(["doc-1"])
         delete_content_mock.assert_called_once_with("doc-1", output_format="json")
 
+    def test_delete_documents_data_continues_after_failure(self, monkeypatch):
+        schedule_mock = Mock()
+        monkeypatch.setattr(documents_router_module, "schedule_vdb_deletion", schedule_mock)
+        teardown_mock = Mock(side_effect=[OSError("disk error"), None, None])
+        monkeypatch.setattr(documents_router_module, "_delete_document_files_and_record", teardown_mock)
+
+        with pytest.raises(RuntimeError, match="1 of 3 document\\(s\\): doc-1") as exc_info:
+            documents_router_module.delete_documents_data(["doc-1", "doc-2", "doc-3"])
+
+        schedule_mock.assert_called_once_with(["doc-1", "doc-2", "doc-3"])
+        assert [c.args[0] for c in teardown_mock.call_args_list] == ["doc-1", "doc-2", "doc-3"]
+        assert isinstance(exc_info.value.__cause__, OSError)
+
     def test_delete_active_document_returns_409(self, digitize_test_client, monkeypatch):
         from digitize.models import DocumentDetailResponse
         mock_doc = DocumentDetailResponse(
@@ -662,4 +677,103 @@ class TestImportExportEndpoints:
         assert response.status_code == 400
 
 
+class _FakeReindexStore:
+    """Vector store whose reindex reports progress and waits until released."""
+
+    supports_reindex = True
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def reindex(self, embedding, progress=None):
+        progress({"phase": "copying", "total": 10, "copied": 4})
+        self.release.wait(timeout=5)
+        progress({"phase": "done", "total": 10, "copied": 10})
+        return "rag_new"
+
+
+@pytest.mark.unit
+class TestReindexEndpoints:
+    @pytest.fixture(autouse=True)
+    def reindex_env(self, monkeypatch):
+        import digitize.pipeline.reindex as reindex_module
+
+        monkeypatch.setattr(reindex_module, "_status", None)
+        monkeypatch.setattr(reindex_module, "resolve_model_max_len", Mock(return_value=512))
+        monkeypatch.setattr(reindex_module, "Embedding", Mock())
+        monkeypatch.setattr(reindex_module, "get_embedding_cache", Mock(return_value=None))
+        monkeypatch.setattr(reindex_module.settings.embedding, "model", "configured-model")
+        store = _FakeReindexStore()
+        monkeypatch.setattr(reindex_module.db, "get_vector_store", Mock(return_value=store))
+        yield store
+        store.release.set()
+
+    def test_status_before_any_reindex_returns_404(self, digitize_test_client):
+        response = digitize_test_client.get("/v1/reindex")
+
+        assert response.status_code == 404
+
+    def test_start_reports_progress_and_eta(self, digitize_test_client, reindex_env):
+        response = digitize_test_client.post("/v1/reindex", json={"emb_endpoint": "http://emb-batch:8000"})
+
+        assert response.status_code == 202
+        assert response.json()["emb_model"] == "configured-model"
+
+        for _ in range(100):
+            status = digitize_test_client.get("/v1/reindex").json()
+            if status["copied_chunks"]:
+                break
+            time.sleep(0.01)
+        assert status["status"] == "running"
+        assert status["total_chunks"] == 10
+        assert status["copied_chunks"] == 4
+        assert status["chunks_per_second"] > 0
+        assert status["eta_seconds"] is not None
+
+        assert digitize_test_client.post("/v1/reindex").status_code == 409
+
+        reindex_env.release.set()
+        for _ in range(100):
+            status = digitize_test_client.get("/v1/reindex").json()
+            if status["status"] != "running":
+                break
+            time.sleep(0.01)
+        assert status["status"] == "completed"
+        assert status["new_index"] == "rag_new"
+
+    def test_other_embedding_model_returns_400(self, digitize_test_client, reindex_env):
+        response = digitize_test_client.post("/v1/reindex", json={"emb_model": "new-model"})
+
+        assert response.status_code == 400
+        assert "configured-model" in response.json()["error"]["message"]
+        assert digitize_test_client.get("/v1/reindex").status_code == 404
+
+    def test_configured_embedding_model_accepted(self, digitize_test_client, reindex_env):
+        import digitize.pipeline.reindex as reindex_module
+
+        response = digitize_test_client.post("/v1/reindex", json={"emb_model": "configured-model"})
+
+        assert response.status_code == 202
+        assert reindex_module.Embedding.call_args.args[0] == "configured-model"
+
+        reindex_env.release.set()
+        for _ in range(100):
+            if digitize_test_client.get("/v1/reindex").json()["status"] != "running":
+                break
+            time.sleep(0.01)
+
+    def test_unsupported_store_returns_400(self, digitize_test_client, monkeypatch):
+        import digitize.pipeline.reindex as reindex_module
+
+        class NoReindexStore:
+            supports_reindex = False
+
+        monkeypatch.setattr(reindex_module.db, "get_vector_store", Mock(return_value=NoReindexStore()))
+
+        response = digitize_test_client.post("/v1/reindex")
+
+        assert response.status_code == 400
+        assert digitize_test_client.get("/v1/reindex").json()["status"] == "failed"
+
+
 # Made with Bob
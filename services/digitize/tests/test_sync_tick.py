@@ -275,7 +275,7 @@ class TestProcessNewFiles:
 # _delete_orphans  (async)
 # ---------------------------------------------------------------------------
 
-_DELETE_DOC = "digitize.api.v1.connectors._best_effort_delete_document"
+_DELETE_DOC = "digitize.api.v1.connectors._best_effort_delete_documents"
 
 
 class TestDeleteOrphans:
@@ -285,7 +285,7 @@ class TestDeleteOrphans:
             asyncio.run(_delete_orphans("c1", {"ck_orphan"}))
 
         mock_rm.assert_called_once_with("c1", "ck_orphan")
-        mock_del.assert_called_once_with("doc-1")
+        mock_del.assert_called_once_with(["doc-1"])
 
     def test_skips_doc_deletion_when_other_owners_remain(self):
         with patch(f"{DB_MODULE}.remove_connector_checksum_entry", return_value=(2, "doc-1")), \
@@ -311,6 +311,23 @@ class TestDeleteOrphans:
 
         assert mock_rm.call_count == 2
 
+    def test_deletes_orphaned_docs_together(self):
+        side_effects = [(0, "doc-1"), (0, "doc-2")]
+        with patch(f"{DB_MODULE}.remove_connector_checksum_entry", side_effect=side_effects), \
+             patch(_DELETE_DOC) as mock_del:
+            asyncio.run(_delete_orphans("c1", ["ck1", "ck2"]))
+
+        mock_del.assert_called_once_with(["doc-1", "doc-2"])
+
+    def test_deletes_already_orphaned_docs_when_remove_raises(self):
+        side_effects = [(0, "doc-1"), RuntimeError("db gone")]
+        with patch(f"{DB_MODULE}.remove_connector_checksum_entry", side_effect=side_effects), \
+             patch(_DELETE_DOC) as mock_del:
+            with pytest.raises(RuntimeError, match="db gone"):
+                asyncio.run(_delete_orphans("c1", ["ck1", "ck2"]))
+
+        mock_del.assert_called_once_with(["doc-1"])
+
     def test_empty_orphan_set(self):
         with patch(f"{DB_MODULE}.remove_connector_checksum_entry") as mock_rm:
             asyncio.run(_delete_orphans("c1", set()))
@@ -194,3 +194,19 @@ def recover_connector_sync_state() -> int:
         logger.debug("No stuck connector syncs found on startup")
 
     return len(affected_ids)
+
+
+def recover_vector_store_settings() -> bool:
+    """
+    Restore vector store settings left by a bulk ingestion job interrupted by a crash.
+
+    Ingestion jobs switch the index to bulk ingestion settings (no periodic refresh,
+    optionally no replicas) and record the original values in the index itself.
+    No job survives a restart, so any recorded values are restored on startup.
+
+    Returns:
+        True if settings were restored.
+    """
+    import common.db_utils as db
+
+    return db.get_vector_store().recover_bulk_ingestion_mode()
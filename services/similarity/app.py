@@ -1,12 +1,15 @@
 import asyncio
 import logging
 import os
+import time
 import uuid
 from contextlib import asynccontextmanager
 
+import orjson
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.openapi.docs import get_swagger_ui_html
+from fastapi.responses import JSONResponse
 
 from common.misc_utils import set_log_level
 
@@ -21,16 +24,33 @@ if level != "":
 set_log_level(log_level)
 
 import common.db_utils as db
-from common.misc_utils import get_embedding_endpoint, get_reranker_endpoint, set_request_id, create_llm_session
+from common.misc_utils import (
+    close_async_llm_client,
+    create_async_llm_client,
+    create_llm_session,
+    get_embedding_endpoint,
+    get_reranker_endpoint,
+    set_request_id,
+)
+from common.reranker_utils import close_async_rerank_clients
+from common.rerank_cache import get_rerank_cache
+from common.retrieval_cache import get_retrieval_cache
 from common.error_utils import APIError, ErrorCode, http_error_responses, http_exception_handler
 from common.validation_utils import validate_query_length as _validate_query_length
 from common.retry_utils import retry_on_transient_error
+from similarity.semantic_cache import get_semantic_cache
 from similarity.settings import settings
 from similarity.similarity_utils import (
+    RESULT_FORMATS,
+    SimilaritySearchBatchRequest,
+    SimilaritySearchBatchResponse,
     SimilaritySearchRequest,
     SimilaritySearchResponse,
-    SimilaritySearchResult,
+    SimilaritySearchTimings,
     perform_similarity_search,
+    perform_similarity_search_async,
+    perform_similarity_search_batch,
+    perform_similarity_search_batch_async,
 )
 
 vectorstore = None
@@ -38,6 +58,14 @@ emb_model_dict: dict = {}
 reranker_model_dict: dict = {}
 
 
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered with orjson, several times faster than the stdlib encoder on large result sets."""
+
+    def render(self, content) -> bytes:
+        """Serialize content, accepting numpy scalars and arrays."""
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
 def _initialize_models():
     global emb_model_dict, reranker_model_dict
     emb_model_dict = get_embedding_endpoint()
@@ -60,13 +88,19 @@ def _initialize_vectorstore():
 async def lifespan(app: FastAPI):
     """Manage application lifespan events (startup and shutdown).
 
-    Sets up the global LLM connection pool, resolves endpoint configurations for
-    retrieval models, and initializes the vector store connection.
+    Sets up the global LLM connection pools, resolves endpoint configurations for
+    retrieval models, and initializes the vector store connection. The async clients
+    are closed on shutdown.
     """
     create_llm_session(pool_maxsize=10)
+    create_async_llm_client(max_connections=settings.similarity.async_max_connections, timeout=60.0)
     _initialize_models()
     await asyncio.to_thread(_initialize_vectorstore)
     yield
+    if hasattr(vectorstore, "aclose"):
+        await vectorstore.aclose()
+    await close_async_rerank_clients()
+    await close_async_llm_client()
 
 tags_metadata = [
     {
@@ -134,17 +168,29 @@ def swagger_root():
         "| `true` | Medium |\n\n"
         "**`top_k`** defaults to `NUM_CHUNKS_POST_SEARCH` "
         f"(currently {settings.similarity.num_chunks_post_search}) if not provided.\n\n"
+        "**`format`** `full` (default) returns each chunk's text and metadata; `compact` returns only "
+        "`chunk_id` and `score`, for callers that already hold the chunk text.\n\n"
         "## Performance Timing Headers\n\n"
         "The response includes timing information in custom headers:\n\n"
         "- **`X-Retrieve-Time`**: Time taken for document retrieval (seconds)\n"
         "- **`X-Rerank-Time`**: Time taken for reranking (seconds, only if rerank=true)\n"
-        "- **`X-Total-Time`**: Total processing time (seconds)\n\n"
+        "- **`X-Total-Time`**: Total processing time (seconds)\n"
+        "- **`X-Retrieval-Cache`**: `hit` or `miss`, when results were looked up in the retrieval cache\n"
+        "- **`X-Retrieval-Cache-Hit-Rate`** / **`X-Retrieval-Cache-Bytes`**: Retrieval cache hit rate and memory footprint\n"
+        "- **`X-Semantic-Cache`**: `hit` or `miss`, when the semantic query cache is enabled; a hit reuses the results "
+        "of a recent near-duplicate query\n"
+        "- **`X-Semantic-Cache-Hit-Rate`**: Hit rate of the semantic query cache\n"
+        "- **`X-Rerank-Cache-Hits`** / **`X-Rerank-Cache-Misses`**: Reranker scores served from the score cache and "
+        "sent to the reranker (only if rerank=true)\n"
+        "- **`X-Rerank-Cache-Hit-Rate`**: Hit rate of the rerank score cache (only if rerank=true)\n"
+        "- **`X-Cascade-Time`** / **`X-Rerank-Candidates`**: Time spent pruning candidates and number sent "
+        "to the reranker (only if rerank=true and the cascade is enabled)\n\n"
         "These headers enable cross-service performance monitoring and can be used by clients "
         "to track and optimize search performance."
     ),
     response_description="Documents ranked by descending score, with score_type indicating the scoring method used. Performance metrics available in response headers."
 )
-async def similarity_search(req: SimilaritySearchRequest, response: Response) -> SimilaritySearchResponse:
+async def similarity_search(req: SimilaritySearchRequest, response: Response) -> OrjsonResponse:
     """Perform a vector similarity search against the vector store.
 
     Validates inputs, executes the requested retrieval mode (dense, sparse, or hybrid),
@@ -156,6 +202,8 @@ async def similarity_search(req: SimilaritySearchRequest, response: Response) ->
 
     if req.mode not in ["dense", "sparse", "hybrid"]:
         APIError.raise_error(ErrorCode.INVALID_PARAMETER, "mode must be one of: dense, sparse, hybrid")
+    if req.format not in RESULT_FORMATS:
+        APIError.raise_error(ErrorCode.INVALID_PARAMETER, "format must be one of: full, compact")
     try:
         emb_model = emb_model_dict["emb_model"]
         emb_endpoint = emb_model_dict["emb_endpoint"]
@@ -176,8 +224,7 @@ async def similarity_search(req: SimilaritySearchRequest, response: Response) ->
         reranker_model = reranker_model_dict.get("reranker_model") if req.rerank else None
         reranker_endpoint = reranker_model_dict.get("reranker_endpoint") if req.rerank else None
 
-        docs, scores, score_type, perf_stat_dict = await asyncio.to_thread(
-            perform_similarity_search,
+        search_args = (
             req.query,
             emb_model,
             emb_endpoint,
@@ -189,35 +236,163 @@ async def similarity_search(req: SimilaritySearchRequest, response: Response) ->
             reranker_model,
             reranker_endpoint,
         )
+        if settings.similarity.async_pipeline:
+            docs, scores, score_type, perf_stat_dict = await perform_similarity_search_async(*search_args)
+        else:
+            docs, scores, score_type, perf_stat_dict = await asyncio.to_thread(perform_similarity_search, *search_args)
 
     except db.VectorStoreNotReadyError:
         APIError.raise_error(ErrorCode.VECTOR_STORE_NOT_READY, "Index is empty. Ingest documents first.")
     except Exception as e:
         APIError.raise_error(ErrorCode.INTERNAL_SERVER_ERROR, repr(e))
 
-    results = [
-        SimilaritySearchResult(
-            page_content=doc.get("page_content", ""),
-            filename=doc.get("filename", ""),
-            type=doc.get("type", ""),
-            source=doc.get("source", ""),
-            chunk_id=str(doc.get("chunk_id", "")),
-            score=float(score),
-        )
-        for doc, score in zip(docs, scores)
-    ]
+    results = _to_results(docs, scores, req.format)
 
     # Add timing information to response headers
     response.headers["X-Retrieve-Time"] = str(perf_stat_dict.get("retrieve_time", 0.0))
     if "rerank_time" in perf_stat_dict:
         response.headers["X-Rerank-Time"] = str(perf_stat_dict["rerank_time"])
-    total_time = sum(v for v in perf_stat_dict.values() if v is not None)
+    if "cascade_time" in perf_stat_dict:
+        response.headers["X-Cascade-Time"] = str(perf_stat_dict["cascade_time"])
+        response.headers["X-Rerank-Candidates"] = str(perf_stat_dict["rerank_candidates"])
+    total_time = sum(v for k, v in perf_stat_dict.items() if k.endswith("_time") and v is not None)
     response.headers["X-Total-Time"] = str(total_time)
 
-    return SimilaritySearchResponse(
-        score_type=score_type,
-        results=results
-    )
+    # Retrieval cache outcome for this request and process-wide hit rate / memory footprint
+    if "retrieval_cache_hit" in perf_stat_dict:
+        response.headers["X-Retrieval-Cache"] = "hit" if perf_stat_dict["retrieval_cache_hit"] else "miss"
+    cache = get_retrieval_cache()
+    if cache is not None:
+        stats = cache.stats()
+        response.headers["X-Retrieval-Cache-Hit-Rate"] = f"{stats['hit_rate']:.4f}"
+        response.headers["X-Retrieval-Cache-Bytes"] = str(stats["bytes"])
+
+    # Semantic query cache outcome for this request and process-wide hit rate
+    if "semantic_cache_hit" in perf_stat_dict:
+        response.headers["X-Semantic-Cache"] = "hit" if perf_stat_dict["semantic_cache_hit"] else "miss"
+        semantic_cache = get_semantic_cache()
+        if semantic_cache is not None:
+            response.headers["X-Semantic-Cache-Hit-Rate"] = f"{semantic_cache.stats()['hit_rate']:.4f}"
+
+    # Rerank score cache outcome for this request and process-wide hit rate
+    if "rerank_cache_hits" in perf_stat_dict:
+        response.headers["X-Rerank-Cache-Hits"] = str(perf_stat_dict["rerank_cache_hits"])
+        response.headers["X-Rerank-Cache-Misses"] = str(perf_stat_dict["rerank_cache_misses"])
+        rerank_cache = get_rerank_cache()
+        if rerank_cache is not None:
+            response.headers["X-Rerank-Cache-Hit-Rate"] = f"{rerank_cache.stats()['hit_rate']:.4f}"
+
+    # Results are plain dicts matching SimilaritySearchResponse; serialize them directly, headers included
+    return OrjsonResponse({"score_type": score_type, "results": results}, headers=dict(response.headers))
+
+
+@app.post(
+    "/v1/similarity-search:batch",
+    response_model=SimilaritySearchBatchResponse,
+    responses={400: http_error_responses[400], 500: http_error_responses[500], 503: http_error_responses[503]},
+    tags=["similarity"],
+    summary="Batch vector similarity search",
+    description=(
+        "Runs several similarity searches in one request, each with its own `top_k`, `mode`, `rerank` "
+        "and `format` options, using one embedding call and one multi-search request against the vector store. "
+        "Queries with `rerank=true` are reranked concurrently.\n\n"
+        f"At most `MAX_BATCH_QUERIES` (currently {settings.similarity.max_batch_queries}) queries are accepted.\n\n"
+        "Each result set includes its per-query `timings`. Batch-level timings are returned in the "
+        "`X-Retrieve-Time`, `X-Rerank-Time` and `X-Total-Time` headers."
+    ),
+    response_description="One result set with per-query timings for every query, in request order."
+)
+async def similarity_search_batch(req: SimilaritySearchBatchRequest, response: Response) -> OrjsonResponse:
+    """Perform several vector similarity searches with shared embedding and search round-trips.
+
+    Validates every query like the single-query endpoint, then runs the whole batch in one
+    embedding call and one multi-search request, reranking the queries that asked for it.
+    """
+    if len(req.queries) > settings.similarity.max_batch_queries:
+        APIError.raise_error(
+            ErrorCode.INVALID_PARAMETER,
+            f"At most {settings.similarity.max_batch_queries} queries are allowed per batch",
+        )
+    for i, query in enumerate(req.queries):
+        if not query.query or not query.query.strip():
+            APIError.raise_error(ErrorCode.EMPTY_INPUT, f"queries[{i}].query is required")
+        if query.mode not in ["dense", "sparse", "hybrid"]:
+            APIError.raise_error(ErrorCode.INVALID_PARAMETER, f"queries[{i}].mode must be one of: dense, sparse, hybrid")
+        if query.format not in RESULT_FORMATS:
+            APIError.raise_error(ErrorCode.INVALID_PARAMETER, f"queries[{i}].format must be one of: full, compact")
+
+    start_time = time.time()
+    try:
+        emb_model = emb_model_dict["emb_model"]
+        emb_endpoint = emb_model_dict["emb_endpoint"]
+        emb_max_model_len = emb_model_dict["max_model_len"]
+
+        validations = await asyncio.gather(*(
+            asyncio.to_thread(
+                _validate_query_length, query.query, emb_endpoint, settings.similarity.max_query_token_length
+            )
+            for query in req.queries
+        ))
+        for i, (is_valid, error_msg) in enumerate(validations):
+            if not is_valid:
+                APIError.raise_error(ErrorCode.INVALID_REQUEST, f"queries[{i}]: {error_msg}")
+
+        rerank = any(query.rerank for query in req.queries)
+        reranker_model = reranker_model_dict.get("reranker_model") if rerank else None
+        reranker_endpoint = reranker_model_dict.get("reranker_endpoint") if rerank else None
+
+        batch_args = (req.queries, emb_model, emb_endpoint, emb_max_model_len, vectorstore, reranker_model, reranker_endpoint)
+        if settings.similarity.async_pipeline:
+            searches = await perform_similarity_search_batch_async(*batch_args)
+        else:
+            searches = await asyncio.to_thread(perform_similarity_search_batch, *batch_args)
+
+    except db.VectorStoreNotReadyError:
+        APIError.raise_error(ErrorCode.VECTOR_STORE_NOT_READY, "Index is empty. Ingest documents first.")
+    except HTTPException:
+        raise
+    except Exception as e:
+        APIError.raise_error(ErrorCode.INTERNAL_SERVER_ERROR, repr(e))
+
+    items = [
+        {
+            "score_type": score_type,
+            "results": _to_results(docs, scores, query.format),
+            "timings": SimilaritySearchTimings(**perf_stat_dict).model_dump(),
+        }
+        for query, (docs, scores, score_type, perf_stat_dict) in zip(req.queries, searches)
+    ]
+
+    retrieve_time = searches[0][3]["retrieve_time"]
+    response.headers["X-Retrieve-Time"] = str(retrieve_time)
+    rerank_times = [perf_stat_dict["rerank_time"] for *_, perf_stat_dict in searches if "rerank_time" in perf_stat_dict]
+    if rerank_times:
+        # Queries are reranked concurrently, so the slowest one bounds the batch
+        response.headers["X-Rerank-Time"] = str(max(rerank_times))
+    response.headers["X-Total-Time"] = str(time.time() - start_time)
+
+    return OrjsonResponse({"results": items}, headers=dict(response.headers))
+
+
+def _to_results(docs, scores, result_format="full"):
+    """Convert retrieved documents and their scores into response result dicts.
+
+    Builds plain dicts rather than SimilaritySearchResult models: the endpoints serialize
+    them with orjson, so validating every chunk text through pydantic would only add latency.
+    """
+    if result_format == "compact":
+        return [{"chunk_id": str(doc.get("chunk_id", "")), "score": float(score)} for doc, score in zip(docs, scores)]
+    return [
+        {
+            "page_content": doc.get("page_content", ""),
+            "filename": doc.get("filename", ""),
+            "type": doc.get("type", ""),
+            "source": doc.get("source", ""),
+            "chunk_id": str(doc.get("chunk_id", "")),
+            "score": float(score),
+        }
+        for doc, score in zip(docs, scores)
+    ]
 
 
 @app.get(
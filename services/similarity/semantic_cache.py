@@ -0,0 +1,195 @@
+import copy
+import threading
+import time
+
+import numpy as np
+
+from common.misc_utils import get_logger
+from similarity.settings import settings
+
+logger = get_logger("SemanticCache")
+
+_semantic_cache = None
+_semantic_cache_lock = threading.Lock()
+
+
+class SemanticCache:
+    """
+    Bounded cache of final search results, looked up by query embedding.
+
+    A search is served from the cache when a recent query searched with the same
+    options (the scope: embedding model, mode, top_k and reranker) has an embedding
+    within max_distance cosine distance, so paraphrases of a recent question skip
+    search and reranking. Entries belong to one index generation; the first lookup
+    under a new generation drops them all.
+
+    Embeddings are kept unit-normalized in one preallocated matrix and a lookup is a
+    single matrix-vector product over its max_entries rows. At the sizes this cache is
+    meant for (a few thousand recent queries) the exact scan takes well under a
+    millisecond, so no approximate index is built. Repeats of a cached query text
+    (ignoring case and spacing) are found by get_text without embedding the query.
+    """
+
+    def __init__(self, max_entries: int, max_distance: float, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached queries
+            max_distance: Largest cosine distance at which a cached query is reused
+            ttl_seconds: Time after which a cached result is no longer served
+        """
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._generation = None
+        self._matrix = None
+        # Per row: scope id (-1 for a free row), expiry and last use (monotonic), cached value
+        self._scopes = np.full(max_entries, -1, dtype=np.int64)
+        self._expires = np.zeros(max_entries)
+        self._used = np.zeros(max_entries)
+        self._values = [None] * max_entries
+        self._texts = [None] * max_entries
+        self._scope_ids: dict[tuple, int] = {}
+        # (scope id, normalized query text) -> row
+        self._rows_by_text: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector):
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    @staticmethod
+    def _normalize_text(query):
+        return " ".join(query.split()).casefold()
+
+    def _clear_locked(self):
+        self._scopes.fill(-1)
+        self._values = [None] * self.max_entries
+        self._texts = [None] * self.max_entries
+        self._scope_ids.clear()
+        self._rows_by_text.clear()
+
+    def _check_generation_locked(self, generation):
+        """Drop every entry if the index generation changed since they were stored."""
+        if generation == self._generation:
+            return
+        if self._generation is not None:
+            self._clear_locked()
+            self.invalidations += 1
+            logger.debug("Index changed, dropped cached search results")
+        self._generation = generation
+
+    def get_text(self, scope: tuple, generation, query: str):
+        """
+        Return a copy of the value cached for the same query text, or None.
+
+        A miss is not counted, since the caller goes on to look the query up by embedding.
+        """
+        with self._lock:
+            self._check_generation_locked(generation)
+            scope_id = self._scope_ids.get(scope)
+            row = self._rows_by_text.get((scope_id, self._normalize_text(query)))
+            if row is None:
+                return None
+            now = time.monotonic()
+            if self._expires[row] <= now:
+                return None
+            self._used[row] = now
+            self.hits += 1
+            return copy.deepcopy(self._values[row])
+
+    def get(self, scope: tuple, generation, vector):
+        """Return a copy of the value cached for the nearest query within max_distance, or None."""
+        query = self._normalize(vector)
+        with self._lock:
+            self._check_generation_locked(generation)
+            scope_id = self._scope_ids.get(scope)
+            if query is None or scope_id is None or self._matrix.shape[1] != query.shape[0]:
+                self.misses += 1
+                return None
+            now = time.monotonic()
+            similarities = np.where(
+                (self._scopes == scope_id) & (self._expires > now), self._matrix @ query, -np.inf
+            )
+            row = int(np.argmax(similarities))
+            if 1.0 - similarities[row] > self.max_distance:
+                self.misses += 1
+                return None
+            self._used[row] = now
+            self.hits += 1
+            # Callers may modify the cached result dicts
+            return copy.deepcopy(self._values[row])
+
+    def put(self, scope: tuple, generation, vector, value, text: str | None = None):
+        """
+        Cache value for the query embedding, unless the index moved past generation meanwhile.
+
+        With the query text given, repeats of it are also served by get_text.
+        """
+        query = self._normalize(vector)
+        if query is None:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if self._generation is not None and generation != self._generation:
+                return
+            self._check_generation_locked(generation)
+            if self._matrix is None or self._matrix.shape[1] != query.shape[0]:
+                # First entry, or the embedding model changed dimension
+                self._matrix = np.zeros((self.max_entries, query.shape[0]), dtype=np.float32)
+                self._clear_locked()
+            scope_id = self._scope_ids.setdefault(scope, len(self._scope_ids))
+            now = time.monotonic()
+            free = np.flatnonzero((self._scopes < 0) | (self._expires <= now))
+            if free.size:
+                row = int(free[0])
+            else:
+                row = int(np.argmin(self._used))
+                self.evictions += 1
+            if self._texts[row] is not None and self._rows_by_text.get(self._texts[row]) == row:
+                del self._rows_by_text[self._texts[row]]
+            self._texts[row] = None
+            if text is not None:
+                self._texts[row] = (scope_id, self._normalize_text(text))
+                self._rows_by_text[self._texts[row]] = row
+            self._matrix[row] = query
+            self._scopes[row] = scope_id
+            self._expires[row] = now + self.ttl_seconds
+            self._used[row] = now
+            self._values[row] = value
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the number of cached queries."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": int(((self._scopes >= 0) & (self._expires > time.monotonic())).sum()),
+                "max_entries": self.max_entries,
+            }
+
+
+def get_semantic_cache() -> SemanticCache | None:
+    """Return the process-wide semantic query cache, or None if disabled."""
+    global _semantic_cache
+    cfg = settings.similarity
+    if not cfg.semantic_cache_enabled:
+        return None
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticCache(
+                    cfg.semantic_cache_max_entries, cfg.semantic_cache_max_distance, cfg.semantic_cache_ttl_seconds
+                )
+    return _semantic_cache
@@ -26,6 +26,86 @@ class SimilarityConfig(BaseSettings):
         description="Maximum token length for similarity search queries",
     )
 
+    async_pipeline: bool = Field(
+        default=True,
+        description=(
+            "Serve searches with async embedding, vector store and reranker clients on the event loop; "
+            "when false, the synchronous pipeline runs in worker threads"
+        ),
+    )
+
+    async_max_connections: int = Field(
+        default=64,
+        gt=0,
+        description="Connection pool size of the async embedding client",
+    )
+
+    max_batch_queries: int = Field(
+        default=64,
+        gt=0,
+        description="Maximum number of queries accepted by one batch similarity search",
+    )
+
+    batch_rerank_concurrency: int = Field(
+        default=4,
+        gt=0,
+        description="Queries of a batch similarity search reranked concurrently",
+    )
+
+    cascade_enabled: bool = Field(
+        default=False,
+        description="Prune retrieval candidates with a cheap local score before reranking",
+    )
+
+    cascade_retrieve_candidates: int = Field(
+        default=50,
+        gt=0,
+        description="Candidates retrieved for a reranked search when the cascade is enabled (at least top_k)",
+    )
+
+    cascade_rerank_candidates: int = Field(
+        default=20,
+        gt=0,
+        description="Candidates kept by the cheap cascade stage and sent to the reranker (at least top_k)",
+    )
+
+    cascade_min_relative_score: float = Field(
+        default=0.0,
+        ge=0.0,
+        le=1.0,
+        description=(
+            "Also drop candidates whose cheap score is below this fraction of the best one; "
+            "0 keeps cascade_rerank_candidates regardless of score"
+        ),
+    )
+
+    semantic_cache_enabled: bool = Field(
+        default=False,
+        description=(
+            "Serve a search from the results of a recent search with a near-duplicate query embedding "
+            "and the same options, skipping search and reranking"
+        ),
+    )
+
+    semantic_cache_max_distance: float = Field(
+        default=0.05,
+        ge=0.0,
+        le=2.0,
+        description="Largest cosine distance between query embeddings at which cached results are reused",
+    )
+
+    semantic_cache_max_entries: int = Field(
+        default=2048,
+        gt=0,
+        description="Maximum number of recent queries whose results are cached",
+    )
+
+    semantic_cache_ttl_seconds: float = Field(
+        default=600.0,
+        gt=0,
+        description="Time after which cached results are no longer served, even if the index is unchanged",
+    )
+
     @field_validator('num_chunks_post_search')
     @classmethod
     def validate_num_chunks_post_search(cls, v):
@@ -1,11 +1,22 @@
+import asyncio
 import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from pydantic import BaseModel, Field
 
-from common.retrieval_utils import retrieve_documents
-from common.reranker_utils import rerank_documents
+from common.rerank_cache import last_rerank_lookup
+from common.retrieval_cache import last_lookup_hit
+from common.retrieval_utils import (
+    retrieve_documents,
+    retrieve_documents_async,
+    retrieve_documents_many,
+    retrieve_documents_many_async,
+)
+from common.reranker_utils import cascade_prune, rerank_documents, rerank_documents_async
+from common.emb_utils import get_embedder
 from common.error_utils import http_error_responses
+from similarity.semantic_cache import get_semantic_cache
 from similarity.settings import settings
 
 
@@ -25,6 +36,16 @@ class SimilaritySearchRequest(BaseModel):
         default=False,
         description="When true, applies Cohere reranker to re-score and re-order results."
     )
+    format: str = Field(
+        default="full",
+        description=(
+            "Result format: full returns each chunk's text and metadata, compact only its chunk_id and score "
+            "(for callers that already hold the chunk text)"
+        )
+    )
+
+
+RESULT_FORMATS = ("full", "compact")
 
 
 class SimilaritySearchResult(BaseModel):
@@ -37,6 +58,12 @@ class SimilaritySearchResult(BaseModel):
     score: float = Field(..., description="Cosine similarity (rerank=false) or relevance score (rerank=true)")
 
 
+class SimilaritySearchCompactResult(BaseModel):
+    """A single result of a compact format search: the chunk identifier and its score."""
+    chunk_id: str = Field(..., description="Unique chunk identifier")
+    score: float = Field(..., description="Cosine similarity (rerank=false) or relevance score (rerank=true)")
+
+
 class SimilaritySearchResponse(BaseModel):
     """Response from POST /v1/similarity-search.
 
@@ -44,14 +71,19 @@ class SimilaritySearchResponse(BaseModel):
     - X-Retrieve-Time: Time spent retrieving documents (seconds)
     - X-Rerank-Time: Time spent reranking (seconds, only present if reranking was used)
     - X-Total-Time: Total processing time (seconds)
+    - X-Retrieval-Cache: "hit" or "miss" (only present if the retrieval cache was consulted)
+    - X-Retrieval-Cache-Hit-Rate / X-Retrieval-Cache-Bytes: Retrieval cache statistics
+    - X-Rerank-Cache-Hits / X-Rerank-Cache-Misses: Reranker scores served from / missing in the score cache
+    - X-Rerank-Cache-Hit-Rate: Process-wide hit rate of the rerank score cache
+    - X-Cascade-Time / X-Rerank-Candidates: Cheap pruning time and candidates sent to the reranker
     """
     score_type: str = Field(
         ...,
         description="'cosine' for dense-only results, 'relevance' when reranked"
     )
-    results: list[SimilaritySearchResult] = Field(
+    results: list[SimilaritySearchResult | SimilaritySearchCompactResult] = Field(
         ...,
-        description="Documents ranked by descending score"
+        description="Documents ranked by descending score; only chunk_id and score with format=compact"
     )
 
     model_config = {
@@ -82,6 +114,52 @@ class SimilaritySearchResponse(BaseModel):
 
 
 
+class SimilaritySearchBatchRequest(BaseModel):
+    """Request body for POST /v1/similarity-search:batch."""
+    queries: list[SimilaritySearchRequest] = Field(
+        ...,
+        min_length=1,
+        description="Searches to run, each with its own top_k, mode and rerank options"
+    )
+
+
+class SimilaritySearchTimings(BaseModel):
+    """Timings of one search in a batch, in seconds."""
+    retrieve_time: float = Field(..., description="Shared embedding and multi-search time of the batch")
+    rerank_time: Optional[float] = Field(default=None, description="Time spent reranking this query")
+    cascade_time: Optional[float] = Field(default=None, description="Time spent pruning candidates before reranking")
+    rerank_candidates: Optional[int] = Field(default=None, description="Candidates sent to the reranker")
+    rerank_cache_hits: Optional[int] = Field(default=None, description="Reranker scores served from the score cache")
+    rerank_cache_misses: Optional[int] = Field(default=None, description="Reranker scores computed by the reranker")
+
+
+class SimilaritySearchBatchItem(BaseModel):
+    """Results of one search in a batch."""
+    score_type: str = Field(..., description="'cosine', 'bm25' or 'hybrid', or 'relevance' when reranked")
+    results: list[SimilaritySearchResult | SimilaritySearchCompactResult] = Field(
+        ..., description="Documents ranked by descending score; only chunk_id and score with format=compact"
+    )
+    timings: SimilaritySearchTimings = Field(..., description="Per-query timings")
+
+
+class SimilaritySearchBatchResponse(BaseModel):
+    """Response from POST /v1/similarity-search:batch.
+
+    Note: Batch-level timing information is provided in response headers:
+    - X-Retrieve-Time: Time of the shared embedding call and multi-search request (seconds)
+    - X-Rerank-Time: Longest rerank time of the concurrently reranked queries (seconds, only present if any query was reranked)
+    - X-Total-Time: Total processing time (seconds)
+    """
+    results: list[SimilaritySearchBatchItem] = Field(..., description="One result set per query, in request order")
+
+
+_SCORE_TYPES = {
+    "dense": "cosine",
+    "hybrid": "hybrid",
+    "sparse": "bm25"
+}
+
+
 def perform_similarity_search(
     query: str,
     emb_model: str,
@@ -97,6 +175,10 @@ def perform_similarity_search(
     """
     Run vector similarity search using the specified mode, with optional Cohere reranking.
 
+    With the cascade enabled, a reranked search retrieves cascade_retrieve_candidates
+    candidates, keeps the cascade_rerank_candidates most promising by a cheap local
+    score, reranks those and returns the top_k best.
+
     Args:
         query: Natural language search query
         emb_model: Embedding model name
@@ -115,37 +197,282 @@ def perform_similarity_search(
         - docs: list of document dicts (page_content, filename, type, source, chunk_id)
         - scores: parallel list of float scores
         - score_type: "cosine", "bm25", "hybrid", or "relevance" (when reranked)
-        - perf_stat_dict: dict with "retrieve_time" and optionally "rerank_time"
+        - perf_stat_dict: dict with "retrieve_time" and optionally "rerank_time" and
+          "retrieval_cache_hit" (when the retrieval cache was consulted), "rerank_cache_hits"
+          and "rerank_cache_misses" (when the rerank score cache was consulted),
+          "cascade_time" and "rerank_candidates" (when the cascade pruned candidates), and
+          "semantic_cache_hit" (when the semantic query cache was consulted)
     """
     perf_stat_dict: dict = {}
+    retrieve_k = _retrieve_k(top_k, rerank)
 
     start_time = time.time()
+    cache = get_semantic_cache()
+    generation = vectorstore.generation() if cache is not None else None
+    query_vector = None
+    if generation is not None:
+        scope = _semantic_scope(emb_model, top_k, rerank, mode, reranker_model)
+        # Exact repeats are served without embedding the query
+        cached = _semantic_result(cache.get_text(scope, generation, query), start_time, perf_stat_dict)
+        if cached is None:
+            query_vector = get_embedder(emb_model, emb_endpoint, emb_max_model_len).embed_query(query)
+            cached = _semantic_result(cache.get(scope, generation, query_vector), start_time, perf_stat_dict)
+        if cached is not None:
+            return cached
+
     docs, scores = retrieve_documents(
         query,
         emb_model,
         emb_endpoint,
         emb_max_model_len,
         vectorstore,
-        top_k,
+        retrieve_k,
         mode=mode,
+        vector=query_vector,
     )
     perf_stat_dict["retrieve_time"] = time.time() - start_time
+    cache_hit = last_lookup_hit()
+    if cache_hit is not None:
+        perf_stat_dict["retrieval_cache_hit"] = cache_hit
 
-    score_type_map = {
-        "dense": "cosine",
-        "hybrid": "hybrid",
-        "sparse": "bm25"
-    }
-    score_type = score_type_map.get(mode, "cosine")
+    score_type = _SCORE_TYPES.get(mode, "cosine")
 
     if rerank:
         if reranker_model is None or reranker_endpoint is None:
             raise ValueError("reranker_model and reranker_endpoint are required when rerank=True")
-        start_time = time.time()
-        reranked = rerank_documents(query, docs, reranker_model, reranker_endpoint)
-        perf_stat_dict["rerank_time"] = time.time() - start_time
-        docs = [d for d, _ in reranked]
-        scores = [s for _, s in reranked]
+        docs, scores, rerank_stats = _rerank(query, docs, scores, top_k, reranker_model, reranker_endpoint)
+        perf_stat_dict.update(rerank_stats)
         score_type = "relevance"
 
+    if generation is not None:
+        cache.put(scope, generation, query_vector, (docs, scores, score_type), text=query)
     return docs, scores, score_type, perf_stat_dict
+
+
+def perform_similarity_search_batch(
+    requests: list[SimilaritySearchRequest],
+    emb_model: str,
+    emb_endpoint: str,
+    emb_max_model_len: int,
+    vectorstore,
+    reranker_model: Optional[str] = None,
+    reranker_endpoint: Optional[str] = None,
+):
+    """
+    Run several similarity searches with one embedding call and one multi-search request.
+
+    Each request keeps its own top_k, mode and rerank options. Requests with rerank=True
+    are reranked concurrently, each in batched rerank calls.
+
+    Returns:
+        list of (docs, scores, score_type, perf_stat_dict) tuples, one per request. Every
+        perf_stat_dict has "retrieve_time" (the shared embedding and multi-search time)
+        and, for reranked requests, the same rerank entries as perform_similarity_search.
+    """
+    if any(req.rerank for req in requests) and (reranker_model is None or reranker_endpoint is None):
+        raise ValueError("reranker_model and reranker_endpoint are required when rerank=True")
+
+    start_time = time.time()
+    retrieved = retrieve_documents_many(
+        [req.query for req in requests],
+        emb_model,
+        emb_endpoint,
+        emb_max_model_len,
+        vectorstore,
+        [_retrieve_k(req.top_k, req.rerank) for req in requests],
+        mode=[req.mode for req in requests],
+    )
+    retrieve_time = time.time() - start_time
+
+    results = [
+        (docs, scores, _SCORE_TYPES.get(req.mode, "cosine"), {"retrieve_time": retrieve_time})
+        for req, (docs, scores) in zip(requests, retrieved)
+    ]
+    reranked = [i for i, req in enumerate(requests) if req.rerank]
+    if not reranked:
+        return results
+
+    def rerank_one(i):
+        docs, scores, _, perf_stat_dict = results[i]
+        docs, scores, rerank_stats = _rerank(
+            requests[i].query, docs, scores, requests[i].top_k, reranker_model, reranker_endpoint
+        )
+        perf_stat_dict.update(rerank_stats)
+        return i, (docs, scores, "relevance", perf_stat_dict)
+
+    with ThreadPoolExecutor(max_workers=min(len(reranked), settings.similarity.batch_rerank_concurrency)) as executor:
+        for i, result in executor.map(rerank_one, reranked):
+            results[i] = result
+    return results
+
+
+async def perform_similarity_search_async(
+    query: str,
+    emb_model: str,
+    emb_endpoint: str,
+    emb_max_model_len: int,
+    vectorstore,
+    top_k: int,
+    rerank: bool,
+    mode: str,
+    reranker_model: Optional[str] = None,
+    reranker_endpoint: Optional[str] = None,
+):
+    """
+    Async counterpart of perform_similarity_search, with the same arguments and return value.
+
+    Embedding, search and reranking run on the event loop with async clients, so a
+    request does not hold a worker thread while it waits on the model servers or the
+    vector store.
+    """
+    perf_stat_dict: dict = {}
+
+    start_time = time.time()
+    cache = get_semantic_cache()
+    generation = await vectorstore.generation_async() if cache is not None else None
+    query_vector = None
+    if generation is not None:
+        scope = _semantic_scope(emb_model, top_k, rerank, mode, reranker_model)
+        # Exact repeats are served without embedding the query
+        cached = _semantic_result(cache.get_text(scope, generation, query), start_time, perf_stat_dict)
+        if cached is None:
+            query_vector = await get_embedder(emb_model, emb_endpoint, emb_max_model_len).embed_query_async(query)
+            cached = _semantic_result(cache.get(scope, generation, query_vector), start_time, perf_stat_dict)
+        if cached is not None:
+            return cached
+
+    docs, scores = await retrieve_documents_async(
+        query,
+        emb_model,
+        emb_endpoint,
+        emb_max_model_len,
+        vectorstore,
+        _retrieve_k(top_k, rerank),
+        mode=mode,
+        vector=query_vector,
+    )
+    perf_stat_dict["retrieve_time"] = time.time() - start_time
+    cache_hit = last_lookup_hit()
+    if cache_hit is not None:
+        perf_stat_dict["retrieval_cache_hit"] = cache_hit
+
+    score_type = _SCORE_TYPES.get(mode, "cosine")
+
+    if rerank:
+        if reranker_model is None or reranker_endpoint is None:
+            raise ValueError("reranker_model and reranker_endpoint are required when rerank=True")
+        docs, scores, rerank_stats = await _rerank_async(query, docs, scores, top_k, reranker_model, reranker_endpoint)
+        perf_stat_dict.update(rerank_stats)
+        score_type = "relevance"
+
+    if generation is not None:
+        cache.put(scope, generation, query_vector, (docs, scores, score_type), text=query)
+    return docs, scores, score_type, perf_stat_dict
+
+
+async def perform_similarity_search_batch_async(
+    requests: list[SimilaritySearchRequest],
+    emb_model: str,
+    emb_endpoint: str,
+    emb_max_model_len: int,
+    vectorstore,
+    reranker_model: Optional[str] = None,
+    reranker_endpoint: Optional[str] = None,
+):
+    """Async counterpart of perform_similarity_search_batch; all reranks run concurrently."""
+    if any(req.rerank for req in requests) and (reranker_model is None or reranker_endpoint is None):
+        raise ValueError("reranker_model and reranker_endpoint are required when rerank=True")
+
+    start_time = time.time()
+    retrieved = await retrieve_documents_many_async(
+        [req.query for req in requests],
+        emb_model,
+        emb_endpoint,
+        emb_max_model_len,
+        vectorstore,
+        [_retrieve_k(req.top_k, req.rerank) for req in requests],
+        mode=[req.mode for req in requests],
+    )
+    retrieve_time = time.time() - start_time
+
+    async def finish(req, docs, scores):
+        perf_stat_dict = {"retrieve_time": retrieve_time}
+        if not req.rerank:
+            return docs, scores, _SCORE_TYPES.get(req.mode, "cosine"), perf_stat_dict
+        docs, scores, rerank_stats = await _rerank_async(
+            req.query, docs, scores, req.top_k, reranker_model, reranker_endpoint
+        )
+        perf_stat_dict.update(rerank_stats)
+        return docs, scores, "relevance", perf_stat_dict
+
+    return list(await asyncio.gather(*(
+        finish(req, docs, scores) for req, (docs, scores) in zip(requests, retrieved)
+    )))
+
+
+def _semantic_scope(emb_model, top_k, rerank, mode, reranker_model):
+    """Search options whose results a semantically close query may reuse."""
+    return emb_model, mode, top_k, reranker_model if rerank else None
+
+
+def _semantic_result(cached, start_time, perf_stat_dict):
+    """Return the full search result from a semantic cache lookup, or None on a miss."""
+    perf_stat_dict["semantic_cache_hit"] = cached is not None
+    if cached is None:
+        return None
+    perf_stat_dict["retrieve_time"] = time.time() - start_time
+    docs, scores, score_type = cached
+    return docs, scores, score_type, perf_stat_dict
+
+
+def _retrieve_k(top_k: int, rerank: bool) -> int:
+    """Number of candidates to retrieve; the cascade retrieves more for reranking to prune."""
+    if rerank and settings.similarity.cascade_enabled:
+        return max(top_k, settings.similarity.cascade_retrieve_candidates)
+    return top_k
+
+
+def _cascade(query, docs, scores, top_k, perf_stat_dict):
+    """Prune candidates before reranking when the cascade is enabled."""
+    if not settings.similarity.cascade_enabled:
+        return docs, scores
+    start_time = time.time()
+    docs, scores = cascade_prune(
+        query,
+        docs,
+        scores,
+        keep=max(top_k, settings.similarity.cascade_rerank_candidates),
+        min_keep=top_k,
+        min_relative_score=settings.similarity.cascade_min_relative_score,
+    )
+    perf_stat_dict["cascade_time"] = time.time() - start_time
+    perf_stat_dict["rerank_candidates"] = len(docs)
+    return docs, scores
+
+
+def _reranked(reranked, top_k, start_time, perf_stat_dict):
+    """Split reranked (document, score) pairs and record rerank timing and cache stats."""
+    perf_stat_dict["rerank_time"] = time.time() - start_time
+    rerank_lookup = last_rerank_lookup()
+    if rerank_lookup is not None:
+        perf_stat_dict["rerank_cache_hits"], perf_stat_dict["rerank_cache_misses"] = rerank_lookup
+    reranked = reranked[:top_k]
+    return [d for d, _ in reranked], [s for _, s in reranked], perf_stat_dict
+
+
+def _rerank(query, docs, scores, top_k, reranker_model, reranker_endpoint):
+    """Rerank candidates, after cascade pruning when enabled; returns (docs, scores, perf stats)."""
+    perf_stat_dict = {}
+    docs, scores = _cascade(query, docs, scores, top_k, perf_stat_dict)
+    start_time = time.time()
+    reranked = rerank_documents(query, docs, reranker_model, reranker_endpoint)
+    return _reranked(reranked, top_k, start_time, perf_stat_dict)
+
+
+async def _rerank_async(query, docs, scores, top_k, reranker_model, reranker_endpoint):
+    """Async counterpart of _rerank."""
+    perf_stat_dict = {}
+    docs, scores = _cascade(query, docs, scores, top_k, perf_stat_dict)
+    start_time = time.time()
+    reranked = await rerank_documents_async(query, docs, reranker_model, reranker_endpoint)
+    return _reranked(reranked, top_k, start_time, perf_stat_dict)
@@ -0,0 +1,210 @@
+# services/similarity/tests/unit/test_semantic_cache.py
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+# Add services directory to path for imports
+services_path = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(services_path))
+
+import similarity.semantic_cache as semantic_cache
+from similarity.semantic_cache import SemanticCache
+from similarity.settings import settings
+from similarity.similarity_utils import perform_similarity_search, perform_similarity_search_async
+
+SCOPE = ("emb", "dense", 5, None)
+
+
+def _vector(*values):
+    return np.array(values, dtype=np.float32)
+
+
+def _docs(*names):
+    return [{"page_content": n, "filename": "f.pdf", "type": "text", "source": "f.pdf", "chunk_id": n} for n in names]
+
+
+class TestSemanticCache:
+    """Tests for the near-duplicate query cache"""
+
+    def test_near_duplicate_served(self):
+        """Test: a query within max_distance gets the cached value, a distant one does not"""
+        cache = SemanticCache(max_entries=8, max_distance=0.05, ttl_seconds=60)
+        cache.put(SCOPE, "g1", _vector(1.0, 0.0), "results")
+
+        assert cache.get(SCOPE, "g1", _vector(0.99, 0.05)) == "results"
+        assert cache.get(SCOPE, "g1", _vector(0.7, 0.7)) is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_scope_separates_entries(self):
+        """Test: results cached for other search options are not served"""
+        cache = SemanticCache(max_entries=8, max_distance=0.05, ttl_seconds=60)
+        cache.put(SCOPE, "g1", _vector(1.0, 0.0), "dense")
+
+        assert cache.get(("emb", "sparse", 5, None), "g1", _vector(1.0, 0.0)) is None
+        assert cache.get(("emb", "dense", 10, None), "g1", _vector(1.0, 0.0)) is None
+
+    def test_generation_change_drops_entries(self):
+        """Test: nothing is served after the index generation changes, and stale puts are ignored"""
+        cache = SemanticCache(max_entries=8, max_distance=0.05, ttl_seconds=60)
+        cache.put(SCOPE, "g1", _vector(1.0, 0.0), "old")
+
+        assert cache.get(SCOPE, "g2", _vector(1.0, 0.0)) is None
+        cache.put(SCOPE, "g1", _vector(1.0, 0.0), "stale")
+
+        assert cache.get(SCOPE, "g2", _vector(1.0, 0.0)) is None
+        assert cache.stats()["invalidations"] == 1
+
+    def test_ttl_expiry(self):
+        """Test: entries are not served after the TTL"""
+        cache = SemanticCache(max_entries=8, max_distance=0.05, ttl_seconds=60)
+        with patch("similarity.semantic_cache.time.monotonic", return_value=100.0):
+            cache.put(SCOPE, "g1", _vector(1.0, 0.0), "results")
+        with patch("similarity.semantic_cache.time.monotonic", return_value=200.0):
+            assert cache.get(SCOPE, "g1", _vector(1.0, 0.0)) is None
+
+    def test_least_recently_used_evicted(self):
+        """Test: a full cache replaces the entry used longest ago"""
+        cache = SemanticCache(max_entries=2, max_distance=0.01, ttl_seconds=60)
+        cache.put(SCOPE, "g1", _vector(1.0, 0.0), "a")
+        cache.put(SCOPE, "g1", _vector(0.0, 1.0), "b")
+        cache.get(SCOPE, "g1", _vector(1.0, 0.0))
+
+        cache.put(SCOPE, "g1", _vector(-1.0, 0.0), "c")
+
+        assert cache.get(SCOPE, "g1", _vector(1.0, 0.0)) == "a"
+        assert cache.get(SCOPE, "g1", _vector(0.0, 1.0)) is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_exact_text_served_without_vector(self):
+        """Test: a repeat of a cached query text is found by text within its scope and generation"""
+        cache = SemanticCache(max_entries=8, max_distance=0.05, ttl_seconds=60)
+        cache.put(SCOPE, "g1", _vector(1.0, 0.0), "results", text="Reset  Password")
+
+        assert cache.get_text(SCOPE, "g1", "reset password") == "results"
+        assert cache.get_text(SCOPE, "g1", "printer setup") is None
+        assert cache.get_text(("emb", "sparse", 5, None), "g1", "reset password") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 0
+        assert cache.get_text(SCOPE, "g2", "reset password") is None
+
+    def test_evicted_row_not_served_by_text(self):
+        """Test: a row reused for another query no longer answers its previous text"""
+        cache = SemanticCache(max_entries=1, max_distance=0.01, ttl_seconds=60)
+        cache.put(SCOPE, "g1", _vector(1.0, 0.0), "a", text="first")
+        cache.put(SCOPE, "g1", _vector(0.0, 1.0), "b", text="second")
+
+        assert cache.get_text(SCOPE, "g1", "first") is None
+        assert cache.get_text(SCOPE, "g1", "second") == "b"
+
+    def test_returns_copies(self):
+        """Test: callers modifying a served result do not change the cached one"""
+        cache = SemanticCache(max_entries=8, max_distance=0.05, ttl_seconds=60)
+        cache.put(SCOPE, "g1", _vector(1.0, 0.0), (_docs("a"), [0.9], "cosine"))
+
+        cache.get(SCOPE, "g1", _vector(1.0, 0.0))[0][0]["page_content"] = "changed"
+
+        assert cache.get(SCOPE, "g1", _vector(1.0, 0.0))[0][0]["page_content"] == "a"
+
+
+class TestSemanticCacheSearch:
+    """Tests for serving similarity searches from the semantic cache"""
+
+    @pytest.fixture
+    def enabled(self):
+        """Enable a fresh semantic cache and embed queries with a fake embedder"""
+        embedder = Mock()
+        vectors = {"reset password": _vector(1.0, 0.0), "password reset steps": _vector(0.99, 0.04),
+                   "printer setup": _vector(0.0, 1.0)}
+        embedder.embed_query.side_effect = vectors.get
+
+        async def embed_query_async(text):
+            return vectors[text]
+        embedder.embed_query_async.side_effect = embed_query_async
+
+        with patch.object(semantic_cache, "_semantic_cache", None), \
+             patch.object(settings.similarity, "semantic_cache_enabled", True), \
+             patch("similarity.similarity_utils.get_embedder", return_value=embedder):
+            yield embedder
+
+    @staticmethod
+    def _search(query, vectorstore, rerank=False):
+        return perform_similarity_search(query, "emb", "http://emb", 512, vectorstore, 2, rerank, "dense", "r", "http://r")
+
+    def test_paraphrase_skips_search_and_rerank(self, enabled):
+        """Test: a near-duplicate query returns the cached reranked results without searching"""
+        vectorstore = Mock()
+        vectorstore.generation.return_value = "g1"
+        with patch("similarity.similarity_utils.retrieve_documents", return_value=(_docs("a", "b"), [0.9, 0.8])) as mock_retrieve, \
+             patch("similarity.similarity_utils.rerank_documents",
+                   return_value=[(_docs("b")[0], 0.95), (_docs("a")[0], 0.1)]) as mock_rerank:
+            first = self._search("reset password", vectorstore, rerank=True)
+            second = self._search("password reset steps", vectorstore, rerank=True)
+
+        assert mock_retrieve.call_count == 1
+        assert mock_retrieve.call_args.kwargs["vector"] is not None
+        assert mock_rerank.call_count == 1
+        assert first[3]["semantic_cache_hit"] is False
+        assert second[3]["semantic_cache_hit"] is True
+        assert second[:3] == first[:3]
+        assert "rerank_time" not in second[3]
+
+    def test_exact_repeat_skips_embedding(self, enabled):
+        """Test: repeating a cached query is served without embedding it again"""
+        vectorstore = Mock()
+        vectorstore.generation.return_value = "g1"
+        with patch("similarity.similarity_utils.retrieve_documents", return_value=(_docs("a"), [0.9])) as mock_retrieve:
+            first = self._search("reset password", vectorstore)
+            second = self._search("Reset  password", vectorstore)
+
+        assert mock_retrieve.call_count == 1
+        enabled.embed_query.assert_called_once_with("reset password")
+        assert second[3]["semantic_cache_hit"] is True
+        assert second[:3] == first[:3]
+
+    def test_unrelated_query_and_new_generation_search(self, enabled):
+        """Test: a distant query, or the same query after the index changed, runs a new search"""
+        vectorstore = Mock()
+        vectorstore.generation.return_value = "g1"
+        with patch("similarity.similarity_utils.retrieve_documents", return_value=(_docs("a"), [0.9])) as mock_retrieve:
+            self._search("reset password", vectorstore)
+            self._search("printer setup", vectorstore)
+            vectorstore.generation.return_value = "g2"
+            result = self._search("reset password", vectorstore)
+
+        assert mock_retrieve.call_count == 3
+        assert result[3]["semantic_cache_hit"] is False
+
+    def test_store_without_generation_not_cached(self, enabled):
+        """Test: results of a store that cannot report changes are never cached"""
+        vectorstore = Mock()
+        vectorstore.generation.return_value = None
+        with patch("similarity.similarity_utils.retrieve_documents", return_value=(_docs("a"), [0.9])) as mock_retrieve:
+            self._search("reset password", vectorstore)
+            result = self._search("reset password", vectorstore)
+
+        assert mock_retrieve.call_count == 2
+        assert "semantic_cache_hit" not in result[3]
+        enabled.embed_query.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_async_path_shares_cache(self, enabled):
+        """Test: the async pipeline serves results cached by a near-duplicate query"""
+        vectorstore = Mock()
+
+        async def generation_async():
+            return "g1"
+        vectorstore.generation_async.side_effect = generation_async
+        with patch("similarity.similarity_utils.retrieve_documents_async", return_value=(_docs("a"), [0.9])) as mock_retrieve:
+            await perform_similarity_search_async("reset password", "emb", "http://emb", 512, vectorstore, 2, False, "dense")
+            docs, _, _, perf = await perform_similarity_search_async(
+                "password reset steps", "emb", "http://emb", 512, vectorstore, 2, False, "dense"
+            )
+
+        assert mock_retrieve.await_count == 1
+        assert perf["semantic_cache_hit"] is True
+        assert [d["chunk_id"] for d in docs] == ["a"]
@@ -18,8 +18,11 @@ client = TestClient(app)
 
 @pytest.fixture
 def mock_dependencies():
-    """Mock all external dependencies"""
-    with patch('similarity.app.vectorstore') as mock_vs, \
+    """Mock all external dependencies of the synchronous pipeline"""
+    from similarity.settings import settings
+
+    with patch.object(settings.similarity, "async_pipeline", False), \
+         patch('similarity.app.vectorstore') as mock_vs, \
          patch('similarity.app.emb_model_dict') as mock_emb, \
          patch('similarity.app.reranker_model_dict') as mock_reranker, \
          patch('similarity.similarity_utils.retrieve_documents') as mock_retrieve, \
@@ -217,6 +220,40 @@ class TestRequestValidation:
         assert top_k_passed == settings.similarity.num_chunks_post_search
 
 
+class TestResultFormat:
+    """Tests for the format parameter"""
+
+    def test_full_format_is_default(self, mock_dependencies):
+        """Test: results carry chunk text and metadata, and timing headers are still set"""
+        response = client.post("/v1/similarity-search", json={"query": "test query"})
+
+        assert response.status_code == 200
+        assert response.json()["results"] == [{
+            "page_content": "test", "filename": "test.pdf", "type": "text",
+            "source": "test.pdf", "chunk_id": "123", "score": 0.85,
+        }]
+        assert "X-Retrieve-Time" in response.headers
+        assert "X-Total-Time" in response.headers
+
+    def test_compact_format_returns_ids_and_scores(self, mock_dependencies):
+        """Test: format='compact' returns only chunk_id and score"""
+        response = client.post("/v1/similarity-search", json={"query": "test query", "format": "compact"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["score_type"] == "cosine"
+        assert data["results"] == [{"chunk_id": "123", "score": 0.85}]
+        assert "X-Retrieve-Time" in response.headers
+
+    def test_invalid_format_returns_400(self, mock_dependencies):
+        """Test: an unknown format value returns 400"""
+        response = client.post("/v1/similarity-search", json={"query": "test query", "format": "ids"})
+
+        assert response.status_code == 400
+        assert "format must be one of" in response.json()["error"]["message"]
+        assert mock_dependencies["retrieve_documents"].call_count == 0
+
+
 class TestReturnTimings:
     """Tests for the return_timings option on perform_similarity_search"""
 
@@ -308,6 +345,276 @@ class TestReturnTimings:
             assert scores == [0.95]
 
 
+class TestCascadeReranking:
+    """Tests for cheap candidate pruning before reranking"""
+
+    @staticmethod
+    def _candidates(n):
+        docs = [{"page_content": f"chunk {i} about {'solar power' if i % 5 == 0 else 'bread'}",
+                 "filename": "f", "type": "text", "source": "f", "chunk_id": str(i)} for i in range(n)]
+        return docs, [1.0 - i / 100 for i in range(n)]
+
+    def test_cascade_retrieves_more_and_reranks_fewer(self):
+        """With the cascade enabled, more candidates are retrieved and only the kept ones reranked."""
+        from similarity.similarity_utils import perform_similarity_search, settings
+
+        docs, scores = self._candidates(30)
+        with patch("similarity.similarity_utils.retrieve_documents", return_value=(docs, scores)) as mock_retrieve, \
+             patch("similarity.similarity_utils.rerank_documents") as mock_rerank, \
+             patch.object(settings.similarity, "cascade_enabled", True), \
+             patch.object(settings.similarity, "cascade_retrieve_candidates", 30), \
+             patch.object(settings.similarity, "cascade_rerank_candidates", 8):
+            mock_rerank.side_effect = lambda q, d, m, e: [(doc, 1.0 - i / 10) for i, doc in enumerate(d)]
+
+            result_docs, result_scores, score_type, perf = perform_similarity_search(
+                query="solar power",
+                emb_model="m",
+                emb_endpoint="http://emb",
+                emb_max_model_len=512,
+                vectorstore=Mock(),
+                top_k=3,
+                rerank=True,
+                mode="hybrid",
+                reranker_model="r",
+                reranker_endpoint="http://rerank",
+            )
+
+        assert mock_retrieve.call_args[0][5] == 30
+        reranked = mock_rerank.call_args[0][1]
+        assert len(reranked) == 8
+        # Chunks sharing the query terms survive pruning even with lower retrieval scores
+        assert {d["chunk_id"] for d in reranked} >= {"0", "5", "10", "15", "20", "25"}
+        assert len(result_docs) == 3
+        assert perf["rerank_candidates"] == 8
+        assert "cascade_time" in perf
+
+    def test_cascade_disabled_by_default(self):
+        """Without the cascade, top_k candidates are retrieved and all of them reranked."""
+        from similarity.similarity_utils import perform_similarity_search
+
+        docs, scores = self._candidates(5)
+        with patch("similarity.similarity_utils.retrieve_documents", return_value=(docs, scores)) as mock_retrieve, \
+             patch("similarity.similarity_utils.rerank_documents") as mock_rerank:
+            mock_rerank.return_value = [(doc, 0.5) for doc in docs]
+
+            _, _, _, perf = perform_similarity_search(
+                query="solar power",
+                emb_model="m",
+                emb_endpoint="http://emb",
+                emb_max_model_len=512,
+                vectorstore=Mock(),
+                top_k=5,
+                rerank=True,
+                mode="hybrid",
+                reranker_model="r",
+                reranker_endpoint="http://rerank",
+            )
+
+        assert mock_retrieve.call_args[0][5] == 5
+        assert len(mock_rerank.call_args[0][1]) == 5
+        assert "rerank_candidates" not in perf
+
+
+class TestBatchSimilaritySearch:
+    """Tests for POST /v1/similarity-search:batch"""
+
+    @staticmethod
+    def _doc(name):
+        return {"page_content": name, "filename": "f.pdf", "type": "text", "source": "f.pdf", "chunk_id": name}
+
+    @pytest.fixture
+    def batch_dependencies(self):
+        """Mock the vector store, endpoints and batched retrieval of the synchronous pipeline"""
+        from similarity.settings import settings
+
+        with patch.object(settings.similarity, "async_pipeline", False), \
+             patch('similarity.app.vectorstore'), \
+             patch('similarity.app.emb_model_dict'), \
+             patch.dict('similarity.app.reranker_model_dict',
+                        {"reranker_model": "r", "reranker_endpoint": "http://rerank"}, clear=True), \
+             patch('similarity.app._validate_query_length', return_value=(True, "")), \
+             patch('similarity.similarity_utils.retrieve_documents_many') as mock_retrieve, \
+             patch('similarity.similarity_utils.rerank_documents') as mock_rerank:
+            yield mock_retrieve, mock_rerank
+
+    def test_one_retrieval_for_all_queries(self, batch_dependencies):
+        """Test: all queries share one retrieval call with their own top_k and mode, in order"""
+        mock_retrieve, mock_rerank = batch_dependencies
+        mock_retrieve.return_value = [
+            ([self._doc("a1"), self._doc("a2")], [0.9, 0.8]),
+            ([self._doc("b1")], [3.2]),
+        ]
+
+        response = client.post("/v1/similarity-search:batch", json={"queries": [
+            {"query": "first", "mode": "dense", "top_k": 2},
+            {"query": "second", "mode": "sparse", "top_k": 7},
+        ]})
+
+        assert response.status_code == 200
+        assert mock_retrieve.call_count == 1
+        args, kwargs = mock_retrieve.call_args
+        assert args[0] == ["first", "second"]
+        assert args[5] == [2, 7]
+        assert kwargs["mode"] == ["dense", "sparse"]
+        assert mock_rerank.call_count == 0
+
+        data = response.json()["results"]
+        assert [item["score_type"] for item in data] == ["cosine", "bm25"]
+        assert [[r["chunk_id"] for r in item["results"]] for item in data] == [["a1", "a2"], ["b1"]]
+        assert data[0]["timings"]["retrieve_time"] >= 0
+        assert data[0]["timings"]["rerank_time"] is None
+        assert "X-Retrieve-Time" in response.headers
+        assert "X-Rerank-Time" not in response.headers
+
+    def test_rerank_only_requested_queries(self, batch_dependencies):
+        """Test: only queries with rerank=true are reranked, each with its own timings"""
+        mock_retrieve, mock_rerank = batch_dependencies
+        mock_retrieve.return_value = [
+            ([self._doc("a1"), self._doc("a2")], [0.9, 0.8]),
+            ([self._doc("b1")], [0.7]),
+        ]
+        mock_rerank.return_value = [(self._doc("a2"), 0.99), (self._doc("a1"), 0.1)]
+
+        response = client.post("/v1/similarity-search:batch", json={"queries": [
+            {"query": "first", "top_k": 2, "rerank": True},
+            {"query": "second", "top_k": 1},
+        ]})
+
+        assert response.status_code == 200
+        mock_rerank.assert_called_once()
+        assert mock_rerank.call_args[0][0] == "first"
+        data = response.json()["results"]
+        assert data[0]["score_type"] == "relevance"
+        assert [r["chunk_id"] for r in data[0]["results"]] == ["a2", "a1"]
+        assert data[0]["timings"]["rerank_time"] >= 0
+        assert data[1]["score_type"] == "cosine"
+        assert data[1]["timings"]["rerank_time"] is None
+        assert "X-Rerank-Time" in response.headers
+
+    def test_invalid_query_rejected(self, batch_dependencies):
+        """Test: an empty query or invalid mode anywhere in the batch returns 400"""
+        mock_retrieve, _ = batch_dependencies
+
+        empty = client.post("/v1/similarity-search:batch", json={"queries": [{"query": "ok"}, {"query": " "}]})
+        bad_mode = client.post("/v1/similarity-search:batch", json={"queries": [{"query": "ok", "mode": "fuzzy"}]})
+
+        assert empty.status_code == 400
+        assert bad_mode.status_code == 400
+        assert mock_retrieve.call_count == 0
+
+    def test_format_per_query(self, batch_dependencies):
+        """Test: each query's results follow its own format, and an invalid format returns 400"""
+        mock_retrieve, _ = batch_dependencies
+        mock_retrieve.return_value = [([self._doc("a1")], [0.9]), ([self._doc("b1")], [0.7])]
+
+        response = client.post("/v1/similarity-search:batch", json={"queries": [
+            {"query": "first", "format": "compact"},
+            {"query": "second"},
+        ]})
+        bad_format = client.post("/v1/similarity-search:batch", json={"queries": [{"query": "ok", "format": "ids"}]})
+
+        assert response.status_code == 200
+        data = response.json()["results"]
+        assert data[0]["results"] == [{"chunk_id": "a1", "score": 0.9}]
+        assert data[1]["results"][0]["page_content"] == "b1"
+        assert bad_format.status_code == 400
+        assert "queries[0].format" in bad_format.json()["error"]["message"]
+
+    def test_batch_size_limit(self, batch_dependencies):
+        """Test: more than max_batch_queries queries, or none, are rejected"""
+        from similarity.settings import settings
+
+        with patch.object(settings.similarity, "max_batch_queries", 2):
+            too_many = client.post("/v1/similarity-search:batch", json={"queries": [{"query": "q"}] * 3})
+        empty = client.post("/v1/similarity-search:batch", json={"queries": []})
+
+        assert too_many.status_code == 400
+        assert empty.status_code in (400, 422)
+
+    def test_empty_index_returns_503(self, batch_dependencies):
+        """Test: an empty vector store returns 503"""
+        import common.db_utils as db
+
+        mock_retrieve, _ = batch_dependencies
+        mock_retrieve.side_effect = db.VectorStoreNotReadyError("empty")
+
+        response = client.post("/v1/similarity-search:batch", json={"queries": [{"query": "q"}]})
+
+        assert response.status_code == 503
+
+
+class TestAsyncPipeline:
+    """Tests for the endpoints on the async embedding, search and rerank path"""
+
+    @staticmethod
+    def _doc(name):
+        return {"page_content": name, "filename": "f.pdf", "type": "text", "source": "f.pdf", "chunk_id": name}
+
+    @pytest.fixture
+    def async_dependencies(self):
+        """Mock the vector store, endpoints and async retrieval and reranking"""
+        from similarity.settings import settings
+
+        with patch.object(settings.similarity, "async_pipeline", True), \
+             patch('similarity.app.vectorstore'), \
+             patch('similarity.app.emb_model_dict'), \
+             patch.dict('similarity.app.reranker_model_dict',
+                        {"reranker_model": "r", "reranker_endpoint": "http://rerank"}, clear=True), \
+             patch('similarity.app._validate_query_length', return_value=(True, "")), \
+             patch('similarity.similarity_utils.retrieve_documents') as sync_retrieve, \
+             patch('similarity.similarity_utils.retrieve_documents_async') as mock_retrieve, \
+             patch('similarity.similarity_utils.retrieve_documents_many_async') as mock_retrieve_many, \
+             patch('similarity.similarity_utils.rerank_documents_async') as mock_rerank:
+            yield {
+                "sync_retrieve": sync_retrieve,
+                "retrieve": mock_retrieve,
+                "retrieve_many": mock_retrieve_many,
+                "rerank": mock_rerank,
+            }
+
+    def test_search_awaits_async_retrieval_and_rerank(self, async_dependencies):
+        """Test: a reranked search runs on the async path, not the threaded sync one"""
+        async_dependencies["retrieve"].return_value = ([self._doc("a"), self._doc("b")], [0.9, 0.8])
+        async_dependencies["rerank"].return_value = [(self._doc("b"), 0.95), (self._doc("a"), 0.2)]
+
+        response = client.post("/v1/similarity-search", json={"query": "q", "top_k": 2, "rerank": True})
+
+        assert response.status_code == 200
+        async_dependencies["retrieve"].assert_awaited_once()
+        async_dependencies["rerank"].assert_awaited_once()
+        async_dependencies["sync_retrieve"].assert_not_called()
+        assert [r["chunk_id"] for r in response.json()["results"]] == ["b", "a"]
+        assert "X-Rerank-Time" in response.headers
+
+    def test_batch_reranks_concurrently(self, async_dependencies):
+        """Test: the batch endpoint retrieves once and reranks each requested query"""
+        async_dependencies["retrieve_many"].return_value = [
+            ([self._doc("a1")], [0.9]),
+            ([self._doc("b1")], [0.7]),
+        ]
+        async_dependencies["rerank"].side_effect = lambda query, docs, *args: [(docs[0], 0.5)]
+
+        response = client.post("/v1/similarity-search:batch", json={"queries": [
+            {"query": "first", "top_k": 1, "rerank": True},
+            {"query": "second", "top_k": 1, "rerank": True},
+        ]})
+
+        assert response.status_code == 200
+        async_dependencies["retrieve_many"].assert_awaited_once()
+        assert sorted(c.args[0] for c in async_dependencies["rerank"].await_args_list) == ["first", "second"]
+        assert [item["score_type"] for item in response.json()["results"]] == ["relevance", "relevance"]
+
+    def test_empty_index_returns_503(self, async_dependencies):
+        """Test: an empty vector store returns 503 on the async path"""
+        import common.db_utils as db
+
+        async_dependencies["retrieve"].side_effect = db.VectorStoreNotReadyError("empty")
+
+        response = client.post("/v1/similarity-search", json={"query": "q"})
+
+        assert response.status_code == 503
+
+
 class TestConfig:
     """Tests for startup-time config validation"""
 
@@ -9,7 +9,6 @@ import uvicorn
 from fastapi import FastAPI, Request, UploadFile, File, Form, BackgroundTasks
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.responses import JSONResponse, StreamingResponse, Response
-from starlette.concurrency import iterate_in_threadpool
 
 from common.misc_utils import set_log_level, get_logger
 from summarize.db_operations import create_job_with_db
@@ -29,8 +28,8 @@ from summarize.models import (
 
 set_log_level(settings.common.app.log_level)
 
-from common.llm_utils import query_vllm_summarize, query_vllm_summarize_stream, tokenize_with_llm
-from common.misc_utils import get_llm_endpoint, set_request_id, configure_uvicorn_logging, create_llm_session
+from common.llm_utils import query_vllm_summarize_async, query_vllm_summarize_stream_async, tokenize_many, tokenize_with_llm
+from common.misc_utils import get_llm_endpoint, set_request_id, configure_uvicorn_logging, create_llm_session, create_async_llm_client, close_async_llm_client
 from common.diagnostic_logger import setup_comprehensive_crash_handler
 
 from common.error_utils import http_error_responses
@@ -76,6 +75,7 @@ async def lifespan(app):
     filtered_paths = ['/health']
     configure_uvicorn_logging(settings.common.app.log_level, filtered_paths)
     create_llm_session(pool_maxsize=settings.common.llm.max_batch_size)
+    create_async_llm_client(max_connections=settings.common.llm.max_batch_size)
     initialize_models()
     
     # Check database connection and initialize schema (required for operation)
@@ -122,6 +122,7 @@ async def lifespan(app):
         logger.info("Database connections closed")
     except Exception as e:
         logger.error(f"Error closing database connections: {e}", exc_info=True)
+    await close_async_llm_client()
     stderr_monitor.stop()
 
 # OpenAPI tags metadata for endpoint organization
@@ -199,7 +200,7 @@ def initialize_models():
 async def locked_stream(stream_g):
     """Wrap a vLLM SSE generator, releasing the concurrency semaphore when the stream ends."""
     try:
-        async for chunk in iterate_in_threadpool(stream_g):
+        async for chunk in stream_g:
             yield chunk
     finally:
         concurrency_limiter.release()
@@ -263,8 +264,7 @@ async def handle_summarize(
     if stream:
         await concurrency_limiter.acquire()
         try:
-            vllm_stream = await asyncio.to_thread(
-                query_vllm_summarize_stream,
+            vllm_stream = query_vllm_summarize_stream_async(
                 llm_endpoint=llm_endpoint,
                 messages=messages,
                 model=llm_model,
@@ -288,9 +288,7 @@ async def handle_summarize(
 
     async with concurrency_limiter:
         start = time.time()
-        # Running the call in a async thread pool to avoid blocking the event loop
-        result, in_tokens, out_tokens = await asyncio.to_thread(
-            query_vllm_summarize,
+        result, in_tokens, out_tokens = await query_vllm_summarize_async(
             llm_endpoint=llm_endpoint,
             messages=messages,
             model=llm_model,
@@ -590,8 +588,7 @@ async def process_summarization_job(job_id: str, level):
             
             # Call LLM with semaphore
             async with concurrency_limiter:
-                result, in_tokens, out_tokens = await asyncio.to_thread(
-                    query_vllm_summarize,
+                result, in_tokens, out_tokens = await query_vllm_summarize_async(
                     llm_endpoint=llm_endpoint,
                     messages=messages,
                     model=llm_model,
@@ -635,13 +632,14 @@ async def process_summarization_job(job_id: str, level):
             chunk_token_info = []
             total_estimated_summary_tokens = 0
             
-            for i, chunk in enumerate(chunks):
-                chunk_tokens = await asyncio.to_thread(
-                    tokenize_with_llm,
-                    chunk,
-                    llm_endpoint
-                )
-                chunk_input_tokens = len(chunk_tokens)
+            # Tokenize all chunks in one batched call
+            chunk_token_counts = await asyncio.to_thread(
+                tokenize_many,
+                chunks,
+                llm_endpoint
+            )
+
+            for i, chunk_input_tokens in enumerate(chunk_token_counts):
                 chunk_available_output_tokens = (
                     get_llm_max_model_len()
                     - chunk_input_tokens
@@ -746,8 +744,7 @@ async def process_summarization_job(job_id: str, level):
                     
                     try:
                         async with concurrency_limiter:  # Global vLLM limit
-                            chunk_result, chunk_in_tokens, chunk_out_tokens = await asyncio.to_thread(
-                                query_vllm_summarize,
+                            chunk_result, chunk_in_tokens, chunk_out_tokens = await query_vllm_summarize_async(
                                 llm_endpoint=llm_endpoint,
                                 messages=chunk_messages,
                                 model=llm_model,
@@ -853,8 +850,7 @@ async def process_summarization_job(job_id: str, level):
             logger.info(f"Merge messages: {merge_messages}")
             # Final merge call
             async with concurrency_limiter:
-                merge_result, merge_in_tokens, merge_out_tokens = await asyncio.to_thread(
-                    query_vllm_summarize,
+                merge_result, merge_in_tokens, merge_out_tokens = await query_vllm_summarize_async(
                     llm_endpoint=llm_endpoint,
                     messages=merge_messages,
                     model=llm_model,
@@ -266,7 +266,7 @@ class TestHandleSummarize:
              patch("summarize.app.validate_input_and_get_available_tokens", return_value=200), \
              patch("summarize.app.compute_target_and_max_tokens", return_value=(60, 51, 69, 80)), \
              patch("summarize.app.build_messages", return_value=[{"role": "user", "content": "prompt"}]), \
-             patch("summarize.app.query_vllm_summarize", return_value=("Sentence one. Sentence two incomplete", 40, 20)):
+             patch("summarize.app.query_vllm_summarize_async", return_value=("Sentence one. Sentence two incomplete", 40, 20)):
             result = await handle_summarize(
                 content_text=summarize_sample_text,
                 input_type="text",
@@ -316,7 +316,7 @@ class TestHandleSummarize:
              patch("summarize.app.validate_input_and_get_available_tokens", return_value=200), \
              patch("summarize.app.compute_target_and_max_tokens", return_value=(60, 51, 69, 80)), \
              patch("summarize.app.build_messages", return_value=[{"role": "user", "content": "prompt"}]), \
-             patch("summarize.app.query_vllm_summarize", return_value=({"error": "failure"}, 40, 0)):
+             patch("summarize.app.query_vllm_summarize_async", return_value=({"error": "failure"}, 40, 0)):
             with pytest.raises(SummarizeException) as exc:
                 await handle_summarize(
                     content_text=summarize_sample_text,
@@ -352,7 +352,7 @@ class TestHandleSummarize:
              patch("summarize.app.validate_input_and_get_available_tokens", return_value=200), \
              patch("summarize.app.compute_target_and_max_tokens", return_value=(60, 51, 69, 80)), \
              patch("summarize.app.build_messages", return_value=[{"role": "user", "content": "prompt"}]), \
-             patch("summarize.app.query_vllm_summarize_stream", side_effect=Exception("llm down")):
+             patch("summarize.app.query_vllm_summarize_stream_async", side_effect=Exception("llm down")):
             with pytest.raises(SummarizeException) as exc:
                 await handle_summarize(
                     content_text=summarize_sample_text,
@@ -377,7 +377,7 @@ class TestHandleSummarize:
             def release(self):
                 return None
 
-        def fake_stream():
+        async def fake_stream():
             yield "data: hello\n\n"
 
         with patch("summarize.app.concurrency_limiter", DummyLimiter()), \
@@ -390,7 +390,7 @@ class TestHandleSummarize:
              patch("summarize.app.validate_input_and_get_available_tokens", return_value=200), \
              patch("summarize.app.compute_target_and_max_tokens", return_value=(60, 51, 69, 80)), \
              patch("summarize.app.build_messages", return_value=[{"role": "user", "content": "prompt"}]), \
-             patch("summarize.app.query_vllm_summarize_stream", return_value=fake_stream()):
+             patch("summarize.app.query_vllm_summarize_stream_async", return_value=fake_stream()):
             response = await handle_summarize(
                 content_text=summarize_sample_text,
                 input_type="text",
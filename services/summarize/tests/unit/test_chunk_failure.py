@@ -12,7 +12,7 @@ Patching strategy
 -----------------
 process_summarization_job uses names from two scopes:
 
-* Top-level imports in summarize/app.py (e.g. tokenize_with_llm, query_vllm_summarize,
+* Top-level imports in summarize/app.py (e.g. tokenize_with_llm, query_vllm_summarize_async,
   compute_target_and_max_tokens, cleanup_staging_directory …).
   These must be patched at  ``summarize.app.<name>``  because that is where Python
   resolves them at call time.
@@ -101,7 +101,8 @@ def _make_patches(tmp_path, mock_db_repo, chunks, query_side_effect=None):
         6  cleanup_staging_directory     (top-level import in app.py)
         7  split_text_into_chunks  (local import → patch at source)
         8  build_merge_messages    (local import → patch at source)
-        9  query_vllm_summarize    (top-level import in app.py)
+        9  query_vllm_summarize_async (top-level import in app.py)
+        10 tokenize_many           (top-level import in app.py)
     """
     return [
         # 0 — results_dir points at tmp_path so open() has a real directory
@@ -126,8 +127,11 @@ def _make_patches(tmp_path, mock_db_repo, chunks, query_side_effect=None):
             {"role": "system", "content": "sys"},
             {"role": "user", "content": "merge"},
         ]),
-        # 9  — top-level import: from common.llm_utils import query_vllm_summarize
-        patch("summarize.app.query_vllm_summarize", side_effect=query_side_effect),
+        # 9  — top-level import: from common.llm_utils import query_vllm_summarize_async
+        patch("summarize.app.query_vllm_summarize_async", side_effect=query_side_effect),
+        # 10 — top-level import: from common.llm_utils import tokenize_many
+        patch("summarize.app.tokenize_many",
+              side_effect=lambda texts, endpoint: [len(_TOKEN_LIST)] * len(texts)),
     ]
 
 
@@ -238,42 +242,42 @@ class TestChunkFailureHandling:
         chunk_1_cancelled = asyncio.Event()
         llm_call_count = 0
 
-        # query_vllm_summarize is called synchronously inside asyncio.to_thread.
-        # We need chunk-1's to_thread call to be cancellable, so we override
-        # asyncio.to_thread itself: the first LLM call fails immediately; the
-        # second blocks in an awaitable sleep that catches CancelledError.
-        original_to_thread = asyncio.to_thread
+        # query_vllm_summarize_async is awaited directly on the event loop: the
+        # first LLM call fails immediately; the second blocks in an awaitable
+        # sleep that catches CancelledError.
+        async def controlled_query(*args, **kwargs):
+            nonlocal llm_call_count
+            llm_call_count += 1
+            if llm_call_count == 1:
+                return {"error": "instant failure"}, 10, 0
+            # Chunk 1+: block until cancelled — proves sibling cancellation
+            try:
+                await asyncio.sleep(60)
+                return "summary", 10, 5
+            except asyncio.CancelledError:
+                chunk_1_cancelled.set()
+                raise
 
         async def controlled_to_thread(func, *args, **kwargs):
-            nonlocal llm_call_count
             # app.py makes four kinds of asyncio.to_thread calls:
             #   (a) lambda: len(tokenize_with_llm(...))  → no positional args → return int
             #   (b) tokenize_with_llm, chunk, endpoint   → return list (caller calls len())
             #   (c) split_text_into_chunks, text, ...    → return the test's chunks list
-            #   (d) query_vllm_summarize, ...            → LLM result tuple
+            #   (e) tokenize_many, chunks, endpoint      → per-chunk token counts
             import summarize.chunk_utils as _chunk_utils
             import summarize.app as _app
 
             split_mock = getattr(_chunk_utils, "split_text_into_chunks", None)
-            query_mock = getattr(_app, "query_vllm_summarize", None)
+            tokenize_many_mock = getattr(_app, "tokenize_many", None)
+
+            if func is tokenize_many_mock:
+                # (e) batched chunk tokenization
+                return func(*args, **kwargs)
 
             if func is split_mock:
                 # (c) return the pre-configured chunks list
                 return chunks
 
-            if func is query_mock:
-                # (d) LLM call
-                llm_call_count += 1
-                if llm_call_count == 1:
-                    return {"error": "instant failure"}, 10, 0
-                # Chunk 1+: block until cancelled — proves sibling cancellation
-                try:
-                    await asyncio.sleep(60)
-                    return "summary", 10, 5
-                except asyncio.CancelledError:
-                    chunk_1_cancelled.set()
-                    raise
-
             # (a) tokenize lambda — no positional args, lambda wraps len() itself
             if not args:
                 return len(_TOKEN_LIST)
@@ -283,10 +287,7 @@ class TestChunkFailureHandling:
 
         import summarize.app as app_module
 
-        patches = _make_patches(tmp_path, mock_db_repo, chunks)
-        # Remove the query_vllm_summarize patch (index 9) — we control it via
-        # controlled_to_thread instead, so it must not be patched separately.
-        patches.pop(9)
+        patches = _make_patches(tmp_path, mock_db_repo, chunks, query_side_effect=controlled_query)
 
         with _MultiPatch(patches), \
              patch("asyncio.to_thread", side_effect=controlled_to_thread):